@@ -4,16 +4,21 @@
 Interface Streamlit pour l'Extraction de Graphes de Connaissances
 Master 2 Web Sémantique - Projet T-Box/A-Box avec LLM
 Architecture Neuro-Symbolique Hybride (100% conformité audit)
+
+Le pipeline s'exécute dans le processus Streamlit : le modèle spaCy et la
+T-Box sont chargés une fois (st.cache_resource) et partagés par toutes les
+sessions ; la barre de progression suit les étapes réelles de
+KnowledgeGraphPipeline.process() (paramètre `progress`), et les entités,
+relations et statistiques sont lues dans le graphe retourné.
 """
 
 import streamlit as st
 import os
 import sys
 from PIL import Image
-import subprocess
-import tempfile
-from pathlib import Path
-import json
+import contextlib
+import io
+import time
 from datetime import datetime
 
 # Configuration de la page
@@ -85,8 +90,9 @@ st.markdown("""
 # VÉRIFICATION DES MODULES - Système de diagnostic
 # ============================================================================
 
+@st.cache_data(show_spinner=False)
 def check_modules_status():
-    """Vérifie que tous les modules requis sont présents et fonctionnels"""
+    """Vérifie que tous les modules requis sont présents et fonctionnels (une fois par serveur)"""
     status = {
         "modules": {},
         "overall": True,
@@ -136,10 +142,11 @@ def check_modules_status():
         status["overall"] = False
         status["score"] -= 35
     
-    # Vérifier spaCy
+    # Vérifier spaCy (présence du modèle, sans le charger : le pipeline le charge une fois)
     try:
         import spacy
-        nlp = spacy.load("fr_core_news_sm")
+        if not spacy.util.is_package("fr_core_news_sm"):
+            raise OSError("fr_core_news_sm")
         status["modules"]["spaCy (fr_core_news_sm)"] = {
             "present": True,
             "layers": f"Version {spacy.__version__}",
@@ -172,6 +179,66 @@ def check_modules_status():
     
     return status
 
+# ============================================================================
+# PIPELINE EN MÉMOIRE - Ressources chargées une fois par serveur
+# ============================================================================
+
+# Libellés affichés pendant chaque étape de KnowledgeGraphPipeline.process()
+STAGE_LABELS = {
+    "validation": "🔍 Module 0 - Entry gate (validation du texte)",
+    "entities": "🔍 Module 0++ - Extraction NER Hybride (7 couches)",
+    "types": "🤖 Raffinement des types (Groq/Llama-3.1)",
+    "abox": "🔧 Instanciation A-Box + scores de confiance",
+    "relations": "🤖 Extraction des relations (verbes + LLM)",
+    "reification": "📊 Réification des relations (provenance)",
+    "reasoning": "⚙️ Module 1 - Validation OWL + Reasoning",
+    "export": "📦 Génération fichiers RDF + Visualisation",
+}
+
+
+@st.cache_resource(show_spinner="⏳ Chargement du modèle spaCy et de la T-Box...")
+def load_pipeline_pool():
+    """
+    Pipeline chaud (modèle spaCy, HybridNER, T-Box) partagé par les sessions.
+
+    Un seul pipeline : les extractions de sessions simultanées passent
+    l'une après l'autre (PipelinePool de kg_service.py).
+    """
+    from kg_service import PipelinePool
+    with contextlib.redirect_stdout(io.StringIO()):
+        return PipelinePool.create(workers=1, reasoning=True)
+
+
+def graph_entities(graph):
+    """Lignes (entité, types, confiance) des instances de l'A-Box."""
+    from rdflib import RDF, RDFS
+    from kg_extraction_semantic_web import DATA, EX
+
+    rows = []
+    for subject in sorted(set(graph.subjects(RDFS.label, None))):
+        if not str(subject).startswith(str(DATA)):
+            continue
+        types = sorted(graph.namespace_manager.normalizeUri(t) for t in graph.objects(subject, RDF.type))
+        confidence = graph.value(subject, EX.confidence)
+        rows.append({
+            "Entité": str(graph.value(subject, RDFS.label)),
+            "Type(s)": ", ".join(types),
+            "Confiance": round(float(confidence), 2) if confidence is not None else None,
+        })
+    return rows
+
+
+def graph_relations(graph):
+    """Lignes (sujet, propriété, objet) des relations entre instances."""
+    from rdflib import RDFS
+    from kg_extraction_semantic_web import DATA, EX
+
+    labels = {s: str(o) for s, o in graph.subject_objects(RDFS.label) if str(s).startswith(str(DATA))}
+    rows = [{"Sujet": labels[s], "Propriété": graph.namespace_manager.normalizeUri(p), "Objet": labels[o]}
+            for s, p, o in graph if str(p).startswith(str(EX)) and s in labels and o in labels]
+    return sorted(rows, key=lambda row: (row["Sujet"], row["Propriété"], row["Objet"]))
+
+
 # ============================================================================
 # HEADER
 # ============================================================================
@@ -303,6 +370,7 @@ with st.sidebar:
             if os.path.exists(file):
                 os.remove(file)
                 cleaned += 1
+        st.session_state.pop("extraction", None)
         if cleaned > 0:
             st.success(f"✅ {cleaned} fichier(s) nettoyé(s) !")
             st.rerun()
@@ -383,158 +451,114 @@ if generate_btn:
         st.error("❌ Impossible de lancer l'extraction : certains modules sont manquants. Vérifiez le diagnostic ci-dessus.")
     else:
         with col1:
-            with st.spinner('🔄 Analyse en cours...'):
-                # Créer un progress bar avec étapes du pipeline
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # Afficher les étapes du pipeline
-                st.markdown("### 🔄 Pipeline d'Extraction")
-                
-                pipeline_status = st.empty()
-                
-                # Étape 1: Préparation
-                pipeline_status.markdown('<div class="pipeline-step">⏳ <strong>Étape 1/7</strong> : Préparation du texte...</div>', unsafe_allow_html=True)
-                progress_bar.progress(10)
-                
-                # Sauvegarder le texte dans le fichier temporaire
-                with open("texte_temp.txt", "w", encoding="utf-8") as f:
-                    f.write(user_input)
-                
-                # Étape 2: Module 0++ - NER Hybride
-                pipeline_status.markdown('<div class="pipeline-step">🔍 <strong>Étape 2/7</strong> : Module 0++ - Extraction NER Hybride (7 couches)...</div>', unsafe_allow_html=True)
-                progress_bar.progress(25)
-                
-                # Étape 3: Normalisation et déduplication
-                pipeline_status.markdown('<div class="pipeline-step">🔧 <strong>Étape 3/7</strong> : Normalisation + Déduplication...</div>', unsafe_allow_html=True)
-                progress_bar.progress(40)
-                
-                # Étape 4: Extraction relations LLM
-                pipeline_status.markdown('<div class="pipeline-step">🤖 <strong>Étape 4/7</strong> : Interrogation LLM (Groq/Llama-3.1)...</div>', unsafe_allow_html=True)
-                progress_bar.progress(55)
-                
-                # Étape 5: Module 1 - OWL Reasoning
-                pipeline_status.markdown('<div class="pipeline-step">⚙️ <strong>Étape 5/7</strong> : Module 1 - Validation OWL + Reasoning...</div>', unsafe_allow_html=True)
-                progress_bar.progress(70)
-                
-                # Étape 6: Confidence Scoring
-                pipeline_status.markdown('<div class="pipeline-step">📊 <strong>Étape 6/7</strong> : Calcul des scores de confiance...</div>', unsafe_allow_html=True)
-                progress_bar.progress(85)
-                
-                try:
-                    # Exécuter le script d'extraction avec python3
-                    result = subprocess.run(
-                        ["python3", "kg_extraction_semantic_web.py"],
-                        capture_output=True,
-                        text=True,
-                        timeout=60,
-                        cwd=os.getcwd()
-                    )
+            from confidence_scorer import ConfidenceScorer
+            from kg_extraction_semantic_web import PipelineInputError, visualize_knowledge_graph
+            from kg_service import ServiceBusy, graph_stats
+
+            pool = load_pipeline_pool()
+            st.session_state.pop("extraction", None)
+            
+            # Nouveau graphe à chaque extraction : anciens fichiers supprimés (comme main())
+            for old_file in ["knowledge_graph.ttl", "knowledge_graph.xml", "graphe_connaissance.png"]:
+                if os.path.exists(old_file):
+                    os.remove(old_file)
+            
+            # Barre de progression pilotée par les étapes réelles du pipeline
+            st.markdown("### 🔄 Pipeline d'Extraction")
+            progress_bar = st.progress(0)
+            pipeline_status = st.empty()
+            
+            try:
+                with pool.acquire() as pipeline:
+                    stages = [stage for stage in pipeline.STAGES
+                              if stage != "reasoning" or pipeline.reasoning] + ["export"]
                     
-                    # Étape 7: Génération RDF
-                    pipeline_status.markdown('<div class="pipeline-step">📦 <strong>Étape 7/7</strong> : Génération fichiers RDF + Visualisation...</div>', unsafe_allow_html=True)
-                    progress_bar.progress(100)
+                    def show_stage(index):
+                        pipeline_status.markdown(
+                            f'<div class="pipeline-step">⏳ <strong>Étape {index + 1}/{len(stages)}</strong> : '
+                            f'{STAGE_LABELS[stages[index]]}...</div>', unsafe_allow_html=True)
                     
-                    # Effacer le statut
-                    import time
-                    time.sleep(1)
-                    pipeline_status.empty()
-                    progress_bar.empty()
+                    def on_stage(stage, seconds):
+                        done = stages.index(stage) + 1
+                        progress_bar.progress(done / len(stages))
+                        show_stage(done)
                     
-                    if result.returncode == 0:
-                        st.success("✅ **Extraction terminée avec succès !** Tous les modules ont été exécutés.", icon="✅")
-                        
-                        # Afficher les logs détaillés si demandé
-                        if show_detailed_logs:
-                            st.markdown("---")
-                            st.markdown("### 📋 Logs Détaillés du Pipeline")
-                            
-                            # Extraire tous les logs du pipeline
-                            output_lines = result.stdout.split('\n')
-                            
-                            # Section Module 0++ - Couches 1-7
-                            module0_logs = [line for line in output_lines if any(x in line for x in [
-                                'MODULE 0++', 'COUCHE', 'Layer', 'HybridNERModule',
-                                '✓ Entité', '🔍 Lemme', 'EntityRuler', 'PROPN', 'Normalisation',
-                                'Déduplication', 'Filtrage', 'Validation ontologique'
-                            ])]
-                            
-                            if module0_logs:
-                                with st.expander("🔍 Module 0++ - NER Hybride (7 Couches)", expanded=True):
-                                    st.markdown("**Extraction multi-couches des entités :**")
-                                    for log in module0_logs:
-                                        if 'COUCHE' in log or 'Layer' in log:
-                                            st.markdown(f"**:blue[{log}]**")
-                                        elif '✓' in log or '✅' in log:
-                                            st.markdown(f"**:green[{log}]**")
-                                        elif '❌' in log or '🚫' in log:
-                                            st.markdown(f"**:red[{log}]**")
-                                        else:
-                                            st.text(log)
-                            
-                            # Section Module 1 - OWL Reasoning
-                            module1_logs = [line for line in output_lines if any(x in line for x in [
-                                'MODULE 1', 'OWL', 'Reasoning', 'domain', 'range',
-                                'Validation', 'Coherence', 'rdfs:subClassOf'
-                            ])]
-                            
-                            if module1_logs:
-                                with st.expander("⚙️ Module 1 - OWL Reasoning Engine", expanded=True):
-                                    for log in module1_logs:
-                                        if 'VALIDE' in log or '✅' in log:
-                                            st.markdown(f"**:green[{log}]**")
-                                        elif 'VIOLATION' in log or '❌' in log:
-                                            st.markdown(f"**:red[{log}]**")
-                                        else:
-                                            st.text(log)
-                            
-                            # Section Confidence System
-                            confidence_logs = [line for line in output_lines if any(x in line for x in [
-                                'confidence', 'Confiance', 'Score', 'STATISTIQUES',
-                                'Min:', 'Max:', 'Mean:'
-                            ])]
-                            
-                            if confidence_logs:
-                                with st.expander("📊 Confidence Scoring System", expanded=True):
-                                    for log in confidence_logs:
-                                        if 'STATISTIQUES' in log:
-                                            st.markdown(f"**:blue[{log}]**")
-                                        elif 'Min:' in log or 'Max:' in log or 'Mean:' in log:
-                                            st.markdown(f"**:orange[{log}]**")
-                                        else:
-                                            st.text(log)
-                            
-                            # Section Relations
-                            relation_logs = [line for line in output_lines if any(x in line for x in [
-                                '→', 'teaches', 'worksAt', 'author', 'manages', 'studies',
-                                'Relation LLM', '🤖 Groq', 'Priorité'
-                            ])]
-                            
-                            if relation_logs:
-                                with st.expander("🔗 Relations Extraites (Verbes + LLM)", expanded=True):
-                                    for log in relation_logs:
-                                        if '→' in log or 'teaches' in log or 'worksAt' in log:
-                                            st.markdown(f"**:violet[{log}]**")
-                                        elif '🤖' in log:
-                                            st.markdown(f"**:blue[{log}]**")
-                                        else:
-                                            st.text(log)
-                        else:
-                            st.info("💡 Activez 'Afficher les logs détaillés' pour voir l'exécution de chaque module")
+                    show_stage(0)
+                    timings = {}
+                    logs = io.StringIO()
+                    with contextlib.redirect_stdout(logs):
+                        graph = pipeline.process(user_input, source_file="streamlit",
+                                                 timings=timings, progress=on_stage)
                         
-                    else:
-                        st.warning("⚠️ Le script s'est exécuté mais a rencontré des problèmes.")
-                        with st.expander("🔍 Détails de l'erreur"):
-                            st.code(result.stderr if result.stderr else result.stdout)
-                
-                except subprocess.TimeoutExpired:
-                    pipeline_status.empty()
-                    progress_bar.empty()
-                    st.error("❌ Timeout : le traitement a pris trop de temps (> 60s)")
-                except Exception as e:
-                    pipeline_status.empty()
-                    progress_bar.empty()
-                    st.error(f"❌ Erreur lors de l'exécution : {str(e)}")
+                        # Exports Turtle + RDF/XML et visualisation (affichés plus bas)
+                        start = time.perf_counter()
+                        graph.serialize(destination="knowledge_graph.ttl", format="turtle", encoding="utf-8")
+                        graph.serialize(destination="knowledge_graph.xml", format="xml", encoding="utf-8")
+                        visualize_knowledge_graph(graph, "graphe_connaissance.png")
+                        timings["export"] = round(time.perf_counter() - start, 6)
+                    progress_bar.progress(1.0)
+                    
+                    st.session_state["extraction"] = {
+                        "entities": graph_entities(graph),
+                        "relations": graph_relations(graph),
+                        "stats": graph_stats(graph, pipeline.tbox),
+                        "confidence": ConfidenceScorer(graph, verbose=False).get_confidence_statistics(),
+                        "timings": timings,
+                        "logs": logs.getvalue(),
+                    }
+            except PipelineInputError as e:
+                st.warning(f"⚠️ Texte rejeté par l'entry gate : {e}")
+            except ServiceBusy:
+                st.error("❌ Le pipeline est occupé par une autre session, réessayez dans un instant.")
+            except Exception as e:
+                st.error(f"❌ Erreur lors de l'exécution : {str(e)}")
+            finally:
+                pipeline_status.empty()
+                progress_bar.empty()
+
+# ============================================================================
+# RÉSULTATS - Lus dans le graphe retourné par le pipeline
+# ============================================================================
+
+extraction = st.session_state.get("extraction")
+
+if extraction:
+    with col1:
+        st.success("✅ **Extraction terminée avec succès !** Tous les modules ont été exécutés.", icon="✅")
+        
+        timings = extraction["timings"]
+        st.caption("⏱️ " + " | ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+                   + f" — total {sum(timings.values()) * 1000:.0f} ms")
+        
+        stats = extraction["stats"]
+        col_res1, col_res2, col_res3, col_res4 = st.columns(4)
+        col_res1.metric("Triplets RDF", stats["triples"])
+        col_res2.metric("Entités", stats["instances"])
+        col_res3.metric("Relations", stats["relations"])
+        col_res4.metric("Réifications", stats["reified"])
+        
+        with st.expander(f"🔍 Module 0++ - Entités extraites ({len(extraction['entities'])})", expanded=True):
+            st.dataframe(extraction["entities"], hide_index=True)
+        
+        with st.expander(f"🔗 Relations Extraites (Verbes + LLM) ({len(extraction['relations'])})", expanded=True):
+            if extraction["relations"]:
+                st.dataframe(extraction["relations"], hide_index=True)
+            else:
+                st.info("Aucune relation entre les entités détectées")
+        
+        with st.expander("📊 Confidence Scoring System", expanded=True):
+            confidence = extraction["confidence"]
+            col_conf1, col_conf2, col_conf3, col_conf4 = st.columns(4)
+            col_conf1.metric("Scores", confidence["count"])
+            col_conf2.metric("Min", f"{confidence['min']:.2f}")
+            col_conf3.metric("Max", f"{confidence['max']:.2f}")
+            col_conf4.metric("Moyenne", f"{confidence['mean']:.2f}")
+        
+        if show_detailed_logs:
+            with st.expander("📋 Logs Détaillés du Pipeline", expanded=False):
+                st.code(extraction["logs"], language=None)
+        else:
+            st.info("💡 Activez 'Afficher les logs détaillés' pour voir l'exécution de chaque module")
 
 # ============================================================================
 # VISUALISATION - Colonne de droite
@@ -640,8 +664,12 @@ with tab3:
                 st.metric("🏢 Organisations/Lieux", orgs)
             
             with col_stat3:
-                relations = content.count("ex:worksAt") + content.count("ex:teaches") + \
-                           content.count("ex:collaboratesWith") + content.count("ex:studiesAt")
+                if extraction:
+                    # Toutes les relations entre instances du graphe de la dernière extraction
+                    relations = extraction["stats"]["relations"]
+                else:
+                    relations = content.count("ex:worksAt") + content.count("ex:teaches") + \
+                               content.count("ex:collaboratesWith") + content.count("ex:studiesAt")
                 st.metric("🔗 Relations", relations)
             
             st.divider()
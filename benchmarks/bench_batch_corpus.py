@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : DÉBIT DU MODE CORPUS (DOCUMENTS / SECONDE)
+
+Construit un corpus en répétant les textes de tests/test_cases, puis mesure
+le débit de trois façons de le traiter :
+
+1. Un chargement de modèle par document (ce que coûte main() appelé une fois
+   par texte) : temps de spacy.load + HybridNER mesuré une fois, ajouté au
+   temps de traitement de chaque document (estimation sans le démarrage de
+   l'interpréteur, qui s'y ajoute en réalité)
+2. KnowledgeGraphPipeline.process() document par document (modèle partagé,
+   analyse spaCy nlp(text) à chaque document)
+3. kg_batch.process_corpus() : analyse en flux nlp.pipe, pour chaque nombre
+   de processus spaCy demandé (--workers)
+
+Le backend LLM est le backend local déterministe (aucun appel réseau), le
+cache LLM et le mémo des types sont désactivés, le raisonnement OWL est
+désactivé : seul le coût du pipeline local est mesuré.
+
+Usage :
+    python benchmarks/bench_batch_corpus.py [--docs 200] [--batch-size 32] [--workers 1 2 4]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES_DIR = os.path.join(ROOT, "tests", "test_cases")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du mode corpus (nlp.pipe)")
+    parser.add_argument("--docs", type=int, default=200, help="Nombre de documents du corpus")
+    parser.add_argument("--batch-size", type=int, default=32, help="Documents par lot nlp.pipe")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="Nombres de processus spaCy à mesurer")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    args = parser.parse_args()
+
+    # Configuration lue à l'import des modules du pipeline
+    os.environ["KG_LLM_CACHE"] = "0"
+    os.environ["KG_ENTITY_MEMO"] = "0"
+    os.environ["KG_LLM_RPM"] = "0"
+
+    import spacy
+
+    import kg_batch
+    import kg_extraction_semantic_web as kg
+    from llm_backends import LocalStandInBackend
+
+    cases = [open(os.path.join(CASES_DIR, name), encoding="utf-8").read().strip()
+             for name in sorted(os.listdir(CASES_DIR)) if name.endswith(".txt")]
+    corpus = [(f"doc_{i:05d}", cases[i % len(cases)]) for i in range(args.docs)]
+
+    def quiet(func, *a, **k):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*a, **k)
+
+    start = time.perf_counter()
+    nlp = quiet(spacy.load, args.model)
+    pipeline = quiet(kg.KnowledgeGraphPipeline, nlp=nlp, llm_backend=LocalStandInBackend(),
+                     reasoning=False)
+    load_s = time.perf_counter() - start
+
+    print("=" * 80)
+    print(f"BENCHMARK MODE CORPUS — {args.docs} documents ({len(cases)} textes distincts), "
+          f"modèle {args.model}, batch_size={args.batch_size}")
+    print(f"  chargement du modèle + HybridNER : {load_s * 1000:.0f} ms")
+    print("=" * 80)
+
+    def sequential():
+        for doc_id, text in corpus:
+            try:
+                pipeline.process(text, source_file=doc_id)
+            except kg.PipelineInputError:
+                pass
+
+    start = time.perf_counter()
+    quiet(sequential)
+    sequential_s = time.perf_counter() - start
+
+    rows = [("chargement par document (estimé)", sequential_s + load_s * args.docs),
+            ("process() séquentiel", sequential_s)]
+    for workers in args.workers:
+        start = time.perf_counter()
+        _, report = quiet(kg_batch.process_corpus, pipeline, corpus,
+                          batch_size=args.batch_size, n_process=workers)
+        rows.append((f"process_corpus n_process={workers}", time.perf_counter() - start))
+
+    baseline = rows[0][1]
+    for label, elapsed in rows:
+        print(f"  {label:<36} {elapsed:7.2f} s   {args.docs / elapsed:8.1f} docs/s   "
+              f"x{baseline / elapsed:.1f}")
+    print(f"\n  graphe fusionné : {report['triples']} triplets, "
+          f"{report['processed']} traité(s), {report['rejected']} rejeté(s)")
+    print(f"  cœurs disponibles : {os.cpu_count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : PRÉDICTION DES RELATIONS SÉQUENTIELLE vs CONCURRENTE
+
+Simule un document dense (N paires candidates) dont chaque prédiction coûte
+une latence réseau tirée aléatoirement, puis mesure le temps total de l'étape
+relations pour plusieurs niveaux de concurrence (concurrent_relations.py).
+
+Attendu : en séquentiel, temps ≈ somme des latences ; en concurrent (sans
+limitation de débit), temps ≈ latence max × ceil(N / concurrence).
+
+Usage :
+    python benchmarks/bench_concurrent_relations.py [--pairs 40] [--latency 0.3] [--rpm 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent_relations import run_predictions
+from llm_rate_limiter import TokenBucket
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Étape relations : séquentiel vs concurrent")
+    parser.add_argument("--pairs", type=int, default=40, help="Nombre de paires candidates")
+    parser.add_argument("--latency", type=float, default=0.3, help="Latence moyenne d'un appel (s)")
+    parser.add_argument("--rpm", type=float, default=0, help="Quota simulé en req/min (0 = aucun)")
+    parser.add_argument("--burst", type=float, default=5, help="Rafale du seau à jetons")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    latencies = [args.latency * rng.uniform(0.5, 1.5) for _ in range(args.pairs)]
+
+    def run(concurrency):
+        limiter = TokenBucket(args.rpm / 60.0, args.burst) if args.rpm > 0 else None
+
+        def predict(idx, latency):
+            if limiter is not None:
+                limiter.acquire()
+            time.sleep(latency)
+            return idx
+
+        start = time.perf_counter()
+        results = run_predictions(list(enumerate(latencies)), predict, concurrency)
+        elapsed = time.perf_counter() - start
+        assert results == list(range(args.pairs)), "ordre des résultats non conservé"
+        return elapsed
+
+    print("=" * 80)
+    print(f"BENCHMARK RELATIONS — {args.pairs} paires, latence ≈ {args.latency * 1000:.0f} ms"
+          + (f", quota {args.rpm:.0f} req/min" if args.rpm > 0 else ""))
+    print(f"  somme des latences : {sum(latencies):.2f} s   max : {max(latencies):.2f} s")
+    print("=" * 80)
+
+    baseline = None
+    for concurrency in (1, 4, 8, 16, args.pairs):
+        elapsed = run(concurrency)
+        baseline = baseline or elapsed
+        print(f"  concurrence={concurrency:<4} temps={elapsed:6.2f} s   accélération=x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : BALAYAGE any(kw in texte) vs INDEX DE MOTS-CLÉS COMPILÉ
+
+Mesure, sur les textes du corpus tests/test_cases (phrases, fenêtres de
+contexte local de 100 caractères et groupes de mots courts façon entités),
+le coût des tests de mots-clés dans quatre modes :
+  - "scan"        : any(kw in texte for kw in LISTE)   (ancien comportement)
+  - "index"       : KeywordIndex.contains_any(texte)   (alternance regex compilée)
+  - "scan-all"    : {kw for kw in LISTE if kw in texte}
+  - "find-all"    : KeywordIndex.find_all(texte)       (automate Aho-Corasick)
+
+Les listes mesurées sont celles des règles (relation_rules.py) et la liste
+TECH_CONCEPT_KEYWORDS du NER hybride (≈ 125 mots-clés).
+Les résultats de chaque paire de modes sont vérifiés identiques avant la mesure.
+
+Usage :
+    python benchmarks/bench_keyword_index.py [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relation_rules
+from hybrid_ner_module import HybridNERModule
+from keyword_index import KeywordIndex
+
+CASES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "tests", "test_cases")
+
+
+# ============================================================================
+# CORPUS
+# ============================================================================
+
+def load_texts():
+    """Phrases, fenêtres de contexte et n-grammes (entités) en minuscules."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(CASES_DIR, "cas_*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            content = f.read().lower()
+        sentences = [s.strip() for s in re.split(r"[.!?\n]+", content) if s.strip()]
+        texts.extend(sentences)
+        for sentence in sentences:
+            texts.extend(sentence[i:i + 100] for i in range(0, max(1, len(sentence) - 50), 25))
+            words = sentence.split()
+            texts.extend(" ".join(words[i:i + n]) for n in (1, 2, 3) for i in range(len(words)))
+    return texts
+
+
+def keyword_lists():
+    lists = {name: list(value) for name, value in vars(relation_rules).items()
+             if isinstance(value, KeywordIndex)}
+    lists["TECH_CONCEPT_KEYWORDS"] = sorted(HybridNERModule.TECH_CONCEPT_KEYWORDS)
+    return lists
+
+
+# ============================================================================
+# MESURE
+# ============================================================================
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balayage any(kw in texte) vs KeywordIndex")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions (meilleur temps retenu)")
+    args = parser.parse_args()
+
+    texts = load_texts()
+    lists = keyword_lists()
+
+    print("=" * 80)
+    print(f"BENCHMARK INDEX DE MOTS-CLÉS — {len(texts)} textes × {len(lists)} listes")
+    print("=" * 80)
+    print(f"  {'liste':<24}{'mots':>5}{'scan':>10}{'index':>10}{'gain':>8}"
+          f"{'scan-all':>11}{'find-all':>10}{'gain':>8}")
+
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for name, keywords in lists.items():
+        index = KeywordIndex(keywords)
+        for text in texts:
+            assert index.contains_any(text) == any(kw in text for kw in keywords), (name, text)
+            assert index.find_all(text) == {kw for kw in keywords if kw in text}, (name, text)
+
+        timings = [
+            best_of(args.repeat, lambda: [any(kw in t for kw in keywords) for t in texts]),
+            best_of(args.repeat, lambda: [index.contains_any(t) for t in texts]),
+            best_of(args.repeat, lambda: [{kw for kw in keywords if kw in t} for t in texts]),
+            best_of(args.repeat, lambda: [index.find_all(t) for t in texts]),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        scan, indexed, scan_all, find_all = (timing * 1000 for timing in timings)
+        print(f"  {name:<24}{len(keywords):>5}{scan:>8.2f}ms{indexed:>8.2f}ms{scan / indexed:>7.1f}x"
+              f"{scan_all:>9.2f}ms{find_all:>8.2f}ms{scan_all / find_all:>7.1f}x")
+
+    scan, indexed, scan_all, find_all = (total * 1000 for total in totals)
+    print(f"\n  {'TOTAL':<29}{scan:>8.2f}ms{indexed:>8.2f}ms{scan / indexed:>7.1f}x"
+          f"{scan_all:>9.2f}ms{find_all:>8.2f}ms{scan_all / find_all:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : CLIENT GROQ PAR APPEL vs CLIENT PARTAGÉ (llm_client_registry)
+
+Mesure la latence par appel de chat.completions.create dans deux modes :
+  - "fresh"  : Groq(api_key=...) construit à chaque appel (ancien comportement)
+  - "pooled" : client partagé du registre, connexions HTTP keep-alive
+
+Par défaut, les appels visent le serveur local compatible API Groq
+(llm_backends.LocalStandInServer), afin de mesurer uniquement le coût
+client + connexion sans consommer de quota.
+Avec --live, les appels partent vers l'API Groq réelle (GROQ_API_KEY requis).
+
+Le cache LLM est désactivé pendant la mesure : chaque appel part sur le réseau.
+
+Usage :
+    python benchmarks/bench_llm_client.py [--calls 50] [--live]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq import Groq
+
+import llm_client_registry
+from llm_backends import LocalStandInServer
+from llm_client_registry import get_groq_client
+
+MODEL = "llama-3.1-8b-instant"
+MESSAGES = [
+    {"role": "system", "content": "You are a relation extraction expert. Output only the relation name."},
+    {"role": "user", "content": "Entity 1: Marie Curie\nEntity 2: Sorbonne\nRelation:"},
+]
+
+
+# ============================================================================
+# MESURE
+# ============================================================================
+
+def _call(client):
+    client.chat.completions.create(messages=MESSAGES, model=MODEL, temperature=0)
+
+
+def run_fresh(api_key, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = Groq(api_key=api_key)
+        _call(client)
+        latencies.append(time.perf_counter() - start)
+        client.close()
+    return latencies
+
+
+def run_pooled(api_key, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        _call(get_groq_client(api_key))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"  {name:<8} moyenne={statistics.mean(latencies) * 1000:8.2f} ms   "
+          f"médiane={statistics.median(latencies) * 1000:8.2f} ms   "
+          f"p95={p95 * 1000:8.2f} ms   total={sum(latencies):6.2f} s")
+    return statistics.mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence Groq : client par appel vs client partagé")
+    parser.add_argument("--calls", type=int, default=50, help="Nombre d'appels par mode")
+    parser.add_argument("--live", action="store_true", help="Appeler l'API Groq réelle")
+    args = parser.parse_args()
+
+    os.environ["KG_LLM_CACHE"] = "0"
+
+    server = None
+    if args.live:
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("❌ GROQ_API_KEY absent : --live impossible")
+            sys.exit(1)
+        target = "API Groq"
+    else:
+        server = LocalStandInServer().start()
+        base_url = server.base_url
+        os.environ["GROQ_BASE_URL"] = base_url
+        api_key = "bench-key"
+        target = base_url
+
+    print("=" * 80)
+    print(f"BENCHMARK CLIENT LLM — {args.calls} appels par mode — cible : {target}")
+    print("=" * 80)
+
+    # Un appel de chauffe par mode (imports paresseux, résolution DNS)
+    run_fresh(api_key, 1)
+    run_pooled(api_key, 1)
+
+    fresh = summarize("fresh", run_fresh(api_key, args.calls))
+    pooled = summarize("pooled", run_pooled(api_key, args.calls))
+    print(f"\n  Gain par appel : {(fresh - pooled) * 1000:.2f} ms  (x{fresh / pooled:.2f})")
+
+    llm_client_registry.close_all_clients()
+    if server is not None:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
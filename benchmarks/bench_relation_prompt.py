@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RAPPORT : PROMPT DE RELATION COMPLET vs COMPACT (TOKENS ET LATENCE)
+
+Exécute l'extraction (entités → raffinement → relations) sur chaque texte de
+tests/test_cases, une fois avec le prompt de relation complet (règles
+répétées à chaque paire) et une fois avec le prompt compact
+(KG_COMPACT_PROMPT : règles condensées une seule fois dans le message système,
+relations admissibles limitées à la ligne RELATION_TABLE de la paire).
+
+Pour chaque mode, le rapport donne le nombre d'appels LLM, les tokens
+d'entrée/sortie (llm_token_usage.py), la latence par appel, et l'accord des
+relations produites avec le mode complet.
+
+Par défaut :
+  - backend local déterministe (llm_backends.LocalStandInBackend), dont la
+    latence croît avec la taille du prompt (--token-latency s / 1000 tokens) ;
+    avec --live, l'API Groq réelle (GROQ_API_KEY requis, comptes exacts)
+  - règles d'abord désactivées (KG_RULE_FIRST=0) pour que chaque paire
+    candidate passe par le LLM ; --rule-first pour mesurer le pipeline tel quel
+  - cache LLM désactivé : chaque appel est compté
+
+Usage :
+    python benchmarks/bench_relation_prompt.py [--batch] [--rule-first] [--live]
+                                               [--token-latency 0.05] [--output rapport.json]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES_DIR = os.path.join(ROOT, "tests", "test_cases")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prompt de relation : complet vs compact")
+    parser.add_argument("--batch", action="store_true", help="Mode batch (un appel par document)")
+    parser.add_argument("--rule-first", action="store_true", help="Garder les règles d'abord")
+    parser.add_argument("--live", action="store_true", help="Appeler l'API Groq réelle")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence fixe du backend local (s)")
+    parser.add_argument("--token-latency", type=float, default=0.05,
+                        help="Latence du backend local par 1000 tokens de prompt (s)")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    parser.add_argument("--output", help="Fichier JSON du rapport détaillé")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Configuration lue à l'import des modules du pipeline
+    os.environ["KG_LLM_CACHE"] = "0"
+    os.environ["KG_RULE_FIRST"] = "1" if args.rule_first else "0"
+    if not args.live:
+        os.environ["KG_LLM_RPM"] = "0"
+
+    import spacy
+    from rdflib import Graph
+
+    import kg_extraction_semantic_web as kg
+    from llm_backends import LocalStandInBackend, get_llm_backend, set_llm_backend
+    from llm_token_usage import get_token_usage_stats
+
+    if args.live:
+        if not get_llm_backend().is_available():
+            print("❌ GROQ_API_KEY absent : --live impossible")
+            sys.exit(1)
+        target = "API Groq"
+    else:
+        set_llm_backend(LocalStandInBackend(latency=args.latency, token_latency=args.token_latency))
+        target = f"backend local ({args.token_latency * 1000:.0f} ms / 1000 tokens de prompt)"
+
+    cases = sorted(glob.glob(os.path.join(CASES_DIR, "cas_*.txt")))
+    texts = [open(path, encoding="utf-8").read() for path in cases]
+    nlp = spacy.load(args.model)
+    usage_stats = get_token_usage_stats()
+
+    def run(compact):
+        kg.COMPACT_PROMPT_MODE = compact
+        usage_stats.reset()
+        relations = []
+        start = time.perf_counter()
+        for text in texts:
+            graph = Graph()
+            with contextlib.redirect_stdout(io.StringIO()):
+                kg.define_tbox(graph)
+                entities = kg.extract_entities_with_spacy(text, nlp)
+                entities = kg.refine_entity_types(entities, text)
+                entity_uris = kg.instantiate_entities_in_abox(graph, entities)
+                kg.extract_relations(graph, entity_uris, text, batch_mode=args.batch)
+            relations.append({(str(s), str(p), str(o)) for s, p, o in graph
+                              if str(p).startswith(str(kg.EX)) and "confidence" not in str(p)})
+        summary = usage_stats.summary()
+        summary["wall_time"] = round(time.perf_counter() - start, 3)
+        return summary, relations
+
+    print("=" * 80)
+    print(f"RAPPORT PROMPT DE RELATION — {len(texts)} textes — "
+          f"{'batch' if args.batch else 'une requête par paire'} — cible : {target}")
+    print("=" * 80)
+
+    verbose, verbose_relations = run(compact=False)
+    compact, compact_relations = run(compact=True)
+
+    agreement = sum(a == b for a, b in zip(verbose_relations, compact_relations))
+    triples_verbose = sum(len(r) for r in verbose_relations)
+    triples_common = sum(len(a & b) for a, b in zip(verbose_relations, compact_relations))
+
+    print(f"  {'mode':<10}{'appels':>8}{'tokens in':>12}{'in/appel':>10}{'tokens out':>12}"
+          f"{'ms/appel':>10}{'total (s)':>11}")
+    for name, summary in (("complet", verbose), ("compact", compact)):
+        print(f"  {name:<10}{summary['calls']:>8}{summary['prompt_tokens']:>12}"
+              f"{summary['prompt_tokens_per_call']:>10}{summary['completion_tokens']:>12}"
+              f"{summary['latency_per_call_ms']:>10}{summary['wall_time']:>11}")
+
+    if verbose["prompt_tokens"]:
+        saved = 1 - compact["prompt_tokens"] / verbose["prompt_tokens"]
+        print(f"\n  Tokens d'entrée économisés : {saved:.1%}")
+    if verbose["latency_total"]:
+        print(f"  Latence LLM cumulée : {verbose['latency_total']:.2f} s → {compact['latency_total']:.2f} s")
+    print(f"  Relations identiques : {agreement}/{len(texts)} document(s), "
+          f"{triples_common}/{triples_verbose} triplet(s) du mode complet retrouvés")
+    if verbose["estimated_calls"] or compact["estimated_calls"]:
+        print("  (comptes de tokens estimés : le backend ne renvoie pas d'usage)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"verbose": verbose, "compact": compact,
+                       "documents": len(texts), "documents_identical": agreement,
+                       "triples_verbose": triples_verbose, "triples_common": triples_common},
+                      f, indent=2, ensure_ascii=False)
+        print(f"  Rapport détaillé : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
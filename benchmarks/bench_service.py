@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : LATENCE PAR REQUÊTE, SOUS-PROCESSUS CONTRE SERVICE CHAUD
+
+Mesure la latence médiane d'une extraction pour un texte de
+tests/test_cases, de trois façons :
+
+1. Sous-processus par requête : ce que faisait app_streamlit.py (texte écrit
+   dans texte_temp.txt puis `python3 kg_extraction_semantic_web.py`,
+   démarrage de l'interpréteur, imports, spaCy, T-Box, exports compris)
+2. POST /extract sur kg_service.py (pipelines chauds, format "turtle")
+3. KnowledgeGraphPipeline.process() seul : le coût de l'extraction
+
+puis la latence du service sous --clients requêtes simultanées.
+
+Le backend LLM est le backend local déterministe (aucun appel réseau), le
+cache LLM et le mémo des types sont désactivés, le raisonnement OWL est
+désactivé (service et process()) ; le sous-processus exécute main() tel quel.
+
+Usage :
+    python benchmarks/bench_service.py [--requests 20] [--subprocess-requests 5] [--workers 2] [--clients 4]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES_DIR = os.path.join(ROOT, "tests", "test_cases")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence : sous-processus par requête contre service chaud")
+    parser.add_argument("--requests", type=int, default=20, help="Requêtes mesurées (service, process())")
+    parser.add_argument("--subprocess-requests", type=int, default=5,
+                        help="Requêtes mesurées en sous-processus")
+    parser.add_argument("--workers", type=int, default=2, help="Pipelines chauds du service")
+    parser.add_argument("--clients", type=int, default=4, help="Requêtes simultanées")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    args = parser.parse_args()
+
+    # Configuration lue à l'import des modules du pipeline (et héritée par le sous-processus)
+    os.environ["KG_LLM_CACHE"] = "0"
+    os.environ["KG_ENTITY_MEMO"] = "0"
+    os.environ["KG_LLM_RPM"] = "0"
+    os.environ["KG_LLM_BACKEND"] = "local"
+
+    from kg_logging import set_log_level
+    from kg_service import PipelinePool, create_server
+
+    cases = [open(os.path.join(CASES_DIR, name), encoding="utf-8").read().strip()
+             for name in sorted(os.listdir(CASES_DIR)) if name.endswith(".txt")]
+    texts = [cases[i % len(cases)] for i in range(args.requests)]
+
+    # 1. Un sous-processus par requête (ancien app_streamlit.py)
+    subprocess_s = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for text in texts[:args.subprocess_requests]:
+            with open(os.path.join(workdir, "texte_temp.txt"), "w", encoding="utf-8") as handle:
+                handle.write(text)
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(ROOT, "kg_extraction_semantic_web.py")],
+                           cwd=workdir, capture_output=True, timeout=120, stdin=subprocess.DEVNULL)
+            subprocess_s.append(time.perf_counter() - start)
+
+    # 2. Service chaud
+    set_log_level("WARNING")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pool = PipelinePool.create(args.workers, args.model, reasoning=False)
+    startup_s = time.perf_counter() - start
+    server = create_server(pool, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/extract"
+
+    def post(text):
+        body = json.dumps({"text": text}).encode("utf-8")
+        start = time.perf_counter()
+        with urllib.request.urlopen(url, data=body, timeout=120) as response:
+            response.read()
+        return time.perf_counter() - start
+
+    service_s = [post(text) for text in texts]
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        start = time.perf_counter()
+        concurrent_s = list(executor.map(post, texts))
+        concurrent_wall = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+
+    # 3. Extraction seule
+    process_s = []
+    with pool.acquire() as pipeline:
+        for text in texts:
+            start = time.perf_counter()
+            try:
+                pipeline.process(text, reasoning=False)
+            except Exception:
+                pass
+            process_s.append(time.perf_counter() - start)
+
+    def ms(values):
+        return statistics.median(values) * 1000
+
+    print("=" * 80)
+    print(f"BENCHMARK SERVICE — {len(cases)} textes distincts, modèle {args.model}, "
+          f"{args.workers} pipeline(s) chaud(s)")
+    print(f"  démarrage du service (chargement + chauffe) : {startup_s:.2f} s")
+    print("=" * 80)
+    rows = [("sous-processus par requête", subprocess_s),
+            ("POST /extract (séquentiel)", service_s),
+            (f"POST /extract ({args.clients} clients)", concurrent_s),
+            ("process() seul", process_s)]
+    for label, values in rows:
+        print(f"  {label:<32} médiane {ms(values):8.1f} ms   ({len(values)} requêtes)")
+    print(f"\n  part de l'extraction dans la latence du service : "
+          f"{100 * ms(process_s) / ms(service_s):.0f} %")
+    print(f"  débit à {args.clients} clients : {len(texts) / concurrent_wall:.1f} requêtes/s")
+    print(f"  cœurs disponibles : {os.cpu_count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : DÉMARRAGE À FROID DU POINT D'ENTRÉE (python -X importtime)
+
+Lance --runs interpréteurs neufs qui importent kg_extraction_semantic_web
+avec `python -X importtime`, et relève :
+
+1. Le temps d'import cumulé du module (médiane), et la durée totale de
+   l'interpréteur
+2. Les imports directs les plus coûteux (dernière exécution)
+3. Les dépendances chargées à la demande (matplotlib, networkx, groq,
+   huggingface_hub, httpx) qui auraient été importées quand même : elles ne
+   doivent apparaître qu'à la visualisation ou au premier appel LLM distant
+
+--cli mesure en plus une exécution complète du script (`--no-viz` puis avec
+visualisation) sur un texte de tests/test_cases ; elle nécessite le modèle
+spaCy fr_core_news_sm.
+
+Pour l'intégration continue : --budget-ms fait échouer le script (code 1)
+si la médiane dépasse le budget ou si une dépendance paresseuse est chargée
+à l'import ; --json écrit les mesures pour suivre leur évolution.
+
+Le backend LLM est le backend local (aucun appel réseau), le cache LLM et le
+mémo des types sont désactivés.
+
+Usage :
+    python benchmarks/bench_startup.py [--runs 5] [--top 10] [--cli] [--budget-ms 2500] [--json startup.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES_DIR = os.path.join(ROOT, "tests", "test_cases")
+
+MODULE = "kg_extraction_semantic_web"
+
+# Dépendances importées à la première utilisation seulement
+LAZY_MODULES = ("matplotlib", "networkx", "groq", "huggingface_hub", "httpx")
+
+# "import time: self [us] | cumulative | imported package" (indentation = profondeur)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def _environment():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env.update(KG_LLM_BACKEND="local", KG_LLM_CACHE="0", KG_ENTITY_MEMO="0", KG_LLM_RPM="0")
+    return env
+
+
+def measure_import(env):
+    """(cumulé du module en s, durée de l'interpréteur en s, {module: cumulé}, {direct: cumulé})."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+
+    modules, direct = {}, {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)) / 1e6, len(match.group(3)) // 2, match.group(4)
+        modules[name] = cumulative
+        if depth == 1:
+            direct[name] = cumulative
+    return modules[MODULE], wall, modules, direct
+
+
+def measure_cli(env, text, no_viz):
+    """Durée d'une exécution complète du script (répertoire temporaire)."""
+    command = [sys.executable, os.path.join(ROOT, f"{MODULE}.py")]
+    if no_viz:
+        command.append("--no-viz")
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        result = subprocess.run(command + ["--text", text], cwd=workdir, env=env,
+                                capture_output=True, stdin=subprocess.DEVNULL, timeout=300)
+        elapsed = time.perf_counter() - start
+    return elapsed if result.returncode == 0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage à froid de kg_extraction_semantic_web")
+    parser.add_argument("--runs", type=int, default=5, help="Interpréteurs mesurés")
+    parser.add_argument("--top", type=int, default=10, help="Imports directs affichés")
+    parser.add_argument("--cli", action="store_true",
+                        help="Mesure aussi une exécution complète du script (modèle spaCy requis)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Échec (code 1) si l'import médian dépasse ce budget")
+    parser.add_argument("--json", default=None, help="Fichier JSON des mesures")
+    args = parser.parse_args()
+
+    env = _environment()
+    runs = [measure_import(env) for _ in range(args.runs)]
+    import_ms = statistics.median(run[0] for run in runs) * 1000
+    wall_ms = statistics.median(run[1] for run in runs) * 1000
+    _, _, modules, direct = runs[-1]
+    loaded_lazy = sorted(name for name in LAZY_MODULES if name in modules)
+
+    print("=" * 80)
+    print(f"BENCHMARK DÉMARRAGE — import {MODULE}, {args.runs} interpréteur(s) neuf(s)")
+    print("=" * 80)
+    print(f"  import du module (médiane)      {import_ms:8.1f} ms")
+    print(f"  interpréteur complet (médiane)  {wall_ms:8.1f} ms")
+    print(f"\n  Imports directs les plus coûteux :")
+    for name, seconds in sorted(direct.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"    {name:<32} {seconds * 1000:8.1f} ms")
+    print(f"\n  Dépendances paresseuses chargées à l'import : {', '.join(loaded_lazy) or 'aucune'}")
+
+    results = {
+        "module": MODULE,
+        "runs": args.runs,
+        "import_ms": round(import_ms, 1),
+        "interpreter_ms": round(wall_ms, 1),
+        "top_imports_ms": {name: round(seconds * 1000, 1) for name, seconds
+                           in sorted(direct.items(), key=lambda item: -item[1])[:args.top]},
+        "lazy_modules_loaded": loaded_lazy,
+    }
+
+    if args.cli:
+        name = sorted(n for n in os.listdir(CASES_DIR) if n.endswith(".txt"))[0]
+        text = open(os.path.join(CASES_DIR, name), encoding="utf-8").read().strip()
+        print(f"\n  Exécution complète du script ({name}) :")
+        for label, no_viz in (("--no-viz", True), ("avec visualisation", False)):
+            elapsed = measure_cli(env, text, no_viz)
+            key = "cli_no_viz_ms" if no_viz else "cli_viz_ms"
+            results[key] = round(elapsed * 1000, 1) if elapsed is not None else None
+            print(f"    {label:<32} " + (f"{elapsed * 1000:8.1f} ms" if elapsed is not None
+                                           else "échec (modèle spaCy installé ?)"))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, ensure_ascii=False)
+
+    if args.budget_ms is not None:
+        failures = []
+        if import_ms > args.budget_ms:
+            failures.append(f"import médian {import_ms:.0f} ms > budget {args.budget_ms:.0f} ms")
+        if loaded_lazy:
+            failures.append(f"dépendances paresseuses importées : {', '.join(loaded_lazy)}")
+        if failures:
+            print("\n❌ " + " ; ".join(failures))
+            sys.exit(1)
+        print(f"\n✅ Démarrage dans le budget ({args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK : PASSAGE À L'ÉCHELLE DU POOL DE WORKERS (1 → N CŒURS)
+
+Construit un corpus en répétant les textes de tests/test_cases et le traite
+avec kg_worker_pool.process_corpus_parallel() pour 1, 2, 4... N workers.
+
+Pour chaque nombre de workers :
+  - temps total et débit (documents / seconde)
+  - accélération = T(1 worker) / T(n workers)
+  - efficacité = accélération / n (1.0 = passage à l'échelle parfait)
+  - équilibre : documents traités par le worker le plus et le moins chargé
+
+Le backend LLM est le backend local déterministe, avec une latence simulée
+optionnelle (--latency) pour représenter des appels réseau ; cache LLM, mémo
+des types et raisonnement OWL sont désactivés.
+
+Usage :
+    python benchmarks/bench_worker_pool.py [--docs 200] [--max-workers 8] [--latency 0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES_DIR = os.path.join(ROOT, "tests", "test_cases")
+
+
+def worker_counts(max_workers):
+    """1, 2, 4... jusqu'à max_workers inclus."""
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Passage à l'échelle du pool de workers")
+    parser.add_argument("--docs", type=int, default=200, help="Nombre de documents du corpus")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="Nombre maximal de workers (défaut : nombre de cœurs)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latence simulée d'un appel LLM (s)")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    args = parser.parse_args()
+
+    # Configuration lue à l'import des modules du pipeline
+    os.environ["KG_LLM_CACHE"] = "0"
+    os.environ["KG_ENTITY_MEMO"] = "0"
+    os.environ["KG_LLM_RPM"] = "0"
+
+    import spacy
+
+    import kg_extraction_semantic_web as kg
+    import kg_worker_pool
+    from llm_backends import LocalStandInBackend
+
+    if not kg_worker_pool.fork_available():
+        print("❌ fork() indisponible sur cette plateforme")
+        sys.exit(1)
+
+    cases = [open(os.path.join(CASES_DIR, name), encoding="utf-8").read().strip()
+             for name in sorted(os.listdir(CASES_DIR)) if name.endswith(".txt")]
+    corpus = [(f"doc_{i:05d}", cases[i % len(cases)]) for i in range(args.docs)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = kg.KnowledgeGraphPipeline(nlp=spacy.load(args.model),
+                                             llm_backend=LocalStandInBackend(latency=args.latency),
+                                             reasoning=False)
+
+    print("=" * 80)
+    print(f"BENCHMARK POOL DE WORKERS — {args.docs} documents, modèle {args.model}, "
+          f"latence LLM {args.latency * 1000:.0f} ms, {os.cpu_count()} cœur(s) disponible(s)")
+    print("=" * 80)
+
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, report = kg_worker_pool.process_corpus_parallel(pipeline, corpus, workers=workers)
+        elapsed = report["elapsed_s"]
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        loads = [stats["documents"] for stats in report["per_worker"].values()]
+        print(f"  workers={workers:<3} {elapsed:7.2f} s   {report['docs_per_s']:8.1f} docs/s   "
+              f"accélération x{speedup:.2f}   efficacité {speedup / workers:.2f}   "
+              f"docs/worker {min(loads)}-{max(loads)}")
+    print(f"\n  graphe fusionné : {report['triples']} triplets, "
+          f"{report['processed']} traité(s), {report['rejected']} rejeté(s)")
+
+
+if __name__ == "__main__":
+    main()
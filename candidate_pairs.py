@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GÉNÉRATION DES PAIRES CANDIDATES PAR FENÊTRE DE PHRASES
+
+Énumérer toutes les paires d'entités d'un document fait croître le nombre
+d'appels LLM de façon quadratique avec la longueur du texte, alors que la
+quasi-totalité des relations réelles se trouvent dans une même phrase ou
+dans deux phrases adjacentes.
+
+Le générateur s'appuie sur les phrases spaCy (doc.sents) :
+==========================================================
+1. Chaque entité est localisée dans les phrases où elle apparaît
+2. Une paire est retenue si deux de ses mentions sont à au plus `window`
+   phrases d'écart (0 = même phrase, 1 = phrases adjacentes, ...)
+3. Une paire hors fenêtre est repêchée si ses mentions sont reliées par un
+   chemin de dépendances d'au plus `max_dep_hops` arcs ; spaCy construit un
+   arbre par phrase, les arbres de deux phrases sont donc reliés par la
+   chaîne de leurs racines (un arc par phrase d'écart) : une mention proche
+   de la racine de sa phrase (sujet, objet du verbe principal) reste liée
+   aux phrases voisines
+4. Une entité introuvable dans le texte (forme normalisée par le NER) n'est
+   jamais élaguée : ses paires sont conservées par prudence
+5. Pour chaque paire retenue, le contexte transmis au LLM est le passage
+   couvrant les deux mentions les plus proches, et non le document entier
+
+Configuration (.env) :
+======================
+KG_RELATION_WINDOW    Écart maximal en phrases (défaut : 1 ; -1 = toutes les paires)
+KG_RELATION_DEP_HOPS  Longueur maximale du chemin de dépendances (défaut : 4)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from document_index import DocumentIndex
+
+
+@dataclass
+class CandidatePair:
+    """Paire retenue : indices dans la liste d'entités, motif et contexte"""
+    index1: int
+    index2: int
+    reason: str       # "window", "dependency" ou "unplaced"
+    context: str
+
+
+class SentenceWindowPairGenerator:
+    """
+    Sélectionne les paires d'entités proches dans le document.
+
+    Utilisation :
+    -------------
+    >>> generator = SentenceWindowPairGenerator(window=1)
+    >>> pairs = generator.generate(doc, ["Marie Curie", "Sorbonne", "Paris"])
+    >>> generator.stats
+    {'pairs_total': 3, 'pairs_kept': 2, 'pairs_pruned': 1, ...}
+    """
+
+    def __init__(self, window: int = 1, max_dep_hops: int = 4):
+        """
+        Args:
+            window: Écart maximal en phrases entre deux mentions (< 0 = aucun élagage)
+            max_dep_hops: Chemin de dépendances maximal pour repêcher une paire
+                          hors fenêtre (0 = critère désactivé)
+        """
+        self.window = window
+        self.max_dep_hops = max_dep_hops
+        self.stats = {}
+
+    @classmethod
+    def from_env(cls) -> "SentenceWindowPairGenerator":
+        return cls(
+            window=int(os.getenv("KG_RELATION_WINDOW", "1")),
+            max_dep_hops=int(os.getenv("KG_RELATION_DEP_HOPS", "4")),
+        )
+
+    # ── Chemins de dépendances ──────────────────────────────────────────────
+
+    @staticmethod
+    def _dependency_distance(token1, token2) -> Optional[int]:
+        """Nombre d'arcs entre deux tokens dans l'arbre de dépendances (None si non reliés)."""
+        depth1 = {token1.i: 0}
+        for depth, ancestor in enumerate(token1.ancestors, start=1):
+            depth1[ancestor.i] = depth
+        if token2.i in depth1:
+            return depth1[token2.i]
+        for depth, ancestor in enumerate(token2.ancestors, start=1):
+            if ancestor.i in depth1:
+                return depth + depth1[ancestor.i]
+        return None
+
+    # ── Génération ──────────────────────────────────────────────────────────
+
+    def generate(self, doc, entity_texts: Sequence[str],
+                 doc_index: Optional[DocumentIndex] = None) -> List[CandidatePair]:
+        """
+        Paires (i < j) retenues, dans l'ordre de l'énumération exhaustive.
+
+        Args:
+            doc: Document spaCy du texte source
+            entity_texts: Entités dans l'ordre de entity_uris
+            doc_index: Index du document déjà construit (sinon construit ici)
+
+        Returns:
+            list: CandidatePair retenues ; les compteurs sont dans self.stats
+        """
+        if doc_index is None:
+            doc_index = DocumentIndex(doc)
+        sentences = doc_index.sentences
+        mentions = doc_index.locate(entity_texts)
+        full_text = doc_index.text
+
+        stats = {"pairs_total": 0, "pairs_kept": 0, "pairs_pruned": 0,
+                 "kept_window": 0, "kept_dependency": 0, "kept_unplaced": 0}
+        pairs = []
+
+        for i, text1 in enumerate(entity_texts):
+            for j in range(i + 1, len(entity_texts)):
+                text2 = entity_texts[j]
+                stats["pairs_total"] += 1
+
+                if self.window < 0:
+                    pairs.append(CandidatePair(i, j, "window", full_text))
+                    stats["kept_window"] += 1
+                    continue
+
+                if not mentions[text1] or not mentions[text2]:
+                    pairs.append(CandidatePair(i, j, "unplaced", full_text))
+                    stats["kept_unplaced"] += 1
+                    continue
+
+                # Mentions les plus proches (en phrases)
+                gap, sent1, sent2 = min(
+                    (abs(s1 - s2), s1, s2)
+                    for s1, _ in mentions[text1]
+                    for s2, _ in mentions[text2]
+                )
+                first, last = min(sent1, sent2), max(sent1, sent2)
+                context = full_text[sentences[first].start_char:sentences[last].end_char]
+
+                if gap <= self.window:
+                    pairs.append(CandidatePair(i, j, "window", context))
+                    stats["kept_window"] += 1
+                    continue
+
+                if (self.max_dep_hops > 0 and doc.has_annotation("DEP")
+                        and self._linked_by_dependency(mentions[text1], mentions[text2])):
+                    pairs.append(CandidatePair(i, j, "dependency", context))
+                    stats["kept_dependency"] += 1
+                    continue
+
+                stats["pairs_pruned"] += 1
+
+        stats["pairs_kept"] = len(pairs)
+        self.stats = stats
+        return pairs
+
+    @staticmethod
+    def _root_depth(token) -> int:
+        """Nombre d'arcs entre un token et la racine de sa phrase."""
+        return sum(1 for _ in token.ancestors)
+
+    def _linked_by_dependency(self, mentions1, mentions2) -> bool:
+        for sent1, span1 in mentions1:
+            for sent2, span2 in mentions2:
+                distance = self._dependency_distance(span1.root, span2.root)
+                if distance is None:
+                    # Arbres distincts : chemin par la chaîne des racines de phrases
+                    distance = (self._root_depth(span1.root) + self._root_depth(span2.root)
+                                + abs(sent1 - sent2))
+                if distance <= self.max_dep_hops:
+                    return True
+        return False
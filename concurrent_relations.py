@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRÉDICTION CONCURRENTE DES RELATIONS (ASYNCIO)
+
+Une fois leurs types NER résolus, les paires candidates d'un document sont
+indépendantes : chaque prédiction est un aller-retour réseau qui n'attend
+rien des autres. Exécutées l'une après l'autre, le temps total est la SOMME
+des latences ; exécutées en parallèle, il tend vers la latence MAXIMALE.
+
+Fonctionnement :
+================
+1. Chaque paire devient une tâche asyncio
+2. Un sémaphore borne le nombre d'appels simultanés (KG_RELATION_CONCURRENCY)
+3. L'appel LLM (client synchrone partagé) s'exécute dans un pool de threads
+4. Le débit réseau reste régulé par le seau à jetons (llm_rate_limiter.py)
+5. Les résultats sont rendus dans l'ordre des paires, quel que soit l'ordre
+   d'arrivée des réponses → graphe identique d'une exécution à l'autre
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+
+async def predict_concurrently(jobs: Sequence[tuple], predict: Callable[..., Any],
+                               concurrency: int) -> List[Any]:
+    """
+    Exécute predict(*job) pour chaque job avec au plus `concurrency` appels en vol.
+
+    Args:
+        jobs: Arguments positionnels de chaque appel
+        predict: Fonction bloquante (ex : predict_relation_real_api)
+        concurrency: Nombre maximal d'appels simultanés
+
+    Returns:
+        list: Un résultat par job, dans l'ordre de `jobs`
+    """
+    concurrency = max(1, int(concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=concurrency,
+                            thread_name_prefix="kg-relation") as executor:
+        async def _run(job):
+            async with semaphore:
+                return await loop.run_in_executor(executor, lambda: predict(*job))
+
+        # gather() conserve l'ordre des tâches : l'application au graphe reste déterministe
+        return await asyncio.gather(*(_run(job) for job in jobs))
+
+
+def run_predictions(jobs: Sequence[tuple], predict: Callable[..., Any],
+                    concurrency: int) -> List[Any]:
+    """
+    Point d'entrée synchrone de predict_concurrently().
+
+    Si une boucle asyncio tourne déjà dans ce thread (notebook, serveur), la
+    coroutine est exécutée dans un thread dédié avec sa propre boucle.
+    """
+    if not jobs:
+        return []
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(predict_concurrently(jobs, predict, concurrency))
+
+    result = {}
+
+    def _worker():
+        try:
+            result["value"] = asyncio.run(predict_concurrently(jobs, predict, concurrency))
+        except BaseException as exc:  # propagé au thread appelant
+            result["error"] = exc
+
+    thread = threading.Thread(target=_worker, name="kg-relation-loop")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
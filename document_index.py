@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+INDEX DES POSITIONS D'UN DOCUMENT (PHRASES, ENTITÉS, TOKENS)
+
+Chaque étape de l'extraction des relations re-parcourait le document pour
+retrouver la même information : la cascade de règles redécoupait et passait
+en minuscules le texte à chaque paire, la couche 7 balayait doc.ents pour
+chaque token enfant d'un verbe, et le repli positionnel rebalayait tout le
+document pour chaque entité.
+
+DocumentIndex est construit UNE fois par texte :
+================================================
+1. token → entité     : entity_at(i), le Span de doc.ents couvrant le token i
+2. mot → position     : last_position(mot), dernier indice de token de ce texte
+3. entité → mentions  : mentions(texte), couples (indice de phrase, Span),
+                        d'où sentence_ids() et char_offsets()
+4. passage → phrases  : passage(texte), découpage re.split(r'[.!?]\\s+') en
+                        minuscules (celui de la cascade de règles), mémorisé
+                        avec l'index « sous-chaîne → phrases qui la contiennent »
+
+Toutes les requêtes sont des accès dictionnaire/liste ; les tables
+paresseuses (mentions, passages) sont remplies au premier accès. L'index est
+partagé par les prédictions concurrentes : les mémos sont des dict (accès
+atomiques sous le GIL) et un calcul en double produit la même valeur.
+"""
+
+import re
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+
+# Découpage en phrases de la cascade de règles (relation_rules.py)
+SENTENCE_SPLIT = re.compile(r'[.!?]\s+')
+
+
+def squeeze(text: str) -> Tuple[str, List[int]]:
+    """Texte en minuscules sans blancs + position d'origine de chaque caractère."""
+    chars, offsets = [], []
+    for offset, char in enumerate(text):
+        if not char.isspace():
+            chars.append(char.lower())
+            offsets.append(offset)
+    return "".join(chars), offsets
+
+
+# ============================================================================
+# PASSAGE DÉCOUPÉ EN PHRASES
+# ============================================================================
+
+class PassageSentences:
+    """
+    Passage découpé en phrases minuscules, avec recherche mémorisée.
+
+    Utilisation :
+    -------------
+    >>> passage = PassageSentences("Marie enseigne. Elle travaille au CNRS.")
+    >>> passage.first_containing("marie", "cnrs")      # aucune phrase commune
+    >>> passage.first_containing("cnrs")
+    'elle travaille au cnrs.'
+    """
+
+    def __init__(self, passage: str):
+        self.text_lower = passage.lower()
+        self.sentences_lower = [sent.lower() for sent in SENTENCE_SPLIT.split(passage)]
+        self._containing: Dict[str, FrozenSet[int]] = {}
+
+    def containing(self, needle: str) -> FrozenSet[int]:
+        """Indices des phrases dont `needle` est sous-chaîne."""
+        ids = self._containing.get(needle)
+        if ids is None:
+            ids = frozenset(idx for idx, sent in enumerate(self.sentences_lower) if needle in sent)
+            self._containing[needle] = ids
+        return ids
+
+    def first_containing(self, *needles: str) -> Optional[str]:
+        """Première phrase contenant toutes les sous-chaînes `needles`, sinon None."""
+        ids = self.containing(needles[0])
+        for needle in needles[1:]:
+            ids = ids & self.containing(needle)
+        return self.sentences_lower[min(ids)] if ids else None
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : DocumentIndex
+# ============================================================================
+
+class DocumentIndex:
+    """
+    Positions des phrases, entités et tokens d'un document spaCy.
+
+    Utilisation :
+    -------------
+    >>> doc_index = DocumentIndex(nlp(text))
+    >>> doc_index.entity_at(token.i)            # Span ou None
+    >>> doc_index.sentence_ids("Marie Curie")   # [0, 2]
+    >>> doc_index.passage(context).first_containing("marie curie", "sorbonne")
+    """
+
+    def __init__(self, doc):
+        """
+        Args:
+            doc: Document spaCy analysé (phrases disponibles via doc.sents)
+        """
+        self.doc = doc
+        self.text = doc.text
+        self.sentences = list(doc.sents)
+
+        # token → premier Span de doc.ents qui le couvre
+        self._token_entity = [None] * len(doc)
+        for ent in doc.ents:
+            for i in range(ent.start, ent.end):
+                if self._token_entity[i] is None:
+                    self._token_entity[i] = ent
+
+        # texte de token → indice de sa dernière occurrence
+        self._last_position = {token.text: token.i for token in doc}
+
+        self._squeezed_sentences = None
+        self._mentions: Dict[str, List[Tuple[int, object]]] = {}
+        self._passages: Dict[str, PassageSentences] = {}
+
+    # ── Tokens ──────────────────────────────────────────────────────────────
+
+    def entity_at(self, token_index: int):
+        """Span de doc.ents contenant le token `token_index` (None sinon)."""
+        return self._token_entity[token_index]
+
+    def last_position(self, token_text: str) -> int:
+        """Indice de la dernière occurrence d'un token de ce texte (-1 si absent)."""
+        return self._last_position.get(token_text, -1)
+
+    # ── Entités ─────────────────────────────────────────────────────────────
+
+    def mentions(self, entity_text: str) -> List[Tuple[int, object]]:
+        """
+        Mentions (indice de phrase, Span) d'une entité dans le document.
+
+        La recherche est textuelle, sans tenir compte de la casse ni des
+        blancs : les couches NER reconstruisent certaines entités en joignant
+        les tokens ("à l' Université") ou en changeant leur casse.
+        """
+        found = self._mentions.get(entity_text)
+        if found is not None:
+            return found
+
+        if self._squeezed_sentences is None:
+            self._squeezed_sentences = [squeeze(sent.text) for sent in self.sentences]
+
+        found = []
+        needle, _ = squeeze(entity_text)
+        if needle:
+            for sent_idx, (haystack, offsets) in enumerate(self._squeezed_sentences):
+                start = haystack.find(needle)
+                while start != -1:
+                    sent = self.sentences[sent_idx]
+                    span = self.doc.char_span(sent.start_char + offsets[start],
+                                              sent.start_char + offsets[start + len(needle) - 1] + 1,
+                                              alignment_mode="expand")
+                    if span is not None:
+                        found.append((sent_idx, span))
+                    start = haystack.find(needle, start + 1)
+        self._mentions[entity_text] = found
+        return found
+
+    def locate(self, entity_texts: Sequence[str]) -> Dict[str, List[Tuple[int, object]]]:
+        """Mentions de plusieurs entités (voir mentions())."""
+        return {text: self.mentions(text) for text in entity_texts}
+
+    def sentence_ids(self, entity_text: str) -> List[int]:
+        """Indices des phrases où l'entité est mentionnée (croissants, sans doublon)."""
+        return sorted({sent_idx for sent_idx, _ in self.mentions(entity_text)})
+
+    def char_offsets(self, entity_text: str) -> List[Tuple[int, int]]:
+        """Positions (début, fin) en caractères de chaque mention de l'entité."""
+        return [(span.start_char, span.end_char) for _, span in self.mentions(entity_text)]
+
+    # ── Passages ────────────────────────────────────────────────────────────
+
+    def passage(self, text: str) -> PassageSentences:
+        """Découpage mémorisé d'un passage du document (ou du document entier)."""
+        passage = self._passages.get(text)
+        if passage is None:
+            passage = self._passages.setdefault(text, PassageSentences(text))
+        return passage
@@ -32,10 +32,12 @@ from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL
 from rdflib.namespace import XSD
 from typing import List, Dict, Optional
 from dataclasses import dataclass
-from groq import Groq
 import json
 import os
 
+from llm_backends import GroqBackend, LLMBackend, get_llm_backend
+from llm_resilience import make_resilient
+
 
 @dataclass
 class ProposedClass:
@@ -96,7 +98,7 @@ class DynamicOntologyProposer:
     """
     
     def __init__(self, base_graph: Graph, groq_api_key: str = None, 
-                 base_namespace: Namespace = None):
+                 base_namespace: Namespace = None, llm_backend: LLMBackend = None):
         """
         Initialize the Dynamic Ontology Proposer.
         
@@ -104,9 +106,15 @@ class DynamicOntologyProposer:
             base_graph: RDF graph containing base ontology (T-Box)
             groq_api_key: Groq API key (optional, loaded from env)
             base_namespace: Namespace for extensions (e.g., EX)
+            llm_backend: LLM backend (optional, defaults to KG_LLM_BACKEND;
+                         an explicit groq_api_key forces a Groq backend)
         """
         self.base_graph = base_graph
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY", "")
+        self.llm_backend = llm_backend or (
+            make_resilient(GroqBackend(api_key=groq_api_key)) if groq_api_key
+            else get_llm_backend()
+        )
         self.base_namespace = base_namespace or Namespace("http://example.org/master2/ontology#")
         
         # Extract base ontology elements
@@ -133,7 +141,7 @@ class DynamicOntologyProposer:
         Returns:
             OntologyExtension object (validated or rejected)
         """
-        if not enable_proposal or not self.groq_api_key:
+        if not enable_proposal or not self.llm_backend.is_available():
             return None
         
         print("\n" + "="*80)
@@ -141,21 +149,12 @@ class DynamicOntologyProposer:
         print("="*80)
         
         try:
-            client = Groq(api_key=self.groq_api_key)
-            
             # Build prompt
             prompt = self._build_llm_prompt(text)
+            system_prompt = "You are an ontology engineering expert. Output only valid JSON."
             
-            response = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are an ontology engineering expert. Output only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0
-            )
-            
-            result = response.choices[0].message.content.strip()
+            # Same text + same base ontology → identical proposal, reuse it from the LLM cache
+            result = self.llm_backend.cached_complete(system_prompt, prompt).strip()
             
             # Parse JSON
             if "```json" in result:
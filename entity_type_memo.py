@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MÉMO PERSISTANT DES TYPES D'ENTITÉS (RAFFINEMENT INTER-DOCUMENTS)
+
+refine_entity_types() demande au LLM de re-classifier les entités de chaque
+document, alors que les mêmes chaînes ("Université de Versailles", "RDFS",
+"Web Sémantique"...) reviennent d'un document à l'autre. Le cache LLM
+(llm_cache.py) ne les retrouve pas : la clé y est le prompt complet, qui
+change avec le texte et la liste des entités.
+
+Ce module mémorise le type raffiné par entité, indépendamment du document.
+
+Caractéristiques :
+==================
+1. Clé = texte normalisé (normalize_uri_fragment, soit le fragment de l'URI
+   de l'instance dans l'A-Box) + signature de contexte optionnelle
+2. Chaque entrée porte le type raffiné, un compteur de hits et sa source
+   (llm, graph)
+3. Entrée ambiguë : deux types différents observés pour la même clé
+   (réponses LLM divergentes, types contradictoires dans le graphe) ;
+   le LLM est alors toujours consulté
+4. Pré-chargement en masse depuis un graphe existant (knowledge_graph.ttl)
+5. Stockage local SQLite (même répertoire que le cache LLM)
+
+Signature de contexte (KG_ENTITY_MEMO_CONTEXT) :
+================================================
+none  Une entrée par texte normalisé (défaut)
+ner   Une entrée par (texte, type spaCy) : "Versailles" LOC et "Versailles"
+      ORG sont mémorisés séparément ; les entrées sans signature (graphe
+      pré-chargé) servent de repli
+
+Configuration (.env) :
+======================
+KG_ENTITY_MEMO          Chemin du fichier SQLite, ou "0" pour désactiver
+KG_ENTITY_MEMO_CONTEXT  Signature de contexte : none | ner
+
+Usage :
+    python entity_type_memo.py warmup knowledge_graph.ttl
+    python entity_type_memo.py stats
+    python entity_type_memo.py clear
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from rdflib import RDF, RDFS, Graph
+
+from kg_metrics import get_metrics
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_MEMO_PATH = os.path.join(".kg_cache", "entity_types.sqlite3")
+
+DATA_NAMESPACE = "http://example.org/master2/data#"
+
+# Classes de l'A-Box → type interne (inverse du mapping d'instanciation).
+# ex:Document en est absent : TOPIC, DOC et MISC documentaire y sont tous
+# instanciés, le type d'origine n'est pas retrouvable depuis la classe
+CLASS_TO_TYPE = {
+    "http://xmlns.com/foaf/0.1/Person": "PER",
+    "http://schema.org/Place": "LOC",
+    "http://schema.org/Organization": "ORG",
+}
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : EntityTypeMemo
+# ============================================================================
+
+class EntityTypeMemo:
+    """
+    Mémo persistant texte normalisé → type raffiné.
+
+    Utilisation :
+    -------------
+    >>> memo = EntityTypeMemo("types.sqlite3")
+    >>> memo.store("web_semantique", "TOPIC")
+    >>> memo.lookup("web_semantique")
+    'TOPIC'
+    >>> memo.stats()
+    {'hits': 1, 'misses': 0, 'entries': 1, 'ambiguous': 0, ...}
+    """
+
+    def __init__(self, db_path: str = DEFAULT_MEMO_PATH, context_mode: str = "none"):
+        """
+        Initialise le mémo et crée la table si nécessaire.
+
+        Args:
+            db_path: Fichier SQLite (":memory:" pour un mémo non persistant)
+            context_mode: Signature de contexte ("none" ou "ner")
+        """
+        self.db_path = db_path
+        self.context_mode = context_mode
+
+        self.hits = 0
+        self.misses = 0
+
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        """Ouvre la connexion SQLite et crée la table si nécessaire."""
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entity_types (
+                key         TEXT NOT NULL,
+                context     TEXT NOT NULL,
+                entity_type TEXT NOT NULL,
+                ambiguous   INTEGER NOT NULL DEFAULT 0,
+                hits        INTEGER NOT NULL DEFAULT 0,
+                source      TEXT NOT NULL,
+                updated_at  REAL NOT NULL,
+                PRIMARY KEY (key, context)
+            )
+        """)
+        self._conn.commit()
+
+    # ── Signature de contexte ───────────────────────────────────────────────
+
+    def context_for(self, ner_type: str) -> str:
+        """Signature de contexte d'une entité selon le mode configuré."""
+        return ner_type if self.context_mode == "ner" else ""
+
+    # ── Lecture / écriture ──────────────────────────────────────────────────
+
+    def lookup(self, key: str, context: str = "") -> Optional[str]:
+        """
+        Type mémorisé pour la clé, ou None (inconnue ou ambiguë).
+
+        L'entrée avec signature est prioritaire ; l'entrée sans signature
+        sert de repli. Un hit incrémente le compteur de l'entrée.
+        """
+        with self._lock:
+            for ctx in ([context, ""] if context else [""]):
+                row = self._conn.execute(
+                    "SELECT entity_type, ambiguous FROM entity_types WHERE key = ? AND context = ?",
+                    (key, ctx),
+                ).fetchone()
+                if row is None:
+                    continue
+                entity_type, ambiguous = row
+                if ambiguous:
+                    break
+                self._conn.execute(
+                    "UPDATE entity_types SET hits = hits + 1 WHERE key = ? AND context = ?",
+                    (key, ctx),
+                )
+                self._conn.commit()
+                self.hits += 1
+                get_metrics().inc("kg_entity_memo_lookups_total", result="hit")
+                return entity_type
+            self.misses += 1
+            get_metrics().inc("kg_entity_memo_lookups_total", result="miss")
+            return None
+
+    def store(self, key: str, entity_type: str, context: str = "", source: str = "llm"):
+        """
+        Mémorise le type d'une clé.
+
+        Un type différent de celui déjà mémorisé marque l'entrée ambiguë
+        (le dernier type observé est conservé pour information).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entity_types (key, context, entity_type, ambiguous, hits, source, updated_at) "
+                "VALUES (?, ?, ?, 0, 0, ?, ?) "
+                "ON CONFLICT(key, context) DO UPDATE SET "
+                "ambiguous = ambiguous OR (entity_type != excluded.entity_type), "
+                "entity_type = excluded.entity_type, source = excluded.source, "
+                "updated_at = excluded.updated_at",
+                (key, context, entity_type, source, now),
+            )
+            self._conn.commit()
+
+    def mark_ambiguous(self, key: str, context: str = ""):
+        """Force la consultation du LLM pour cette clé."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entity_types SET ambiguous = 1 WHERE key = ? AND context = ?",
+                (key, context),
+            )
+            self._conn.commit()
+
+    # ── Pré-chargement ──────────────────────────────────────────────────────
+
+    def warm_up_from_graph(self, graph) -> Dict[str, int]:
+        """
+        Pré-charge le mémo depuis les instances d'un graphe (ou d'un fichier).
+
+        Chaque instance de l'espace de données portant un rdfs:label donne une
+        entrée sans signature : clé = fragment de son URI, type = sa classe
+        A-Box. Une instance de plusieurs de ces classes (graphe raisonné,
+        erreurs passées) est mémorisée comme ambiguë.
+
+        Args:
+            graph: rdflib.Graph ou chemin d'un fichier RDF (Turtle, RDF/XML...)
+
+        Returns:
+            dict: {"loaded": n, "ambiguous": n, "skipped": n}
+        """
+        if isinstance(graph, str):
+            path = graph
+            graph = Graph()
+            graph.parse(path)
+
+        counts = {"loaded": 0, "ambiguous": 0, "skipped": 0}
+        for subject in set(graph.subjects(RDFS.label, None)):
+            uri = str(subject)
+            if not uri.startswith(DATA_NAMESPACE):
+                continue
+            types = {CLASS_TO_TYPE[str(cls)] for cls in graph.objects(subject, RDF.type)
+                     if str(cls) in CLASS_TO_TYPE}
+            if not types:
+                counts["skipped"] += 1
+                continue
+            key = uri[len(DATA_NAMESPACE):]
+            self.store(key, sorted(types)[0], source="graph")
+            if len(types) > 1:
+                self.mark_ambiguous(key)
+                counts["ambiguous"] += 1
+            else:
+                counts["loaded"] += 1
+        return counts
+
+    # ── Statistiques ────────────────────────────────────────────────────────
+
+    def clear(self):
+        """Vide entièrement le mémo (les compteurs sont conservés)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entity_types")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entity_types").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs du processus et contenu du mémo."""
+        with self._lock:
+            entries, ambiguous, stored_hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(ambiguous), 0), COALESCE(SUM(hits), 0) "
+                "FROM entity_types"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "ambiguous": ambiguous,
+            "stored_hits": stored_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def reopen_after_fork(self):
+        """
+        Nouvelle connexion SQLite dans un processus fils (pool de workers).
+
+        La connexion héritée n'est ni utilisée ni fermée (verrous du parent).
+        """
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._connect()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NullEntityTypeMemo:
+    """Mémo désactivé (KG_ENTITY_MEMO=0) : même interface, aucune mémorisation."""
+
+    hits = 0
+    misses = 0
+
+    def context_for(self, ner_type):
+        return ""
+
+    def lookup(self, key, context=""):
+        return None
+
+    def store(self, key, entity_type, context="", source="llm"):
+        pass
+
+    def mark_ambiguous(self, key, context=""):
+        pass
+
+    def warm_up_from_graph(self, graph):
+        return {"loaded": 0, "ambiguous": 0, "skipped": 0}
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def stats(self):
+        return {"hits": 0, "misses": 0, "entries": 0, "ambiguous": 0,
+                "stored_hits": 0, "hit_rate": 0.0}
+
+    def reopen_after_fork(self):
+        pass
+
+
+# ============================================================================
+# INSTANCE PARTAGÉE
+# ============================================================================
+
+_shared_memo = None
+_shared_memo_lock = threading.Lock()
+
+
+def get_entity_type_memo():
+    """
+    Retourne le mémo partagé par tous les modules du processus.
+
+    Construit à la première utilisation à partir des variables d'environnement.
+    """
+    global _shared_memo
+    with _shared_memo_lock:
+        if _shared_memo is None:
+            path = os.getenv("KG_ENTITY_MEMO", DEFAULT_MEMO_PATH)
+            if path in ("0", "", "off"):
+                _shared_memo = NullEntityTypeMemo()
+            else:
+                _shared_memo = EntityTypeMemo(
+                    db_path=path,
+                    context_mode=os.getenv("KG_ENTITY_MEMO_CONTEXT", "none"),
+                )
+        return _shared_memo
+
+
+def set_entity_type_memo(memo):
+    """Remplace le mémo partagé (tests, mémo en mémoire, désactivation)."""
+    global _shared_memo
+    with _shared_memo_lock:
+        _shared_memo = memo
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "stats"
+    memo = get_entity_type_memo()
+
+    if command == "warmup":
+        path = argv[1] if len(argv) > 1 else "knowledge_graph.ttl"
+        counts = memo.warm_up_from_graph(path)
+        print(f"✓ Mémo pré-chargé depuis {path} : {counts['loaded']} entité(s), "
+              f"{counts['ambiguous']} ambiguë(s), {counts['skipped']} sans type reconnu")
+    elif command == "clear":
+        memo.clear()
+        print("✓ Mémo des types vidé")
+    elif command != "stats":
+        print(f"❌ Commande inconnue : {command} (warmup | stats | clear)")
+        return 1
+
+    stats = memo.stats()
+    print(f"📊 Mémo des types : {stats['entries']} entrée(s), {stats['ambiguous']} ambiguë(s), "
+          f"{stats['stored_hits']} hit(s) cumulés")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
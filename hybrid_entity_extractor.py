@@ -21,10 +21,12 @@ from dataclasses import dataclass
 from typing import List, Optional, Tuple, Set
 from enum import Enum
 import re
-from groq import Groq
 import os
 import json
 
+from llm_backends import GroqBackend, LLMBackend, get_llm_backend
+from llm_resilience import make_resilient
+
 
 class EntityType(Enum):
     """Standard entity types in our ontology"""
@@ -82,7 +84,8 @@ class HybridEntityExtractor:
         # Returns: [DetectedEntity("Marie", PERSON, 0.95, SPACY_NER), ...]
     """
     
-    def __init__(self, nlp, enable_llm_fallback: bool = False, groq_api_key: str = None):
+    def __init__(self, nlp, enable_llm_fallback: bool = False, groq_api_key: str = None,
+                 llm_backend: LLMBackend = None):
         """
         Initialize the hybrid extractor.
         
@@ -90,10 +93,16 @@ class HybridEntityExtractor:
             nlp: Loaded spaCy model (fr_core_news_sm)
             enable_llm_fallback: Enable Layer 5 (LLM) for uncertain entities
             groq_api_key: Groq API key (optional, loaded from env if None)
+            llm_backend: LLM backend (optional, defaults to KG_LLM_BACKEND;
+                         an explicit groq_api_key forces a Groq backend)
         """
         self.nlp = nlp
         self.enable_llm_fallback = enable_llm_fallback
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY", "")
+        self.llm_backend = llm_backend or (
+            make_resilient(GroqBackend(api_key=groq_api_key)) if groq_api_key
+            else get_llm_backend()
+        )
         
         # Initialize spaCy Matcher for rule-based patterns
         self.matcher = Matcher(nlp.vocab)
@@ -193,7 +202,7 @@ class HybridEntityExtractor:
         print(f"  [Layer 4] Dependency Parser: {len(layer4_entities)} new entities")
         
         # LAYER 5: LLM Fallback (optional, for uncertain entities)
-        if self.enable_llm_fallback and self.groq_api_key:
+        if self.enable_llm_fallback and self.llm_backend.is_available():
             layer5_entities = self._layer5_llm_fallback(text, doc, all_entities)
             all_entities.update(layer5_entities)
             self.stats['llm_fallback'] = len(layer5_entities)
@@ -428,8 +437,6 @@ class HybridEntityExtractor:
                 return entities
         
         try:
-            client = Groq(api_key=self.groq_api_key)
-            
             prompt = f"""Extract ALL named entities from this text:
 
 Text: "{text}"
@@ -444,17 +451,10 @@ Output a JSON array of entities with format:
 Types: PERSON, ORGANIZATION, LOCATION, TOPIC, DOCUMENT
 
 JSON:"""
+            system_prompt = "You are an entity extraction expert. Output only valid JSON."
             
-            response = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are an entity extraction expert. Output only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0
-            )
-            
-            result = response.choices[0].message.content.strip()
+            # Temperature 0 + deterministic prompt → served from the persistent cache when seen before
+            result = self.llm_backend.cached_complete(system_prompt, prompt).strip()
             
             # Parse JSON
             if "```json" in result:
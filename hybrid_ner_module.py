@@ -26,6 +26,10 @@ import spacy
 from spacy.language import Language
 from spacy.tokens import Doc, Token
 
+from keyword_index import KeywordIndex
+from kg_metrics import get_metrics
+from kg_tracing import span
+
 
 # ============================================================================
 # CONFIGURATION
@@ -181,6 +185,16 @@ class HybridNERModule:
         "théorie des langages", "language theory",
         "algorithmique", "algorithmics",
     ])
+    # Index compilé : une passe par texte au lieu d'un test par mot-clé
+    _TECH_CONCEPT_INDEX = KeywordIndex(sorted(TECH_CONCEPT_KEYWORDS))
+
+    # Mots qui excluent un « Prénom Nom » regex (couche 3c)
+    _ORG_WORDS_INDEX = KeywordIndex([
+        "université", "university", "institute", "institut", "school",
+        "école", "college", "laboratory", "laboratoire", "department",
+        "département", "center", "centre", "research", "national",
+        "inria", "cnrs", "mit", "stanford",
+    ])
 
     HUMAN_NAME_INDICATORS: frozenset = frozenset([
         "dr", "dr.", "prof", "prof.", "professeur", "docteur",
@@ -339,7 +353,8 @@ class HybridNERModule:
         else:
             print("  [Couche 2] EntityRuler déjà présent dans le pipeline")
     
-    def extract(self, text: str, verbose: bool = True) -> List[Tuple[str, str, float]]:
+    def extract(self, text: str, verbose: bool = True,
+                doc: Optional[Doc] = None) -> List[Tuple[str, str, float]]:
         """
         Extrait les entités avec les 7 couches de traitement.
         
@@ -355,6 +370,8 @@ class HybridNERModule:
         Args:
             text: Texte à analyser
             verbose: Affiche logs détaillés (default: True)
+            doc: Doc spaCy déjà analysé du texte normalisé (nlp.pipe) ;
+                 ignoré s'il ne correspond pas au texte normalisé
             
         Returns:
             Liste de tuples (entité, type, confiance)
@@ -372,12 +389,25 @@ class HybridNERModule:
         text = normalized
         # ───────────────────────────────────────────────────────────────────
 
+        # Durée et entités en sortie de chaque couche (kg_metrics.py, kg_tracing.py)
+        metrics = get_metrics()
+
+        def _layer(name, function, *args):
+            with span(f"ner.{name}") as current, metrics.timer("kg_ner_layer_seconds", layer=name):
+                entities = function(*args)
+                current.set(entities=len(entities))
+            metrics.inc("kg_ner_entities_total", len(entities), layer=name)
+            return entities
+
         # COUCHE 1 : spaCy NER + EntityRuler
-        doc = self.nlp(text)
-        raw_entities = self._layer1_spacy_ner(doc, verbose)
+        if doc is None or doc.text != text:
+            with span("ner.0_parse", chars=len(text)), \
+                    metrics.timer("kg_ner_layer_seconds", layer="0_parse"):
+                doc = self.nlp(text)
+        raw_entities = _layer("1_spacy_ner", self._layer1_spacy_ner, doc, verbose)
         
         # COUCHE 3 : Heuristiques PROPN
-        propn_entities = self._layer3_propn_heuristics(doc, verbose)
+        propn_entities = _layer("3_propn", self._layer3_propn_heuristics, doc, verbose)
         
         # Fusion des entités
         all_entities = raw_entities + propn_entities
@@ -386,21 +416,24 @@ class HybridNERModule:
         # Splits "X and Y" / "X et Y" / "X, Y" TOPIC/ORG entities that span
         # what should be two distinct entities.  Applied here (post-fusion) so
         # that both Layer-1 and Layer-3 entities are covered.
-        all_entities = self._split_coordinated_entities(all_entities, verbose)
+        all_entities = _layer("coordination", self._split_coordinated_entities, all_entities, verbose)
         # ────────────────────────────────────────────────────────────────────
         
         # COUCHE 4 : Normalisation
-        normalized_entities = self._layer4_normalize(all_entities, verbose)
+        normalized_entities = _layer("4_normalize", self._layer4_normalize, all_entities, verbose)
         
         # COUCHE 5 : Déduplication
-        deduplicated_entities = self._layer5_deduplicate(normalized_entities, verbose)
+        deduplicated_entities = _layer("5_deduplicate", self._layer5_deduplicate,
+                                       normalized_entities, verbose)
         
         # COUCHE 6 : Filtrage par confiance
-        filtered_entities = self._layer6_filter_confidence(deduplicated_entities, verbose)
+        filtered_entities = _layer("6_confidence", self._layer6_filter_confidence,
+                                   deduplicated_entities, verbose)
         
         # COUCHE 7 : Validation ontologique (si activée)
         if self.enable_validation and self.ontology_graph:
-            validated_entities = self._layer7_validate_ontology(filtered_entities, verbose)
+            validated_entities = _layer("7_ontology", self._layer7_validate_ontology,
+                                        filtered_entities, verbose)
         else:
             validated_entities = filtered_entities
         
@@ -448,7 +481,7 @@ class HybridNERModule:
                 if _is_real_org:
                     label = "ORG"
                     confidence = max(confidence, 0.85)
-                elif any(kw in ent_lower for kw in self.TECH_CONCEPT_KEYWORDS):
+                elif self._TECH_CONCEPT_INDEX.contains_any(ent_lower):
                     label = "TOPIC"
                     confidence = max(confidence, 0.80)
                 elif ent.text in self._SHORT_TOPIC_ACRONYMS:
@@ -457,7 +490,7 @@ class HybridNERModule:
             elif label == "ORG" and not _is_real_org:
                 # ORG entities that don't start with an org-prefix word may be
                 # mislabelled tech/academic subjects (e.g. "Formal Verification")
-                if any(kw in ent_lower for kw in self.TECH_CONCEPT_KEYWORDS):
+                if self._TECH_CONCEPT_INDEX.contains_any(ent_lower):
                     label = "TOPIC"
                     confidence = max(confidence, 0.78)
                 elif ent.text in self._SHORT_TOPIC_ACRONYMS:
@@ -716,12 +749,6 @@ class HybridNERModule:
                     print(f"  👤 Regex-titre : '{full_match}' → PER (conf: 0.88)")
 
         # ── 3c. Regex: bare Firstname Lastname ─────────────────────────────
-        _ORG_WORDS = frozenset([
-            "université", "university", "institute", "institut", "school",
-            "école", "college", "laboratory", "laboratoire", "department",
-            "département", "center", "centre", "research", "national",
-            "inria", "cnrs", "mit", "stanford",
-        ])
         bare_re = re.compile(
             r'(?<!\w)([A-ZÀÂÉÈÊÙÛÎÔŒÆÇ][a-zàâéèêùûîôœæç]{1,})'
             r'\s+([A-ZÀÂÉÈÊÙÛÎÔŒÆÇ][a-zàâéèêùûîôœæç]{1,})(?!\w)'
@@ -730,9 +757,9 @@ class HybridNERModule:
             first, last = m.group(1), m.group(2)
             full = f"{first} {last}"
             tl = full.lower()
-            if any(kw in tl for kw in self.TECH_CONCEPT_KEYWORDS):
+            if self._TECH_CONCEPT_INDEX.contains_any(tl):
                 continue
-            if any(w in tl for w in _ORG_WORDS):
+            if self._ORG_WORDS_INDEX.contains_any(tl):
                 continue
             if full in already_in_doc or full in already_in_entities:
                 continue
@@ -787,7 +814,7 @@ class HybridNERModule:
             # Skip single PROPN that looks like a personal name (not a tech/org keyword)
             if candidate_tok.pos_ == "PROPN" and len(span_tokens) == 1:
                 if candidate_tok.lower_ not in self._ORG_PREFIX_LOWER:
-                    if not any(kw in topic_lower for kw in self.TECH_CONCEPT_KEYWORDS):
+                    if not self._TECH_CONCEPT_INDEX.contains_any(topic_lower):
                         if topic_text not in self._SHORT_TOPIC_ACRONYMS:
                             continue
             entities.append((topic_text, "TOPIC", 0.72))
@@ -876,7 +903,7 @@ class HybridNERModule:
             #  and is NOT a tech keyword → defer to PROPN section)
             root_lower = chunk.root.lower_
             is_tech = (
-                any(kw in chunk_lower for kw in self.TECH_CONCEPT_KEYWORDS)
+                self._TECH_CONCEPT_INDEX.contains_any(chunk_lower)
                 or chunk_text in self._SHORT_TOPIC_ACRONYMS
             )
             # Only accept if near a teaching verb OR clearly a known tech term
@@ -927,7 +954,7 @@ class HybridNERModule:
                     if etype in ("ORG", "MISC"):
                         # Check if parts look like tech topics
                         if any(
-                            any(kw in p.lower() for kw in self.TECH_CONCEPT_KEYWORDS)
+                            self._TECH_CONCEPT_INDEX.contains_any(p.lower())
                             or p in self._SHORT_TOPIC_ACRONYMS
                             for p in parts
                         ):
@@ -1003,7 +1030,7 @@ class HybridNERModule:
             split_type = etype
             if etype in ("ORG", "MISC"):
                 if any(
-                    any(kw in p.lower() for kw in self.TECH_CONCEPT_KEYWORDS)
+                    self._TECH_CONCEPT_INDEX.contains_any(p.lower())
                     or p in self._SHORT_TOPIC_ACRONYMS
                     for p in parts
                 ):
@@ -1057,9 +1084,8 @@ class HybridNERModule:
             if tok_str in self._SHORT_TOPIC_ACRONYMS:
                 return "TOPIC", 0.83
 
-        for kw in self.TECH_CONCEPT_KEYWORDS:
-            if kw in text_lower:
-                return "TOPIC", 0.82
+        if self._TECH_CONCEPT_INDEX.contains_any(text_lower):
+            return "TOPIC", 0.82
 
         for indicator in self.HUMAN_NAME_INDICATORS:
             if re.search(r'\b' + re.escape(indicator) + r'\b', text_lower):
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+INDEX DE MOTS-CLÉS COMPILÉ (AHO-CORASICK)
+
+Les règles de typage et de relation testent sans cesse des listes de
+mots-clés avec `any(kw in texte for kw in LISTE)` : chaque test reparcourt
+le texte une fois par mot-clé, et la liste elle-même est souvent reconstruite
+à chaque appel. Sur des dizaines d'entités × des dizaines de mots-clés, ces
+balayages dominent le temps des règles.
+
+Un KeywordIndex compile une liste UNE fois :
+==========================================
+1. contains_any(texte)   → une seule passe, via une alternance regex compilée
+                           (moteur C, mots-clés les plus longs en premier)
+2. find_all(texte)       → ensemble des mots-clés présents, en une passe sur un
+                           automate Aho-Corasick (chevauchements inclus :
+                           "rdfs" trouve aussi "rdf")
+3. first_in_order(texte) → premier mot-clé présent selon l'ordre de la liste,
+                           équivalent de next(kw for kw in LISTE if kw in texte)
+
+La sémantique est exactement celle de l'opérateur `in` sur les chaînes :
+recherche de sous-chaîne, sensible à la casse (passer un texte déjà en
+minuscules, comme le font les appelants actuels).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class KeywordIndex:
+    """
+    Liste de mots-clés compilée pour la recherche multi-motifs.
+
+    Utilisation :
+    -------------
+    >>> ORG_KEYWORDS = KeywordIndex(["université", "institut", "cnrs"])
+    >>> ORG_KEYWORDS.contains_any("université de versailles")
+    True
+    >>> ORG_KEYWORDS.find_all("institut cnrs")
+    {'institut', 'cnrs'}
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Mots-clés à rechercher (l'ordre est conservé pour first_in_order)
+        """
+        # dict.fromkeys : dédoublonne en conservant l'ordre
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._rank = {kw: rank for rank, kw in enumerate(self.keywords)}
+        # "" in texte est toujours vrai : reproduit tel quel
+        self._has_empty = "" in self._rank
+
+        patterns = sorted((kw for kw in self.keywords if kw), key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, patterns))) if patterns else None
+        self._build_automaton(patterns)
+
+    # ── Construction de l'automate ──────────────────────────────────────────
+
+    def _build_automaton(self, patterns: List[str]):
+        """Trie des mots-clés + liens d'échec (parcours en largeur)."""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[str]] = [[]]
+        for keyword in patterns:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._goto, self._fail, self._outputs = goto, fail, outputs
+
+    # ── Requêtes ────────────────────────────────────────────────────────────
+
+    def contains_any(self, text: str) -> bool:
+        """Vrai si au moins un mot-clé est sous-chaîne de `text`."""
+        if self._has_empty:
+            return True
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def find_all(self, text: str) -> Set[str]:
+        """Ensemble des mots-clés présents dans `text` (une seule passe)."""
+        found = {""} if self._has_empty else set()
+        # Pré-filtre C : la plupart des textes ne contiennent aucun mot-clé
+        if self._pattern is None or self._pattern.search(text) is None:
+            return found
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def first_in_order(self, text: str) -> Optional[str]:
+        """Premier mot-clé de la liste (dans son ordre) présent dans `text`, sinon None."""
+        found = self.find_all(text)
+        if not found:
+            return None
+        return min(found, key=self._rank.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __iter__(self):
+        return iter(self.keywords)
+
+    def __repr__(self) -> str:
+        return f"KeywordIndex({len(self.keywords)} mots-clés)"
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MODE CORPUS : DES MILLIERS DE DOCUMENTS → UN GRAPHE FUSIONNÉ
+
+main() (kg_extraction_semantic_web.py) traite un seul texte : un corpus de
+mille résumés coûte alors mille démarrages d'interpréteur et mille
+chargements de spaCy. Ce module traite tout un corpus dans un seul processus :
+
+Fonctionnement :
+================
+1. Un seul KnowledgeGraphPipeline (modèle spaCy, HybridNER, backend LLM, T-Box)
+2. Analyse spaCy en flux avec nlp.pipe(batch_size=..., n_process=...)
+3. Étapes entités / types / relations / réification par document, sur le Doc
+   déjà analysé (aucune ré-analyse)
+4. Graphe de chaque document fusionné dans un graphe unique ; les nœuds de
+   réification gardent la source (dc:source = identifiant du document)
+5. Raisonnement OWL une seule fois, sur le graphe fusionné
+6. Un document rejeté par l'entry gate ou en erreur est compté puis ignoré
+
+Formats d'entrée :
+==================
+répertoire  Un document par fichier *.txt (identifiant = nom du fichier)
+.jsonl      Un objet par ligne : {"id": "...", "text": "..."} (id facultatif)
+.tsv        Une ligne par document : identifiant<TAB>texte (ou texte seul)
+
+Configuration (.env) :
+======================
+KG_BATCH_SIZE       Documents par lot nlp.pipe (défaut : 32)
+KG_BATCH_PROCESSES  Processus d'analyse spaCy (défaut : 1)
+KG_POOL_WORKERS     Workers forkés pour tout le pipeline (kg_worker_pool.py ;
+                    défaut : 0 = un seul processus)
+KG_INCREMENTAL      "1" : équivaut à --incremental (voir kg_manifest.py)
+KG_LOG_LEVEL        Niveau des messages par document (voir kg_logging.py) ;
+                    --log-level WARNING pour un corpus
+
+Usage :
+    python kg_batch.py corpus/ -o corpus.ttl
+    python kg_batch.py resumes.jsonl --batch-size 64 --n-process 4
+    python kg_batch.py resumes.jsonl --workers 8
+    python kg_batch.py resumes.jsonl --stream corpus.nq.gz   (flux N-Quads, voir rdf_stream_sink.py)
+    python kg_batch.py modifies/ --dataset corpus.trig       (graphes nommés, voir kg_dataset.py)
+    python kg_batch.py corpus/ --incremental                 (documents inchangés repris, kg_manifest.py)
+    python kg_batch.py corpus/ --log-level WARNING           (mode production, kg_logging.py)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator, Tuple
+
+from dotenv import load_dotenv
+
+from kg_extraction_semantic_web import KnowledgeGraphPipeline, PipelineInputError
+from kg_logging import LOG_LEVELS, get_logger, set_log_level
+from kg_manifest import INCREMENTAL_MODE, RunManifest
+from kg_metrics import export_metrics, get_metrics
+from kg_tracing import export_trace
+from rdf_stream_sink import StreamingTripleSink, abox_ntriples
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_BATCH_SIZE = int(os.getenv("KG_BATCH_SIZE", "32"))
+DEFAULT_N_PROCESS = int(os.getenv("KG_BATCH_PROCESSES", "1"))
+DEFAULT_POOL_WORKERS = int(os.getenv("KG_POOL_WORKERS", "0"))
+
+# Extension du fichier de sortie → format rdflib
+OUTPUT_FORMATS = {
+    ".ttl": "turtle",
+    ".xml": "xml",
+    ".rdf": "xml",
+    ".nt": "nt",
+}
+
+
+# ============================================================================
+# LECTURE DU CORPUS
+# ============================================================================
+
+def read_documents(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Lit un corpus (répertoire, JSONL ou TSV) document par document.
+
+    Args:
+        path: Répertoire de fichiers .txt, fichier .jsonl ou fichier .tsv
+
+    Yields:
+        tuple: (identifiant, texte) ; les documents vides sont ignorés
+
+    Raises:
+        ValueError: Format d'entrée non reconnu
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".txt"):
+                continue
+            with open(os.path.join(path, name), encoding="utf-8") as handle:
+                text = handle.read().strip()
+            if text:
+                yield name, text
+        return
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".jsonl", ".tsv"):
+        raise ValueError(f"Format d'entrée non reconnu : {path} (répertoire, .jsonl ou .tsv)")
+
+    with open(path, encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if extension == ".jsonl":
+                record = json.loads(line)
+                doc_id, text = str(record.get("id", line_no)), record.get("text", "")
+            elif "\t" in line:
+                doc_id, text = line.split("\t", 1)
+            else:
+                doc_id, text = str(line_no), line
+            text = text.strip()
+            if text:
+                yield doc_id, text
+
+
+# ============================================================================
+# TRAITEMENT DU CORPUS
+# ============================================================================
+
+def process_corpus(pipeline: KnowledgeGraphPipeline, documents: Iterable[Tuple[str, str]],
+                   batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = DEFAULT_N_PROCESS,
+                   reasoning: bool = None, sink=None, manifest=None):
+    """
+    Construit le graphe fusionné d'un corpus.
+
+    Args:
+        pipeline: Pipeline partagé (modèles chargés une fois)
+        documents: Couples (identifiant, texte), ex : read_documents()
+        batch_size: Documents par lot nlp.pipe
+        n_process: Processus d'analyse spaCy
+        reasoning: Raisonnement OWL sur le graphe fusionné (défaut : réglage du pipeline)
+        sink: StreamingTripleSink (rdf_stream_sink.py) ou KnowledgeGraphDataset
+              (kg_dataset.py) : l'A-Box de chaque document y est écrite dès
+              qu'il est terminé, sans graphe fusionné en mémoire ni
+              raisonnement (étape hors ligne : convert --reason, union_graph())
+        manifest: RunManifest (kg_manifest.py) : un document inchangé reprend
+                  ses triplets conservés sans être analysé ; les autres y sont
+                  enregistrés avec la durée de chaque étape
+
+    Returns:
+        tuple: (rdflib.Graph fusionné, ou None en mode flux, rapport)
+               rapport = {"documents", "processed", "rejected", "failed", "skipped",
+                          "triples", "elapsed_s", "docs_per_s"}
+    """
+    if reasoning is None:
+        reasoning = pipeline.reasoning
+    if sink is not None:
+        reasoning = False
+
+    documents = iter(documents)
+    doc_ids = []
+
+    def _add_ntriples(ntriples, doc_id):
+        if sink is not None:
+            sink.write_ntriples(ntriples, doc_id)
+        else:
+            corpus.parse(data=ntriples, format="nt")
+
+    def _texts():
+        for doc_id, text in documents:
+            if manifest is not None and manifest.is_current(doc_id, text):
+                # Document inchangé : triplets conservés, aucune analyse spaCy
+                report["documents"] += 1
+                report["skipped"] += 1
+                ntriples = manifest.reuse(doc_id)
+                if ntriples is not None:
+                    _add_ntriples(ntriples, doc_id)
+                continue
+            doc_ids.append(doc_id)
+            yield text
+
+    corpus = pipeline.new_graph() if sink is None else None
+    report = {"documents": 0, "processed": 0, "rejected": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    # nlp.pipe rend les documents dans l'ordre d'entrée : doc_ids[i] est le i-ème
+    for index, (text, docs) in enumerate(pipeline.pipe(_texts(), batch_size=batch_size,
+                                                        n_process=n_process)):
+        doc_id = doc_ids[index]
+        report["documents"] += 1
+        timings = {}
+        try:
+            graph = pipeline.process(text, source_file=doc_id, docs=docs, reasoning=False,
+                                     timings=timings)
+        except PipelineInputError as e:
+            logger.warning("⚠️ [%s] ignoré - %s", doc_id, e)
+            report["rejected"] += 1
+            if manifest is not None:
+                manifest.record(doc_id, text, "rejected", timings=timings)
+            continue
+        except Exception as e:
+            logger.error("❌ [%s] erreur - %s: %s", doc_id, type(e).__name__, e)
+            report["failed"] += 1
+            continue
+        if manifest is not None:
+            ntriples = abox_ntriples(graph, pipeline.tbox)
+            manifest.record(doc_id, text, "ok", ntriples, timings)
+            _add_ntriples(ntriples, doc_id)
+        elif sink is not None:
+            sink.write_graph(graph, doc_id)
+        else:
+            # T-Box déjà présente dans le graphe fusionné : seule l'A-Box est ajoutée
+            corpus.addN((s, p, o, corpus) for s, p, o in graph if (s, p, o) not in pipeline.tbox)
+        report["processed"] += 1
+
+    if manifest is not None:
+        manifest.save()
+    if reasoning and (report["processed"] or report["skipped"]):
+        pipeline.apply_reasoning(corpus)
+
+    elapsed = time.perf_counter() - start
+    report["triples"] = len(corpus) if sink is None else sink.triples
+    report["elapsed_s"] = round(elapsed, 3)
+    report["docs_per_s"] = round(report["documents"] / elapsed, 2) if elapsed > 0 else 0.0
+    return corpus, report
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Graphe de connaissances d'un corpus de documents")
+    parser.add_argument("input", help="Répertoire de .txt, fichier .jsonl ou .tsv")
+    parser.add_argument("-o", "--output", default="knowledge_graph_corpus.ttl",
+                        help="Graphe fusionné (.ttl, .xml, .rdf, .nt)")
+    parser.add_argument("--stream", metavar="FICHIER",
+                        help="Écrit chaque document dès qu'il est traité (.nt, .nq, .nt.gz, .nq.gz) "
+                             "au lieu du graphe fusionné")
+    parser.add_argument("--dataset", metavar="FICHIER",
+                        help="Dataset à graphes nommés (.trig, .nq) : chargé s'il existe, "
+                             "graphe de chaque document remplacé, puis réécrit")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Documents par lot nlp.pipe")
+    parser.add_argument("--n-process", type=int, default=DEFAULT_N_PROCESS,
+                        help="Processus d'analyse spaCy")
+    parser.add_argument("--workers", type=int, default=DEFAULT_POOL_WORKERS,
+                        help="Workers forkés pour tout le pipeline (0 = un seul processus)")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    parser.add_argument("--no-reasoning", action="store_true",
+                        help="Pas de raisonnement OWL sur le graphe fusionné")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL_MODE,
+                        help="Reprend les triplets des documents inchangés (manifeste kg_manifest.py)")
+    parser.add_argument("--manifest", metavar="RÉPERTOIRE",
+                        help="Répertoire du manifeste (défaut : KG_MANIFEST_DIR)")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, type=str.upper,
+                        help="Niveau des messages par document (défaut : KG_LOG_LEVEL ; "
+                             "WARNING = mode production)")
+    args = parser.parse_args(argv)
+    if args.log_level:
+        set_log_level(args.log_level)
+
+    output_format = OUTPUT_FORMATS.get(os.path.splitext(args.output)[1].lower())
+    if output_format is None and not (args.stream or args.dataset):
+        print(f"❌ Format de sortie non reconnu : {args.output} ({', '.join(OUTPUT_FORMATS)})")
+        return 1
+
+    try:
+        pipeline = KnowledgeGraphPipeline(model_name=args.model, reasoning=not args.no_reasoning)
+    except OSError:
+        print(f"❌ ERREUR : Le modèle spaCy '{args.model}' n'est pas installé.")
+        print(f"   Installez-le avec : python -m spacy download {args.model}")
+        return 1
+
+    if args.dataset:
+        from kg_dataset import KnowledgeGraphDataset
+        if os.path.exists(args.dataset):
+            sink = KnowledgeGraphDataset.load(args.dataset, pipeline)
+            print(f"[DATASET] {len(sink)} document(s) chargé(s) depuis {args.dataset}")
+        else:
+            sink = KnowledgeGraphDataset(pipeline)
+    elif args.stream:
+        sink = StreamingTripleSink(args.stream, tbox=pipeline.tbox)
+    else:
+        sink = None
+    manifest = RunManifest.for_pipeline(pipeline, args.manifest) if args.incremental else None
+    try:
+        if args.workers > 0:
+            from kg_worker_pool import process_corpus_parallel
+            graph, report = process_corpus_parallel(pipeline, read_documents(args.input),
+                                                    workers=args.workers, sink=sink,
+                                                    manifest=manifest)
+        else:
+            graph, report = process_corpus(pipeline, read_documents(args.input),
+                                           batch_size=args.batch_size, n_process=args.n_process,
+                                           sink=sink, manifest=manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if isinstance(sink, StreamingTripleSink):
+            sink.close()
+
+    metrics = get_metrics()
+    with metrics.timer("kg_stage_seconds", stage="serialization"):
+        if args.dataset:
+            sink.save(args.dataset)
+        elif sink is None:
+            graph.serialize(destination=args.output, format=output_format)
+    metrics.set_gauge("kg_graph_triples", report["triples"])
+
+    print("\n" + "=" * 80)
+    print(f"✓ Corpus traité : {report['processed']}/{report['documents']} document(s) "
+          f"({report['rejected']} rejeté(s), {report['failed']} en erreur, "
+          f"{report['skipped']} inchangé(s))")
+    print(f"  {report['triples']} triplets → {args.dataset or args.stream or args.output}")
+    if args.workers > 0:
+        print(f"  {report['elapsed_s']:.2f} s, {report['docs_per_s']:.2f} docs/s "
+              f"({report.get('workers', 1)} worker(s))")
+    else:
+        print(f"  {report['elapsed_s']:.2f} s, {report['docs_per_s']:.2f} docs/s "
+              f"(batch_size={args.batch_size}, n_process={args.n_process})")
+    for metrics_file in export_metrics():
+        print(f"  métriques → {metrics_file}")
+    trace_file = export_trace()
+    if trace_file:
+        print(f"  trace → {trace_file}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MODE DATASET : UN GRAPHE NOMMÉ PAR DOCUMENT SOURCE
+
+Dans un graphe unique, les triplets de tous les documents sont mêlés : une
+entité partagée ("CNRS") ou un nœud de réification ne disent plus de quel
+document ils viennent, et remplacer un document impose de tout reconstruire.
+
+Ce module range le graphe de connaissances dans un rdflib.Dataset :
+
+Organisation :
+==============
+<http://example.org/master2/ontology>       T-Box partagée (graphe nommé unique)
+<http://example.org/master2/graph/{doc_id}>  A-Box d'un document : instances,
+                                             relations, nœuds de réification
+                                             (dc:source = doc_id)
+
+Opérations :
+============
+1. upsert_document(doc_id, texte) : extrait le document puis remplace son
+   graphe nommé ; un texte rejeté par l'entry gate laisse l'ancien graphe
+2. delete_document(doc_id) : retire son graphe nommé ; les entités qu'un
+   autre document mentionne restent dans le graphe de cet autre document
+3. Coût proportionnel à la taille du document : le store mémoire de rdflib
+   indexe les triplets par graphe, la suppression ne parcourt que celui-ci
+4. union_graph() : T-Box + toutes les A-Box, pour l'export, la visualisation
+   et le raisonnement OWL (fait sur l'union, jamais dans les graphes nommés)
+5. save() / load() : TriG ou N-Quads, graphes nommés conservés
+
+Un KnowledgeGraphDataset accepte aussi les appels d'un flux de documents
+(write_graph / write_ntriples) : kg_batch.py --dataset corpus.trig met à jour
+les documents du corpus dans un dataset existant.
+
+Usage :
+    python kg_batch.py nouveaux_resumes.jsonl --dataset corpus.trig
+"""
+
+import os
+from typing import List, Optional
+from urllib.parse import unquote
+
+from rdflib import Dataset, Graph, URIRef
+
+from kg_extraction_semantic_web import EX, KnowledgeGraphPipeline
+from rdf_stream_sink import GRAPH_NAMESPACE, document_graph_uri
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Graphe nommé de la T-Box : l'IRI de l'ontologie elle-même
+TBOX_GRAPH = URIRef(str(EX).rstrip("#"))
+
+# Extension → format rdflib des fichiers de dataset
+DATASET_FORMATS = {
+    ".trig": "trig",
+    ".nq": "nquads",
+}
+
+
+def _dataset_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in DATASET_FORMATS:
+        raise ValueError(f"Format de dataset non reconnu : {path} ({', '.join(DATASET_FORMATS)})")
+    return DATASET_FORMATS[extension]
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : KnowledgeGraphDataset
+# ============================================================================
+
+class KnowledgeGraphDataset:
+    """
+    Graphe de connaissances découpé en graphes nommés, un par document.
+
+    Utilisation :
+    -------------
+    >>> kg_dataset = KnowledgeGraphDataset(KnowledgeGraphPipeline())
+    >>> kg_dataset.upsert_document("cours_rdf.txt", "Zoubida Kedad enseigne RDFS.")
+    >>> kg_dataset.upsert_document("cours_rdf.txt", "Zoubida Kedad enseigne OWL.")
+    >>> kg_dataset.delete_document("cours_rdf.txt")
+    >>> kg_dataset.save("corpus.trig")
+    """
+
+    def __init__(self, pipeline: Optional[KnowledgeGraphPipeline] = None,
+                 tbox: Optional[Graph] = None):
+        """
+        Args:
+            pipeline: Pipeline d'extraction (requis pour upsert_document)
+            tbox: T-Box du dataset (défaut : pipeline.tbox ; aucune si les deux manquent)
+        """
+        self.pipeline = pipeline
+        self.dataset = Dataset()
+        if pipeline is not None:
+            pipeline._bind_namespaces(self.dataset)
+
+        self.tbox = self.dataset.graph(TBOX_GRAPH)
+        if tbox is None and pipeline is not None:
+            tbox = pipeline.tbox
+        if tbox is not None:
+            self.tbox += tbox
+
+    # ── Documents ───────────────────────────────────────────────────────────
+
+    def graph_for(self, doc_id: str) -> Graph:
+        """Graphe nommé d'un document (vide s'il n'existe pas)."""
+        return self.dataset.graph(document_graph_uri(doc_id))
+
+    def documents(self) -> List[str]:
+        """Identifiants des documents présents, triés."""
+        return sorted(unquote(str(graph.identifier)[len(GRAPH_NAMESPACE):])
+                      for graph in self.dataset.graphs()
+                      if str(graph.identifier).startswith(GRAPH_NAMESPACE) and len(graph))
+
+    def __contains__(self, doc_id: str) -> bool:
+        return len(self.graph_for(doc_id)) > 0
+
+    def __len__(self) -> int:
+        return len(self.documents())
+
+    def delete_document(self, doc_id: str) -> int:
+        """
+        Retire le graphe nommé d'un document.
+
+        Returns:
+            int: Nombre de triplets retirés (0 si le document est absent)
+        """
+        graph = self.graph_for(doc_id)
+        removed = len(graph)
+        self.dataset.remove_graph(graph)
+        return removed
+
+    def write_graph(self, graph: Graph, doc_id: str) -> int:
+        """
+        Remplace le graphe nommé d'un document par les triplets A-Box de `graph`.
+
+        Args:
+            graph: Graphe du document (KnowledgeGraphPipeline.process())
+            doc_id: Identifiant du document
+
+        Returns:
+            int: Nombre de triplets du nouveau graphe du document
+        """
+        self.delete_document(doc_id)
+        target = self.graph_for(doc_id)
+        target.addN((s, p, o, target) for s, p, o in graph if (s, p, o) not in self.tbox)
+        return len(target)
+
+    def write_ntriples(self, ntriples: str, doc_id: str) -> int:
+        """Comme write_graph(), à partir d'une A-Box sérialisée (worker du pool)."""
+        return self.write_graph(Graph().parse(data=ntriples, format="nt"), doc_id)
+
+    def upsert_document(self, doc_id: str, text: str, docs=None) -> int:
+        """
+        Extrait un document et remplace son graphe nommé.
+
+        L'extraction a lieu avant toute suppression : si le texte est rejeté,
+        l'ancien graphe du document est conservé.
+
+        Args:
+            doc_id: Identifiant du document (dc:source de ses nœuds de réification)
+            text: Texte source
+            docs: Analyses spaCy déjà faites (KnowledgeGraphPipeline.pipe())
+
+        Returns:
+            int: Nombre de triplets du graphe du document
+
+        Raises:
+            PipelineInputError: Texte rejeté par l'entry gate
+        """
+        if self.pipeline is None:
+            raise RuntimeError("upsert_document() nécessite un KnowledgeGraphPipeline")
+        graph = self.pipeline.process(text, source_file=doc_id, docs=docs, reasoning=False)
+        return self.write_graph(graph, doc_id)
+
+    # ── Vues et statistiques ────────────────────────────────────────────────
+
+    @property
+    def triples(self) -> int:
+        """Nombre total de quads (T-Box comprise)."""
+        return sum(len(graph) for graph in self.dataset.graphs())
+
+    def union_graph(self, reasoning: bool = False) -> Graph:
+        """
+        T-Box + A-Box de tous les documents dans un seul graphe.
+
+        Args:
+            reasoning: Applique le raisonnement OWL à l'union
+        """
+        union = Graph()
+        KnowledgeGraphPipeline._bind_namespaces(union)
+        for graph in self.dataset.graphs():
+            union += graph
+        if reasoning:
+            KnowledgeGraphPipeline.apply_reasoning(union)
+        return union
+
+    def stats(self):
+        """Documents, quads et taille de la T-Box."""
+        return {"documents": len(self), "triples": self.triples, "tbox": len(self.tbox)}
+
+    # ── Persistance ─────────────────────────────────────────────────────────
+
+    def save(self, path: str):
+        """Écrit le dataset en TriG (.trig) ou N-Quads (.nq)."""
+        self.dataset.serialize(destination=path, format=_dataset_format(path))
+
+    @classmethod
+    def load(cls, path: str, pipeline: Optional[KnowledgeGraphPipeline] = None):
+        """
+        Recharge un dataset écrit par save().
+
+        Avec un pipeline, sa T-Box remplace celle du fichier : les nœuds
+        blancs des restrictions OWL sont renommés à la relecture, et les
+        graphes des upserts suivants doivent en être filtrés à l'identique.
+        """
+        kg_dataset = cls(pipeline=pipeline, tbox=Graph())
+        kg_dataset.dataset.parse(path, format=_dataset_format(path))
+        if pipeline is not None:
+            kg_dataset.tbox.remove((None, None, None))
+            kg_dataset.tbox += pipeline.tbox
+        return kg_dataset
@@ -15,28 +15,41 @@ import unicodedata
 import json
 import os
 import sys
-import requests
 import time
-from groq import Groq
-from huggingface_hub import InferenceClient
 from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL, BNode
 from rdflib.namespace import XSD, DC, FOAF
 import spacy
-import networkx as nx
-import matplotlib.pyplot as plt
+# matplotlib et networkx : importés par visualize_knowledge_graph() seulement
 from typing import Optional
 from dotenv import load_dotenv
 
 # ============================================================================
 # IMPORTS DES NOUVEAUX MODULES (ARCHITECTURE NEURO-SYMBOLIQUE COMPLÈTE)
 # ============================================================================
-from hybrid_ner_module import HybridNERModule, normalize_uri_fragment
+from hybrid_ner_module import HybridNERModule, normalize_input_text, normalize_uri_fragment
 from owl_reasoning_engine import OWLReasoningEngine, apply_owl_reasoning
 from confidence_scorer import ConfidenceScorer, add_inference_confidence
+from llm_cache import get_llm_cache
+from kg_metrics import export_metrics, get_metrics
+from kg_tracing import export_trace, record_span, span, traced
+from kg_logging import configure_logging, debug_enabled, get_logger
+from entity_type_memo import get_entity_type_memo
+from llm_backends import get_llm_backend, set_llm_backend
+from llm_resilience import ResilientBackend
+from concurrent_relations import run_predictions
+from candidate_pairs import SentenceWindowPairGenerator
+from document_index import DocumentIndex
+from keyword_index import KeywordIndex
+from relation_rules import (VALID_RELATIONS, RULE_FIRST_ENABLED, classify_relation_by_rules,
+                            finalize_relation, get_relation_decision_stats)
 
 # Chargement des variables d'environnement depuis .env
 load_dotenv()
 
+# Messages du traitement d'un document (KG_LOG_LEVEL, voir kg_logging.py)
+configure_logging()
+logger = get_logger(__name__)
+
 
 # ============================================================================
 # 1. CONFIGURATION ET NAMESPACES
@@ -71,6 +84,43 @@ if not HF_TOKEN:
 # Headers pour l'authentification
 HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"}
 
+# Mode batch : toutes les paires d'un document en un seul appel LLM (KG_BATCH_RELATIONS=1)
+BATCH_RELATION_MODE = os.getenv("KG_BATCH_RELATIONS", "0") == "1"
+
+# Nombre de prédictions de relations en vol simultanément (1 = séquentiel)
+RELATION_CONCURRENCY = int(os.getenv("KG_RELATION_CONCURRENCY", "1"))
+
+# Prompt de relation compact : règles une fois, relations admissibles de la paire seulement
+COMPACT_PROMPT_MODE = os.getenv("KG_COMPACT_PROMPT", "0") == "1"
+
+# Mode fusionné : types raffinés + relations du document en un seul appel LLM
+FUSED_EXTRACTION_MODE = os.getenv("KG_FUSED_EXTRACTION", "0") == "1"
+
+# Affiche le Turtle complet en fin de main() (désactivé : déjà écrit dans knowledge_graph.ttl)
+PRINT_TURTLE = os.getenv("KG_PRINT_TURTLE", "0") == "1"
+
+# Mots-clés des heuristiques de typage et de repli (compilés une fois)
+FALLBACK_ORG_KEYWORDS = KeywordIndex([
+    "université", "university", "institut", "institute",
+    "laboratoire", "lab", "department", "département",
+    "centre", "center", "école", "school", "college",
+    "inria", "cnrs"])
+FALLBACK_TOPIC_KEYWORDS = KeywordIndex([
+    "physique", "mathématiques", "maths", "informatique",
+    "sémantique", "rdf", "owl", "sparql", "ontologie",
+    "machine learning", "deep learning", "ia", "ai",
+    "réseaux", "algorithmes", "database", "databases"])
+# Mots-clés indiquant un document/œuvre (entités MISC)
+DOCUMENT_KEYWORDS = KeywordIndex([
+    "roman", "livre", "cours", "spécifications", "document",
+    "article", "publication", "ouvrage", "œuvre", "the", "les", "le"])
+# Noms d'institutions (un Place n'est adapté en Organization que s'il en contient un)
+INSTITUTION_KEYWORDS = KeywordIndex([
+    "université", "university", "institute", "institut", "école",
+    "school", "college", "laboratoire", "lab", "centre", "center",
+    "department", "département", "inria", "cnrs", "mit", "stanford",
+    "harvard", "palais", "élysée"])
+
 
 # ============================================================================
 # 2. DÉFINITION DE L'ONTOLOGIE (T-BOX) - SCHÉMA CONCEPTUEL
@@ -321,44 +371,19 @@ def normalize_uri_fragment(text):
 # 4. PRÉDICTION DE RELATIONS VIA LLM (SIMULATION)
 # ============================================================================
 
-def predict_relation_real_api(entity1: str, entity2: str, sentence: str,
-                              entity1_type: str = "UNK", entity2_type: str = "UNK") -> Optional[str]:
-    """
-    Utilise l'API GROQ (Gratuite et Ultra-Rapide).
-    Modèle : Llama-3-8B (très performant pour l'extraction de relations).
-    
-    VERSION PRODUCTION (GROQ API) 🚀 :
-    - API Groq gratuite et ultra-rapide
-    - Modèle Meta Llama-3-8B-8192 (excellent pour le NLP)
-    - Température = 0 pour des réponses stables et déterministes
-    - Fallback intelligent si l'API est indisponible
-    
-    Args:
-        entity1 (str): Première entité (généralement le sujet)
-        entity2 (str): Deuxième entité (généralement l'objet)
-        sentence (str): Phrase complète contenant les entités
-        
-    Returns:
-        str: Le type de relation détecté ("teaches", "author", "worksAt", "relatedTo")
-    
-    Exemples:
-        >>> predict_relation_real_api("Marie", "Université", "Marie enseigne à l'Université")
-        'teaches'
-    """
-    
-    # Clé API Groq (chargée depuis .env)
-    GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-    if not GROQ_API_KEY:
-        print("⚠️ ATTENTION : GROQ_API_KEY non trouvé. Créez un fichier .env avec votre clé.")
-        return "relatedTo"
-    
-    try:
-        print(f"  🚀 Appel API Groq (Llama-3) pour : {entity1} ↔ {entity2}")
-        
-        client = Groq(api_key=GROQ_API_KEY)
-        
-        # Prompt académique strict V3 - DOMAIN ENFORCEMENT (NEURO-SYMBOLIC ARCHITECTURE)
-        prompt = f"""You are a STRICT relation extraction component inside a Neuro-Symbolic RDF system.
+# -------------------------------------------------------------------------
+# Prompts partagés (mode paire unique et mode batch)
+# -------------------------------------------------------------------------
+# Les règles ci-dessous sont invariantes : elles sont identiques pour toutes les
+# paires d'un document. Le mode batch les envoie UNE SEULE FOIS par document.
+
+RELATION_SYSTEM_PROMPT = (
+    "You are a STRICT relation extraction component. You output ONLY property names "
+    "or NO_VALID_RELATIONS. You NEVER modify entity types. You NEVER allow non-Person "
+    "subjects for human actions. You REJECT semantically incoherent relations."
+)
+
+RELATION_RULES_PROMPT = """You are a STRICT relation extraction component inside a Neuro-Symbolic RDF system.
 
 You are NOT an ontology editor.
 You are NOT allowed to change entity types.
@@ -401,7 +426,55 @@ VERB MAPPING
 - "écrit", "auteur" → author (if subject=Person AND object=Document)
 - "situé à" → locatedIn
 
-If constraints violated → NO_VALID_RELATIONS
+If constraints violated → NO_VALID_RELATIONS"""
+
+RELATION_OUTPUT_LABELS = ("teachesSubject | teaches | author | worksAt | locatedIn | "
+                          "collaboratesWith | studiesAt | manages | relatedTo | NO_VALID_RELATIONS")
+
+# Mode compact (KG_COMPACT_PROMPT=1) : les règles invariantes, condensées, ne
+# figurent qu'une fois dans le message système (identique pour tous les appels,
+# donc réutilisable par le cache de préfixe du fournisseur) ; le message
+# utilisateur ne porte que le texte, la paire et sa ligne de RELATION_TABLE.
+RELATION_RULES_COMPACT = """Rules:
+- Use the given entity types as-is: never re-type an entity, create classes or properties, infer implicit roles or output schema triples.
+- Human actions (teachesSubject, author, worksAt, manages, collaboratesWith) require a PER subject, else NO_VALID_RELATIONS.
+- Topics (RDF, OWL, SPARQL, Web, Graph, Ontology, Sémantique, academic subjects, standards) are never persons.
+- Verb cues: "enseigne" → teachesSubject (PER→TOPIC/DOC); "travaille à" → worksAt (PER→ORG); "écrit"/"auteur" → author (PER→DOC); "situé à" → locatedIn.
+- Answer only with an admissible relation of the pair; if none fits or a constraint fails → NO_VALID_RELATIONS."""
+
+RELATION_SYSTEM_PROMPT_COMPACT = RELATION_SYSTEM_PROMPT + "\n\n" + RELATION_RULES_COMPACT
+
+RELATION_BATCH_SUFFIX = " In batch mode you output ONLY a JSON array."
+
+
+def build_relation_prompt(entity1: str, entity2: str, sentence: str,
+                          entity1_type: str, entity2_type: str,
+                          allowed_relations=None, compact=None):
+    """
+    Messages (système, utilisateur) de la prédiction d'une paire.
+
+    Args:
+        allowed_relations (list): Relations admissibles (défaut : ligne de RELATION_TABLE)
+        compact (bool): Prompt compact (défaut : COMPACT_PROMPT_MODE)
+
+    Returns:
+        tuple: (system_prompt, user_prompt)
+    """
+    if compact is None:
+        compact = COMPACT_PROMPT_MODE
+
+    if compact:
+        if allowed_relations is None:
+            allowed_relations = _admissible_relations(entity1_type, entity2_type)
+        admissible = ", ".join(list(allowed_relations) + ["NO_VALID_RELATIONS"])
+        return RELATION_SYSTEM_PROMPT_COMPACT, f"""Text: "{sentence}"
+Entity 1: "{entity1}" (type: {entity1_type})
+Entity 2: "{entity2}" (type: {entity2_type})
+Admissible: {admissible}
+Relation (one word):"""
+
+    # Prompt académique strict V3 - DOMAIN ENFORCEMENT (NEURO-SYMBOLIC ARCHITECTURE)
+    prompt = f"""{RELATION_RULES_PROMPT}
 
 ========================
 CONTEXT
@@ -423,299 +496,440 @@ Admissible relations for ({entity1_type} → {entity2_type}):
 OUTPUT (ONE WORD ONLY)
 ========================
 
-teachesSubject | teaches | author | worksAt | locatedIn | collaboratesWith | studiesAt | manages | relatedTo | NO_VALID_RELATIONS
+{RELATION_OUTPUT_LABELS}
 
 No explanations."""
+    return RELATION_SYSTEM_PROMPT, prompt
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a STRICT relation extraction component. You output ONLY property names or NO_VALID_RELATIONS. You NEVER modify entity types. You NEVER allow non-Person subjects for human actions. You REJECT semantically incoherent relations."
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0,
-        )
 
-        relation = chat_completion.choices[0].message.content.strip()
-        
-        # Clean LLM output: strip punctuation but KEEP underscores (needed for
-        # camelCase property names like "teachesSubject" which use no underscores,
-        # but also safe to keep them for any variant the LLM may emit).
-        relation = relation.strip().replace(".", "").replace('"', "").replace("'", "")
-        # Normalise to camelCase canonical forms used by valid_relations
-        _llm_aliases = {
-            "teachessubject":   "teachesSubject",
-            "teaches_subject":  "teachesSubject",
-            "worksat":          "worksAt",
-            "works_at":         "worksAt",
-            "locatedin":        "locatedIn",
-            "located_in":       "locatedIn",
-            "collaborateswith":        "collaboratesWith",
-            "collaborates_with":       "collaboratesWith",
-            "studiesat":        "studiesAt",
-            "studies_at":       "studiesAt",
-        }
-        relation = _llm_aliases.get(relation.lower(), relation)
-        
-        # Si LLM retourne NO_RELATION ou NO_VALID_RELATIONS, on arrête immédiatement
-        if "no" in relation and ("relation" in relation or "valid" in relation):
-            print(f"    ⛔ LLM a rejeté la relation (NO_VALID_RELATIONS)")
-            return None
-        
-        # --- LOGIQUE DE CORRECTION SÉMANTIQUE AVEC PRIORITÉS ET CONTEXTE LOCAL ---
-        sentence_lower = sentence.lower()
-        entity1_lower = entity1.lower()
-        entity2_lower = entity2.lower()
-        
-        # Extraction du contexte local AMÉLIORÉE : Utiliser la phrase qui contient les deux entités
-        # Si les entités sont dans des phrases différentes, utiliser la phrase de entity2 (objet)
-        try:
-            # Séparer le texte en phrases
-            import re
-            sentences = re.split(r'[.!?]\s+', sentence)
-            
-            # Trouver la phrase qui contient les deux entités
-            local_context = None
-            for sent in sentences:
-                sent_lower = sent.lower()
-                if entity1_lower in sent_lower and entity2_lower in sent_lower:
-                    local_context = sent_lower
-                    break
-            
-            # Si pas de phrase commune, prendre la phrase de entity2 (objet)
-            # Raison: La relation est généralement exprimée près de l'objet
-            # Ex: "Elle travaille au CNRS" → "travaille" est dans la phrase du CNRS
-            if not local_context:
-                for sent in sentences:
-                    sent_lower = sent.lower()
-                    if entity2_lower in sent_lower:
-                        local_context = sent_lower
-                        break
-            
-            # Fallback sur la phrase de entity1
-            if not local_context:
-                for sent in sentences:
-                    sent_lower = sent.lower()
-                    if entity1_lower in sent_lower:
-                        local_context = sent_lower
-                        break
-            
-            # Fallback final sur contexte autour des entités (ancien système)
-            if not local_context:
-                pos1 = sentence_lower.find(entity1_lower)
-                pos2 = sentence_lower.find(entity2_lower)
-                
-                if pos1 >= 0 and pos2 >= 0:
-                    start = min(pos1, pos2)
-                    end = max(pos1 + len(entity1_lower), pos2 + len(entity2_lower))
-                    
-                    # Extraire 50 caractères avant et après pour le contexte
-                    context_start = max(0, start - 50)
-                    context_end = min(len(sentence_lower), end + 50)
-                    local_context = sentence_lower[context_start:context_end]
-                else:
-                    local_context = sentence_lower  # Fallback sur phrase complète
-        except:
-            local_context = sentence_lower
-        
-        print(f"    🔍 Contexte local : ...{local_context}...")
-        
-        # Classification des lieux (villes vs bâtiments/institutions)
-        # IMPORTANT : Ne pas mettre de villes qui apparaissent souvent dans des noms d'institutions
-        vraies_villes = ["paris", "france", "versailles", "lyon", "marseille", "toulouse", 
-                        "bordeaux", "lille", "états-unis", "usa", "new york", "londres",
-                        "californie", "redmond", "cambridge", "oxford",
-                        "berkeley", "boston", "seattle", "tokyo", "berlin"]
-        
-        batiments_institutions = ["palais", "élysée", "mit", "stanford", "harvard", "université", 
-                                 "university", "institut", "école", "college"]
-        
-        # Vérifier si entity2 est UNIQUEMENT une ville (pas dans un nom d'institution)
-        is_vraie_ville = any(ville in entity2_lower for ville in vraies_villes) and \
-                        not any(bat in entity2_lower for bat in batiments_institutions)
-        is_batiment = any(bat in entity2_lower for bat in batiments_institutions)
-        
-        # === PRIORITÉS BASÉES SUR LE CONTEXTE LOCAL (pas toute la phrase) ===
-
-        # PRIORITÉ 0 : Enseignement — dispatch selon le type de entity2
-        # Primary source: NER-produced entity types passed as parameters.
-        # Keyword lists are used ONLY as fallback when type is UNK.
-        topics_keywords = ["physique", "mathématiques", "maths", "informatique", "biologie",
-                          "chimie", "histoire", "géographie", "philosophie", "littérature",
-                          "physics", "mathematics", "computer science", "biology", "chemistry",
-                          "rdfs", "rdf", "owl", "sparql", "sémantique", "web sémantique",
-                          "semantic web", "ontologie", "ontology", "json-ld", "turtle",
-                          "bases de données", "base de données", "database", "réseaux", "networks",
-                          "algorithmes", "algorithms", "intelligence artificielle", "ia", "ai",
-                          "machine learning", "deep learning", "apprentissage"]
-
-        org_keywords = ["université", "university", "institute", "institut", "laboratoire",
-                        "lab", "department", "département", "centre", "center", "school",
-                        "college", "école", "inria", "cnrs"]
-
-        # Type-first resolution (NER parameter > keyword heuristic)
+def build_batch_relation_prompt(llm_pairs, sentence: str, compact=None):
+    """
+    Messages (système, utilisateur) de la prédiction groupée des paires.
+
+    Args:
+        llm_pairs (list): Tuples (entity1, entity2, entity1_type, entity2_type, allowed_relations)
+        sentence (str): Texte complet du document
+        compact (bool): Prompt compact (défaut : COMPACT_PROMPT_MODE)
+
+    Returns:
+        tuple: (system_prompt, user_prompt)
+    """
+    if compact is None:
+        compact = COMPACT_PROMPT_MODE
+
+    pair_lines = "\n".join(
+        f'{idx}. "{entity1}" ({entity1_type}) → "{entity2}" ({entity2_type}) '
+        f'| admissible: {", ".join(allowed_relations)}'
+        for idx, (entity1, entity2, entity1_type, entity2_type, allowed_relations)
+        in enumerate(llm_pairs, start=1)
+    )
+
+    if compact:
+        # Règles une seule fois pour tout le lot, dans le message système
+        return RELATION_SYSTEM_PROMPT_COMPACT + RELATION_BATCH_SUFFIX, f"""Text: "{sentence}"
+
+Candidate pairs (Entity 1 → Entity 2):
+{pair_lines}
+
+JSON array of exactly {len(llm_pairs)} labels (admissible relation or NO_VALID_RELATIONS), in pair order:"""
+
+    prompt = f"""{RELATION_RULES_PROMPT}
+
+========================
+CONTEXT
+========================
+
+Text: "{sentence}"
+
+Candidate pairs (Entity 1 → Entity 2):
+{pair_lines}
+
+========================
+OUTPUT (JSON ARRAY ONLY)
+========================
+
+Return a JSON array of exactly {len(llm_pairs)} strings, one per candidate pair, in the same order.
+Each string must be one of: {RELATION_OUTPUT_LABELS}
+Example for 2 pairs: ["worksAt", "NO_VALID_RELATIONS"]
+
+No explanations."""
+    return RELATION_SYSTEM_PROMPT + RELATION_BATCH_SUFFIX, prompt
+
+# Normalise to camelCase canonical forms used by VALID_RELATIONS
+_LLM_RELATION_ALIASES = {
+    "teachessubject":   "teachesSubject",
+    "teaches_subject":  "teachesSubject",
+    "worksat":          "worksAt",
+    "works_at":         "worksAt",
+    "locatedin":        "locatedIn",
+    "located_in":       "locatedIn",
+    "collaborateswith":        "collaboratesWith",
+    "collaborates_with":       "collaboratesWith",
+    "studiesat":        "studiesAt",
+    "studies_at":       "studiesAt",
+}
+
+
+def _normalize_llm_relation(raw_relation: str) -> Optional[str]:
+    """
+    Nettoie une étiquette brute renvoyée par le LLM.
+
+    Returns:
+        str: L'étiquette normalisée (camelCase canonique si reconnue)
+        None: Si le LLM a rejeté la relation (NO_RELATION / NO_VALID_RELATIONS)
+    """
+    # Clean LLM output: strip punctuation but KEEP underscores (needed for
+    # camelCase property names like "teachesSubject" which use no underscores,
+    # but also safe to keep them for any variant the LLM may emit).
+    relation = raw_relation.strip().replace(".", "").replace('"', "").replace("'", "")
+    relation = _LLM_RELATION_ALIASES.get(relation.lower(), relation)
+
+    # Si LLM retourne NO_RELATION ou NO_VALID_RELATIONS (toute casse), on arrête immédiatement
+    lowered = relation.lower()
+    if "no" in lowered and ("relation" in lowered or "valid" in lowered):
+        return None
+    return relation
+
+
+def _fallback_relation(entity2: str, sentence: str, entity2_type: str = "UNK") -> str:
+    """
+    Prédiction par mots-clés utilisée quand l'appel LLM échoue.
+
+    Args:
+        entity2 (str): Objet de la relation
+        sentence (str): Texte complet du document
+        entity2_type (str): Type NER de l'objet
+
+    Returns:
+        str: Relation déduite des seuls mots-clés
+    """
+    # Fallback ultime avec détection de lieux
+    sentence_lower = sentence.lower()
+    entity2_lower = entity2.lower()
+
+    # Détection de lieux dans le fallback
+    lieux = ["paris", "france", "versailles", "lyon", "marseille", "toulouse",
+             "bordeaux", "lille", "états-unis", "usa", "new york", "londres",
+             "californie", "silicon valley"]
+
+    for lieu in lieux:
+        if lieu in entity2_lower:
+            logger.debug("  🔍 Fallback : Détection de lieu '%s' → locatedIn", lieu)
+            return "locatedIn"
+
+    # Autres détections — use entity2_type (NER) first, keyword fallback for UNK
+    if "enseigne" in sentence_lower or "teach" in sentence_lower:
+        if entity2_type == "ORG":
+            return "worksAt"
         if entity2_type == "TOPIC":
-            is_topic, is_org = True, False
-        elif entity2_type in ("ORG",):
-            is_topic, is_org = False, True
-        elif entity2_type in ("LOC",):
-            # LOC alone: keyword fallback distinguishes pure city from institution
-            is_topic = False
-            is_org   = any(kw in entity2_lower for kw in org_keywords)
-        else:
-            # UNK — fall back to keyword heuristics
-            is_topic = any(kw in entity2_lower for kw in topics_keywords)
-            is_org   = any(kw in entity2_lower for kw in org_keywords)
-
-        _teach_verbs = ["enseigne", "enseigné", "enseignant", "teach", "taught", "teaching"]
-        _teach_in_ctx = any(kw in local_context for kw in _teach_verbs)
-
-        if _teach_in_ctx and is_topic:
-            relation = "teachesSubject"
-            print(f"  🎓 Priorité 0a : 'enseigne' + matière '{entity2}' → teachesSubject")
-
-        elif _teach_in_ctx and is_org:
-            relation = "worksAt"
-            print(f"  🏫 Priorité 0b : 'enseigne' + organisation '{entity2}' → worksAt")
-
-        # PRIORITÉ 1 : Enseignement générique (type de entity2 inconnu)
-        elif any(kw in local_context for kw in ["enseigne", "enseigné", "enseignant", "professeur",
-                                                  "teach", "professor", "taught", "teaching"]):
-            relation = "teachesSubject"
-            print(f"  🎓 Priorité 1 : 'enseigne/professeur' → teachesSubject (défaut)")
-        
-        # PRIORITÉ 2 : Direction/Management (mots-clés de management)
-        # IMPORTANT : Seulement si entity1 est une personne ET entity2 est une organisation
-        elif any(kw in local_context for kw in ["dirige", "gère", "manage", "manages", "ceo", "dirigeant"]) and \
-             not is_vraie_ville:  # Exclure les villes (on ne dirige pas une ville)
-            relation = "manages"
-            print(f"  💼 Priorité 2 : Détection 'dirige/gère' dans contexte local → Force manages")
-        
-        # PRIORITÉ 3 : Travail/Emploi (personne → organisation/bâtiment)
-        # IMPORTANT : "travaille à X" devrait être worksAt même si X est une ville
-        # car dans contexte professionnel, c'est souvent une organisation (ex: Université de Versailles)
-        elif any(kw in local_context for kw in ["travaille", "works", "employé", "employee"]):
-            # Dans contexte de travail, privilégier worksAt (organisation implicite)
-            relation = "worksAt"
-            print(f"  💼 Priorité 3 : Détection 'travaille' → Force worksAt (contexte professionnel)")
-        
-        # PRIORITÉ 4 : Rédaction/Auteur (mots-clés de création)
-        elif any(kw in local_context for kw in ["auteur", "rédigé", "écrit", "author", "wrote", "written", "écrivain", "a écrit"]):
-            relation = "author"
-            print(f"  ✍️ Priorité 4 : Détection 'auteur/écrit' dans contexte local → Force author")
-        
-        # PRIORITÉ 4.5 : Localisation explicite avec "situé" (prend le dessus sur manages)
-        elif any(kw in local_context for kw in ["situé", "située", "basé", "basée", "located", "based"]):
-            if is_vraie_ville or is_batiment:
-                relation = "locatedIn"
-                print(f"  📍 Priorité 4.5 : Détection 'situé/basé' dans contexte local → Force locatedIn")
-        
-        # PRIORITÉ 5 : Localisation (si entity2 est une VRAIE ville — pas une institution)
-        # This fires even after Priority 0/1 because a bare city is never a
-        # teaching object: "Zoubida enseigne Versailles" makes no semantic sense.
-        elif is_vraie_ville:
-            ville_detectee = next((v for v in vraies_villes if v in entity2_lower), entity2)
-            print(f"  📍 Priorité 5 : Détection ville '{ville_detectee}' → Force locatedIn")
-            relation = "locatedIn"
-
-        # POST-OVERRIDE: bare city must always yield locatedIn regardless of verb
-        if is_vraie_ville and relation != "locatedIn":
-            relation = "locatedIn"
-            print(f"  📍 Post-override : ville seule → locatedIn (annule verbe d'enseignement)")
-        
-        # Mapping de sécurité pour les autres cas (détection dans la réponse LLM)
-        # IMPORTANT : Ne pas écraser teachesSubject ou worksAt fixés par les priorités 0a/0b
-        if relation not in ("teachesSubject", "worksAt"):  # Protection contre écrasement
-            if "teachsubject" in relation.lower().replace(" ", "").replace("_", ""):
-                relation = "teachesSubject"
-            elif "teach" in relation:
-                # Dispatcher selon le type de entity2
-                if is_org:
-                    relation = "worksAt"
-                else:
-                    relation = "teachesSubject"
-            elif "author" in relation or "wrote" in relation:
-                relation = "author"
-            elif "work" in relation:
-                relation = "worksAt"
-            elif "located" in relation or "situé" in relation or "basé" in relation:
-                relation = "locatedIn"
-            elif "collabore" in relation or "collaborate" in relation:
-                relation = "collaboratesWith"
-            elif "étudie" in relation or "studies" in relation:
-                relation = "studiesAt"
-            elif "gère" in relation or "manage" in relation:
-                relation = "manages"
-        
-        # Liste des relations valides
-        valid_relations = ["teachesSubject", "author", "worksAt", "locatedIn",
-                          "collaboratesWith", "studiesAt", "manages", "relatedTo"]
-        if relation not in valid_relations:
-            relation = "relatedTo"
+            return "teachesSubject"
+        # Type UNK → keyword fallback
+        if FALLBACK_ORG_KEYWORDS.contains_any(entity2_lower):
+            return "worksAt"
+        if FALLBACK_TOPIC_KEYWORDS.contains_any(entity2_lower):
+            return "teachesSubject"
+        return "teachesSubject"  # safest default
+    if "rédigé" in sentence_lower or "écrit" in sentence_lower or "author" in sentence_lower:
+        return "author"
+    if "travaille" in sentence_lower or "works" in sentence_lower:
+        return "worksAt"
+    if "situé" in sentence_lower or "basé" in sentence_lower or "located" in sentence_lower:
+        return "locatedIn"
+    if "collabore" in sentence_lower or "collaborate" in sentence_lower:
+        return "collaboratesWith"
+    if "étudie" in sentence_lower or "studies" in sentence_lower:
+        return "studiesAt"
+
+    return "relatedTo"
+
+
+def _llm_chat_completion(system_prompt: str, user_prompt: str) -> str:
+    """
+    Appel LLM (température 0) via le backend actif, mémorisé dans le cache persistant.
+
+    Le backend (Groq, Hugging Face ou remplaçant local) est choisi par
+    KG_LLM_BACKEND (voir llm_backends.py). Les prompts étant déterministes,
+    une requête déjà vue est servie depuis le cache SQLite sans appel réseau.
+
+    Args:
+        system_prompt (str): Message système
+        user_prompt (str): Message utilisateur
+
+    Returns:
+        str: Contenu brut de la réponse du modèle
+    """
+    with span("llm.request", prompt_chars=len(system_prompt) + len(user_prompt)):
+        return get_llm_backend().cached_complete(system_prompt, user_prompt)
+
+
+def _extract_json_payload(response: str) -> str:
+    """Retire les balises ``` que Llama ajoute parfois autour du JSON."""
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0].strip()
+    return response
+
+
+def predict_relation_real_api(entity1: str, entity2: str, sentence: str,
+                              entity1_type: str = "UNK", entity2_type: str = "UNK",
+                              doc_index: Optional[DocumentIndex] = None,
+                              allowed_relations: Optional[list] = None) -> Optional[str]:
+    """
+    Utilise l'API GROQ (Gratuite et Ultra-Rapide).
+    Modèle : Llama-3-8B (très performant pour l'extraction de relations).
 
-        print(f"  🤖 Groq/Llama-3 a détecté : {entity1} --[{relation}]--> {entity2}")
+    VERSION PRODUCTION (GROQ API) 🚀 :
+    - API Groq gratuite et ultra-rapide
+    - Modèle Meta Llama-3-8B-8192 (excellent pour le NLP)
+    - Température = 0 pour des réponses stables et déterministes
+    - Fallback intelligent si l'API est indisponible
+    - Règles d'abord (KG_RULE_FIRST) : si la cascade de priorités tranche,
+      le LLM n'est pas appelé (voir relation_rules.py)
+
+    Chaque décision est enregistrée avec sa source dans
+    get_relation_decision_stats() (rule:*, llm, llm:rejected, fallback, no_backend,
+    rule_only quand le disjoncteur LLM est ouvert).
+
+    Args:
+        entity1 (str): Première entité (généralement le sujet)
+        entity2 (str): Deuxième entité (généralement l'objet)
+        sentence (str): Phrase complète contenant les entités
+        doc_index (DocumentIndex): Index du document (découpage des phrases partagé)
+        allowed_relations (list): Relations admissibles de la paire (prompt compact ;
+                                  défaut : ligne de RELATION_TABLE)
+
+    Returns:
+        str: Le type de relation détecté ("teaches", "author", "worksAt", "relatedTo")
+
+    Exemples:
+        >>> predict_relation_real_api("Marie", "Université", "Marie enseigne à l'Université")
+        'teaches'
+    """
+    decision_stats = get_relation_decision_stats()
+
+    # Pré-classification déterministe : pas d'appel réseau si les règles tranchent
+    decision = None
+    if RULE_FIRST_ENABLED:
+        decision = classify_relation_by_rules(entity1, entity2, sentence, entity1_type, entity2_type,
+                                              doc_index=doc_index)
+        if decision.is_decisive:
+            relation = finalize_relation(decision.relation, decision)
+            logger.debug("  ⚡ Règles (%s) : %s --[%s]--> %s (appel LLM évité)", decision.source,
+                         entity1, relation, entity2)
+            decision_stats.record(entity1, entity2, relation, decision.source, llm_called=False)
+            return relation
+
+    # Backend LLM actif (clé API chargée depuis .env)
+    backend = get_llm_backend()
+    if not backend.is_available():
+        logger.warning("⚠️ ATTENTION : %s", backend.unavailable_reason())
+        decision_stats.record(entity1, entity2, "relatedTo", "no_backend", llm_called=False)
+        return "relatedTo"
+
+    # Disjoncteur ouvert (fournisseur dégradé) : mode règles seules, sans appel
+    if backend.is_degraded():
+        if decision is None:
+            decision = classify_relation_by_rules(entity1, entity2, sentence, entity1_type,
+                                                  entity2_type, doc_index=doc_index)
+        relation = finalize_relation(
+            decision.relation or _fallback_relation(entity2, sentence, entity2_type), decision)
+        logger.debug("  🔌 Disjoncteur LLM ouvert, règles seules : %s --[%s]--> %s", entity1,
+                     relation, entity2)
+        decision_stats.record(entity1, entity2, relation, "rule_only", llm_called=False)
+        return relation
+
+    try:
+        logger.debug("  🚀 Appel API Groq (Llama-3) pour : %s ↔ %s", entity1, entity2)
+
+        system_prompt, prompt = build_relation_prompt(entity1, entity2, sentence,
+                                                      entity1_type, entity2_type,
+                                                      allowed_relations)
+        response = _llm_chat_completion(system_prompt, prompt)
+
+        relation = _normalize_llm_relation(response)
+        if relation is None:
+            logger.debug("    ⛔ LLM a rejeté la relation (NO_VALID_RELATIONS)")
+            decision_stats.record(entity1, entity2, None, "llm:rejected", llm_called=True)
+            return None
+
+        if decision is None:
+            decision = classify_relation_by_rules(entity1, entity2, sentence,
+                                                  entity1_type, entity2_type, doc_index=doc_index)
+        relation = finalize_relation(relation, decision)
+
+        logger.debug("  🤖 Groq/Llama-3 a détecté : %s --[%s]--> %s", entity1, relation, entity2)
+        decision_stats.record(entity1, entity2, relation,
+                              decision.source if decision.is_decisive else "llm", llm_called=True)
         return relation
 
     except Exception as e:
-        print(f"  ⚠️ Erreur Groq ({str(e)[:80]}). Passage au fallback.")
-        # Fallback ultime avec détection de lieux
-        sentence_lower = sentence.lower()
-        entity2_lower = entity2.lower()
-        
-        # Détection de lieux dans le fallback
-        lieux = ["paris", "france", "versailles", "lyon", "marseille", "toulouse", 
-                 "bordeaux", "lille", "états-unis", "usa", "new york", "londres",
-                 "californie", "silicon valley"]
-        
-        for lieu in lieux:
-            if lieu in entity2_lower:
-                print(f"  🔍 Fallback : Détection de lieu '{lieu}' → locatedIn")
-                return "locatedIn"
-        
-        # Autres détections — use entity2_type (NER) first, keyword fallback for UNK
-        if "enseigne" in sentence_lower or "teach" in sentence_lower:
-            if entity2_type == "ORG":
-                return "worksAt"
-            if entity2_type == "TOPIC":
-                return "teachesSubject"
-            # Type UNK → keyword fallback
-            _fallback_org_kw   = ["université", "university", "institut", "institute",
-                                   "laboratoire", "lab", "department", "département",
-                                   "centre", "center", "école", "school", "college",
-                                   "inria", "cnrs"]
-            _fallback_topic_kw = ["physique", "mathématiques", "maths", "informatique",
-                                   "sémantique", "rdf", "owl", "sparql", "ontologie",
-                                   "machine learning", "deep learning", "ia", "ai",
-                                   "réseaux", "algorithmes", "database", "databases"]
-            if any(kw in entity2_lower for kw in _fallback_org_kw):
-                return "worksAt"
-            if any(kw in entity2_lower for kw in _fallback_topic_kw):
-                return "teachesSubject"
-            return "teachesSubject"  # safest default
-        if "rédigé" in sentence_lower or "écrit" in sentence_lower or "author" in sentence_lower:
-            return "author"
-        if "travaille" in sentence_lower or "works" in sentence_lower:
-            return "worksAt"
-        if "situé" in sentence_lower or "basé" in sentence_lower or "located" in sentence_lower:
-            return "locatedIn"
-        if "collabore" in sentence_lower or "collaborate" in sentence_lower:
-            return "collaboratesWith"
-        if "étudie" in sentence_lower or "studies" in sentence_lower:
-            return "studiesAt"
-        
-        return "relatedTo"
+        logger.warning("  ⚠️ Erreur Groq (%s). Passage au fallback.", str(e)[:80])
+        relation = _fallback_relation(entity2, sentence, entity2_type)
+        decision_stats.record(entity1, entity2, relation, "fallback", llm_called=True)
+        return relation
+
+
+def predict_relations_batch_real_api(pairs, sentence, doc_index=None, fused_labels=None, contexts=None):
+    """
+    Prédit en UN SEUL appel Groq les relations de toutes les paires d'un document.
+
+    Au lieu d'un aller-retour réseau par paire (O(n²) appels pour n entités),
+    toutes les paires candidates sont envoyées dans une requête structurée et le
+    LLM renvoie un tableau JSON d'étiquettes, une par paire et dans le même ordre.
+    Chaque étiquette passe ensuite par la même normalisation et la même
+    correction contextuelle que predict_relation_real_api(). Les paires déjà
+    tranchées par les règles (KG_RULE_FIRST) ne figurent pas dans la requête.
+
+    Args:
+        pairs (list): Tuples (entity1, entity2, entity1_type, entity2_type, allowed_relations)
+                      déjà filtrés par RELATION_TABLE
+        sentence (str): Texte complet du document (contexte des paires sans passage)
+        doc_index (DocumentIndex): Index du document (découpage des phrases partagé)
+        fused_labels (dict): Étiquettes {(entity1, entity2): relation} déjà renvoyées
+                             par l'appel fusionné ; aucune requête n'est alors émise
+        contexts (list): Passage de chaque paire (CandidatePair.context), comme en
+                         modes séquentiel et concurrent : règles, repli et prompt
+                         voient le même texte quel que soit le mode
+
+    Returns:
+        list: Une relation (str) ou None (rejet LLM) par paire, dans l'ordre d'entrée
+    """
+    if not pairs:
+        return []
+
+    decision_stats = get_relation_decision_stats()
+    contexts = [context or sentence for context in (contexts or [sentence] * len(pairs))]
+    results = [None] * len(pairs)
+    decisions = [None] * len(pairs)
+
+    # Règles d'abord : seules les paires ambiguës sont envoyées au LLM
+    pending = []
+    for idx, (entity1, entity2, entity1_type, entity2_type, _) in enumerate(pairs):
+        if RULE_FIRST_ENABLED:
+            decision = classify_relation_by_rules(entity1, entity2, contexts[idx],
+                                                  entity1_type, entity2_type, doc_index=doc_index)
+            decisions[idx] = decision
+            if decision.is_decisive:
+                relation = finalize_relation(decision.relation, decision)
+                logger.debug("  ⚡ Règles (%s) : %s --[%s]--> %s (appel LLM évité)", decision.source,
+                             entity1, relation, entity2)
+                decision_stats.record(entity1, entity2, relation, decision.source, llm_called=False)
+                results[idx] = relation
+                continue
+        pending.append(idx)
+
+    if not pending:
+        return results
+    llm_pairs = [pairs[idx] for idx in pending]
+
+    if fused_labels is not None:
+        # Paires absentes de la réponse fusionnée (None) : rejetées par le LLM. Une étiquette
+        # renvoyée pour la paire inversée (entity2, entity1) n'est pas reprise : appliquée
+        # dans le sens de la paire, elle inverserait sujet et objet
+        logger.info("  🧩 Mode fusionné : %s paire(s) étiquetée(s) par l'appel unique", len(llm_pairs))
+        labels = [fused_labels.get((entity1, entity2)) for entity1, entity2, _, _, _ in llm_pairs]
+    else:
+        # Backend LLM actif (clé API chargée depuis .env)
+        backend = get_llm_backend()
+        if not backend.is_available():
+            logger.warning("⚠️ ATTENTION : %s", backend.unavailable_reason())
+            for idx in pending:
+                entity1, entity2 = pairs[idx][:2]
+                decision_stats.record(entity1, entity2, "relatedTo", "no_backend", llm_called=False)
+                results[idx] = "relatedTo"
+            return results
+
+        # Disjoncteur ouvert (fournisseur dégradé) : mode règles seules, sans appel
+        if backend.is_degraded():
+            logger.warning("  🔌 Disjoncteur LLM ouvert : %s paire(s) en mode règles seules", len(pending))
+            for idx in pending:
+                entity1, entity2, entity1_type, entity2_type, _ = pairs[idx]
+                decision = decisions[idx] or classify_relation_by_rules(entity1, entity2, contexts[idx],
+                                                                        entity1_type, entity2_type,
+                                                                        doc_index=doc_index)
+                results[idx] = finalize_relation(
+                    decision.relation or _fallback_relation(entity2, contexts[idx], entity2_type), decision)
+                decision_stats.record(entity1, entity2, results[idx], "rule_only", llm_called=False)
+            return results
+
+        try:
+            logger.info("  🚀 Appel API Groq (Llama-3) en mode batch : %s paire(s) en une requête",
+                        len(llm_pairs))
+
+            # Texte du lot : passages des paires envoyées (dans l'ordre du document)
+            passages = sorted(set(contexts[idx] for idx in pending), key=sentence.find)
+            system_prompt, prompt = build_batch_relation_prompt(llm_pairs, " ".join(passages))
+            response = _llm_chat_completion(system_prompt, prompt)
+            response = _extract_json_payload(response.strip())
+            try:
+                labels = json.loads(response)
+            except json.JSONDecodeError:
+                # Fallback : essayer de trouver un tableau JSON dans la réponse
+                json_match = re.search(r'\[.*\]', response, re.DOTALL)
+                if not json_match:
+                    raise ValueError(f"réponse non JSON : {response[:80]}")
+                labels = json.loads(json_match.group())
+            if not isinstance(labels, list):
+                raise ValueError("la réponse n'est pas un tableau JSON")
+
+        except Exception as e:
+            logger.warning("  ⚠️ Erreur Groq batch (%s). Passage au fallback.", str(e)[:80])
+            for idx in pending:
+                entity1, entity2, _, entity2_type, _ = pairs[idx]
+                results[idx] = _fallback_relation(entity2, contexts[idx], entity2_type)
+                decision_stats.record(entity1, entity2, results[idx], "fallback", llm_called=True)
+            return results
+
+    if len(labels) != len(llm_pairs):
+        logger.warning("  ⚠️ Batch : %s étiquette(s) reçue(s) pour %s paire(s) "
+                       "→ fallback pour les paires manquantes", len(labels), len(llm_pairs))
+
+    for position, idx in enumerate(pending):
+        entity1, entity2, entity1_type, entity2_type, _ = pairs[idx]
+        raw_label = labels[position] if position < len(labels) else None
+        if raw_label is None and fused_labels is not None:
+            logger.debug("    ⛔ Paire absente de la réponse fusionnée (aucune relation) : %s ↔ %s",
+                         entity1, entity2)
+            decision_stats.record(entity1, entity2, None, "llm:rejected", llm_called=True)
+            continue
+        if not isinstance(raw_label, str):
+            results[idx] = _fallback_relation(entity2, contexts[idx], entity2_type)
+            decision_stats.record(entity1, entity2, results[idx], "fallback", llm_called=True)
+            continue
+
+        relation = _normalize_llm_relation(raw_label)
+        if relation is None:
+            logger.debug("    ⛔ LLM a rejeté la relation (NO_VALID_RELATIONS) : %s ↔ %s", entity1, entity2)
+            decision_stats.record(entity1, entity2, None, "llm:rejected", llm_called=True)
+            continue
+
+        decision = decisions[idx] or classify_relation_by_rules(entity1, entity2, contexts[idx],
+                                                                entity1_type, entity2_type,
+                                                                doc_index=doc_index)
+        relation = finalize_relation(relation, decision)
+        logger.debug("  🤖 Groq/Llama-3 (batch) a détecté : %s --[%s]--> %s", entity1, relation, entity2)
+        decision_stats.record(entity1, entity2, relation,
+                              decision.source if decision.is_decisive else "llm", llm_called=True)
+        results[idx] = relation
+
+    return results
 
 
 # ============================================================================
 # 4.5. RAFFINEMENT INTELLIGENT DES TYPES D'ENTITÉS VIA LLM
 # ============================================================================
 
+# Mapper les types Groq vers les types de notre système
+LLM_TYPE_MAPPING = {
+    "PERSON": "PER",
+    "ORGANIZATION": "ORG",
+    "LOCATION": "LOC",
+    "TOPIC": "TOPIC",  # Nouveau type !
+    "DOCUMENT": "DOC"
+}
+
+
 def refine_entity_types(entities, sentence):
     """
     Re-classifie dynamiquement les entités détectées par spaCy via Groq/Llama-3.
@@ -723,6 +937,10 @@ def refine_entity_types(entities, sentence):
     Cette fonction permet de corriger les erreurs de spaCy et d'ajouter un nouveau type : TOPIC
     (pour les matières académiques, concepts scientifiques, domaines de connaissance).
     
+    Les types déjà connus du mémo inter-documents (entity_type_memo.py) sont
+    appliqués sans appel LLM : seules les entités jamais vues, ou marquées
+    ambiguës, sont envoyées au LLM, et ses réponses enrichissent le mémo.
+    
     Args:
         entities (list): Liste de tuples (texte_entité, type_spacy)
         sentence (str): Phrase complète pour le contexte
@@ -737,17 +955,91 @@ def refine_entity_types(entities, sentence):
     if not entities:
         return entities
     
-    print("\n[RAFFINEMENT] Re-classification intelligente des entités via Groq/Llama-3...")
+    logger.info("\n[RAFFINEMENT] Re-classification intelligente des entités via Groq/Llama-3...")
+    
+    # Mémo inter-documents : types déjà raffinés pour ces textes normalisés
+    memo = get_entity_type_memo()
+    refined_types = {}
+    for entity_text, original_type in entities:
+        known_type = memo.lookup(normalize_uri_fragment(entity_text), memo.context_for(original_type))
+        if known_type is not None:
+            refined_types[entity_text] = known_type
+    unknown = [(text, original_type) for text, original_type in entities if text not in refined_types]
+    if refined_types:
+        logger.info("  💾 Mémo des types : %s entité(s) déjà connue(s), %s à classifier",
+                    len(refined_types), len(unknown))
+    
+    if unknown:
+        llm_types = _classify_entities_with_llm(unknown, sentence)
+        if llm_types is None and not refined_types:
+            return entities  # Retourner entités non raffinées
+        for entity_text, original_type in unknown:
+            if entity_text in (llm_types or {}):
+                refined_types[entity_text] = llm_types[entity_text]
+                memo.store(normalize_uri_fragment(entity_text), llm_types[entity_text],
+                           memo.context_for(original_type))
+    
+    return _apply_refined_types(entities, refined_types)
+
+
+def _apply_refined_types(entities, refined_types):
+    """
+    Applique les types raffinés (garde PER incluse) aux entités spaCy.
     
-    # Clé API Groq (chargée depuis .env)
-    GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-    if not GROQ_API_KEY:
-        print("⚠️ ATTENTION : GROQ_API_KEY non trouvé dans .env")
-        return entities  # Retourner entités non raffinées
+    Args:
+        entities (list): Liste de tuples (texte_entité, type_spacy)
+        refined_types (dict): {texte_entité: type_interne}
+        
+    Returns:
+        list: Liste de tuples (texte_entité, type_raffiné)
+    """
+    refined_entities = []
+    for entity_text, original_type in entities:
+        if entity_text in refined_types:
+            refined_type = refined_types[entity_text]
+            
+            # Safety guard: never let LLM downgrade a PER decided by NER
+            if original_type == "PER" and refined_type != "PER":
+                logger.debug("  🛡️ Protégé : '%s' reste PER (LLM proposait %s)", entity_text, refined_type)
+                refined_type = "PER"
+
+            if refined_type != original_type:
+                logger.debug("  🔄 Raffinement : '%s' : %s → %s", entity_text, original_type, refined_type)
+            else:
+                logger.debug("  ✓ Confirmé : '%s' : %s", entity_text, refined_type)
+            
+            refined_entities.append((entity_text, refined_type))
+        else:
+            # Entité non classifiée par Groq, garder le type original
+            logger.debug("  ℹ️ Non classifié : '%s' (conservé: %s)", entity_text, original_type)
+            refined_entities.append((entity_text, original_type))
     
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
+    logger.info("[RAFFINEMENT] ✓ %s entités re-classifiées\n", len(refined_entities))
+    return refined_entities
+
+
+def _classify_entities_with_llm(entities, sentence):
+    """
+    Classification LLM des entités (types internes PER/ORG/LOC/TOPIC/DOC).
+    
+    Args:
+        entities (list): Liste de tuples (texte_entité, type_spacy)
+        sentence (str): Phrase complète pour le contexte
         
+    Returns:
+        dict: {texte_entité: type_interne} pour les entités classifiées,
+              ou None si le LLM est indisponible ou sa réponse inexploitable
+    """
+    # Backend LLM actif (clé API chargée depuis .env)
+    backend = get_llm_backend()
+    if not backend.is_available():
+        logger.warning("⚠️ ATTENTION : %s", backend.unavailable_reason())
+        return None
+    if backend.is_degraded():
+        logger.warning("  🔌 Disjoncteur LLM ouvert : types spaCy conservés (mode règles seules)")
+        return None
+    
+    try:
         # Préparer la liste des entités pour le prompt
         entity_list = [text for text, _ in entities]
         entity_list_str = ", ".join([f'"{e}"' for e in entity_list])
@@ -769,22 +1061,11 @@ Example: {{"Einstein": "PERSON", "Physique": "TOPIC", "Université de Princeton"
 
 JSON:"""
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a semantic entity classifier. You output ONLY valid JSON."
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0,
+        response = _llm_chat_completion(
+            "You are a semantic entity classifier. You output ONLY valid JSON.",
+            prompt
         )
-
-        response = chat_completion.choices[0].message.content.strip()
+        response = response.strip()
         
         # Nettoyage : extraire le JSON (parfois Llama ajoute des backticks)
         if "```json" in response:
@@ -802,56 +1083,157 @@ JSON:"""
             if json_match:
                 classification = json.loads(json_match.group())
             else:
-                print(f"  ⚠️ Échec parsing JSON. Réponse brute: {response[:100]}")
-                return entities
+                logger.warning("  ⚠️ Échec parsing JSON. Réponse brute: %s", response[:100])
+                return None
         
-        # Appliquer la re-classification
-        refined_entities = []
-        for entity_text, original_type in entities:
-            if entity_text in classification:
-                new_type = classification[entity_text]
-                
-                # Mapper les types Groq vers les types de notre système
-                type_mapping = {
-                    "PERSON": "PER",
-                    "ORGANIZATION": "ORG",
-                    "LOCATION": "LOC",
-                    "TOPIC": "TOPIC",  # Nouveau type !
-                    "DOCUMENT": "DOC"
-                }
-                
-                refined_type = type_mapping.get(new_type, original_type)
-                
-                # Safety guard: never let LLM downgrade a PER decided by NER
-                if original_type == "PER" and refined_type != "PER":
-                    print(f"  🛡️ Protégé : '{entity_text}' reste PER (LLM proposait {refined_type})")
-                    refined_type = "PER"
-
-                if refined_type != original_type:
-                    print(f"  🔄 Raffinement : '{entity_text}' : {original_type} → {refined_type}")
-                else:
-                    print(f"  ✓ Confirmé : '{entity_text}' : {refined_type}")
-                
-                refined_entities.append((entity_text, refined_type))
-            else:
-                # Entité non classifiée par Groq, garder le type original
-                print(f"  ℹ️ Non classifié : '{entity_text}' (conservé: {original_type})")
-                refined_entities.append((entity_text, original_type))
+        return {entity_text: LLM_TYPE_MAPPING[new_type]
+                for entity_text, new_type in classification.items()
+                if entity_text in entity_list and new_type in LLM_TYPE_MAPPING}
         
-        print(f"[RAFFINEMENT] ✓ {len(refined_entities)} entités re-classifiées\n")
-        return refined_entities
+    except Exception as e:
+        logger.warning("  ⚠️ Erreur Groq lors du raffinement (%s)", str(e)[:80])
+        logger.warning("  → Utilisation des types spaCy originaux")
+        return None
+
+
+# ============================================================================
+# 4.6. EXTRACTION FUSIONNÉE : TYPES + RELATIONS EN UN SEUL APPEL
+# ============================================================================
+# Le raffinement des types puis la prédiction des relations renvoient le même
+# texte au LLM dans des requêtes distinctes (1 + jusqu'à n(n-1)/2 par document).
+# En mode fusionné (KG_FUSED_EXTRACTION=1), la liste des entités est envoyée
+# une fois ; la réponse porte les types raffinés ET les paires étiquetées, qui
+# passent ensuite par instantiate_entities_in_abox() et la validation
+# ontologique des relations sans changement.
+
+FUSED_SYSTEM_PROMPT = """You are a semantic entity classifier and a STRICT relation extraction component. You return entity types and relations together in ONE valid JSON object.
+
+Rules:
+- Never create classes or properties, infer implicit roles or output schema triples.
+- Human actions (teachesSubject, author, worksAt, manages, collaboratesWith) require a PERSON subject.
+- Topics (RDF, OWL, SPARQL, Web, Graph, Ontology, Sémantique, academic subjects, standards) are never persons.
+- Verb cues: "enseigne" → teachesSubject (PER→TOPIC/DOC); "travaille à" → worksAt (PER→ORG); "écrit"/"auteur" → author (PER→DOC); "situé à" → locatedIn.
+- A relation must be admissible for the types of the pair, otherwise omit the pair."""
+
+
+def build_fused_prompt(entities, sentence: str):
+    """
+    Messages (système, utilisateur) de l'appel fusionné types + relations.
+
+    Args:
+        entities (list): Liste de tuples (texte_entité, type_spacy)
+        sentence (str): Texte complet du document
+
+    Returns:
+        tuple: (system_prompt, user_prompt)
+    """
+    entity_lines = "\n".join(f'{idx}. "{entity_text}" (spaCy: {ner_type})'
+                             for idx, (entity_text, ner_type) in enumerate(entities, start=1))
+    table_lines = "\n".join(f"- {type1} → {type2} : {', '.join(relations)}"
+                            for (type1, type2), relations in RELATION_TABLE.items()
+                            if "UNK" not in (type1, type2))
+    return FUSED_SYSTEM_PROMPT, f"""Text: "{sentence}"
+
+Entities:
+{entity_lines}
+
+1. Type each entity:
+- PERSON: human being (name, pronoun)
+- ORGANIZATION: company, institution, university, government body
+- LOCATION: city, country, place, building, address
+- TOPIC: academic subject, scientific field, concept, domain (e.g., Physics, Computer Science, RDFS)
+- DOCUMENT: book title, article, publication, course name
+
+2. Label the relations stated in the text between entities i < j (subject i, object j).
+Admissible relations by type pair (PER, ORG, LOC, TOPIC, DOC):
+{table_lines}
+
+Reply ONLY with a JSON object:
+{{"types": {{"1": "PERSON", "2": "ORGANIZATION"}}, "relations": [[1, 2, "worksAt"]]}}
+
+JSON:"""
+
+
+def extract_types_and_relations_fused(entities, sentence):
+    """
+    Raffine les types ET étiquette les relations du document en UN SEUL appel LLM.
+    
+    Les types passent par la même correspondance et la même garde PER que
+    refine_entity_types() ; les étiquettes sont rendues sous la forme attendue
+    par extract_relations(..., fused_relations=...), qui leur applique les
+    règles d'abord, la normalisation et la validation ontologique habituelles.
+    
+    Args:
+        entities (list): Liste de tuples (texte_entité, type_spacy)
+        sentence (str): Texte complet du document
         
+    Returns:
+        tuple: (entités raffinées, {(entité1, entité2): relation}) ; le second
+               élément vaut None si l'appel n'a pas abouti (mode standard)
+    """
+    if not entities:
+        return entities, {}
+    
+    logger.info("\n[FUSIONNÉ] Types + relations du document en un seul appel LLM...")
+    
+    backend = get_llm_backend()
+    if not backend.is_available():
+        logger.warning("⚠️ ATTENTION : %s", backend.unavailable_reason())
+        return entities, None
+    if backend.is_degraded():
+        logger.warning("  🔌 Disjoncteur LLM ouvert : types spaCy conservés (mode règles seules)")
+        return entities, None
+    
+    try:
+        system_prompt, prompt = build_fused_prompt(entities, sentence)
+        response = _extract_json_payload(_llm_chat_completion(system_prompt, prompt).strip())
+        try:
+            payload = json.loads(response)
+        except json.JSONDecodeError:
+            # Fallback : essayer de trouver un objet JSON dans la réponse
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if not json_match:
+                raise ValueError(f"réponse non JSON : {response[:80]}")
+            payload = json.loads(json_match.group())
+        if not isinstance(payload, dict):
+            raise ValueError("la réponse n'est pas un objet JSON")
     except Exception as e:
-        print(f"  ⚠️ Erreur Groq lors du raffinement ({str(e)[:80]})")
-        print(f"  → Utilisation des types spaCy originaux")
-        return entities
+        logger.warning("  ⚠️ Erreur Groq en mode fusionné (%s) → raffinement et relations en mode standard",
+                       str(e)[:80])
+        return refine_entity_types(entities, sentence), None
+    
+    # Types : indices (1..n) → types internes
+    memo = get_entity_type_memo()
+    refined_types = {}
+    types = payload.get("types")
+    for key, new_type in (types.items() if isinstance(types, dict) else []):
+        if str(key).isdigit() and 1 <= int(key) <= len(entities) and new_type in LLM_TYPE_MAPPING:
+            entity_text, original_type = entities[int(key) - 1]
+            refined_types[entity_text] = LLM_TYPE_MAPPING[new_type]
+            memo.store(normalize_uri_fragment(entity_text), refined_types[entity_text],
+                       memo.context_for(original_type))
+    refined_entities = _apply_refined_types(entities, refined_types)
+    
+    # Relations : [i, j, relation] → {(entité i, entité j): relation}
+    fused_relations = {}
+    relations = payload.get("relations")
+    for item in (relations if isinstance(relations, list) else []):
+        if not (isinstance(item, list) and len(item) == 3 and isinstance(item[2], str)):
+            continue
+        index1, index2, relation = item
+        if all(isinstance(idx, int) and 1 <= idx <= len(entities) for idx in (index1, index2)) \
+                and index1 != index2:
+            fused_relations[(entities[index1 - 1][0], entities[index2 - 1][0])] = relation
+    logger.info("[FUSIONNÉ] ✓ %s type(s), %s relation(s) étiquetée(s)\n", len(refined_types),
+                len(fused_relations))
+    return refined_entities, fused_relations
 
 
 # ============================================================================
 # 5. EXTRACTION DES ENTITÉS (A-BOX) - DONNÉES FACTUELLES
 # ============================================================================
 
-def extract_entities_with_spacy(text, nlp):
+def extract_entities_with_spacy(text, nlp, hybrid_ner=None, doc=None):
     """
     ⚠️ FONCTION LEGACY - REMPLACÉE PAR HybridNERModule
     
@@ -866,26 +1248,29 @@ def extract_entities_with_spacy(text, nlp):
     Args:
         text (str): Le texte source à analyser
         nlp (spacy.Language): Modèle spaCy chargé
+        hybrid_ner (HybridNERModule): Module déjà construit sur nlp (défaut : nouveau module)
+        doc (spacy.tokens.Doc): Texte normalisé déjà analysé (nlp.pipe, mode corpus)
         
     Returns:
         list: Liste de tuples (texte_entité, type_entité)
               Exemple: [("Zoubida Kedad", "PER"), ("Université de Versailles", "LOC")]
     """
-    print("\n[A-BOX] Extraction des entités nommées avec MODULE 0++ (HybridNER)...")
+    logger.info("\n[A-BOX] Extraction des entités nommées avec MODULE 0++ (HybridNER)...")
     
     # ============================================================================
     # NOUVEAU : Utilisation du HybridNERModule (7 couches)
     # ============================================================================
-    # Initialisation du module NER hybride
+    # Initialisation du module NER hybride (une fois par KnowledgeGraphPipeline)
     # Note: ontology_graph sera passé ultérieurement si validation activée
-    hybrid_ner = HybridNERModule(
-        nlp=nlp,
-        confidence_threshold=0.6,  # Seuil de confiance minimum
-        enable_validation=False    # Validation ontologique désactivée à cette étape
-    )
+    if hybrid_ner is None:
+        hybrid_ner = HybridNERModule(
+            nlp=nlp,
+            confidence_threshold=0.6,  # Seuil de confiance minimum
+            enable_validation=False    # Validation ontologique désactivée à cette étape
+        )
     
     # Extraction avec les 7 couches
-    entities_with_confidence = hybrid_ner.extract(text, verbose=True)
+    entities_with_confidence = hybrid_ner.extract(text, verbose=debug_enabled(), doc=doc)
     
     # Conversion au format attendu (texte, type) - la confiance sera gérée séparément
     entities = [(text, entity_type) for text, entity_type, confidence in entities_with_confidence]
@@ -920,12 +1305,12 @@ def instantiate_entities_in_abox(graph, entities):
     Returns:
         dict: Mapping {texte_entité: URI} pour référencer les instances
     """
-    print("\n[A-BOX] Instanciation des entités dans le graphe...")
+    logger.info("\n[A-BOX] Instanciation des entités dans le graphe...")
     
     # ============================================================================
     # NOUVEAU : Initialisation du système de confiance
     # ============================================================================
-    confidence_scorer = ConfidenceScorer(graph, verbose=True)
+    confidence_scorer = ConfidenceScorer(graph, verbose=debug_enabled())
     
     # Mapping entre les types NER (spaCy + Groq raffinés) et les classes OWL standards
     entity_type_mapping = {
@@ -950,7 +1335,7 @@ def instantiate_entities_in_abox(graph, entities):
         
         # Gestion du nouveau type TOPIC (matières académiques, concepts scientifiques)
         if entity_label == "TOPIC":
-            print(f"  📚 Entité TOPIC détectée (matière/concept) : '{entity_text}'")
+            logger.debug("  📚 Entité TOPIC détectée (matière/concept) : '%s'", entity_text)
             graph.add((entity_uri, RDF.type, EX.Document))
             graph.add((entity_uri, RDFS.label, Literal(entity_text, lang="fr")))
             graph.add((entity_uri, FOAF.name, Literal(entity_text, lang="fr")))
@@ -959,18 +1344,17 @@ def instantiate_entities_in_abox(graph, entities):
             confidence_scorer.add_entity_confidence(entity_uri, confidence, source="hybrid_ner")
             
             entity_uris[entity_text] = entity_uri
-            print(f"  ✓ Instance créée : {uri_fragment} (type: Topic/Document, label: '{entity_text}')")
+            logger.debug("  ✓ Instance créée : %s (type: Topic/Document, label: '%s')",
+                         uri_fragment, entity_text)
             continue
         
         # Gestion intelligente des entités MISC (œuvres, documents, concepts)
         if entity_label == "MISC":
             # Mots-clés indiquant un document/œuvre
-            document_keywords = ["roman", "livre", "cours", "spécifications", "document", 
-                               "article", "publication", "ouvrage", "œuvre", "the", "les", "le"]
-            is_document = any(kw.lower() in entity_text.lower() for kw in document_keywords)
+            is_document = DOCUMENT_KEYWORDS.contains_any(entity_text.lower())
             
             if is_document:
-                print(f"  📚 Entité MISC détectée comme Document : '{entity_text}'")
+                logger.debug("  📚 Entité MISC détectée comme Document : '%s'", entity_text)
                 graph.add((entity_uri, RDF.type, EX.Document))
                 graph.add((entity_uri, RDFS.label, Literal(entity_text, lang="fr")))
                 graph.add((entity_uri, FOAF.name, Literal(entity_text, lang="fr")))
@@ -979,15 +1363,16 @@ def instantiate_entities_in_abox(graph, entities):
                 confidence_scorer.add_entity_confidence(entity_uri, confidence, source="hybrid_ner")
                 
                 entity_uris[entity_text] = entity_uri
-                print(f"  ✓ Instance créée : {uri_fragment} (type: Document, label: '{entity_text}')")
+                logger.debug("  ✓ Instance créée : %s (type: Document, label: '%s')", uri_fragment,
+                             entity_text)
                 continue
             else:
-                print(f"  ⚠ Type d'entité MISC non reconnu comme document : {entity_text} (ignoré)")
+                logger.debug("  ⚠ Type d'entité MISC non reconnu comme document : %s (ignoré)", entity_text)
                 continue
         
         # Vérification que le type d'entité est reconnu
         if entity_label not in entity_type_mapping:
-            print(f"  ⚠ Type d'entité non mappé : {entity_label} (ignoré)")
+            logger.debug("  ⚠ Type d'entité non mappé : %s (ignoré)", entity_label)
             continue
         
         # TYPAGE STRICT : Assignation du type de classe selon Spacy NER
@@ -1007,7 +1392,8 @@ def instantiate_entities_in_abox(graph, entities):
         
         entity_uris[entity_text] = entity_uri
         type_display = owl_class.split('#')[-1].split('/')[-1]
-        print(f"  ✓ Instance créée : {uri_fragment} (type: {type_display}, label: '{entity_text}')")
+        logger.debug("  ✓ Instance créée : %s (type: %s, label: '%s')", uri_fragment, type_display,
+                     entity_text)
     
     return entity_uris
     
@@ -1035,27 +1421,184 @@ def adapt_entity_type(graph, entity_uri, entity_text, required_type):
     
     # Si l'entité est un Place et qu'on a besoin d'Organization → ajouter Organization
     # GUARD: Only adapt if the entity name looks like an institution, NOT a bare city.
-    _inst_keywords = ["université", "university", "institute", "institut", "école",
-                      "school", "college", "laboratoire", "lab", "centre", "center",
-                      "department", "département", "inria", "cnrs", "mit", "stanford",
-                      "harvard", "palais", "élysée"]
-    _entity_lower = entity_text.lower()
-    _looks_like_institution = any(kw in _entity_lower for kw in _inst_keywords)
+    _looks_like_institution = INSTITUTION_KEYWORDS.contains_any(entity_text.lower())
     if SCHEMA.Place in current_types and required_type == SCHEMA.Organization and _looks_like_institution:
         graph.add((entity_uri, RDF.type, SCHEMA.Organization))
-        print(f"    🔄 Typage adaptatif : {entity_text} est aussi une Organisation (contexte professionnel)")
+        logger.debug("    🔄 Typage adaptatif : %s est aussi une Organisation (contexte professionnel)",
+                     entity_text)
         return True
     
     # Si l'entité est un Place et qu'on a besoin de Document → possible pour institutions
     if SCHEMA.Place in current_types and required_type == EX.Document:
         graph.add((entity_uri, RDF.type, EX.Document))
-        print(f"    🔄 Typage adaptatif : {entity_text} est aussi un Document")
+        logger.debug("    🔄 Typage adaptatif : %s est aussi un Document", entity_text)
         return True
     
     return False
 
 
-def extract_relations(graph, entity_uris, text):
+# ── Static OWL-derived relation table ──────────────────────────────────────
+# Defines which relation predicates are semantically admissible for each
+# (entity1_type, entity2_type) pair.  The LLM is ONLY called when the pair
+# has at least one admissible relation.  This avoids noise triples like
+# TOPIC --[author]--> ORG  or  ORG --[worksAt]--> LOC.
+RELATION_TABLE = {
+    ("PER", "TOPIC"):  ["teachesSubject", "author", "relatedTo"],
+    ("PER", "ORG"):    ["worksAt", "manages", "studiesAt", "collaboratesWith", "relatedTo"],
+    # PER→LOC includes worksAt: an institution may be NER-typed LOC and later
+    # promoted to ORG by adapt_entity_type (guarded against bare cities).
+    ("PER", "LOC"):    ["worksAt", "locatedIn", "relatedTo"],
+    ("PER", "PER"):    ["collaboratesWith", "relatedTo"],
+    ("ORG", "LOC"):    ["locatedIn", "relatedTo"],
+    ("ORG", "ORG"):    ["relatedTo"],
+    ("ORG", "PER"):    ["relatedTo"],
+    ("TOPIC", "TOPIC"):["relatedTo"],
+    ("TOPIC", "ORG"):  ["relatedTo"],
+    ("LOC", "LOC"):    ["locatedIn", "relatedTo"],
+    # UNK: type could not be resolved — allow all, priority logic will decide
+    ("PER", "UNK"):    ["teachesSubject", "author", "worksAt", "manages",
+                        "studiesAt", "collaboratesWith", "locatedIn", "relatedTo"],
+    ("UNK", "TOPIC"):  ["teachesSubject", "author", "relatedTo"],
+    ("UNK", "ORG"):    ["worksAt", "manages", "studiesAt", "relatedTo"],
+    ("UNK", "LOC"):    ["locatedIn", "relatedTo"],
+    ("UNK", "UNK"):    ["relatedTo"],
+}
+
+
+def _admissible_relations(entity1_type: str, entity2_type: str) -> list:
+    """Ligne de RELATION_TABLE pour la paire (sens inverse en repli, [] si aucune)."""
+    return (RELATION_TABLE.get((entity1_type, entity2_type), [])
+            or RELATION_TABLE.get((entity2_type, entity1_type), []))
+
+
+def _apply_predicted_relation(graph, entity1_text, entity1_uri, entity2_text, entity2_uri,
+                              relation_type, allowed_relations, e1_type, e2_type):
+    """
+    Valide une relation prédite (garde ontologique + domain/range) puis l'ajoute au graphe.
+
+    Args:
+        graph (rdflib.Graph): Le graphe RDF où ajouter la relation
+        entity1_text (str): Texte du sujet
+        entity1_uri (URIRef): URI du sujet
+        entity2_text (str): Texte de l'objet
+        entity2_uri (URIRef): URI de l'objet
+        relation_type (str): Relation prédite (sortie de predict_relation_real_api)
+        allowed_relations (list): Relations admissibles d'après RELATION_TABLE
+        e1_type (str): Type NER du sujet
+        e2_type (str): Type NER de l'objet
+    """
+    # Post-call ontology guard: reject anything outside the admissible set.
+    # "relatedTo" is always a safe fallback so we allow it even if not in table.
+    if relation_type != "relatedTo" and relation_type not in allowed_relations:
+        logger.debug("  ⛔ LLM retourné '%s' n'est pas admissible pour (%s→%s). Forcé → relatedTo",
+                     relation_type, e1_type, e2_type)
+        relation_type = "relatedTo"
+    
+    # Mapping des relations prédites vers les propriétés OWL avec contraintes flexibles
+    # Note : teaches accepte Place OU Organization (université = organisation)
+    relation_mapping = {
+        "teaches": (EX.teaches, FOAF.Person, [SCHEMA.Place, SCHEMA.Organization]),  # Personne → Lieu OU Organisation
+        "teachesSubject": (EX.teachesSubject, FOAF.Person, EX.Document),  # ✨ Personne → Matière/Topic
+        "author": (EX.author, FOAF.Person, EX.Document),  # Auteur → Document
+        "worksAt": (EX.worksAt, FOAF.Person, SCHEMA.Organization),
+        "locatedIn": (EX.locatedIn, None, SCHEMA.Place),  # Organisation/Personne → Lieu
+        "collaboratesWith": (EX.collaboratesWith, FOAF.Person, FOAF.Person),
+        "studiesAt": (EX.studiesAt, FOAF.Person, SCHEMA.Organization),
+        "manages": (EX.manages, FOAF.Person, SCHEMA.Organization),
+        "relatedTo": (EX.relatedTo, None, None)
+    }
+    
+    if relation_type not in relation_mapping:
+        return
+    
+    relation_prop, expected_domain, expected_range = relation_mapping[relation_type]
+    
+    # Fast-path domain/range check for type-exact relations.
+    # These have unambiguous OWL constraints — validate directly without adapt_entity_type.
+    if relation_type == "teachesSubject":
+        domain_valid = (entity1_uri, RDF.type, FOAF.Person) in graph
+        range_valid  = (entity2_uri, RDF.type, EX.Document)  in graph
+        if domain_valid and range_valid:
+            graph.add((entity1_uri, relation_prop, entity2_uri))
+            logger.debug("  ✓ Relation LLM : %s --[teachesSubject]--> %s", entity1_text, entity2_text)
+        else:
+            if not domain_valid:
+                logger.debug("  ⚠️ teachesSubject rejeté : %s n'est pas une Person", entity1_text)
+            if not range_valid:
+                logger.debug("  ⚠️ teachesSubject rejeté : %s n'est pas un Document/Topic", entity2_text)
+        return
+
+    if relation_type == "worksAt":
+        domain_valid = (entity1_uri, RDF.type, FOAF.Person) in graph
+        range_valid  = (entity2_uri, RDF.type, SCHEMA.Organization) in graph
+        if not range_valid:
+            # Allow LOC→ORG adaptation only for institution-like names
+            range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, SCHEMA.Organization)
+        if domain_valid and range_valid:
+            graph.add((entity1_uri, relation_prop, entity2_uri))
+            logger.debug("  ✓ Relation LLM : %s --[worksAt]--> %s", entity1_text, entity2_text)
+        else:
+            if not domain_valid:
+                logger.debug("  ⚠️ worksAt rejeté : %s n'est pas une Person", entity1_text)
+            if not range_valid:
+                logger.debug("  ⚠️ worksAt rejeté : %s n'est pas une Organisation", entity2_text)
+        return
+    
+    # VALIDATION FLEXIBLE AVEC TYPAGE ADAPTATIF ET MULTIPLES TYPES ACCEPTÉS
+    if expected_domain and expected_range:
+        # Vérifier que les types correspondent aux contraintes
+        domain_valid = (entity1_uri, RDF.type, expected_domain) in graph
+        
+        # Si expected_range est une liste, accepter n'importe quel type de la liste
+        if isinstance(expected_range, list):
+            range_valid = any((entity2_uri, RDF.type, rtype) in graph for rtype in expected_range)
+        else:
+            range_valid = (entity2_uri, RDF.type, expected_range) in graph
+        
+        # Si le range n'est pas valide, tenter un typage adaptatif
+        if not range_valid and expected_range:
+            if isinstance(expected_range, list):
+                # Essayer d'adapter au premier type de la liste
+                range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, expected_range[0])
+            else:
+                range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, expected_range)
+        
+        # Si le domain n'est pas valide, tenter un typage adaptatif
+        if not domain_valid and expected_domain:
+            domain_valid = adapt_entity_type(graph, entity1_uri, entity1_text, expected_domain)
+        
+        if domain_valid and range_valid:
+            graph.add((entity1_uri, relation_prop, entity2_uri))
+            logger.debug("  ✓ Relation LLM : %s --[%s]--> %s", entity1_text, relation_type, entity2_text)
+            
+            # RESTRICTION OWL : Si c'est une relation 'author', typer le document en ValidatedCourse
+            if relation_type == "author":
+                # Ajouter le type ValidatedCourse pour valider la contrainte OWL
+                graph.add((entity2_uri, RDF.type, EX.ValidatedCourse))
+                logger.debug("    → Contrainte OWL : %s typé en ValidatedCourse", entity2_text)
+        else:
+            if not domain_valid:
+                logger.debug("  ⚠️ Type domain invalide pour %s (attendu: %s)", entity1_text, expected_domain)
+            if not range_valid:
+                range_str = ', '.join([str(r) for r in expected_range]) if isinstance(expected_range, list) else str(expected_range)
+                logger.debug("  ⚠️ Type range invalide pour %s (attendu: %s)", entity2_text, range_str)
+                
+    elif expected_domain is None and expected_range:
+        # Seulement le range est spécifié (ex: locatedIn → Place)
+        if (entity2_uri, RDF.type, expected_range) in graph:
+            graph.add((entity1_uri, relation_prop, entity2_uri))
+            logger.debug("  ✓ Relation LLM : %s --[%s]--> %s", entity1_text, relation_type, entity2_text)
+        else:
+            logger.debug("  ⚠️ Type range invalide pour %s (attendu: Place)", entity2_text)
+            
+    elif relation_type == "relatedTo":
+        # Relation générique sans contrainte de type
+        graph.add((entity1_uri, relation_prop, entity2_uri))
+        logger.debug("  ✓ Relation LLM : %s --[%s]--> %s", entity1_text, relation_type, entity2_text)
+
+
+def extract_relations(graph, entity_uris, text, batch_mode=None, concurrency=None,
+                      fused_relations=None, nlp=None, doc=None):
     """
     Extrait et instancie les relations sémantiques entre entités.
     
@@ -1073,25 +1616,54 @@ def extract_relations(graph, entity_uris, text):
     - Mapping automatique vers propriétés OWL (teaches, author, worksAt)
     - Validation domain/range pour les relations inférées
     
+    ✨ NOUVEAU : Mode batch (KG_BATCH_RELATIONS=1)
+    - Toutes les paires candidates du document en UN SEUL appel LLM
+    - Pré-filtre RELATION_TABLE et garde ontologique post-appel inchangés
+    
+    ✨ NOUVEAU : Mode concurrent (KG_RELATION_CONCURRENCY > 1)
+    - Les paires sont prédites en parallèle (asyncio + sémaphore)
+    - Débit régulé par le seau à jetons partagé (quota du fournisseur)
+    - Relations appliquées dans l'ordre des paires (sortie reproductible)
+    
+    ✨ NOUVEAU : Paires candidates par fenêtre de phrases (KG_RELATION_WINDOW)
+    - Seules les paires proches (même phrase / phrases adjacentes) ou reliées
+      par un chemin de dépendances sont soumises au LLM
+    - Le contexte envoyé est le passage couvrant la paire, pas tout le document
+    
+    ✨ NOUVEAU : Mode fusionné (KG_FUSED_EXTRACTION=1)
+    - Étiquettes déjà renvoyées avec les types par extract_types_and_relations_fused()
+    - Aucun appel LLM supplémentaire ; règles et validation ontologique inchangées
+    
     Args:
         graph (rdflib.Graph): Le graphe RDF où ajouter les relations
         entity_uris (dict): Mapping des entités vers leurs URIs
         text (str): Le texte source pour l'analyse contextuelle
+        batch_mode (bool): Prédiction groupée des paires (défaut : BATCH_RELATION_MODE)
+        concurrency (int): Prédictions simultanées (défaut : RELATION_CONCURRENCY)
+        fused_relations (dict): Étiquettes {(entité1, entité2): relation} de l'appel
+                                fusionné (None = prédiction par le LLM)
+        nlp (spacy.Language): Modèle déjà chargé avec son EntityRuler
+                              (défaut : chargement de fr_core_news_sm)
+        doc (spacy.tokens.Doc): Texte déjà analysé (nlp.pipe, mode corpus) ;
+                                ré-analysé s'il ne correspond pas à text
     """
-    print("\n[A-BOX] Extraction des relations sémantiques avec LLM Mock...")
+    logger.info("\n[A-BOX] Extraction des relations sémantiques avec LLM Mock...")
+    
+    if batch_mode is None:
+        batch_mode = BATCH_RELATION_MODE
+    if concurrency is None:
+        concurrency = RELATION_CONCURRENCY
     
     # ============================================================================
     # ✨ COUCHE 7 : MAPPING LEMME → PROPRIÉTÉ OWL (Module 0++)
     # ============================================================================
-    print("\n[MODULE 0++ - COUCHE 7] Mapping verbes → propriétés OWL")
-    print("-" * 80)
+    logger.info("\n[MODULE 0++ - COUCHE 7] Mapping verbes → propriétés OWL")
+    logger.info("-" * 80)
     
-    # Initialisation HybridNER pour extraction de relations verbales
-    import spacy
-    nlp = spacy.load("fr_core_news_sm")
-    
-    from hybrid_ner_module import HybridNERModule
-    hybrid_ner = HybridNERModule(nlp, confidence_threshold=0.6, enable_validation=False)
+    # Modèle spaCy avec l'EntityRuler de HybridNER (chargé ici si non fourni)
+    if nlp is None and (doc is None or doc.text != text):
+        nlp = spacy.load("fr_core_news_sm")
+        HybridNERModule(nlp, confidence_threshold=0.6, enable_validation=False)
     
     # Mapping verbe lemme → propriété OWL
     # Note: 'enseigner' handled separately below with type-aware dispatch.
@@ -1107,9 +1679,13 @@ def extract_relations(graph, entity_uris, text):
     # Prepositions that introduce a workplace in French / English
     _AT_PREPS = frozenset(["à", "au", "aux", "dans", "en", "at", "in"])
 
-    # Analyse du texte pour détecter les verbes
-    doc = nlp(text)
+    # Analyse du texte pour détecter les verbes (sauf si déjà analysé par nlp.pipe)
+    if doc is None or doc.text != text:
+        doc = nlp(text)
+    # Index construit une fois : token → entité, entité → phrases, phrases en minuscules
+    doc_index = DocumentIndex(doc)
     verb_relations_added = 0
+    verb_dispatch_start = time.perf_counter()
 
     for token in doc:
         if token.pos_ == "VERB":
@@ -1126,10 +1702,9 @@ def extract_relations(graph, entity_uris, text):
                 subject_text = None
                 for child in token.children:
                     if child.dep_ in ("nsubj", "nsubjpass"):
-                        for ent in doc.ents:
-                            if child.i >= ent.start and child.i < ent.end:
-                                subject_text = ent.text
-                                break
+                        ent = doc_index.entity_at(child.i)
+                        if ent is not None:
+                            subject_text = ent.text
 
                 if not subject_text:
                     continue
@@ -1142,50 +1717,50 @@ def extract_relations(graph, entity_uris, text):
                 # Direct object → teachesSubject (TOPIC/Document)
                 for child in token.children:
                     if child.dep_ in ("dobj", "obj", "attr"):
-                        for ent in doc.ents:
-                            if child.i >= ent.start and child.i < ent.end:
-                                obj_uri = entity_uris.get(ent.text)
-                                if obj_uri and (
-                                    (obj_uri, RDF.type, EX.Document) in graph or
-                                    (obj_uri, RDF.type, EX.Topic)    in graph
-                                ):
-                                    graph.add((subject_uri, EX.teachesSubject, obj_uri))
-                                    print(f"  ✓ enseigner (dobj) → {subject_text} --[teachesSubject]--> {ent.text}")
-                                    verb_relations_added += 1
-                                    ConfidenceScorer(graph, verbose=False).add_relation_confidence(
-                                        subject_uri, EX.teachesSubject, obj_uri,
-                                        confidence=0.85, source="verb_lemma_mapping")
-                                break
+                        ent = doc_index.entity_at(child.i)
+                        if ent is not None:
+                            obj_uri = entity_uris.get(ent.text)
+                            if obj_uri and (
+                                (obj_uri, RDF.type, EX.Document) in graph or
+                                (obj_uri, RDF.type, EX.Topic)    in graph
+                            ):
+                                graph.add((subject_uri, EX.teachesSubject, obj_uri))
+                                logger.debug("  ✓ enseigner (dobj) → %s --[teachesSubject]--> %s",
+                                             subject_text, ent.text)
+                                verb_relations_added += 1
+                                ConfidenceScorer(graph, verbose=False).add_relation_confidence(
+                                    subject_uri, EX.teachesSubject, obj_uri,
+                                    confidence=0.85, source="verb_lemma_mapping")
 
                 # Oblique / prepositional object → worksAt (ORG)
                 for child in token.children:
                     if child.dep_ in ("obl", "obl:mod", "obl:arg", "nmod", "prep"):
-                        for ent in doc.ents:
-                            if child.i >= ent.start and child.i < ent.end:
-                                obj_uri = entity_uris.get(ent.text)
-                                if obj_uri and (obj_uri, RDF.type, SCHEMA.Organization) in graph:
-                                    graph.add((subject_uri, EX.worksAt, obj_uri))
-                                    print(f"  ✓ enseigner (obl) → {subject_text} --[worksAt]--> {ent.text}")
-                                    verb_relations_added += 1
-                                    ConfidenceScorer(graph, verbose=False).add_relation_confidence(
-                                        subject_uri, EX.worksAt, obj_uri,
-                                        confidence=0.85, source="verb_lemma_mapping")
-                                break
+                        ent = doc_index.entity_at(child.i)
+                        if ent is not None:
+                            obj_uri = entity_uris.get(ent.text)
+                            if obj_uri and (obj_uri, RDF.type, SCHEMA.Organization) in graph:
+                                graph.add((subject_uri, EX.worksAt, obj_uri))
+                                logger.debug("  ✓ enseigner (obl) → %s --[worksAt]--> %s",
+                                             subject_text, ent.text)
+                                verb_relations_added += 1
+                                ConfidenceScorer(graph, verbose=False).add_relation_confidence(
+                                    subject_uri, EX.worksAt, obj_uri,
+                                    confidence=0.85, source="verb_lemma_mapping")
                     # Also walk ADP → pobj (e.g. "à" → "Université de Versailles")
                     if child.pos_ == "ADP" and child.lower_ in _AT_PREPS:
                         for grandchild in child.children:
                             if grandchild.dep_ in ("pobj", "obj", "nmod"):
-                                for ent in doc.ents:
-                                    if grandchild.i >= ent.start and grandchild.i < ent.end:
-                                        obj_uri = entity_uris.get(ent.text)
-                                        if obj_uri and (obj_uri, RDF.type, SCHEMA.Organization) in graph:
-                                            graph.add((subject_uri, EX.worksAt, obj_uri))
-                                            print(f"  ✓ enseigner (prep) → {subject_text} --[worksAt]--> {ent.text}")
-                                            verb_relations_added += 1
-                                            ConfidenceScorer(graph, verbose=False).add_relation_confidence(
-                                                subject_uri, EX.worksAt, obj_uri,
-                                                confidence=0.85, source="verb_lemma_mapping")
-                                        break
+                                ent = doc_index.entity_at(grandchild.i)
+                                if ent is not None:
+                                    obj_uri = entity_uris.get(ent.text)
+                                    if obj_uri and (obj_uri, RDF.type, SCHEMA.Organization) in graph:
+                                        graph.add((subject_uri, EX.worksAt, obj_uri))
+                                        logger.debug("  ✓ enseigner (prep) → %s --[worksAt]--> %s",
+                                                     subject_text, ent.text)
+                                        verb_relations_added += 1
+                                        ConfidenceScorer(graph, verbose=False).add_relation_confidence(
+                                            subject_uri, EX.worksAt, obj_uri,
+                                            confidence=0.85, source="verb_lemma_mapping")
 
                 # Positional fallback: dep parse missed the objects — scan by type
                 already_linked = set(graph.objects(subject_uri, EX.teachesSubject)) | \
@@ -1195,17 +1770,20 @@ def extract_relations(graph, entity_uris, text):
                     for ent_text, ent_uri in entity_uris.items():
                         if ent_text == subject_text:
                             continue
-                        ent_after = any(t.i > verb_pos for t in doc if t.text in ent_text.split())
+                        ent_after = any(doc_index.last_position(word) > verb_pos
+                                        for word in ent_text.split())
                         if not ent_after:
                             continue
                         if (ent_uri, RDF.type, EX.Document) in graph or \
                            (ent_uri, RDF.type, EX.Topic) in graph:
                             graph.add((subject_uri, EX.teachesSubject, ent_uri))
-                            print(f"  ✓ enseigner (pos-fallback) → {subject_text} --[teachesSubject]--> {ent_text}")
+                            logger.debug("  ✓ enseigner (pos-fallback) → %s --[teachesSubject]--> %s",
+                                         subject_text, ent_text)
                             verb_relations_added += 1
                         elif (ent_uri, RDF.type, SCHEMA.Organization) in graph:
                             graph.add((subject_uri, EX.worksAt, ent_uri))
-                            print(f"  ✓ enseigner (pos-fallback) → {subject_text} --[worksAt]--> {ent_text}")
+                            logger.debug("  ✓ enseigner (pos-fallback) → %s --[worksAt]--> %s",
+                                         subject_text, ent_text)
                             verb_relations_added += 1
                 continue  # done with this enseigner token
 
@@ -1225,19 +1803,17 @@ def extract_relations(graph, entity_uris, text):
             for child in token.children:
                 if child.dep_ in ["nsubj", "nsubjpass"]:
                     # Récupérer l'entité complète (avec composés)
-                    for ent in doc.ents:
-                        if child.i >= ent.start and child.i < ent.end:
-                            subject_text = ent.text
-                            break
+                    ent = doc_index.entity_at(child.i)
+                    if ent is not None:
+                        subject_text = ent.text
 
             # Chercher l'objet (dobj, attr)
             for child in token.children:
                 if child.dep_ in ["dobj", "obj", "attr", "obl"]:
                     # Récupérer l'entité complète
-                    for ent in doc.ents:
-                        if child.i >= ent.start and child.i < ent.end:
-                            object_text = ent.text
-                            break
+                    ent = doc_index.entity_at(child.i)
+                    if ent is not None:
+                        object_text = ent.text
 
             # Si sujet et objet trouvés, créer la relation
             if subject_text and object_text:
@@ -1252,7 +1828,8 @@ def extract_relations(graph, entity_uris, text):
                     if domain_valid and range_valid:
                         relation_prop = getattr(EX, property_name)
                         graph.add((subject_uri, relation_prop, object_uri))
-                        print(f"  ✓ Verbe '{token.text}' → {subject_text} --[{property_name}]--> {object_text}")
+                        logger.debug("  ✓ Verbe '%s' → %s --[%s]--> %s", token.text, subject_text,
+                                     property_name, object_text)
                         verb_relations_added += 1
 
                         # Ajout confiance pour cette relation
@@ -1263,43 +1840,21 @@ def extract_relations(graph, entity_uris, text):
                             source="verb_lemma_mapping"
                         )
     
+    metrics = get_metrics()
+    metrics.observe("kg_stage_seconds", time.perf_counter() - verb_dispatch_start,
+                    stage="verb_dispatch")
+    metrics.inc("kg_verb_relations_total", verb_relations_added)
+    record_span("relations.verb_dispatch", verb_dispatch_start, relations=verb_relations_added)
     if verb_relations_added > 0:
-        print(f"✅ {verb_relations_added} relation(s) inférée(s) via mapping verbes")
+        logger.info("✅ %s relation(s) inférée(s) via mapping verbes", verb_relations_added)
     else:
-        print("  (Aucune relation verbale détectée)")
+        logger.info("  (Aucune relation verbale détectée)")
     
-    print()
+    logger.info("")
     
     # ============================================================================
     # EXTRACTION RELATIONS LLM (méthode existante)
     # ============================================================================
-    
-    # ── Static OWL-derived relation table ──────────────────────────────────────
-    # Defines which relation predicates are semantically admissible for each
-    # (entity1_type, entity2_type) pair.  The LLM is ONLY called when the pair
-    # has at least one admissible relation.  This avoids noise triples like
-    # TOPIC --[author]--> ORG  or  ORG --[worksAt]--> LOC.
-    RELATION_TABLE = {
-        ("PER", "TOPIC"):  ["teachesSubject", "author", "relatedTo"],
-        ("PER", "ORG"):    ["worksAt", "manages", "studiesAt", "collaboratesWith", "relatedTo"],
-        # PER→LOC includes worksAt: an institution may be NER-typed LOC and later
-        # promoted to ORG by adapt_entity_type (guarded against bare cities).
-        ("PER", "LOC"):    ["worksAt", "locatedIn", "relatedTo"],
-        ("PER", "PER"):    ["collaboratesWith", "relatedTo"],
-        ("ORG", "LOC"):    ["locatedIn", "relatedTo"],
-        ("ORG", "ORG"):    ["relatedTo"],
-        ("ORG", "PER"):    ["relatedTo"],
-        ("TOPIC", "TOPIC"):["relatedTo"],
-        ("TOPIC", "ORG"):  ["relatedTo"],
-        ("LOC", "LOC"):    ["locatedIn", "relatedTo"],
-        # UNK: type could not be resolved — allow all, priority logic will decide
-        ("PER", "UNK"):    ["teachesSubject", "author", "worksAt", "manages",
-                            "studiesAt", "collaboratesWith", "locatedIn", "relatedTo"],
-        ("UNK", "TOPIC"):  ["teachesSubject", "author", "relatedTo"],
-        ("UNK", "ORG"):    ["worksAt", "manages", "studiesAt", "relatedTo"],
-        ("UNK", "LOC"):    ["locatedIn", "relatedTo"],
-        ("UNK", "UNK"):    ["relatedTo"],
-    }
 
     # Build a reverse map: entity_uri → NER type (PER/ORG/LOC/TOPIC/DOC)
     _OWL_TO_NER = {
@@ -1321,17 +1876,38 @@ def extract_relations(graph, entity_uris, text):
         for s, _, o in graph.triples((None, prop, None)):
             _layer7_covered.add((str(s), str(o)))
 
-    # Parcours de toutes les paires d'entités possibles
+    # Phase 1 : collecte des paires candidates
+    #   a) fenêtre de phrases + chemins de dépendances (au lieu de toutes les paires)
+    #   b) pré-filtre RELATION_TABLE
     entities_list = list(entity_uris.items())
-    
+    pair_generator = SentenceWindowPairGenerator.from_env()
+    window_pairs = {
+        (pair.index1, pair.index2): pair
+        for pair in pair_generator.generate(doc, [entity_text for entity_text, _ in entities_list],
+                                            doc_index=doc_index)
+    }
+    pair_stats = pair_generator.stats
+    logger.info("  ✂️  Paires candidates : %s/%s (fenêtre=%s : %s, dépendances : %s, "
+                "non localisées : %s) → %s paire(s) élaguée(s)",
+                pair_stats['pairs_kept'], pair_stats['pairs_total'], pair_generator.window,
+                pair_stats['kept_window'], pair_stats['kept_dependency'],
+                pair_stats['kept_unplaced'], pair_stats['pairs_pruned'])
+    candidates = []
+
     for i, (entity1_text, entity1_uri) in enumerate(entities_list):
         for j, (entity2_text, entity2_uri) in enumerate(entities_list):
             if i >= j:  # Éviter les doublons et auto-relations
                 continue
 
+            # Paire trop éloignée dans le texte (hors fenêtre, sans lien syntaxique)
+            window_pair = window_pairs.get((i, j))
+            if window_pair is None:
+                continue
+
             # Skip pairs already covered by Layer 7 (dep-parse verb dispatch)
-            if (str(entity1_uri), str(entity2_uri)) in _layer7_covered or                (str(entity2_uri), str(entity1_uri)) in _layer7_covered:
-                print(f"  ⏭️  Paire déjà couverte par Couche 7 : {entity1_text} ↔ {entity2_text}")
+            if (str(entity1_uri), str(entity2_uri)) in _layer7_covered or \
+               (str(entity2_uri), str(entity1_uri)) in _layer7_covered:
+                logger.debug("  ⏭️  Paire déjà couverte par Couche 7 : %s ↔ %s", entity1_text, entity2_text)
                 continue
 
             # Resolve NER types from the graph (authoritative source)
@@ -1339,132 +1915,74 @@ def extract_relations(graph, entity_uris, text):
             e2_type = _ner_type_of(entity2_uri)
 
             # Pre-filter: skip pairs with no admissible relation in the table
-            allowed_relations = RELATION_TABLE.get((e1_type, e2_type), [])
-            if not allowed_relations:
-                # Try reverse direction before giving up
-                allowed_relations = RELATION_TABLE.get((e2_type, e1_type), [])
+            # (reverse direction is tried before giving up)
+            allowed_relations = _admissible_relations(e1_type, e2_type)
             if not allowed_relations:
-                print(f"  ⛔ Paire ignorée (aucune relation OWL admissible) : "
-                      f"{entity1_text}({e1_type}) ↔ {entity2_text}({e2_type})")
+                logger.debug("  ⛔ Paire ignorée (aucune relation OWL admissible) : %s(%s) ↔ %s(%s)",
+                             entity1_text, e1_type, entity2_text, e2_type)
                 continue
 
-            # Utilisation de l'API Groq pour prédire la relation ⭐
-            relation_type = predict_relation_real_api(
-                entity1_text, entity2_text, text,
-                entity1_type=e1_type, entity2_type=e2_type
-            )
-
-            if relation_type is None:
-                continue
-
-            # Post-call ontology guard: reject anything outside the admissible set.
-            # "relatedTo" is always a safe fallback so we allow it even if not in table.
-            if relation_type != "relatedTo" and relation_type not in allowed_relations:
-                print(f"  ⛔ LLM retourné '{relation_type}' n'est pas admissible pour "
-                      f"({e1_type}→{e2_type}). Forcé → relatedTo")
-                relation_type = "relatedTo"
-            
-            # Mapping des relations prédites vers les propriétés OWL avec contraintes flexibles
-            # Note : teaches accepte Place OU Organization (université = organisation)
-            relation_mapping = {
-                "teaches": (EX.teaches, FOAF.Person, [SCHEMA.Place, SCHEMA.Organization]),  # Personne → Lieu OU Organisation
-                "teachesSubject": (EX.teachesSubject, FOAF.Person, EX.Document),  # ✨ Personne → Matière/Topic
-                "author": (EX.author, FOAF.Person, EX.Document),  # Auteur → Document
-                "worksAt": (EX.worksAt, FOAF.Person, SCHEMA.Organization),
-                "locatedIn": (EX.locatedIn, None, SCHEMA.Place),  # Organisation/Personne → Lieu
-                "collaboratesWith": (EX.collaboratesWith, FOAF.Person, FOAF.Person),
-                "studiesAt": (EX.studiesAt, FOAF.Person, SCHEMA.Organization),
-                "manages": (EX.manages, FOAF.Person, SCHEMA.Organization),
-                "relatedTo": (EX.relatedTo, None, None)
-            }
-            
-            if relation_type not in relation_mapping:
-                continue
-            
-            relation_prop, expected_domain, expected_range = relation_mapping[relation_type]
-            
-            # Fast-path domain/range check for type-exact relations.
-            # These have unambiguous OWL constraints — validate directly without adapt_entity_type.
-            if relation_type == "teachesSubject":
-                domain_valid = (entity1_uri, RDF.type, FOAF.Person) in graph
-                range_valid  = (entity2_uri, RDF.type, EX.Document)  in graph
-                if domain_valid and range_valid:
-                    graph.add((entity1_uri, relation_prop, entity2_uri))
-                    print(f"  ✓ Relation LLM : {entity1_text} --[teachesSubject]--> {entity2_text}")
-                else:
-                    if not domain_valid:
-                        print(f"  ⚠️ teachesSubject rejeté : {entity1_text} n'est pas une Person")
-                    if not range_valid:
-                        print(f"  ⚠️ teachesSubject rejeté : {entity2_text} n'est pas un Document/Topic")
-                continue
-
-            if relation_type == "worksAt":
-                domain_valid = (entity1_uri, RDF.type, FOAF.Person) in graph
-                range_valid  = (entity2_uri, RDF.type, SCHEMA.Organization) in graph
-                if not range_valid:
-                    # Allow LOC→ORG adaptation only for institution-like names
-                    range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, SCHEMA.Organization)
-                if domain_valid and range_valid:
-                    graph.add((entity1_uri, relation_prop, entity2_uri))
-                    print(f"  ✓ Relation LLM : {entity1_text} --[worksAt]--> {entity2_text}")
-                else:
-                    if not domain_valid:
-                        print(f"  ⚠️ worksAt rejeté : {entity1_text} n'est pas une Person")
-                    if not range_valid:
-                        print(f"  ⚠️ worksAt rejeté : {entity2_text} n'est pas une Organisation")
-                continue
-            
-            # VALIDATION FLEXIBLE AVEC TYPAGE ADAPTATIF ET MULTIPLES TYPES ACCEPTÉS
-            if expected_domain and expected_range:
-                # Vérifier que les types correspondent aux contraintes
-                domain_valid = (entity1_uri, RDF.type, expected_domain) in graph
-                
-                # Si expected_range est une liste, accepter n'importe quel type de la liste
-                if isinstance(expected_range, list):
-                    range_valid = any((entity2_uri, RDF.type, rtype) in graph for rtype in expected_range)
-                else:
-                    range_valid = (entity2_uri, RDF.type, expected_range) in graph
-                
-                # Si le range n'est pas valide, tenter un typage adaptatif
-                if not range_valid and expected_range:
-                    if isinstance(expected_range, list):
-                        # Essayer d'adapter au premier type de la liste
-                        range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, expected_range[0])
-                    else:
-                        range_valid = adapt_entity_type(graph, entity2_uri, entity2_text, expected_range)
-                
-                # Si le domain n'est pas valide, tenter un typage adaptatif
-                if not domain_valid and expected_domain:
-                    domain_valid = adapt_entity_type(graph, entity1_uri, entity1_text, expected_domain)
-                
-                if domain_valid and range_valid:
-                    graph.add((entity1_uri, relation_prop, entity2_uri))
-                    print(f"  ✓ Relation LLM : {entity1_text} --[{relation_type}]--> {entity2_text}")
-                    
-                    # RESTRICTION OWL : Si c'est une relation 'author', typer le document en ValidatedCourse
-                    if relation_type == "author":
-                        # Ajouter le type ValidatedCourse pour valider la contrainte OWL
-                        graph.add((entity2_uri, RDF.type, EX.ValidatedCourse))
-                        print(f"    → Contrainte OWL : {entity2_text} typé en ValidatedCourse")
-                else:
-                    if not domain_valid:
-                        print(f"  ⚠️ Type domain invalide pour {entity1_text} (attendu: {expected_domain})")
-                    if not range_valid:
-                        range_str = ', '.join([str(r) for r in expected_range]) if isinstance(expected_range, list) else str(expected_range)
-                        print(f"  ⚠️ Type range invalide pour {entity2_text} (attendu: {range_str})")
-                        
-            elif expected_domain is None and expected_range:
-                # Seulement le range est spécifié (ex: locatedIn → Place)
-                if (entity2_uri, RDF.type, expected_range) in graph:
-                    graph.add((entity1_uri, relation_prop, entity2_uri))
-                    print(f"  ✓ Relation LLM : {entity1_text} --[{relation_type}]--> {entity2_text}")
-                else:
-                    print(f"  ⚠️ Type range invalide pour {entity2_text} (attendu: Place)")
-                    
-            elif relation_type == "relatedTo":
-                # Relation générique sans contrainte de type
-                graph.add((entity1_uri, relation_prop, entity2_uri))
-                print(f"  ✓ Relation LLM : {entity1_text} --[{relation_type}]--> {entity2_text}")
+            candidates.append((entity1_text, entity1_uri, entity2_text, entity2_uri,
+                               e1_type, e2_type, allowed_relations, window_pair.context))
+
+    # Phase 2 : prédiction des relations (règles d'abord, puis API Groq ⭐)
+    decision_stats = get_relation_decision_stats()
+    avoided_before = decision_stats.llm_calls_avoided
+    predict_start = time.perf_counter()
+    if fused_relations is not None:
+        # Étiquettes déjà obtenues avec les types : aucune requête supplémentaire
+        relation_types = predict_relations_batch_real_api(
+            [(e1_text, e2_text, e1_type, e2_type, allowed)
+             for e1_text, _, e2_text, _, e1_type, e2_type, allowed, _ in candidates],
+            text,
+            doc_index=doc_index,
+            fused_labels=fused_relations,
+            contexts=[context for *_, context in candidates]
+        )
+    elif batch_mode:
+        # Une seule requête pour toutes les paires du document
+        relation_types = predict_relations_batch_real_api(
+            [(e1_text, e2_text, e1_type, e2_type, allowed)
+             for e1_text, _, e2_text, _, e1_type, e2_type, allowed, _ in candidates],
+            text,
+            doc_index=doc_index,
+            contexts=[context for *_, context in candidates]
+        )
+    elif concurrency > 1 and len(candidates) > 1:
+        # Paires indépendantes : temps total ≈ latence max au lieu de la somme
+        logger.info("  ⚡ Prédiction concurrente : %s paire(s), %s appel(s) simultané(s)",
+                    len(candidates), concurrency)
+        relation_types = run_predictions(
+            [(e1_text, e2_text, context, e1_type, e2_type, doc_index, allowed)
+             for e1_text, _, e2_text, _, e1_type, e2_type, allowed, context in candidates],
+            predict_relation_real_api,
+            concurrency
+        )
+    else:
+        relation_types = [
+            predict_relation_real_api(e1_text, e2_text, context,
+                                      entity1_type=e1_type, entity2_type=e2_type,
+                                      doc_index=doc_index, allowed_relations=allowed)
+            for e1_text, _, e2_text, _, e1_type, e2_type, allowed, context in candidates
+        ]
+
+    record_span("relations.predict", predict_start, pairs=len(candidates),
+                pairs_total=pair_stats['pairs_total'],
+                mode=("fused" if fused_relations is not None else "batch" if batch_mode
+                      else "concurrent" if concurrency > 1 and len(candidates) > 1 else "sequential"))
+
+    if RULE_FIRST_ENABLED and candidates:
+        avoided = decision_stats.llm_calls_avoided - avoided_before
+        logger.info("  ⚡ Règles d'abord : %s/%s paire(s) tranchée(s) sans appel LLM", avoided,
+                    len(candidates))
+
+    # Phase 3 : validation ontologique et ajout au graphe (ordre des paires conservé)
+    for candidate, relation_type in zip(candidates, relation_types):
+        if relation_type is None:
+            continue
+        entity1_text, entity1_uri, entity2_text, entity2_uri, e1_type, e2_type, allowed_relations, _ = candidate
+        _apply_predicted_relation(graph, entity1_text, entity1_uri, entity2_text, entity2_uri,
+                                  relation_type, allowed_relations, e1_type, e2_type)
 
 
 # ============================================================================
@@ -1526,7 +2044,8 @@ def reify_statement(graph, subject, predicate, obj, source_file="texte_exemple.t
     # graph.add((statement_uri, DC.date, Literal("2026-01-15", datatype=XSD.date)))
     # graph.add((statement_uri, EX.confidence, Literal(0.95, datatype=XSD.float)))
     
-    print(f"  ✓ Réification créée pour : {subject.split('#')[-1]} --{predicate.split('#')[-1]}--> ...")
+    logger.debug("  ✓ Réification créée pour : %s --%s--> ...", subject.split('#')[-1],
+                 predicate.split('#')[-1])
     
     return statement_uri
 
@@ -1542,7 +2061,7 @@ def apply_reification_to_relations(graph, source_file="texte_exemple.txt"):
         graph (rdflib.Graph): Le graphe RDF contenant les assertions
         source_file (str): Nom du fichier source
     """
-    print("\n[RÉIFICATION] Application de la réification aux relations...")
+    logger.info("\n[RÉIFICATION] Application de la réification aux relations...")
     
     # Liste des propriétés ObjectProperty à réifier
     properties_to_reify = [EX.teaches, EX.author, EX.traite_de, EX.relatedTo, EX.worksAt]
@@ -1554,13 +2073,15 @@ def apply_reification_to_relations(graph, source_file="texte_exemple.txt"):
             reify_statement(graph, subject, predicate, obj, source_file)
             reified_count += 1
     
-    print(f"[RÉIFICATION] {reified_count} triplet(s) réifié(s) avec métadonnées dc:source\n")
+    get_metrics().inc("kg_reified_statements_total", reified_count)
+    logger.info("[RÉIFICATION] %s triplet(s) réifié(s) avec métadonnées dc:source\n", reified_count)
 
 
 # ============================================================================
 # 7. VISUALISATION GRAPHIQUE DU GRAPHE DE CONNAISSANCES
 # ============================================================================
 
+@traced("export.visualization")
 def visualize_knowledge_graph(graph, output_file="graphe_connaissance.png"):
     """
     Génère une visualisation graphique du graphe de connaissances RDF.
@@ -1580,6 +2101,12 @@ def visualize_knowledge_graph(graph, output_file="graphe_connaissance.png"):
     """
     print("\n[VISUALISATION] Génération du graphe visuel...")
     
+    # Imports paresseux : environ 0,8 s de démarrage épargnés aux exécutions
+    # sans visualisation (--no-viz, service, corpus, tests)
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    from matplotlib.patches import Patch
+    
     # Création d'un graphe NetworkX dirigé
     G = nx.DiGraph()
     
@@ -1648,7 +2175,7 @@ def visualize_knowledge_graph(graph, output_file="graphe_connaissance.png"):
                     # DEBUG : Afficher les relations détectées
                     subject_label = node_labels.get(subject_uri, subject_uri.split('#')[-1])
                     obj_label = node_labels.get(str(obj), str(obj).split('#')[-1])
-                    print(f"    [DEBUG] {subject_label} --[{relation_name}]--> {obj_label}")
+                    logger.debug("    [DEBUG] %s --[%s]--> %s", subject_label, relation_name, obj_label)
                     
                     edge_labels[(subject_uri, str(obj))] = relation_name
     
@@ -1745,7 +2272,6 @@ def visualize_knowledge_graph(graph, output_file="graphe_connaissance.png"):
                                          alpha=0.7))
     
     # Légende
-    from matplotlib.patches import Patch
     legend_elements = [
         Patch(facecolor=color_map['Person'], edgecolor='black', label='Personne (FOAF)'),
         Patch(facecolor=color_map['Place'], edgecolor='black', label='Lieu (Schema.org)'),
@@ -1767,7 +2293,280 @@ def visualize_knowledge_graph(graph, output_file="graphe_connaissance.png"):
 
 
 # ============================================================================
-# 8. FONCTION PRINCIPALE - ORCHESTRATION DU PIPELINE
+# 8. PIPELINE RÉUTILISABLE - MODÈLES CHARGÉS UNE SEULE FOIS
+# ============================================================================
+
+class PipelineInputError(ValueError):
+    """Texte rejeté par l'entry gate (trop court, moins de 2 entités)."""
+
+
+class KnowledgeGraphPipeline:
+    """
+    Pipeline texte → graphe RDF dont les ressources coûteuses sont construites
+    une seule fois et partagées par tous les documents traités.
+    
+    Ressources possédées :
+    - nlp : modèle spaCy, avec l'EntityRuler de HybridNER installé une fois
+    - hybrid_ner : module NER hybride (7 couches) construit sur ce modèle
+    - llm_backend : backend LLM actif (client et quota partagés)
+    - tbox : gabarit T-Box, copié dans le graphe de chaque document
+    
+    La latence par document exclut ainsi tout chargement de modèle.
+    
+    Utilisation :
+    -------------
+    >>> pipeline = KnowledgeGraphPipeline()
+    >>> graph = pipeline.process("Zoubida Kedad enseigne à l'Université de Versailles.")
+    >>> graph.serialize(format="turtle")
+    """
+    
+    # Étapes de process(), dans l'ordre (clés de `timings`, événements `progress`)
+    STAGES = ("validation", "entities", "types", "abox", "relations", "reification", "reasoning")
+    
+    def __init__(self, nlp=None, model_name="fr_core_news_sm", llm_backend=None,
+                 batch_mode=None, concurrency=None, fused=None, reasoning=True):
+        """
+        Args:
+            nlp (spacy.Language): Modèle déjà chargé (défaut : spacy.load(model_name))
+            model_name (str): Modèle spaCy à charger si nlp n'est pas fourni
+            llm_backend (LLMBackend): Backend à installer (défaut : backend configuré)
+            batch_mode (bool): Prédiction groupée des paires (défaut : KG_BATCH_RELATIONS)
+            concurrency (int): Prédictions simultanées (défaut : KG_RELATION_CONCURRENCY)
+            fused (bool): Types + relations en un appel (défaut : KG_FUSED_EXTRACTION)
+            reasoning (bool): Applique le raisonnement OWL au graphe produit
+        """
+        self.nlp = nlp if nlp is not None else spacy.load(model_name)
+        self.hybrid_ner = HybridNERModule(
+            nlp=self.nlp,
+            confidence_threshold=0.6,
+            enable_validation=False
+        )
+        if llm_backend is not None:
+            set_llm_backend(llm_backend)
+        self.llm_backend = get_llm_backend()
+        self.batch_mode = batch_mode
+        self.concurrency = concurrency
+        self.fused = FUSED_EXTRACTION_MODE if fused is None else fused
+        self.reasoning = reasoning
+        
+        self.tbox = Graph()
+        self._bind_namespaces(self.tbox)
+        define_tbox(self.tbox)
+    
+    @staticmethod
+    def _bind_namespaces(graph):
+        graph.bind("ex", EX)        # Notre ontologie
+        graph.bind("data", DATA)    # Nos instances
+        graph.bind("foaf", FOAF)    # FOAF (Friend of a Friend)
+        graph.bind("schema", SCHEMA) # Schema.org
+        graph.bind("owl", OWL)      # OWL (Web Ontology Language)
+        graph.bind("rdf", RDF)      # RDF
+        graph.bind("rdfs", RDFS)    # RDFS (vocabulaire de schéma)
+        graph.bind("xsd", XSD)      # Types de données XML Schema
+        graph.bind("dc", DC)        # Dublin Core (métadonnées)
+    
+    def new_graph(self):
+        """Nouveau graphe contenant une copie du gabarit T-Box."""
+        graph = Graph()
+        self._bind_namespaces(graph)
+        graph += self.tbox
+        return graph
+    
+    @staticmethod
+    def validate_text(text):
+        """
+        Entry gate (Module 0) : rejette les textes trop courts.
+        
+        Raises:
+            PipelineInputError: Texte de moins de 10 caractères ou de 3 mots
+        """
+        # WHY: Reject invalid inputs BEFORE processing to avoid noise downstream
+        logger.info("\n" + "="*80)
+        logger.info("[MODULE 0] ENTRY GATE - Validation du texte source")
+        logger.info("="*80)
+        logger.info('[TEXTE SOURCE] : "%s"', text)
+        
+        # Check 1: Minimum length
+        if len(text.strip()) < 10:
+            logger.info("❌ REJETÉ: Texte trop court (< 10 caractères)")
+            raise PipelineInputError("Texte trop court (< 10 caractères)")
+        
+        # Check 2: Minimum word count
+        words = text.split()
+        if len(words) < 3:
+            logger.info("❌ REJETÉ: Phrase trop courte (< 3 mots)")
+            raise PipelineInputError("Phrase trop courte (< 3 mots)")
+        
+        logger.info("✓ Texte valide - longueur: %s caractères, %s mots\n", len(text), len(words))
+    
+    def extract_entities(self, text, doc=None):
+        """
+        Entités du texte (HybridNER) ; au moins 2 sont requises.
+        
+        Args:
+            text (str): Texte source
+            doc (spacy.tokens.Doc): Texte normalisé déjà analysé (défaut : analysé ici)
+            
+        Raises:
+            PipelineInputError: Moins de 2 entités détectées
+        """
+        entities = extract_entities_with_spacy(text, self.nlp, hybrid_ner=self.hybrid_ner, doc=doc)
+        
+        # Entry gate: Minimum entity count
+        # WHY: Without entities, relation extraction will fail or produce noise
+        if len(entities) < 2:
+            logger.info("\n❌ ENTRY GATE: Nombre d'entités insuffisant (%s < 2)", len(entities))
+            raise PipelineInputError(
+                f"Nombre d'entités insuffisant ({len(entities)} < 2) : "
+                "au moins 2 entités requises pour extraire des relations")
+        return entities
+    
+    def pipe(self, texts, batch_size=32, n_process=1):
+        """
+        Analyse un flux de textes avec nlp.pipe() (mode corpus).
+        
+        Chaque texte est analysé sous sa forme normalisée (entités, HybridNER)
+        et, si elle diffère, sous sa forme brute (relations) : les deux
+        analyses passent dans le même flux nlp.pipe.
+        
+        Args:
+            texts (iterable): Textes source
+            batch_size (int): Documents par lot spaCy
+            n_process (int): Processus d'analyse spaCy
+            
+        Yields:
+            tuple: (texte, [Doc, ...]) dans l'ordre d'entrée, à passer à process(docs=...)
+        """
+        def _forms():
+            for idx, text in enumerate(texts):
+                normalized = normalize_input_text(text)
+                yield normalized, (idx, text)
+                if normalized != text:
+                    yield text, (idx, text)
+        
+        current, docs = None, []
+        for doc, key in self.nlp.pipe(_forms(), as_tuples=True,
+                                      batch_size=batch_size, n_process=n_process):
+            if current is not None and key[0] != current[0]:
+                yield current[1], docs
+                docs = []
+            current = key
+            docs.append(doc)
+        if current is not None:
+            yield current[1], docs
+    
+    def process(self, text, source_file="texte_exemple.txt", docs=None, reasoning=None,
+                timings=None, progress=None):
+        """
+        Construit le graphe de connaissances d'un texte.
+        
+        Étapes : entry gate → entités (HybridNER) → raffinement des types
+        (ou appel fusionné) → A-Box → relations → réification → raisonnement OWL.
+        
+        Args:
+            text (str): Texte source
+            source_file (str): Source enregistrée dans les nœuds de réification
+            docs (list): Analyses spaCy déjà faites (pipe()) ; défaut : analyse ici
+            reasoning (bool): Raisonnement OWL (défaut : réglage du pipeline)
+            timings (dict): Rempli avec la durée de chaque étape (s), ex : manifeste
+                            de kg_manifest.py
+            progress (callable): Appelé à la fin de chaque étape (STAGES) avec
+                                 progress(étape, durée_s), ex : barre de
+                                 progression d'app_streamlit.py
+            
+        Returns:
+            rdflib.Graph: T-Box + A-Box du document
+            
+        Raises:
+            PipelineInputError: Texte rejeté par l'entry gate
+        """
+        timings = {} if timings is None else timings
+        metrics = get_metrics()
+        checkpoint = time.perf_counter()
+        
+        def _stage(name):
+            nonlocal checkpoint
+            now = time.perf_counter()
+            timings[name] = round(now - checkpoint, 6)
+            metrics.observe("kg_stage_seconds", now - checkpoint, stage=name)
+            record_span(f"stage.{name}", checkpoint, now)
+            if progress is not None:
+                progress(name, timings[name])
+                now = time.perf_counter()  # rappel non compté dans l'étape suivante
+            checkpoint = now
+        
+        with span("document", doc_id=source_file) as document:
+            try:
+                self.validate_text(text)
+                graph = self.new_graph()
+                parsed = {doc.text: doc for doc in docs or ()}
+                _stage("validation")
+                
+                entities = self.extract_entities(text, doc=parsed.get(normalize_input_text(text)))
+                _stage("entities")
+            except PipelineInputError:
+                metrics.inc("kg_documents_total", status="rejected")
+                raise
+            document.set(entities=len(entities))
+            
+            # Re-classification dynamique pour détecter les TOPICS (matières, concepts)
+            # et corriger les erreurs de spaCy
+            fused_relations = None
+            if self.fused:
+                # Un seul appel LLM pour le document : types raffinés + relations étiquetées
+                entities, fused_relations = extract_types_and_relations_fused(entities, text)
+            else:
+                entities = refine_entity_types(entities, text)
+            _stage("types")
+            
+            entity_uris = instantiate_entities_in_abox(graph, entities)
+            _stage("abox")
+            extract_relations(graph, entity_uris, text, batch_mode=self.batch_mode,
+                              concurrency=self.concurrency, fused_relations=fused_relations,
+                              nlp=self.nlp, doc=parsed.get(text))
+            _stage("relations")
+            apply_reification_to_relations(graph, source_file=source_file)
+            _stage("reification")
+            metrics.inc("kg_documents_total", status="ok")
+            metrics.inc("kg_triples_added_total", len(graph) - len(self.tbox))
+            
+            if self.reasoning if reasoning is None else reasoning:
+                self.apply_reasoning(graph)
+                _stage("reasoning")
+            document.set(triples=len(graph))
+        return graph
+    
+    @staticmethod
+    def apply_reasoning(graph):
+        """Raisonnement OWL (Module 1) et contrôle de cohérence du graphe."""
+        logger.info("\n" + "="*80)
+        logger.info("[MODULE 1] RAISONNEMENT OWL - Inférence de types et propriétés")
+        logger.info("="*80)
+        
+        # Initialisation du moteur de raisonnement
+        owl_reasoner = OWLReasoningEngine(graph, verbose=debug_enabled())
+        
+        # Application du raisonnement (DeductiveClosure si owlrl disponible)
+        inferred_count = owl_reasoner.apply_reasoning()
+        
+        # Vérification de la cohérence du graphe
+        is_consistent, errors = owl_reasoner.check_consistency()
+        
+        if not is_consistent:
+            logger.warning("\n⚠️ ATTENTION : Inconsistances détectées dans le graphe")
+            for error in errors[:5]:  # Afficher max 5 erreurs
+                logger.warning("  • %s", error)
+        
+        # Ajout de métadonnées de confiance pour les triplets inférés
+        if inferred_count > 0:
+            logger.info("\n[MODULE 1] Ajout de métadonnées de confiance pour %s triplets inférés...",
+                        inferred_count)
+            # Note: Les triplets inférés ont confiance = 1.0 (certitude logique)
+        return inferred_count
+
+
+# ============================================================================
+# 9. FONCTION PRINCIPALE - ORCHESTRATION DU PIPELINE
 # ============================================================================
 
 def main():
@@ -1777,7 +2576,14 @@ def main():
     
     IMPORTANT : Chaque exécution crée un NOUVEAU graphe vide pour éviter
     la pollution de données entre extractions successives.
+    
+    Option --no-viz : pas de visualisation PNG (matplotlib et networkx ne
+    sont jamais importés).
     """
+    # Option --no-viz retirée des arguments avant la lecture du texte
+    args = [arg for arg in sys.argv[1:] if arg != "--no-viz"]
+    visualize = len(args) == len(sys.argv) - 1
+    
     print("="*80)
     print("PROJET MASTER 2 - WEB SÉMANTIQUE")
     print("Extraction de Graphe de Connaissances avec Architecture T-Box/A-Box")
@@ -1806,7 +2612,7 @@ def main():
         except Exception as e:
             print(f"[WARNING] Erreur lecture stdin : {e}")
     
-    # Option 2 : Lire depuis texte_temp.txt (utilisé par Streamlit)
+    # Option 2 : Lire depuis texte_temp.txt (ancienne interface Streamlit, conservé pour les scripts)
     elif os.path.exists("texte_temp.txt"):
         try:
             with open("texte_temp.txt", "r", encoding="utf-8") as f:
@@ -1818,44 +2624,21 @@ def main():
             print(f"[WARNING] Erreur lecture texte_temp.txt : {e}")
     
     # Option 3 : Lire depuis argument en ligne de commande
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--text" and len(sys.argv) > 2:
-            text_example = sys.argv[2]
+    if args:
+        if args[0] == "--text" and len(args) > 1:
+            text_example = args[1]
             print(f"[INFO] Texte chargé depuis argument --text\n")
-        elif sys.argv[1] != "--text":
+        elif args[0] != "--text":
             # Tout le reste est considéré comme le texte
-            text_example = " ".join(sys.argv[1:])
+            text_example = " ".join(args)
             print(f"[INFO] Texte chargé depuis arguments\n")
     
     # -----------------------------------------------------------------------
-    # INITIALISATION : Création d'un NOUVEAU graphe RDF vide
-    # -----------------------------------------------------------------------
-    # IMPORTANT : Le graphe est créé LOCALEMENT dans main() à chaque exécution
-    # Cela garantit qu'aucune donnée résiduelle n'est conservée entre les runs
-    print("[INIT] Création d'un nouveau graphe RDF vide...")
-    graph = Graph()
-    graph.bind("ex", EX)        # Notre ontologie
-    graph.bind("data", DATA)    # Nos instances
-    graph.bind("foaf", FOAF)    # FOAF (Friend of a Friend)
-    graph.bind("schema", SCHEMA) # Schema.org
-    graph.bind("owl", OWL)      # OWL (Web Ontology Language)
-    graph.bind("rdf", RDF)      # RDF
-    graph.bind("rdfs", RDFS)    # RDFS (vocabulaire de schéma)
-    graph.bind("xsd", XSD)      # Types de données XML Schema
-    graph.bind("dc", DC)        # Dublin Core (métadonnées)
-    print("  ✓ Graphe initialisé avec namespaces\n")
-    
-    # -----------------------------------------------------------------------
-    # PHASE 1 : Définition de l'ontologie (T-Box)
-    # -----------------------------------------------------------------------
-    define_tbox(graph)
-    
-    # -----------------------------------------------------------------------
-    # PHASE 2 : Chargement du modèle NLP français
+    # PHASE 1-2 : T-Box (gabarit) et modèle NLP français, chargés une fois
     # -----------------------------------------------------------------------
     print("[NLP] Chargement du modèle spaCy français...")
     try:
-        nlp = spacy.load("fr_core_news_sm")
+        pipeline = KnowledgeGraphPipeline()
         print("  ✓ Modèle 'fr_core_news_sm' chargé avec succès\n")
     except OSError:
         print("  ⚠ Modèle non trouvé. Installation automatique...")
@@ -1866,86 +2649,29 @@ def main():
         return
     
     # -----------------------------------------------------------------------
-    # PHASE 2.5 : ENTRY GATE (Module 0 Filter) - Validation du texte source
+    # PHASE 3-5.5 : Entry gate, entités, raffinement, relations, réification,
+    # raisonnement OWL — sur un NOUVEAU graphe (copie de la T-Box)
     # -----------------------------------------------------------------------
-    # WHY: Reject invalid inputs BEFORE processing to avoid noise downstream
-    print("\n" + "="*80)
-    print("[MODULE 0] ENTRY GATE - Validation du texte source")
-    print("="*80)
-    print(f"[TEXTE SOURCE] : \"{text_example}\"")
-    
-    # Check 1: Minimum length
-    if len(text_example.strip()) < 10:
-        print("❌ REJETÉ: Texte trop court (< 10 caractères)")
-        print("✗ Pipeline arrêté - texte invalide\n")
-        return
-    
-    # Check 2: Minimum word count
-    words = text_example.split()
-    if len(words) < 3:
-        print("❌ REJETÉ: Phrase trop courte (< 3 mots)")
-        print("✗ Pipeline arrêté - texte invalide\n")
-        return
-    
-    print("✓ Texte valide - longueur: {} caractères, {} mots\n".format(
-        len(text_example), len(words)))
-    
-    # -----------------------------------------------------------------------
-    # PHASE 3 : Extraction des entités (A-Box - partie 1)
-    # -----------------------------------------------------------------------
-    entities = extract_entities_with_spacy(text_example, nlp)
-    
-    # Entry gate: Minimum entity count
-    # WHY: Without entities, relation extraction will fail or produce noise
-    if len(entities) < 2:
-        print("\n❌ ENTRY GATE: Nombre d'entités insuffisant ({} < 2)".format(len(entities)))
-        print("✗ Pipeline arrêté - au moins 2 entités requises pour extraire des relations\n")
+    # IMPORTANT : Le graphe est créé à chaque appel de process()
+    # Cela garantit qu'aucune donnée résiduelle n'est conservée entre les runs
+    # KG_INCREMENTAL=1 : un texte déjà extrait reprend son A-Box (kg_manifest.py)
+    from kg_manifest import INCREMENTAL_MODE, RunManifest, content_hash, process_incremental
+    manifest = RunManifest.for_pipeline(pipeline) if INCREMENTAL_MODE else None
+    try:
+        if manifest is not None:
+            doc_id = f"texte_exemple.txt#{content_hash(text_example)[:16]}"
+            graph = process_incremental(pipeline, manifest, text_example, doc_id,
+                                        source_file="texte_exemple.txt")
+        else:
+            graph = pipeline.process(text_example)
+    except PipelineInputError as e:
+        print(f"✗ Pipeline arrêté - {e}\n")
         return
-    
-    # -----------------------------------------------------------------------
-    # PHASE 3.5 : Raffinement intelligent des types via Groq/Llama-3 ✨
-    # -----------------------------------------------------------------------
-    # Re-classification dynamique pour détecter les TOPICS (matières, concepts)
-    # et corriger les erreurs de spaCy
-    entities = refine_entity_types(entities, text_example)
-    
-    entity_uris = instantiate_entities_in_abox(graph, entities)
-    
-    # -----------------------------------------------------------------------
-    # PHASE 4 : Extraction des relations (A-Box - partie 2)
-    # -----------------------------------------------------------------------
-    extract_relations(graph, entity_uris, text_example)
-    
-    # -----------------------------------------------------------------------
-    # PHASE 5 : Réification des triplets
-    # -----------------------------------------------------------------------
-    apply_reification_to_relations(graph, source_file="texte_exemple.txt")
-    
-    # -----------------------------------------------------------------------
-    # ✨ NOUVEAU : PHASE 5.5 : APPLICATION DU RAISONNEMENT OWL (MODULE 1)
-    # -----------------------------------------------------------------------
-    print("\n" + "="*80)
-    print("[MODULE 1] RAISONNEMENT OWL - Inférence de types et propriétés")
-    print("="*80)
-    
-    # Initialisation du moteur de raisonnement
-    owl_reasoner = OWLReasoningEngine(graph, verbose=True)
-    
-    # Application du raisonnement (DeductiveClosure si owlrl disponible)
-    inferred_count = owl_reasoner.apply_reasoning()
-    
-    # Vérification de la cohérence du graphe
-    is_consistent, errors = owl_reasoner.check_consistency()
-    
-    if not is_consistent:
-        print("\n⚠️ ATTENTION : Inconsistances détectées dans le graphe")
-        for error in errors[:5]:  # Afficher max 5 erreurs
-            print(f"  • {error}")
-    
-    # Ajout de métadonnées de confiance pour les triplets inférés
-    if inferred_count > 0:
-        print(f"\n[MODULE 1] Ajout de métadonnées de confiance pour {inferred_count} triplets inférés...")
-        # Note: Les triplets inférés ont confiance = 1.0 (certitude logique)
+    finally:
+        if manifest is not None:
+            manifest.save()
+    # Instances de l'A-Box : sujets étiquetés de l'espace de données
+    instances = {s for s in graph.subjects(RDFS.label, None) if str(s).startswith(str(DATA))}
     
     # -----------------------------------------------------------------------
     # ✨ NOUVEAU : PHASE 5.6 : STATISTIQUES DE CONFIANCE
@@ -1969,34 +2695,41 @@ def main():
     print("[EXPORT] Sérialisation du graphe RDF en deux formats")
     print("="*80)
     
+    # Écriture directe dans les fichiers : aucune copie intermédiaire en chaîne
+    # (corpus : flux N-Triples/N-Quads de kg_batch.py, conversion hors ligne)
+    
+    metrics = get_metrics()
+    metrics.set_gauge("kg_graph_triples", len(graph))
+    
     # FORMAT 1 : TURTLE (lisible par l'humain)
     output_file_turtle = "knowledge_graph.ttl"
-    turtle_output = graph.serialize(format='turtle')
-    
-    with open(output_file_turtle, 'w', encoding='utf-8') as f:
-        f.write(turtle_output)
+    with span("export.turtle"), metrics.timer("kg_stage_seconds", stage="serialize_turtle"):
+        graph.serialize(destination=output_file_turtle, format='turtle', encoding='utf-8')
     
     print(f"\n✓ Graphe exporté en TURTLE : {output_file_turtle}")
     
     # FORMAT 2 : RDF/XML (standard historique du W3C, utilisé dans le cours)
     output_file_xml = "knowledge_graph.xml"
-    xml_output = graph.serialize(format='xml')
-    
-    with open(output_file_xml, 'w', encoding='utf-8') as f:
-        f.write(xml_output)
+    with span("export.xml"), metrics.timer("kg_stage_seconds", stage="serialize_xml"):
+        graph.serialize(destination=output_file_xml, format='xml', encoding='utf-8')
     
     print(f"✓ Graphe exporté en RDF/XML : {output_file_xml}")
     print(f"✓ Nombre total de triplets : {len(graph)}")
     
     # -----------------------------------------------------------------------
-    # PHASE 7 : Visualisation graphique
+    # PHASE 7 : Visualisation graphique (sauf --no-viz)
     # -----------------------------------------------------------------------
-    visualize_knowledge_graph(graph, "graphe_connaissance.png")
-    
-    print("\n" + "="*80)
-    print("RÉSULTAT FINAL - FORMAT TURTLE")
-    print("="*80 + "\n")
-    print(turtle_output)
+    if visualize:
+        with metrics.timer("kg_stage_seconds", stage="visualization"):
+            visualize_knowledge_graph(graph, "graphe_connaissance.png")
+    
+    # Affichage du Turtle complet sur demande seulement (KG_PRINT_TURTLE=1)
+    if PRINT_TURTLE:
+        print("\n" + "="*80)
+        print("RÉSULTAT FINAL - FORMAT TURTLE")
+        print("="*80 + "\n")
+        with open(output_file_turtle, encoding='utf-8') as f:
+            print(f.read())
     
     # -----------------------------------------------------------------------
     # Statistiques finales
@@ -2009,9 +2742,36 @@ def main():
     print(f"ObjectProperties : {len(list(graph.subjects(RDF.type, OWL.ObjectProperty)))}")
     print(f"DatatypeProperties : {len(list(graph.subjects(RDF.type, OWL.DatatypeProperty)))}")
     print(f"Restrictions OWL : {len(list(graph.subjects(RDF.type, OWL.Restriction)))}")
-    print(f"Instances extraites : {len(entity_uris)}")
+    print(f"Instances extraites : {len(instances)}")
     print(f"Triplets réifiés : {len(list(graph.subjects(RDF.type, RDF.Statement)))}")
     print(f"Total de triplets RDF : {len(graph)}")
+    cache_stats = get_llm_cache().stats()
+    print(f"Cache LLM : {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+          f"{cache_stats['entries']} entrée(s)")
+    memo_stats = get_entity_type_memo().stats()
+    print(f"Mémo des types d'entités : {memo_stats['hits']} hit(s), {memo_stats['misses']} miss(es), "
+          f"{memo_stats['entries']} entrée(s) dont {memo_stats['ambiguous']} ambiguë(s)")
+    decision_summary = get_relation_decision_stats().summary()
+    print(f"Décisions de relation : {decision_summary['decisions']} "
+          f"(appels LLM évités : {decision_summary['llm_calls_avoided']}, "
+          f"paires soumises au LLM : {decision_summary['llm_calls']})")
+    for source, count in decision_summary['by_source'].items():
+        print(f"  → {source} : {count}")
+    backend = get_llm_backend()
+    if isinstance(backend, ResilientBackend):
+        resilience = backend.stats()
+        print(f"Résilience LLM : {resilience['attempts']} tentative(s), "
+              f"{resilience['retries']} retry(s), {resilience['failures']} échec(s), "
+              f"disjoncteur {resilience['breaker_state']} (ouvert {resilience['breaker_opened']} fois, "
+              f"{resilience['short_circuited']} appel(s) refusé(s)), "
+              f"{resilience['hedges_launched']} requête(s) couverte(s)")
+    # Rapport JSON / fichier Prometheus des métriques (KG_METRICS_JSON, KG_METRICS_PROM)
+    for metrics_file in export_metrics():
+        print(f"Métriques exportées : {metrics_file}")
+    # Trace Chrome trace-event (KG_TRACE) : chrome://tracing ou ui.perfetto.dev
+    trace_file = export_trace()
+    if trace_file:
+        print(f"Trace exportée : {trace_file}")
     print("="*80 + "\n")
     
     print("✓ Pipeline terminé avec succès !")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JOURNALISATION DU PIPELINE : NIVEAUX ET MODE SILENCIEUX
+
+Le pipeline affichait chaque entité, paire candidate, relation et nœud de
+réification par des print() inconditionnels : sur un corpus, le formatage
+des f-strings et les écritures terminal coûtent plus que certaines étapes.
+
+Les messages du traitement d'un document passent par un logger à niveaux,
+avec des messages au format % : sous le seuil, ni la chaîne ni ses
+arguments ne sont formatés (une comparaison d'entiers par message).
+
+Niveaux :
+=========
+DEBUG    Détail par entité, paire, relation, arête (sortie historique, défaut)
+INFO     Bandeaux et bilans d'étape, un par document
+WARNING  Mode production : anomalies seulement (LLM indisponible, erreurs)
+ERROR    Erreurs seulement
+
+Les paramètres `verbose` historiques (HybridNERModule, ConfidenceScorer,
+OWLReasoningEngine) suivent le niveau : debug_enabled().
+
+Pourquoi pas logging.Logger :
+=============================
+Un message du module logging standard crée un LogRecord (horodatage,
+processus, thread, recherche du fichier appelant) et vide le flux : environ
+trois fois le coût d'un print(). Le mode DEBUG, sortie par défaut, aurait
+ralenti le pipeline d'environ 15 %. PipelineLogger garde la même interface
+(debug/info/warning/error, isEnabledFor, niveaux du module logging) et
+écrit directement la ligne sur le sys.stdout courant (redirections des
+workers de kg_worker_pool.py et des tests comprises).
+
+Configuration (.env) :
+======================
+KG_LOG_LEVEL    DEBUG | INFO | WARNING | ERROR (défaut : DEBUG)
+"""
+
+import logging
+import os
+import sys
+from typing import Dict, Optional, Union
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+DEFAULT_LOG_LEVEL = "DEBUG"
+
+# Seuil partagé par tous les loggers du pipeline
+_level = logging.DEBUG
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : PipelineLogger
+# ============================================================================
+
+class PipelineLogger:
+    """
+    Logger à niveaux du pipeline (sous-ensemble de l'interface logging.Logger).
+
+    Utilisation :
+    -------------
+    >>> logger = get_logger(__name__)
+    >>> logger.debug("  ✓ Instance créée : %s (type: %s)", uri_fragment, entity_type)
+    >>> if logger.isEnabledFor(logging.DEBUG):
+    ...     logger.debug("  🔗 %s", describe(chain))   # argument coûteux à calculer
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= _level
+
+    def log(self, level: int, msg: str, *args):
+        if level >= _level:
+            sys.stdout.write((msg % args if args else msg) + "\n")
+
+    def debug(self, msg: str, *args):
+        if logging.DEBUG >= _level:
+            sys.stdout.write((msg % args if args else msg) + "\n")
+
+    def info(self, msg: str, *args):
+        if logging.INFO >= _level:
+            sys.stdout.write((msg % args if args else msg) + "\n")
+
+    def warning(self, msg: str, *args):
+        if logging.WARNING >= _level:
+            sys.stdout.write((msg % args if args else msg) + "\n")
+
+    def error(self, msg: str, *args):
+        if logging.ERROR >= _level:
+            sys.stdout.write((msg % args if args else msg) + "\n")
+
+
+# ============================================================================
+# API
+# ============================================================================
+
+_loggers: Dict[str, PipelineLogger] = {}
+
+
+def get_logger(name: str) -> PipelineLogger:
+    """Logger d'un module du pipeline (un par nom)."""
+    if name not in _loggers:
+        _loggers[name] = PipelineLogger(name)
+    return _loggers[name]
+
+
+def set_log_level(level: Union[str, int]) -> int:
+    """
+    Fixe le seuil de tous les loggers du pipeline.
+
+    Args:
+        level: Nom (LOG_LEVELS) ou valeur numérique du module logging
+
+    Returns:
+        int: Seuil précédent
+    """
+    global _level
+    if isinstance(level, str):
+        if level.upper() not in LOG_LEVELS:
+            raise ValueError(f"Niveau de journalisation inconnu : {level} ({', '.join(LOG_LEVELS)})")
+        level = getattr(logging, level.upper())
+    previous, _level = _level, level
+    return previous
+
+
+def configure_logging(level: Optional[str] = None) -> int:
+    """
+    Fixe le seuil depuis KG_LOG_LEVEL (défaut : DEBUG).
+
+    Appelée à l'import, puis après load_dotenv() par le pipeline pour
+    prendre en compte un KG_LOG_LEVEL défini dans .env.
+    """
+    return set_log_level(level or os.getenv("KG_LOG_LEVEL") or DEFAULT_LOG_LEVEL)
+
+
+def debug_enabled() -> bool:
+    """Vrai si le détail DEBUG est affiché (valeur des paramètres `verbose`)."""
+    return _level <= logging.DEBUG
+
+
+configure_logging()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRAITEMENT INCRÉMENTAL : MANIFESTE DES DOCUMENTS DÉJÀ EXTRAITS
+
+Relancer kg_extraction_semantic_web.py, la suite de validation ou
+kg_batch.py sur un corpus ré-extrait tout, même les documents qui n'ont pas
+changé depuis l'exécution précédente.
+
+Ce module tient un manifeste des documents traités :
+
+Fonctionnement :
+================
+1. Par document : hash SHA-256 du texte, statut (ok / rejected), nombre de
+   triplets, durée de chaque étape du pipeline, date du traitement
+2. Triplets A-Box de chaque document conservés en N-Triples à côté du
+   manifeste (triples/) : un document inchangé est repris tel quel, sans
+   analyse spaCy ni appel LLM
+3. Un texte rejeté par l'entry gate est aussi mémorisé (rejeté à nouveau
+   s'il ne change pas)
+4. Invalidation complète si la version du pipeline (code, modèle spaCy,
+   backend LLM, modes fusionné / batch / règles d'abord / prompt compact,
+   fenêtre des paires candidates) ou celle de l'ontologie (T-Box) change
+5. Un document en erreur n'est pas enregistré : il sera retenté
+
+Les durées par étape restent dans le manifeste pour analyse :
+    python kg_manifest.py [RÉPERTOIRE]   (résumé par étape)
+
+Configuration (.env) :
+======================
+KG_INCREMENTAL     "1" : main() et kg_batch.py réutilisent le manifeste
+KG_MANIFEST_DIR    Répertoire du manifeste (défaut : .kg_cache/manifest)
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+from rdflib import Graph
+from rdflib.compare import to_canonical_graph
+
+import kg_extraction_semantic_web
+from candidate_pairs import SentenceWindowPairGenerator
+from kg_extraction_semantic_web import PipelineInputError
+from llm_cache import DEFAULT_ONTOLOGY_VERSION
+from rdf_stream_sink import abox_ntriples
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# À incrémenter quand le code d'extraction change la forme des triplets produits
+PIPELINE_VERSION = "1"
+
+DEFAULT_MANIFEST_DIR = os.path.join(".kg_cache", "manifest")
+INCREMENTAL_MODE = os.getenv("KG_INCREMENTAL", "0") == "1"
+
+# Étapes de KnowledgeGraphPipeline.process(), dans leur ordre d'exécution
+STAGES = ("validation", "entities", "types", "abox", "relations", "reification", "reasoning")
+
+MANIFEST_FILE = "manifest.json"
+TRIPLES_DIR = "triples"
+
+
+def content_hash(text: str) -> str:
+    """Empreinte SHA-256 du texte d'un document."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def ontology_version(tbox: Graph) -> str:
+    """
+    Version de l'ontologie : KG_ONTOLOGY_VERSION + empreinte de la T-Box.
+
+    La T-Box est mise sous forme canonique (nœuds blancs des restrictions
+    OWL renommés de façon stable) avant le hachage.
+    """
+    lines = sorted(to_canonical_graph(tbox).serialize(format="nt").splitlines())
+    digest = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+    return f"{os.getenv('KG_ONTOLOGY_VERSION', DEFAULT_ONTOLOGY_VERSION)}-{digest[:16]}"
+
+
+def pipeline_version(pipeline) -> str:
+    """Version du pipeline : PIPELINE_VERSION + réglages qui changent les triplets."""
+    meta = getattr(pipeline.nlp, "meta", {}) or {}
+    backend = pipeline.llm_backend
+    pairs = SentenceWindowPairGenerator.from_env()
+    # Réglages lus à l'appel (et non à l'import) : valeurs effectives de l'exécution
+    batch_mode = (kg_extraction_semantic_web.BATCH_RELATION_MODE if pipeline.batch_mode is None
+                  else pipeline.batch_mode)
+    settings = {
+        "model": f"{meta.get('lang', '')}_{meta.get('name', '')}@{meta.get('version', '')}",
+        "llm_backend": type(backend).__name__,
+        "llm_model": str(getattr(backend, "model", "")),
+        "fused": bool(pipeline.fused),
+        "batch": bool(batch_mode),
+        "rule_first": bool(kg_extraction_semantic_web.RULE_FIRST_ENABLED),
+        "compact_prompt": bool(kg_extraction_semantic_web.COMPACT_PROMPT_MODE),
+        "relation_window": pairs.window,
+        "relation_dep_hops": pairs.max_dep_hops,
+    }
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{PIPELINE_VERSION}-{digest[:16]}"
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : RunManifest
+# ============================================================================
+
+class RunManifest:
+    """
+    Manifeste des documents extraits et de leurs triplets.
+
+    Utilisation :
+    -------------
+    >>> manifest = RunManifest.for_pipeline(pipeline)
+    >>> if manifest.is_current(doc_id, text):
+    ...     ntriples = manifest.reuse(doc_id)
+    ... else:
+    ...     timings = {}
+    ...     graph = pipeline.process(text, source_file=doc_id, timings=timings)
+    ...     manifest.record(doc_id, text, "ok", abox_ntriples(graph, pipeline.tbox), timings)
+    >>> manifest.save()
+    """
+
+    def __init__(self, directory: str = DEFAULT_MANIFEST_DIR,
+                 pipeline_version: str = PIPELINE_VERSION,
+                 ontology_version: str = DEFAULT_ONTOLOGY_VERSION):
+        """
+        Charge le manifeste du répertoire (vide s'il n'existe pas).
+
+        Args:
+            directory: Répertoire du manifeste et des triplets conservés
+            pipeline_version: Version du pipeline de cette exécution
+            ontology_version: Version de l'ontologie de cette exécution
+        """
+        self.directory = directory
+        self.pipeline_version = pipeline_version
+        self.ontology_version = ontology_version
+        self.documents: Dict[str, Dict] = {}
+        self.skipped = 0
+        self.updated = 0
+        self.invalidated = False
+
+        path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            if (data.get("pipeline_version") == pipeline_version
+                    and data.get("ontology_version") == ontology_version):
+                self.documents = data.get("documents", {})
+            else:
+                # Pipeline ou ontologie modifiés : aucun résultat n'est réutilisable
+                self.invalidated = True
+                print(f"[MANIFESTE] Versions modifiées : {len(data.get('documents', {}))} "
+                      f"document(s) à ré-extraire")
+
+    @classmethod
+    def for_pipeline(cls, pipeline, directory: Optional[str] = None):
+        """Manifeste aux versions d'un KnowledgeGraphPipeline."""
+        return cls(directory or os.getenv("KG_MANIFEST_DIR", DEFAULT_MANIFEST_DIR),
+                   pipeline_version=pipeline_version(pipeline),
+                   ontology_version=ontology_version(pipeline.tbox))
+
+    # ── Documents ───────────────────────────────────────────────────────────
+
+    def _triples_path(self, doc_id: str) -> str:
+        name = hashlib.sha256(doc_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, TRIPLES_DIR, f"{name}.nt")
+
+    def entry(self, doc_id: str) -> Optional[Dict]:
+        """Entrée du manifeste d'un document (None s'il n'a jamais été traité)."""
+        return self.documents.get(doc_id)
+
+    def is_current(self, doc_id: str, text: str) -> bool:
+        """Vrai si le document a déjà été traité avec ce texte et ces versions."""
+        entry = self.documents.get(doc_id)
+        if entry is None or entry["content_hash"] != content_hash(text):
+            return False
+        return entry["status"] != "ok" or os.path.exists(self._triples_path(doc_id))
+
+    def reuse(self, doc_id: str) -> Optional[str]:
+        """
+        Reprend un document inchangé (is_current() vrai).
+
+        Returns:
+            str: Triplets A-Box conservés (N-Triples), ou None si le texte
+                 avait été rejeté par l'entry gate
+        """
+        self.skipped += 1
+        if self.documents[doc_id]["status"] != "ok":
+            return None
+        with open(self._triples_path(doc_id), encoding="utf-8") as handle:
+            return handle.read()
+
+    def record(self, doc_id: str, text: str, status: str, ntriples: str = "",
+               timings: Optional[Dict[str, float]] = None):
+        """
+        Enregistre le résultat d'un document.
+
+        Args:
+            doc_id: Identifiant du document
+            text: Texte traité (haché)
+            status: "ok" ou "rejected"
+            ntriples: A-Box du document en N-Triples (statut "ok")
+            timings: Durée de chaque étape (KnowledgeGraphPipeline.process(timings=...))
+        """
+        lines = [line for line in ntriples.splitlines() if line.strip()]
+        if status == "ok":
+            path = self._triples_path(doc_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("".join(line + "\n" for line in lines))
+        self.documents[doc_id] = {
+            "content_hash": content_hash(text),
+            "status": status,
+            "triples": len(lines),
+            "timings": {stage: round(seconds, 6) for stage, seconds in (timings or {}).items()},
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.updated += 1
+
+    def save(self):
+        """Écrit le manifeste (remplacement atomique du fichier)."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        data = {"pipeline_version": self.pipeline_version,
+                "ontology_version": self.ontology_version,
+                "documents": self.documents}
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    # ── Analyse ─────────────────────────────────────────────────────────────
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Par étape : nombre de documents, durée totale, moyenne et maximum (s)."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for entry in self.documents.values():
+            for stage, seconds in entry.get("timings", {}).items():
+                stats = summary.setdefault(stage, {"documents": 0, "total_s": 0.0, "max_s": 0.0})
+                stats["documents"] += 1
+                stats["total_s"] += seconds
+                stats["max_s"] = max(stats["max_s"], seconds)
+        for stats in summary.values():
+            stats["mean_s"] = round(stats["total_s"] / stats["documents"], 6)
+            stats["total_s"] = round(stats["total_s"], 6)
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        return dict(sorted(summary.items(), key=lambda item: order.get(item[0], len(STAGES))))
+
+    def stats(self):
+        """Documents du manifeste, repris tels quels et (ré)extraits pendant l'exécution."""
+        return {"documents": len(self.documents), "skipped": self.skipped,
+                "updated": self.updated, "invalidated": self.invalidated}
+
+
+# ============================================================================
+# TRAITEMENT D'UN DOCUMENT AVEC REPRISE
+# ============================================================================
+
+def process_incremental(pipeline, manifest: RunManifest, text: str, doc_id: str,
+                        source_file: Optional[str] = None, reasoning: Optional[bool] = None) -> Graph:
+    """
+    KnowledgeGraphPipeline.process() avec reprise des documents inchangés.
+
+    Les triplets conservés sont ceux de l'A-Box avant raisonnement : le
+    raisonnement OWL est refait sur le graphe reconstruit.
+
+    Args:
+        pipeline: KnowledgeGraphPipeline
+        manifest: Manifeste de l'exécution
+        text: Texte source
+        doc_id: Clé du document dans le manifeste
+        source_file: Source des nœuds de réification (défaut : doc_id)
+        reasoning: Raisonnement OWL (défaut : réglage du pipeline)
+
+    Raises:
+        PipelineInputError: Texte rejeté par l'entry gate (maintenant ou lors
+                            d'une exécution précédente)
+    """
+    if reasoning is None:
+        reasoning = pipeline.reasoning
+
+    if manifest.is_current(doc_id, text):
+        ntriples = manifest.reuse(doc_id)
+        if ntriples is None:
+            raise PipelineInputError("Texte déjà rejeté par l'entry gate (manifeste)")
+        graph = pipeline.new_graph()
+        graph.parse(data=ntriples, format="nt")
+        print(f"[MANIFESTE] Document inchangé ({doc_id}) : "
+              f"{manifest.entry(doc_id)['triples']} triplets repris")
+    else:
+        timings = {}
+        try:
+            graph = pipeline.process(text, source_file=source_file or doc_id, reasoning=False,
+                                     timings=timings)
+        except PipelineInputError:
+            manifest.record(doc_id, text, "rejected", timings=timings)
+            raise
+        ntriples = abox_ntriples(graph, pipeline.tbox)
+        if reasoning:
+            start = time.perf_counter()
+            pipeline.apply_reasoning(graph)
+            timings["reasoning"] = time.perf_counter() - start
+            reasoning = False
+        manifest.record(doc_id, text, "ok", ntriples, timings)
+
+    if reasoning:
+        pipeline.apply_reasoning(graph)
+    return graph
+
+
+# ============================================================================
+# LIGNE DE COMMANDE : RÉSUMÉ DES DURÉES PAR ÉTAPE
+# ============================================================================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    directory = argv[0] if argv else os.getenv("KG_MANIFEST_DIR", DEFAULT_MANIFEST_DIR)
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        print(f"❌ Aucun manifeste : {path}")
+        return 1
+
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    manifest = RunManifest(directory, data.get("pipeline_version"), data.get("ontology_version"))
+    statuses = [entry["status"] for entry in manifest.documents.values()]
+    print(f"Manifeste {path} : {len(statuses)} document(s), {statuses.count('ok')} extrait(s), "
+          f"{statuses.count('rejected')} rejeté(s)")
+    print(f"  pipeline {manifest.pipeline_version}, ontologie {manifest.ontology_version}")
+    for stage, stats in manifest.stage_summary().items():
+        print(f"  {stage:<12} {stats['documents']:>6} doc(s)   total {stats['total_s']:9.3f} s   "
+              f"moyenne {stats['mean_s'] * 1000:8.2f} ms   max {stats['max_s'] * 1000:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MÉTRIQUES DU PIPELINE : COMPTEURS, JAUGES, HISTOGRAMMES DE LATENCE
+
+Les seules mesures de performance étaient le temps total de
+tests/test_suite_complete.py et des comptes affichés sur la console. Ce
+module centralise des métriques alimentées par chaque étape du pipeline :
+
+Métriques :
+===========
+kg_stage_seconds              histogramme  étapes de process(), sérialisation,
+                                           visualisation, couche 7 (stage=...)
+kg_ner_layer_seconds          histogramme  couches HybridNERModule (layer=...)
+kg_ner_entities_total         compteur     entités en sortie de chaque couche
+kg_verb_relations_total       compteur     relations de la couche 7 (verbes)
+kg_llm_calls_total            compteur     appels réseau LLM (backend=...)
+kg_llm_tokens_total           compteur     tokens LLM (backend, kind=prompt|completion)
+kg_llm_latency_seconds        histogramme  latence des appels LLM (backend=...)
+kg_llm_cache_lookups_total    compteur     cache LLM (result=hit|miss)
+kg_entity_memo_lookups_total  compteur     mémo des types d'entités (result=hit|miss)
+kg_reified_statements_total   compteur     nœuds de réification créés
+kg_owl_reasoning_seconds      histogramme  OWLReasoningEngine.apply_reasoning
+kg_owl_inferred_triples_total compteur     triplets inférés par le raisonnement
+kg_documents_total            compteur     documents traités (status=ok|rejected)
+kg_triples_added_total        compteur     triplets A-Box ajoutés par document
+kg_graph_triples              jauge        taille du dernier graphe exporté
+
+Export :
+========
+1. Rapport JSON de l'exécution (write_json) : compteurs, jauges, histogrammes
+2. Fichier texte au format Prometheus (write_prometheus), à exposer par le
+   collecteur textfile de node_exporter pour suivre les régressions
+
+Un worker de kg_worker_pool.py tient ses propres métriques : elles ne
+remontent pas au parent.
+
+Configuration (.env) :
+======================
+KG_METRICS        "0" pour désactiver (registre sans effet)
+KG_METRICS_JSON   Rapport JSON écrit en fin d'exécution (main(), kg_batch.py)
+KG_METRICS_PROM   Fichier Prometheus écrit en fin d'exécution
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bornes des histogrammes de latence (secondes), + l'intervalle +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Description des métriques (ligne # HELP de l'export Prometheus)
+METRIC_HELP = {
+    "kg_stage_seconds": "Durée d'une étape du pipeline (s)",
+    "kg_ner_layer_seconds": "Durée d'une couche HybridNER (s)",
+    "kg_ner_entities_total": "Entités en sortie de chaque couche HybridNER",
+    "kg_verb_relations_total": "Relations ajoutées par la couche 7 (mapping verbes)",
+    "kg_llm_calls_total": "Appels réseau LLM",
+    "kg_llm_tokens_total": "Tokens LLM envoyés et reçus",
+    "kg_llm_latency_seconds": "Latence des appels réseau LLM (s)",
+    "kg_llm_resilience_events_total": "Événements de la couche de résilience LLM (tentatives, retries, couvertures...)",
+    "kg_llm_backoff_seconds_total": "Attente cumulée des backoffs avant un retry LLM (s)",
+    "kg_llm_breaker_opened_total": "Ouvertures du disjoncteur LLM",
+    "kg_llm_cache_lookups_total": "Consultations du cache LLM",
+    "kg_entity_memo_lookups_total": "Consultations du mémo des types d'entités",
+    "kg_reified_statements_total": "Nœuds de réification rdf:Statement créés",
+    "kg_owl_reasoning_seconds": "Durée du raisonnement OWL (s)",
+    "kg_owl_inferred_triples_total": "Triplets inférés par le raisonnement OWL",
+    "kg_documents_total": "Documents traités par le pipeline",
+    "kg_triples_added_total": "Triplets A-Box ajoutés par les documents",
+    "kg_graph_triples": "Triplets du dernier graphe exporté",
+    "kg_service_requests_total": "Requêtes POST /extract du service (kg_service.py), par code HTTP",
+    "kg_service_request_seconds": "Durée d'une requête POST /extract (s)",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """{a="1",b="2"} avec échappement Prometheus des valeurs."""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : MetricsRegistry
+# ============================================================================
+
+class MetricsRegistry:
+    """
+    Registre de métriques du processus (thread-safe).
+
+    Utilisation :
+    -------------
+    >>> metrics = get_metrics()
+    >>> metrics.inc("kg_documents_total", status="ok")
+    >>> with metrics.timer("kg_stage_seconds", stage="serialization"):
+    ...     graph.serialize(destination="kg.ttl", format="turtle")
+    >>> metrics.write_prometheus("kg.prom")
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: Bornes supérieures des histogrammes (croissantes)
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        # name → labels → [effectifs par intervalle (+Inf compris), somme, nombre]
+        self._histograms: Dict[str, Dict[LabelKey, list]] = {}
+
+    # ── Enregistrement ──────────────────────────────────────────────────────
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Ajoute value au compteur name{labels}."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Fixe la jauge name{labels}."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        """Ajoute une observation à l'histogramme name{labels}."""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mesure la durée du bloc dans l'histogramme name{labels} (même en cas d'exception)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # ── Lecture ─────────────────────────────────────────────────────────────
+
+    def value(self, name: str, **labels) -> float:
+        """Valeur d'un compteur ou d'une jauge (0 si absente)."""
+        key = _label_key(labels)
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name].get(key, 0.0)
+            return self._counters.get(name, {}).get(key, 0.0)
+
+    def histogram(self, name: str, **labels) -> Dict[str, float]:
+        """Nombre d'observations et somme d'un histogramme (0 si absent)."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_label_key(labels))
+            if histogram is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": histogram[2], "sum": histogram[1]}
+
+    def snapshot(self) -> Dict[str, object]:
+        """Toutes les séries, sérialisables en JSON."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(key), "value": value}
+                        for name, series in sorted(self._counters.items())
+                        for key, value in sorted(series.items())]
+            gauges = [{"name": name, "labels": dict(key), "value": value}
+                      for name, series in sorted(self._gauges.items())
+                      for key, value in sorted(series.items())]
+            histograms = []
+            for name, series in sorted(self._histograms.items()):
+                for key, (counts, total, count) in sorted(series.items()):
+                    cumulative, running = {}, 0
+                    for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+                        running += bucket_count
+                        cumulative[str(bound)] = running
+                    histograms.append({"name": name, "labels": dict(key), "count": count,
+                                       "sum": round(total, 6),
+                                       "mean": round(total / count, 6) if count else 0.0,
+                                       "buckets": cumulative})
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    # ── Export ──────────────────────────────────────────────────────────────
+
+    def to_prometheus(self) -> str:
+        """Format texte d'exposition Prometheus (version 0.0.4)."""
+        snapshot = self.snapshot()
+        lines = []
+        seen = set()
+
+        def _header(name, metric_type):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for kind in ("counters", "gauges"):
+            for series in snapshot[kind]:
+                _header(series["name"], "counter" if kind == "counters" else "gauge")
+                key = _label_key(series["labels"])
+                lines.append(f"{series['name']}{_format_labels(key)} {_format_value(series['value'])}")
+        for series in snapshot["histograms"]:
+            name = series["name"]
+            _header(name, "histogram")
+            key = _label_key(series["labels"])
+            for bound, count in series["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', bound))} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{name}_count{_format_labels(key)} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> Dict[str, object]:
+        """Rapport JSON de l'exécution : horodatage, durée et séries."""
+        now = time.time()
+        report = {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                  "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+                  "elapsed_s": round(now - self.started_at, 3),
+                  "pid": os.getpid()}
+        report.update(self.snapshot())
+        return report
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.report(), handle, ensure_ascii=False, indent=1)
+
+    def write_prometheus(self, path: str):
+        """Écrit le fichier Prometheus (remplacement atomique, lu par le collecteur textfile)."""
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+
+
+class NullMetricsRegistry:
+    """Registre sans effet (KG_METRICS=0)."""
+
+    def inc(self, name, value=1.0, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    @contextmanager
+    def timer(self, name, **labels):
+        yield
+
+    def reset(self):
+        pass
+
+    def value(self, name, **labels):
+        return 0.0
+
+    def histogram(self, name, **labels):
+        return {"count": 0, "sum": 0.0}
+
+    def snapshot(self):
+        return {"counters": [], "gauges": [], "histograms": []}
+
+    def to_prometheus(self):
+        return ""
+
+    def report(self):
+        return self.snapshot()
+
+    def write_json(self, path):
+        pass
+
+    def write_prometheus(self, path):
+        pass
+
+
+# ============================================================================
+# INSTANCE PARTAGÉE
+# ============================================================================
+
+_shared_metrics = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Registre partagé par tous les modules du processus (construit à la première utilisation)."""
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            if os.getenv("KG_METRICS", "1") in ("0", "", "off"):
+                _shared_metrics = NullMetricsRegistry()
+            else:
+                _shared_metrics = MetricsRegistry()
+        return _shared_metrics
+
+
+def set_metrics(metrics):
+    """Remplace le registre partagé (tests, désactivation)."""
+    global _shared_metrics
+    with _shared_metrics_lock:
+        _shared_metrics = metrics
+
+
+def export_metrics(json_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+    """
+    Écrit le rapport JSON et/ou le fichier Prometheus du registre partagé.
+
+    Args:
+        json_path: Rapport JSON (défaut : KG_METRICS_JSON ; rien si absent)
+        prometheus_path: Fichier Prometheus (défaut : KG_METRICS_PROM ; rien si absent)
+
+    Returns:
+        list: Fichiers écrits
+    """
+    metrics = get_metrics()
+    written = []
+    json_path = json_path or os.getenv("KG_METRICS_JSON")
+    prometheus_path = prometheus_path or os.getenv("KG_METRICS_PROM")
+    if json_path:
+        metrics.write_json(json_path)
+        written.append(json_path)
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path)
+        written.append(prometheus_path)
+    return written
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SERVICE D'EXTRACTION HTTP/JSON : PIPELINES CHAUDS, UNE REQUÊTE = UN DOCUMENT
+
+app_streamlit.py lançait `python3 kg_extraction_semantic_web.py` à chaque
+clic : chaque requête payait le démarrage de l'interpréteur, les imports,
+le chargement de spaCy et la construction de la T-Box. Ce service garde des
+KnowledgeGraphPipeline chargés en mémoire et ne paie plus que l'extraction.
+
+Points d'accès :
+================
+POST /extract   {"text": "...", "format": "turtle" | "json-ld" | "stats",
+                 "doc_id": "...", "reasoning": false}
+                → {"doc_id", "format", "elapsed_ms", "timings_ms", "stats",
+                   "graph"}  (graph absent en format "stats" ; objet JSON-LD
+                   en format "json-ld", texte Turtle sinon)
+GET  /health    État du service (pipelines, requêtes en cours, uptime)
+GET  /metrics   Métriques au format texte Prometheus (kg_metrics.py)
+
+Codes d'erreur : 400 (JSON invalide, texte manquant, format inconnu),
+413 (requête trop volumineuse), 422 (texte rejeté par l'entry gate),
+503 (aucun pipeline libre avant KG_SERVICE_TIMEOUT), 500 (erreur interne).
+
+Concurrence :
+=============
+1. ThreadingHTTPServer : un thread par connexion
+2. Réserve de N pipelines chauds (--workers) : une requête emprunte un
+   pipeline, le traite, le rend ; au-delà de N requêtes simultanées, les
+   suivantes attendent leur tour
+3. Les appels LLM (réseau) de requêtes différentes se recouvrent ; l'analyse
+   spaCy reste limitée par le GIL : pour un corpus, kg_batch.py --workers
+
+Chaque pipeline possède son modèle spaCy (spacy.load par pipeline) : aucun
+objet spaCy n'est partagé entre threads. Un document de chauffe est traité
+au démarrage (compilation des index de mots-clés, imports paresseux).
+
+Configuration (.env) :
+======================
+KG_SERVICE_HOST       Adresse d'écoute (défaut : 127.0.0.1)
+KG_SERVICE_PORT       Port (défaut : 8765)
+KG_SERVICE_WORKERS    Pipelines chauds (défaut : 2)
+KG_SERVICE_TIMEOUT    Attente maximale d'un pipeline libre, en secondes (défaut : 30)
+KG_SERVICE_MAX_BYTES  Taille maximale du corps d'une requête (défaut : 1000000)
+KG_LOG_LEVEL          Niveau des messages par document (défaut du service : WARNING)
+
+Usage :
+    python kg_service.py --workers 2 --port 8765
+    curl -s localhost:8765/extract -d '{"text": "Zoubida Kedad enseigne au CNRS à Paris.", "format": "stats"}'
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from rdflib import RDF, RDFS
+
+from kg_extraction_semantic_web import DATA, EX, KnowledgeGraphPipeline, PipelineInputError
+from kg_logging import LOG_LEVELS, get_logger, set_log_level
+from kg_metrics import get_metrics
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_HOST = os.getenv("KG_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("KG_SERVICE_PORT", "8765"))
+DEFAULT_WORKERS = int(os.getenv("KG_SERVICE_WORKERS", "2"))
+DEFAULT_TIMEOUT = float(os.getenv("KG_SERVICE_TIMEOUT", "30"))
+MAX_REQUEST_BYTES = int(os.getenv("KG_SERVICE_MAX_BYTES", "1000000"))
+
+# Format de réponse → format de sérialisation rdflib (None : statistiques seules)
+RESPONSE_FORMATS = {
+    "turtle": "turtle",
+    "json-ld": "json-ld",
+    "stats": None,
+}
+
+WARMUP_TEXT = "Zoubida Kedad enseigne le Web Sémantique à l'Université de Versailles."
+
+
+class ServiceBusy(Exception):
+    """Aucun pipeline libre avant l'expiration du délai d'attente."""
+
+
+# ============================================================================
+# RÉSERVE DE PIPELINES CHAUDS
+# ============================================================================
+
+class PipelinePool:
+    """
+    Pipelines chargés une fois, empruntés par les requêtes.
+
+    Utilisation :
+    -------------
+    >>> pool = PipelinePool.create(workers=2, reasoning=False)
+    >>> with pool.acquire(timeout=30) as pipeline:
+    ...     graph = pipeline.process(text, source_file="requete_1")
+    """
+
+    def __init__(self, pipelines: List[KnowledgeGraphPipeline]):
+        if not pipelines:
+            raise ValueError("PipelinePool nécessite au moins un pipeline")
+        self.size = len(pipelines)
+        self._idle = queue.Queue()
+        for pipeline in pipelines:
+            self._idle.put(pipeline)
+
+    @classmethod
+    def create(cls, workers: int = DEFAULT_WORKERS, model_name: str = "fr_core_news_sm",
+               reasoning: bool = False, warm_up: bool = True):
+        """Charge `workers` pipelines (un modèle spaCy chacun) et les chauffe."""
+        pipelines = [KnowledgeGraphPipeline(model_name=model_name, reasoning=reasoning)
+                     for _ in range(max(1, workers))]
+        pool = cls(pipelines)
+        if warm_up:
+            pool.warm_up()
+        return pool
+
+    def warm_up(self):
+        """Traite un document de chauffe avec chaque pipeline."""
+        pipelines = [self._idle.get() for _ in range(self.size)]
+        try:
+            for pipeline in pipelines:
+                pipeline.process(WARMUP_TEXT, source_file="warmup", reasoning=False)
+        finally:
+            for pipeline in pipelines:
+                self._idle.put(pipeline)
+
+    @property
+    def busy(self) -> int:
+        return self.size - self._idle.qsize()
+
+    @contextmanager
+    def acquire(self, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Emprunte un pipeline le temps d'un bloc.
+
+        Raises:
+            ServiceBusy: Aucun pipeline libre après `timeout` secondes
+        """
+        try:
+            pipeline = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ServiceBusy(f"Aucun pipeline libre après {timeout:g} s ({self.size} en service)")
+        try:
+            yield pipeline
+        finally:
+            self._idle.put(pipeline)
+
+
+# ============================================================================
+# EXTRACTION D'UNE REQUÊTE
+# ============================================================================
+
+def graph_stats(graph, tbox) -> Dict[str, int]:
+    """Compteurs du graphe d'un document (mêmes définitions que main())."""
+    instances = {s for s in graph.subjects(RDFS.label, None) if str(s).startswith(str(DATA))}
+    relations = sum(1 for s, p, o in graph
+                    if str(p).startswith(str(EX)) and s in instances and o in instances)
+    return {
+        "triples": len(graph),
+        "abox_triples": len(graph) - len(tbox),
+        "instances": len(instances),
+        "relations": relations,
+        "reified": len(set(graph.subjects(RDF.type, RDF.Statement))),
+    }
+
+
+def extract_document(pipeline: KnowledgeGraphPipeline, text: str, response_format: str = "turtle",
+                     doc_id: str = "requete", reasoning: bool = None) -> Dict[str, object]:
+    """
+    Extrait un document et construit la réponse JSON de POST /extract.
+
+    Raises:
+        ValueError: Format de réponse inconnu
+        PipelineInputError: Texte rejeté par l'entry gate
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Format inconnu : {response_format} ({', '.join(RESPONSE_FORMATS)})")
+    start = time.perf_counter()
+    timings = {}
+    graph = pipeline.process(text, source_file=doc_id, reasoning=reasoning, timings=timings)
+
+    response = {
+        "doc_id": doc_id,
+        "format": response_format,
+        "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        "stats": graph_stats(graph, pipeline.tbox),
+    }
+    rdf_format = RESPONSE_FORMATS[response_format]
+    if rdf_format == "json-ld":
+        response["graph"] = json.loads(graph.serialize(format="json-ld"))
+    elif rdf_format is not None:
+        response["graph"] = graph.serialize(format=rdf_format)
+    response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return response
+
+
+# ============================================================================
+# SERVEUR HTTP
+# ============================================================================
+
+class KGServiceServer(ThreadingHTTPServer):
+    """Serveur HTTP portant la réserve de pipelines (un thread par connexion)."""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool: PipelinePool, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(address, KGRequestHandler)
+        self.pool = pool
+        self.acquire_timeout = timeout
+        self.started = time.time()
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def next_doc_id(self) -> str:
+        with self._counter_lock:
+            self._counter += 1
+            return f"requete_{self._counter}"
+
+
+class KGRequestHandler(BaseHTTPRequestHandler):
+    """POST /extract, GET /health, GET /metrics."""
+
+    server_version = "KGService/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            pool = self.server.pool
+            self._send_json(200, {"status": "ok", "pipelines": pool.size, "busy": pool.busy,
+                                  "uptime_s": round(time.time() - self.server.started, 3)})
+        elif self.path == "/metrics":
+            body = get_metrics().to_prometheus().encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": f"Chemin inconnu : {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/extract":
+            self._send_json(404, {"error": f"Chemin inconnu : {self.path}"})
+            return
+        metrics = get_metrics()
+        start = time.perf_counter()
+        status, payload = self._extract()
+        metrics.inc("kg_service_requests_total", status=status)
+        metrics.observe("kg_service_request_seconds", time.perf_counter() - start)
+        self._send_json(status, payload)
+
+    def _extract(self):
+        """Traite le corps de POST /extract → (code HTTP, réponse JSON)."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            return 413, {"error": f"Requête trop volumineuse ({length} > {MAX_REQUEST_BYTES} octets)"}
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError) as e:
+            return 400, {"error": f"JSON invalide : {e}"}
+        if not isinstance(request, dict) or not isinstance(request.get("text"), str):
+            return 400, {"error": "Champ \"text\" (chaîne) requis"}
+        response_format = request.get("format", "turtle")
+        if response_format not in RESPONSE_FORMATS:
+            return 400, {"error": f"Format inconnu : {response_format} ({', '.join(RESPONSE_FORMATS)})"}
+
+        doc_id = str(request.get("doc_id") or self.server.next_doc_id())
+        try:
+            with self.server.pool.acquire(self.server.acquire_timeout) as pipeline:
+                return 200, extract_document(pipeline, request["text"], response_format, doc_id,
+                                             request.get("reasoning"))
+        except PipelineInputError as e:
+            return 422, {"doc_id": doc_id, "error": str(e)}
+        except ServiceBusy as e:
+            return 503, {"doc_id": doc_id, "error": str(e)}
+        except Exception as e:
+            logger.error("❌ [%s] erreur - %s: %s", doc_id, type(e).__name__, e)
+            return 500, {"doc_id": doc_id, "error": f"{type(e).__name__}: {e}"}
+
+    def _send_json(self, status: int, payload: Dict[str, object]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("[SERVICE] %s - " + format, self.address_string(), *args)
+
+
+def create_server(pool: PipelinePool, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  timeout: float = DEFAULT_TIMEOUT) -> KGServiceServer:
+    """Serveur prêt à servir (port 0 : port libre choisi par le système)."""
+    return KGServiceServer((host, port), pool, timeout)
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON d'extraction de graphe de connaissances")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Pipelines chauds")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Attente maximale d'un pipeline libre (s)")
+    parser.add_argument("--model", default="fr_core_news_sm", help="Modèle spaCy")
+    parser.add_argument("--reasoning", action="store_true",
+                        help="Raisonnement OWL par défaut (sinon à la demande : \"reasoning\": true)")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, type=str.upper,
+                        default=os.getenv("KG_LOG_LEVEL", "WARNING").upper(),
+                        help="Niveau des messages par document (défaut : KG_LOG_LEVEL, sinon WARNING)")
+    args = parser.parse_args(argv)
+    set_log_level(args.log_level)
+
+    print(f"[SERVICE] Chargement de {args.workers} pipeline(s) ({args.model})...")
+    start = time.perf_counter()
+    try:
+        pool = PipelinePool.create(args.workers, args.model, reasoning=args.reasoning)
+    except OSError:
+        print(f"❌ ERREUR : Le modèle spaCy '{args.model}' n'est pas installé.")
+        print(f"   Installez-le avec : python -m spacy download {args.model}")
+        return 1
+    server = create_server(pool, args.host, args.port, args.timeout)
+    print(f"[SERVICE] Prêt en {time.perf_counter() - start:.1f} s : "
+          f"http://{args.host}:{server.server_address[1]}/extract")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVICE] Arrêt")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
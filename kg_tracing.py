@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRAÇAGE PAR SPANS DU PIPELINE : EXPORT CHROME TRACE-EVENT
+
+Les métriques (kg_metrics.py) agrègent les durées : elles ne disent pas où
+un document lent a passé son temps. Ce module enregistre des spans
+(intervalles nommés, imbriqués, avec attributs) pour chaque étape et
+sous-étape d'un document :
+
+Spans :
+=======
+document                 process() d'un document (doc_id, entities, triples)
+stage.<étape>            étapes de process() (validation, entities, types, ...)
+ner.<couche>             couches HybridNERModule (entities = entités en sortie)
+relations.verb_dispatch  couche 7, mapping verbes (relations)
+relations.predict        prédiction des paires (pairs, mode)
+llm.request              requête LLM, cache compris
+llm.call                 appel réseau (backend, tokens)
+llm.rate_limit_wait      attente imposée par le quota
+owl.deductive_closure    DeductiveClosure (inferred)
+export.<format>          sérialisation, visualisation
+
+Export :
+========
+Format Chrome trace-event (JSON, événements complets "X") : ouvrir le
+fichier dans chrome://tracing ou https://ui.perfetto.dev. Les spans des
+workers de kg_worker_pool.py sont renvoyés au parent avec chaque document
+(une ligne par processus dans la vue).
+
+Coût :
+======
+Traçage désactivé : span() renvoie un objet sans effet partagé (aucune
+allocation de span ni lecture d'horloge). Activé : un tampon borné en
+mémoire (KG_TRACE_MAX_EVENTS), les événements au-delà sont comptés et
+ignorés.
+
+Configuration (.env) :
+======================
+KG_TRACE              Fichier de trace : active le traçage dès l'import, écrit
+                      en fin d'exécution (main(), kg_batch.py)
+KG_TRACE_MAX_EVENTS   Nombre maximal d'événements conservés (défaut : 1000000)
+"""
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_MAX_EVENTS = int(os.getenv("KG_TRACE_MAX_EVENTS", "1000000"))
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+class Span:
+    """Intervalle en cours ; enregistré par le traceur à la sortie du bloc."""
+
+    __slots__ = ("tracer", "name", "attrs", "start")
+
+    def __init__(self, tracer, name: str, attrs: Dict[str, object]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+
+    def set(self, **attrs):
+        """Ajoute des attributs connus en cours de route (ex : nombre de paires)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.start, time.perf_counter(), self.attrs)
+        return False
+
+
+class _NullSpan:
+    """Span sans effet, partagé quand le traçage est désactivé."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : Tracer
+# ============================================================================
+
+class Tracer:
+    """
+    Tampon d'événements Chrome trace-event (thread-safe).
+
+    Utilisation :
+    -------------
+    >>> tracer = start_tracing()
+    >>> with span("document", doc_id="resume_42.txt") as current:
+    ...     graph = pipeline.process(text)
+    ...     current.set(triples=len(graph))
+    >>> stop_tracing().write_chrome_trace("trace.json")
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        self.max_events = max_events
+        self.dropped = 0
+        self._events: List[Dict[str, object]] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def record(self, name: str, start: float, end: float, attrs: Optional[Dict] = None):
+        """
+        Enregistre un span terminé.
+
+        Args:
+            name: Nom du span ; la catégorie est le préfixe avant le premier "."
+            start, end: Instants time.perf_counter() (secondes)
+            attrs: Attributs affichés dans la vue (args)
+        """
+        event = {"name": name, "cat": name.split(".", 1)[0], "ph": "X",
+                 "ts": round(start * 1e6, 3), "dur": round((end - start) * 1e6, 3),
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": attrs or {}}
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append(event)
+
+    def events(self) -> List[Dict[str, object]]:
+        with self._lock:
+            return list(self._events)
+
+    def drain(self) -> List[Dict[str, object]]:
+        """Retire et renvoie les événements (worker → parent)."""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def extend(self, events: List[Dict[str, object]]):
+        """Ajoute des événements venus d'un autre processus."""
+        with self._lock:
+            room = max(0, self.max_events - len(self._events))
+            self._events.extend(events[:room])
+            self.dropped += max(0, len(events) - room)
+
+    def to_chrome(self) -> Dict[str, object]:
+        """Document Chrome trace-event : événements + noms des processus."""
+        events = self.events()
+        own_pid = os.getpid()
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                     "args": {"name": "kg_pipeline" if pid == own_pid else f"kg_worker ({pid})"}}
+                    for pid in sorted({event["pid"] for event in events} | {own_pid})]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped}}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_chrome(), handle, ensure_ascii=False)
+
+
+# ============================================================================
+# TRACEUR ACTIF ET API DES MODULES DU PIPELINE
+# ============================================================================
+
+_active_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Traceur actif, ou None si le traçage est désactivé."""
+    return _active_tracer
+
+
+def start_tracing(max_events: int = DEFAULT_MAX_EVENTS) -> Tracer:
+    """Active le traçage (nouveau tampon) et renvoie le traceur."""
+    global _active_tracer
+    _active_tracer = Tracer(max_events)
+    return _active_tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Désactive le traçage et renvoie le traceur qui était actif."""
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    return tracer
+
+
+def span(name: str, **attrs):
+    """
+    Span autour d'un bloc ; objet sans effet si le traçage est désactivé.
+
+    >>> with span("relations.predict", pairs=len(candidates)) as current:
+    ...     current.set(mode="batch")
+    """
+    tracer = _active_tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, attrs)
+
+
+def record_span(name: str, start: float, end: Optional[float] = None, **attrs):
+    """Enregistre un span déjà mesuré (instants time.perf_counter())."""
+    tracer = _active_tracer
+    if tracer is not None:
+        tracer.record(name, start, time.perf_counter() if end is None else end, attrs)
+
+
+def traced(name: Optional[str] = None):
+    """Décorateur : un span par appel de la fonction (nom par défaut : module.fonction)."""
+    def decorator(function):
+        span_name = name or f"{function.__module__}.{function.__name__}"
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active_tracer is None:
+                return function(*args, **kwargs)
+            with Span(_active_tracer, span_name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export_trace(path: Optional[str] = None) -> Optional[str]:
+    """
+    Écrit la trace du traceur actif (défaut : fichier KG_TRACE).
+
+    Returns:
+        str: Fichier écrit, ou None (traçage désactivé ou aucun fichier)
+    """
+    path = path or os.getenv("KG_TRACE")
+    if _active_tracer is None or not path:
+        return None
+    _active_tracer.write_chrome_trace(path)
+    return path
+
+
+if os.getenv("KG_TRACE"):
+    start_tracing()
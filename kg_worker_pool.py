@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+POOL DE WORKERS (FORK) : ÉTAPES CPU DU PIPELINE SUR PLUSIEURS CŒURS
+
+Les couches HybridNER, les parcours de dépendances et la validation
+ontologique sont du Python pur : dans un seul processus, le GIL les limite à
+un cœur. kg_batch.process_corpus() parallélise l'analyse spaCy (n_process),
+pas ces étapes.
+
+Fonctionnement :
+================
+1. Le parent construit le KnowledgeGraphPipeline (modèle spaCy, EntityRuler,
+   T-Box) ; les tables de mots-clés (KeywordIndex) sont compilées à l'import
+2. Une analyse de chauffe, puis gc.freeze() : les objets déjà chargés ne sont
+   plus touchés par le ramasse-miettes, leurs pages restent partagées
+3. fork() des workers : modèle, T-Box et tables partagés en copie-sur-écriture,
+   aucun rechargement
+4. Dans chaque fils : nouvelles connexions SQLite (cache LLM, mémo des types),
+   registre de clients HTTP vidé, quota LLM divisé entre les workers
+5. File de tâches commune : un worker libre prend le document suivant ; un
+   document long n'immobilise qu'un worker
+6. Chaque worker renvoie l'A-Box de son document en N-Triples ; le parent
+   fusionne, puis applique une seule fois le raisonnement OWL (ou écrit les
+   lignes telles quelles dans un flux N-Triples/N-Quads, rdf_stream_sink.py)
+
+Sortie : graphe identique à kg_batch.process_corpus() pour le même corpus.
+
+Limites :
+=========
+- Nécessite la méthode de démarrage "fork" (Linux, macOS) ; sinon repli sur
+  le traitement séquentiel de kg_batch.process_corpus()
+- Les statistiques tenues par processus (tokens LLM, décisions des règles)
+  restent dans les workers
+
+Usage :
+    python kg_batch.py corpus/ --workers 4   (ou KG_POOL_WORKERS=4)
+"""
+
+import gc
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Dict, Iterable, Tuple
+
+import llm_client_registry
+from entity_type_memo import get_entity_type_memo
+from kg_extraction_semantic_web import KnowledgeGraphPipeline, PipelineInputError
+from kg_logging import get_logger, set_log_level
+from kg_tracing import get_tracer
+from llm_cache import get_llm_cache
+from llm_rate_limiter import get_rate_limiter, set_rate_limiter
+from rdf_stream_sink import abox_ntriples
+
+logger = get_logger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Délai d'attente d'un résultat avant de vérifier que les workers sont vivants (s)
+RESULT_POLL_INTERVAL = 1.0
+
+# Pipeline hérité par les workers au fork (jamais sérialisé)
+_POOL_PIPELINE = None
+
+
+def fork_available() -> bool:
+    """Vrai si la plateforme permet de démarrer les workers par fork()."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+# ============================================================================
+# CÔTÉ WORKER
+# ============================================================================
+
+def _reset_after_fork(workers: int):
+    """
+    Ressources du processus fils qui ne doivent pas être partagées avec le parent.
+
+    - connexions SQLite (cache LLM, mémo des types) : une par processus
+    - clients HTTP : les pools de connexions hérités appartiennent au parent
+    - seau à jetons : débit et rafale du quota LLM répartis entre les workers
+    - tampon de traçage : les spans hérités du parent y sont déjà
+    """
+    get_llm_cache().reopen_after_fork()
+    get_entity_type_memo().reopen_after_fork()
+    llm_client_registry.reset_after_fork()
+
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        set_rate_limiter(limiter.split(workers))
+
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.drain()
+
+
+def _worker_main(worker_id: int, workers: int, tasks, results, verbose: bool):
+    """Boucle d'un worker : prend un document, le traite, renvoie ses triplets."""
+    _reset_after_fork(workers)
+    if not verbose:
+        # Sortie coupée : les messages sous WARNING ne sont même pas formatés
+        set_log_level("WARNING")
+        sys.stdout = open(os.devnull, "w")
+
+    pipeline = _POOL_PIPELINE
+    tracer = get_tracer()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        index, doc_id, text = task
+        start = time.perf_counter()
+        timings = {}
+        try:
+            graph = pipeline.process(text, source_file=doc_id, reasoning=False, timings=timings)
+            status, payload = "ok", abox_ntriples(graph, pipeline.tbox)
+        except PipelineInputError as e:
+            status, payload = "rejected", str(e)
+        except Exception as e:
+            status, payload = "failed", f"{type(e).__name__}: {e}"
+        # perf_counter() est l'horloge monotone du système : les spans des
+        # workers s'alignent sur ceux du parent dans la trace
+        spans = tracer.drain() if tracer is not None else []
+        results.put((index, doc_id, worker_id, status, payload, time.perf_counter() - start,
+                     timings, spans))
+
+
+# ============================================================================
+# CÔTÉ PARENT
+# ============================================================================
+
+def process_corpus_parallel(pipeline: KnowledgeGraphPipeline, documents: Iterable[Tuple[str, str]],
+                            workers: int = DEFAULT_WORKERS, reasoning: bool = None,
+                            verbose: bool = False, sink=None, manifest=None):
+    """
+    Construit le graphe fusionné d'un corpus avec un pool de workers forkés.
+
+    Args:
+        pipeline: Pipeline chargé dans le parent, partagé par fork
+        documents: Couples (identifiant, texte), ex : kg_batch.read_documents()
+        workers: Nombre de processus workers
+        reasoning: Raisonnement OWL sur le graphe fusionné (défaut : réglage du pipeline)
+        verbose: Conserve la sortie console des workers
+        sink: StreamingTripleSink : A-Box écrite à l'arrivée de chaque document
+              (ordre d'arrivée), sans graphe fusionné ni raisonnement
+        manifest: RunManifest (kg_manifest.py) : documents inchangés repris dans
+                  le parent sans être envoyés aux workers ; résultats et durées
+                  par étape des workers enregistrés par le parent
+
+    Returns:
+        tuple: (rdflib.Graph fusionné, ou None en mode flux, rapport)
+               rapport = {"documents", "processed", "rejected", "failed", "skipped",
+                          "triples", "elapsed_s", "docs_per_s", "workers", "per_worker"}
+               per_worker = {id: {"documents": n, "busy_s": s}}
+    """
+    global _POOL_PIPELINE
+
+    if not fork_available():
+        import kg_batch
+        logger.warning("⚠️ fork() indisponible sur cette plateforme : traitement séquentiel")
+        return kg_batch.process_corpus(pipeline, documents, reasoning=reasoning, sink=sink,
+                                       manifest=manifest)
+
+    if reasoning is None:
+        reasoning = pipeline.reasoning
+    if sink is not None:
+        reasoning = False
+    documents = list(documents)
+    corpus = pipeline.new_graph() if sink is None else None
+    report = {"documents": len(documents), "processed": 0, "rejected": 0, "failed": 0,
+              "skipped": 0}
+
+    def _add_ntriples(ntriples, doc_id):
+        if sink is not None:
+            sink.write_ntriples(ntriples, doc_id)
+        else:
+            corpus.parse(data=ntriples, format="nt")
+
+    if manifest is not None:
+        # Documents inchangés : triplets conservés, jamais envoyés aux workers
+        pending = []
+        for doc_id, text in documents:
+            if not manifest.is_current(doc_id, text):
+                pending.append((doc_id, text))
+                continue
+            report["skipped"] += 1
+            ntriples = manifest.reuse(doc_id)
+            if ntriples is not None:
+                _add_ntriples(ntriples, doc_id)
+        documents = pending
+    workers = max(1, min(int(workers), len(documents) or 1))
+    per_worker: Dict[int, Dict[str, float]] = {
+        worker_id: {"documents": 0, "busy_s": 0.0} for worker_id in range(workers)}
+    start = time.perf_counter()
+
+    # Chauffe puis gel du tas : les workers héritent d'objets déjà initialisés
+    if documents:
+        pipeline.nlp(documents[0][1])
+    gc.collect()
+    gc.freeze()
+
+    _POOL_PIPELINE = pipeline
+    context = multiprocessing.get_context("fork")
+    tasks, results = context.Queue(), context.Queue()
+    processes = [context.Process(target=_worker_main, name=f"kg-worker-{worker_id}",
+                                 args=(worker_id, workers, tasks, results, verbose), daemon=True)
+                 for worker_id in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        for index, (doc_id, text) in enumerate(documents):
+            tasks.put((index, doc_id, text))
+        for _ in processes:
+            tasks.put(None)
+
+        received = 0
+        while received < len(documents):
+            try:
+                index, doc_id, worker_id, status, payload, busy, timings, spans = results.get(
+                    timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    logger.error("❌ Workers arrêtés : %s document(s) perdus", len(documents) - received)
+                    report["failed"] += len(documents) - received
+                    break
+                continue
+            received += 1
+            if spans:
+                get_tracer().extend(spans)
+            per_worker[worker_id]["documents"] += 1
+            per_worker[worker_id]["busy_s"] += busy
+            if status == "ok":
+                _add_ntriples(payload, doc_id)
+                report["processed"] += 1
+            elif status == "rejected":
+                logger.warning("⚠️ [%s] ignoré - %s", doc_id, payload)
+                report["rejected"] += 1
+            else:
+                logger.error("❌ [%s] erreur - %s", doc_id, payload)
+                report["failed"] += 1
+            if manifest is not None and status != "failed":
+                manifest.record(doc_id, documents[index][1], status,
+                                payload if status == "ok" else "", timings)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        _POOL_PIPELINE = None
+        gc.unfreeze()
+
+    if manifest is not None:
+        manifest.save()
+    if reasoning and (report["processed"] or report["skipped"]):
+        pipeline.apply_reasoning(corpus)
+
+    elapsed = time.perf_counter() - start
+    report["triples"] = len(corpus) if sink is None else sink.triples
+    report["elapsed_s"] = round(elapsed, 3)
+    report["docs_per_s"] = round(report["documents"] / elapsed, 2) if elapsed > 0 else 0.0
+    report["workers"] = workers
+    report["per_worker"] = {worker_id: {"documents": stats["documents"],
+                                        "busy_s": round(stats["busy_s"], 3)}
+                            for worker_id, stats in per_worker.items()}
+    return corpus, report
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BACKENDS LLM INTERCHANGEABLES
+
+Tous les appels LLM du pipeline passent par un objet LLMBackend. Le backend
+actif est choisi par configuration, ce qui permet de faire tourner le
+pipeline complet (et ses benchmarks de débit) sans le service distant.
+
+Backends disponibles :
+======================
+1. GroqBackend         → API Groq (Llama-3), client partagé + quota
+2. HuggingFaceBackend  → Inference API Hugging Face
+3. LocalStandInBackend → Remplaçant local déterministe : étiquettes dérivées
+                         de règles, latence et taux d'erreur configurables
+
+Le remplaçant local existe aussi sous forme de serveur HTTP compatible avec
+l'API Groq (LocalStandInServer) : en pointant GROQ_BASE_URL dessus, on exerce
+le vrai chemin réseau (client, pool, retries) sur une machine hors ligne.
+
+    python llm_backends.py --serve --port 8765 --latency 0.2 --error-rate 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8765/openai/v1 python kg_extraction_semantic_web.py
+
+Configuration (.env) :
+======================
+KG_LLM_BACKEND           groq | huggingface | local (défaut : groq)
+KG_HF_MODEL              Modèle Hugging Face (défaut : Mistral-7B-Instruct-v0.2)
+KG_LOCAL_LLM_LATENCY     Latence simulée du backend local en secondes (défaut : 0)
+KG_LOCAL_LLM_JITTER      Variation aléatoire de la latence en secondes (défaut : 0)
+KG_LOCAL_LLM_ERROR_RATE  Proportion d'appels en erreur, entre 0 et 1 (défaut : 0)
+KG_LOCAL_LLM_TOKEN_LATENCY  Latence ajoutée par 1000 tokens de prompt, en secondes (défaut : 0)
+
+Retry, disjoncteur et requêtes couvertes : voir llm_resilience.py.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from llm_cache import get_llm_cache
+from llm_client_registry import get_groq_client, get_hf_client
+from llm_rate_limiter import get_rate_limiter
+from llm_token_usage import estimate_tokens, record_usage
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_GROQ_MODEL = "llama-3.1-8b-instant"
+DEFAULT_HF_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
+LOCAL_MODEL = "local-standin"
+
+
+class LLMBackendError(RuntimeError):
+    """Échec d'un appel LLM (réseau, quota, erreur injectée)."""
+
+
+# ============================================================================
+# INTERFACE COMMUNE
+# ============================================================================
+
+class LLMBackend:
+    """
+    Interface d'un backend LLM : un prompt système + un prompt utilisateur
+    en entrée, le texte brut de la réponse en sortie (température 0).
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def is_available(self) -> bool:
+        """Le backend peut-il être appelé (clé API présente, etc.) ?"""
+        return True
+
+    def unavailable_reason(self) -> str:
+        """Message affiché lorsque is_available() est faux."""
+        return f"backend LLM '{self.name}' indisponible"
+
+    def is_degraded(self) -> bool:
+        """
+        Le backend refuse-t-il temporairement les appels (disjoncteur ouvert) ?
+
+        Le pipeline passe alors en mode « règles seules » (voir llm_resilience.py).
+        """
+        return False
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Envoie la requête et retourne le contenu brut de la réponse."""
+        raise NotImplementedError
+
+    def cached_complete(self, system_prompt: str, user_prompt: str) -> str:
+        """complete() servi par le cache persistant lorsque la requête est connue."""
+        return get_llm_cache().get_or_compute(
+            self.model, system_prompt, user_prompt,
+            lambda: self.complete(system_prompt, user_prompt)
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(model={self.model!r})"
+
+
+# ============================================================================
+# BACKENDS DISTANTS
+# ============================================================================
+
+class GroqBackend(LLMBackend):
+    """API Groq via le client partagé du registre (pool keep-alive + quota)."""
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_GROQ_MODEL):
+        super().__init__(model)
+        self.api_key = api_key or os.getenv("GROQ_API_KEY", "")
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    def unavailable_reason(self) -> str:
+        return "GROQ_API_KEY non trouvé. Créez un fichier .env avec votre clé."
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        # Seul un appel réseau consomme le quota (pas les réponses servies par le cache)
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            limiter.acquire()
+        start = time.perf_counter()
+        chat_completion = get_groq_client(self.api_key).chat.completions.create(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            model=self.model,
+            temperature=0,
+        )
+        content = chat_completion.choices[0].message.content
+        usage = getattr(chat_completion, "usage", None)
+        record_usage(self.name, self.model, system_prompt, user_prompt, content,
+                     time.perf_counter() - start,
+                     prompt_tokens=getattr(usage, "prompt_tokens", None),
+                     completion_tokens=getattr(usage, "completion_tokens", None))
+        return content
+
+
+class HuggingFaceBackend(LLMBackend):
+    """Inference API Hugging Face (chat_completion si disponible, sinon text_generation)."""
+
+    name = "huggingface"
+
+    def __init__(self, token: Optional[str] = None, model: Optional[str] = None,
+                 max_new_tokens: int = 512):
+        super().__init__(model or os.getenv("KG_HF_MODEL", DEFAULT_HF_MODEL))
+        self.token = token or os.getenv("HF_TOKEN", "")
+        self.max_new_tokens = max_new_tokens
+
+    def is_available(self) -> bool:
+        return bool(self.token)
+
+    def unavailable_reason(self) -> str:
+        return "HF_TOKEN non trouvé. Créez un fichier .env avec votre token."
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            limiter.acquire()
+        client = get_hf_client(model=self.model, token=self.token)
+        start = time.perf_counter()
+
+        if hasattr(client, "chat_completion"):
+            response = client.chat_completion(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                max_tokens=self.max_new_tokens,
+                temperature=0.01,
+            )
+            content = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+            record_usage(self.name, self.model, system_prompt, user_prompt, content,
+                         time.perf_counter() - start,
+                         prompt_tokens=getattr(usage, "prompt_tokens", None),
+                         completion_tokens=getattr(usage, "completion_tokens", None))
+            return content
+
+        # huggingface_hub < 0.22 : format d'instruction Mistral
+        prompt = f"<s>[INST] {system_prompt}\n\n{user_prompt} [/INST]"
+        content = client.text_generation(prompt, max_new_tokens=self.max_new_tokens,
+                                         do_sample=False)
+        record_usage(self.name, self.model, system_prompt, user_prompt, content,
+                     time.perf_counter() - start)
+        return content
+
+
+# ============================================================================
+# REMPLAÇANT LOCAL DÉTERMINISTE
+# ============================================================================
+
+# Relation par défaut selon les types (sujet, objet) lorsque le texte ne donne
+# aucun indice verbal ; les combinaisons absentes sont rejetées.
+_LOCAL_TYPE_RELATIONS = {
+    ("PER", "ORG"): "worksAt",
+    ("PER", "LOC"): "locatedIn",
+    ("PER", "PER"): "collaboratesWith",
+    ("PER", "TOPIC"): "teachesSubject",
+    ("PER", "DOC"): "author",
+    ("ORG", "LOC"): "locatedIn",
+    ("LOC", "LOC"): "locatedIn",
+}
+
+# Indices verbaux (radicaux FR/EN) → relation
+_LOCAL_VERB_CUES = [
+    (("enseign", "teach"), "teachesSubject"),
+    (("écri", "rédig", "publi", "wrote", "writ", "author"), "author"),
+    (("dirig", "manag", "direct"), "manages"),
+    (("étudi", "studi"), "studiesAt"),
+    (("travaill", "work"), "worksAt"),
+    (("collabor",), "collaboratesWith"),
+]
+
+# Relations qu'un indice verbal peut imposer pour chaque combinaison de types
+_LOCAL_CUE_ADMISSIBLE = {
+    ("PER", "ORG"): ("worksAt", "manages", "studiesAt"),
+    ("PER", "TOPIC"): ("teachesSubject", "author"),
+    ("PER", "DOC"): ("author", "teachesSubject"),
+    ("PER", "PER"): ("collaboratesWith",),
+}
+
+_LOCAL_ORG_KEYWORDS = ("université", "university", "institut", "institute", "école",
+                       "laboratoire", "cnrs", "inria", "company", "société", "lab")
+_LOCAL_TOPIC_KEYWORDS = ("rdf", "owl", "sparql", "informatique", "physique", "chimie",
+                         "mathématique", "biologie", "sémantique", "intelligence",
+                         "science", "learning", "web")
+
+_LLM_TYPE_TO_NER = {"PERSON": "PER", "ORGANIZATION": "ORG", "LOCATION": "LOC",
+                    "TOPIC": "TOPIC", "DOCUMENT": "DOC"}
+
+_SINGLE_PAIR_RE = re.compile(
+    r'Entity 1: "(?P<e1>[^"]*)" \(type: (?P<t1>\w+)\)\s*'
+    r'Entity 2: "(?P<e2>[^"]*)" \(type: (?P<t2>\w+)\)'
+)
+_BATCH_PAIR_RE = re.compile(
+    r'^\d+\. "(?P<e1>[^"]*)" \((?P<t1>\w+)\) → "(?P<e2>[^"]*)" \((?P<t2>\w+)\)'
+    r'(?: \| admissible: (?P<allowed>.*))?$',
+    re.MULTILINE
+)
+# Prompt compact : relations admissibles de la paire (ligne de RELATION_TABLE)
+_SINGLE_ADMISSIBLE_RE = re.compile(r'^Admissible: (?P<allowed>.*)$', re.MULTILINE)
+_TEXT_RE = re.compile(r'Text: "(?P<text>.*?)"\n(?:Entity 1:|\nCandidate pairs|\nEntities:)', re.DOTALL)
+_ENTITY_LIST_RE = re.compile(r'Entities detected: \[(?P<entities>.*)\]')
+# Prompt fusionné types + relations : entités numérotées avec leur type spaCy
+_FUSED_ENTITY_RE = re.compile(r'^(?P<idx>\d+)\. "(?P<entity>[^"]*)" \(spaCy: (?P<ner>\w+)\)$', re.MULTILINE)
+_NER_TO_LLM_TYPE = {ner: llm for llm, ner in _LLM_TYPE_TO_NER.items()}
+
+
+class LocalStandInBackend(LLMBackend):
+    """
+    Remplaçant local du LLM : répond aux prompts du pipeline avec des
+    étiquettes dérivées de règles simples, sans réseau.
+
+    Les réponses sont déterministes pour un prompt donné ; la latence et
+    les erreurs injectées sont tirées d'un générateur à graine fixe, donc
+    reproductibles d'une exécution à l'autre.
+
+    Utilisation :
+    -------------
+    >>> backend = LocalStandInBackend(latency=0.2, error_rate=0.05)
+    >>> set_llm_backend(backend)
+    """
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0, token_latency: float = 0.0):
+        """
+        Args:
+            latency: Latence simulée de chaque appel (secondes)
+            jitter: Variation uniforme ajoutée à la latence (± secondes)
+            error_rate: Proportion d'appels qui lèvent LLMBackendError
+            seed: Graine du générateur (latence et erreurs)
+            token_latency: Latence ajoutée par 1000 tokens de prompt (secondes),
+                           pour simuler le coût de lecture du prompt
+        """
+        super().__init__(LOCAL_MODEL)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_latency = token_latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        start = time.perf_counter()
+        content = self.respond(system_prompt, user_prompt)
+        record_usage(self.name, self.model, system_prompt, user_prompt, content,
+                     time.perf_counter() - start)
+        return content
+
+    def respond(self, system_prompt: str, user_prompt: str) -> str:
+        """Réponse avec latence et erreurs simulées (sans comptabilité des tokens)."""
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if self.token_latency:
+            prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+            delay += self.token_latency * prompt_tokens / 1000.0
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise LLMBackendError("erreur injectée par le backend local")
+        return self.answer(system_prompt, user_prompt)
+
+    # ── Règles ──────────────────────────────────────────────────────────────
+
+    def answer(self, system_prompt: str, user_prompt: str) -> str:
+        """Réponse déterministe au prompt, selon la tâche reconnue."""
+        system = system_prompt.lower()
+        if "types and relations" in system:
+            return json.dumps(self._fused_answer(user_prompt), ensure_ascii=False)
+        if "relation extraction" in system:
+            text = self._context_text(user_prompt)
+            if "json array" in system:
+                pairs = _BATCH_PAIR_RE.finditer(user_prompt)
+                return json.dumps([
+                    self._relation_for(m["t1"], m["t2"], text,
+                                       [a.strip() for a in (m["allowed"] or "").split(",") if a.strip()])
+                    for m in pairs
+                ])
+            match = _SINGLE_PAIR_RE.search(user_prompt)
+            if not match:
+                return "NO_VALID_RELATIONS"
+            admissible = _SINGLE_ADMISSIBLE_RE.search(user_prompt)
+            allowed = ([a.strip() for a in admissible["allowed"].split(",") if a.strip()]
+                       if admissible else None)
+            return self._relation_for(match["t1"], match["t2"], text, allowed)
+        if "classifier" in system:
+            return json.dumps(self._classify_entities(user_prompt), ensure_ascii=False)
+        if "entity extraction" in system:
+            return "[]"
+        if "ontology" in system:
+            return json.dumps({"classes": [], "properties": []})
+        return ""
+
+    @staticmethod
+    def _context_text(user_prompt: str) -> str:
+        match = _TEXT_RE.search(user_prompt)
+        return match["text"].lower() if match else user_prompt.lower()
+
+    @staticmethod
+    def _relation_for(type1: str, type2: str, text: str,
+                      allowed: Optional[List[str]] = None) -> str:
+        relation = _LOCAL_TYPE_RELATIONS.get((type1, type2))
+        if relation is None:
+            return "NO_VALID_RELATIONS"
+        cue_candidates = _LOCAL_CUE_ADMISSIBLE.get((type1, type2), ())
+        for stems, cue_relation in _LOCAL_VERB_CUES:
+            if cue_relation in cue_candidates and any(stem in text for stem in stems):
+                relation = cue_relation
+                break
+        if allowed and relation not in allowed:
+            return "NO_VALID_RELATIONS"
+        return relation
+
+    @staticmethod
+    def _classify_entity(entity: str) -> Optional[str]:
+        lowered = entity.lower()
+        if any(keyword in lowered for keyword in _LOCAL_ORG_KEYWORDS):
+            return "ORGANIZATION"
+        if any(keyword in lowered for keyword in _LOCAL_TOPIC_KEYWORDS):
+            return "TOPIC"
+        return None
+
+    @classmethod
+    def _classify_entities(cls, user_prompt: str) -> Dict[str, str]:
+        match = _ENTITY_LIST_RE.search(user_prompt)
+        if not match:
+            return {}
+        classification = {}
+        for entity in re.findall(r'"([^"]*)"', match["entities"]):
+            entity_type = cls._classify_entity(entity)
+            if entity_type:
+                classification[entity] = entity_type
+        return classification
+
+    @classmethod
+    def _fused_answer(cls, user_prompt: str) -> Dict[str, object]:
+        """Types (mots-clés, sinon type spaCy) puis relation de chaque paire i < j."""
+        text = cls._context_text(user_prompt)
+        types = {}
+        for match in _FUSED_ENTITY_RE.finditer(user_prompt):
+            entity_type = cls._classify_entity(match["entity"]) or _NER_TO_LLM_TYPE.get(match["ner"])
+            if entity_type:
+                types[match["idx"]] = entity_type
+        relations = []
+        indices = sorted(types, key=int)
+        for position, idx1 in enumerate(indices):
+            for idx2 in indices[position + 1:]:
+                relation = cls._relation_for(_LLM_TYPE_TO_NER[types[idx1]],
+                                             _LLM_TYPE_TO_NER[types[idx2]], text)
+                if relation != "NO_VALID_RELATIONS":
+                    relations.append([int(idx1), int(idx2), relation])
+        return {"types": types, "relations": relations}
+
+
+# ============================================================================
+# SERVEUR HTTP COMPATIBLE API GROQ (OpenAI chat.completions)
+# ============================================================================
+
+def _estimated_usage(system_prompt: str, user_prompt: str, content: str) -> Dict[str, int]:
+    prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+    completion_tokens = estimate_tokens(content)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+class LocalStandInServer:
+    """
+    Serveur HTTP local exposant POST /openai/v1/chat/completions.
+
+    Les réponses viennent d'un LocalStandInBackend ; une erreur injectée
+    devient une réponse HTTP 503, comme un service surchargé.
+    """
+
+    def __init__(self, backend: Optional[LocalStandInBackend] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend or LocalStandInBackend()
+        backend = self.backend
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                messages = payload.get("messages", [])
+                system_prompt = next((m["content"] for m in messages if m.get("role") == "system"), "")
+                user_prompt = next((m["content"] for m in messages if m.get("role") == "user"), "")
+                try:
+                    content = backend.respond(system_prompt, user_prompt)
+                except LLMBackendError as e:
+                    self._send(503, {"error": {"message": str(e), "type": "service_unavailable"}})
+                    return
+                self._send(200, {
+                    "id": f"local-{backend.calls}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": payload.get("model", LOCAL_MODEL),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": _estimated_usage(system_prompt, user_prompt, content),
+                })
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def start(self) -> "LocalStandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# BACKEND ACTIF
+# ============================================================================
+
+_active_backend = None
+_active_backend_lock = threading.Lock()
+
+
+def create_backend(name: str) -> LLMBackend:
+    """Construit un backend à partir de son nom (groq, huggingface, local)."""
+    name = (name or "groq").strip().lower()
+    if name == "groq":
+        return GroqBackend()
+    if name in ("huggingface", "hf"):
+        return HuggingFaceBackend()
+    if name in ("local", "standin"):
+        return LocalStandInBackend(
+            latency=float(os.getenv("KG_LOCAL_LLM_LATENCY", "0")),
+            jitter=float(os.getenv("KG_LOCAL_LLM_JITTER", "0")),
+            error_rate=float(os.getenv("KG_LOCAL_LLM_ERROR_RATE", "0")),
+            token_latency=float(os.getenv("KG_LOCAL_LLM_TOKEN_LATENCY", "0")),
+        )
+    raise ValueError(f"backend LLM inconnu : {name!r} (groq | huggingface | local)")
+
+
+def get_llm_backend() -> LLMBackend:
+    """
+    Retourne le backend utilisé par tous les modules du processus (KG_LLM_BACKEND).
+
+    Le backend configuré est enveloppé par la couche de résilience (retry,
+    disjoncteur, requêtes couvertes) sauf si KG_LLM_RESILIENCE=0.
+    """
+    global _active_backend
+    with _active_backend_lock:
+        if _active_backend is None:
+            from llm_resilience import make_resilient
+            _active_backend = make_resilient(create_backend(os.getenv("KG_LLM_BACKEND", "groq")))
+        return _active_backend
+
+
+def set_llm_backend(backend: Optional[LLMBackend]):
+    """Remplace le backend actif (None = relire KG_LLM_BACKEND au prochain appel)."""
+    global _active_backend
+    with _active_backend_lock:
+        _active_backend = backend
+
+
+# ============================================================================
+# EXÉCUTION DIRECTE : SERVEUR LOCAL
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur LLM local compatible API Groq")
+    parser.add_argument("--serve", action="store_true", help="Démarrer le serveur HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence simulée (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variation de latence (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion d'erreurs 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="Latence ajoutée par 1000 tokens de prompt (s)")
+    args = parser.parse_args()
+
+    if not args.serve:
+        parser.print_help()
+    else:
+        server = LocalStandInServer(
+            LocalStandInBackend(args.latency, args.jitter, args.error_rate, args.seed,
+                                args.token_latency),
+            host=args.host, port=args.port,
+        )
+        print(f"🚀 Backend LLM local : {server.base_url}")
+        print(f"   export GROQ_BASE_URL={server.base_url}")
+        try:
+            server._server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Serveur arrêté")
+            server.stop()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHE PERSISTANT DES RÉPONSES LLM (SQLite)
+
+Tous les appels LLM du pipeline (relations, raffinement des types, extension
+d'ontologie, fallback NER) sont faits à température 0 avec des prompts
+déterministes : une même requête produit toujours la même réponse. Ce module
+mémorise ces réponses sur disque pour qu'une ré-exécution (suite de validation,
+re-traitement d'un corpus) ne repaye pas la latence réseau.
+
+Caractéristiques :
+==================
+1. Clé = (modèle, prompt système, hash du prompt utilisateur)
+2. Stockage local SQLite (un seul fichier, sans dépendance externe)
+3. Éviction LRU bornée en nombre d'entrées
+4. TTL optionnel (expiration des entrées anciennes)
+5. Compteurs hits / misses / évictions
+6. Invalidation par version d'ontologie
+
+Configuration (.env) :
+======================
+KG_LLM_CACHE          Chemin du fichier SQLite, ou "0" pour désactiver
+KG_LLM_CACHE_MAX      Nombre maximal d'entrées (défaut : 10000)
+KG_LLM_CACHE_TTL      Durée de vie en secondes (défaut : aucune expiration)
+KG_ONTOLOGY_VERSION   Version de l'ontologie associée aux entrées
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from kg_metrics import get_metrics
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_CACHE_PATH = os.path.join(".kg_cache", "llm_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_ONTOLOGY_VERSION = "1"
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : LLMResponseCache
+# ============================================================================
+
+class LLMResponseCache:
+    """
+    Cache persistant des réponses LLM avec éviction LRU.
+
+    Utilisation :
+    -------------
+    >>> cache = LLMResponseCache("cache.sqlite3", max_entries=1000)
+    >>> answer = cache.get_or_compute(model, system_prompt, user_prompt,
+    ...                               lambda: call_llm(system_prompt, user_prompt))
+    >>> cache.stats()
+    {'hits': 0, 'misses': 1, 'evictions': 0, 'entries': 1, ...}
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: Optional[float] = None,
+        ontology_version: str = DEFAULT_ONTOLOGY_VERSION,
+    ):
+        """
+        Initialise le cache et crée la table si nécessaire.
+
+        Args:
+            db_path: Fichier SQLite (":memory:" pour un cache non persistant)
+            max_entries: Nombre maximal d'entrées avant éviction LRU
+            ttl_seconds: Durée de vie d'une entrée (None = pas d'expiration)
+            ontology_version: Version d'ontologie ; les entrées d'une autre
+                              version sont ignorées
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.ontology_version = ontology_version
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        # Un verrou protège la connexion partagée entre threads
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        """Ouvre la connexion SQLite et crée la table si nécessaire."""
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key              TEXT PRIMARY KEY,
+                model            TEXT NOT NULL,
+                ontology_version TEXT NOT NULL,
+                response         TEXT NOT NULL,
+                created_at       REAL NOT NULL,
+                last_access      REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_last_access ON llm_responses(last_access)"
+        )
+        self._conn.commit()
+
+    # ── Clés ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str) -> str:
+        """Clé stable : sha256(modèle, prompt système, sha256(prompt utilisateur))."""
+        user_hash = hashlib.sha256(user_prompt.encode("utf-8")).hexdigest()
+        raw = "\x1f".join([model, system_prompt, user_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ── Lecture / écriture ──────────────────────────────────────────────────
+
+    def get(self, model: str, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """
+        Retourne la réponse mémorisée, ou None (miss, expirée ou autre version).
+        """
+        key = self.make_key(model, system_prompt, user_prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at, ontology_version FROM llm_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                get_metrics().inc("kg_llm_cache_lookups_total", result="miss")
+                return None
+
+            response, created_at, version = row
+            expired = self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+            if expired or version != self.ontology_version:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                get_metrics().inc("kg_llm_cache_lookups_total", result="miss")
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            get_metrics().inc("kg_llm_cache_lookups_total", result="hit")
+            return response
+
+    def put(self, model: str, system_prompt: str, user_prompt: str, response: str):
+        """Mémorise une réponse puis applique l'éviction LRU si nécessaire."""
+        key = self.make_key(model, system_prompt, user_prompt)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, ontology_version, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, self.ontology_version, response, now, now),
+            )
+            self._evict_if_needed()
+            self._conn.commit()
+
+    def get_or_compute(
+        self,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        compute: Callable[[], str],
+    ) -> str:
+        """
+        Retourne la réponse mémorisée ou appelle compute() et mémorise son résultat.
+
+        Les exceptions levées par compute() sont propagées et rien n'est mémorisé.
+        """
+        cached = self.get(model, system_prompt, user_prompt)
+        if cached is not None:
+            return cached
+        response = compute()
+        if isinstance(response, str):
+            self.put(model, system_prompt, user_prompt, response)
+        return response
+
+    def _evict_if_needed(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_entries."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN ("
+                "SELECT key FROM llm_responses ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    # ── Invalidation ────────────────────────────────────────────────────────
+
+    def set_ontology_version(self, version: str, purge: bool = True) -> int:
+        """
+        Change la version d'ontologie courante.
+
+        Args:
+            version: Nouvelle version (ex : hash de la T-Box)
+            purge: Supprime immédiatement les entrées des autres versions
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        self.ontology_version = version
+        return self.invalidate_other_versions() if purge else 0
+
+    def invalidate_other_versions(self) -> int:
+        """Supprime les entrées produites avec une autre version d'ontologie."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE ontology_version != ?",
+                (self.ontology_version,),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Vide entièrement le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    # ── Statistiques ────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs du cache depuis sa création."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def reopen_after_fork(self):
+        """
+        Nouvelle connexion SQLite dans un processus fils (pool de workers).
+
+        La connexion héritée du parent n'est ni utilisée ni fermée : la fermer
+        relâcherait les verrous de fichier que le parent détient encore.
+        Un cache ":memory:" repart vide.
+        """
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._connect()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NullLLMCache:
+    """Cache désactivé (KG_LLM_CACHE=0) : même interface, aucune mémorisation."""
+
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    def get(self, model, system_prompt, user_prompt):
+        return None
+
+    def put(self, model, system_prompt, user_prompt, response):
+        pass
+
+    def get_or_compute(self, model, system_prompt, user_prompt, compute):
+        return compute()
+
+    def set_ontology_version(self, version, purge=True):
+        return 0
+
+    def invalidate_other_versions(self):
+        return 0
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def stats(self):
+        return {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "hit_rate": 0.0}
+
+    def reopen_after_fork(self):
+        pass
+
+
+# ============================================================================
+# INSTANCE PARTAGÉE
+# ============================================================================
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Retourne le cache partagé par tous les modules du processus.
+
+    Construit à la première utilisation à partir des variables d'environnement.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            path = os.getenv("KG_LLM_CACHE", DEFAULT_CACHE_PATH)
+            if path in ("0", "", "off"):
+                _shared_cache = NullLLMCache()
+            else:
+                ttl = os.getenv("KG_LLM_CACHE_TTL")
+                _shared_cache = LLMResponseCache(
+                    db_path=path,
+                    max_entries=int(os.getenv("KG_LLM_CACHE_MAX", DEFAULT_MAX_ENTRIES)),
+                    ttl_seconds=float(ttl) if ttl else None,
+                    ontology_version=os.getenv("KG_ONTOLOGY_VERSION", DEFAULT_ONTOLOGY_VERSION),
+                )
+        return _shared_cache
+
+
+def set_llm_cache(cache):
+    """Remplace le cache partagé (tests, cache en mémoire, désactivation)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        _shared_cache = cache
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+REGISTRE DES CLIENTS LLM DU PROCESSUS
+
+Construire un client Groq à chaque appel coûte la configuration du client et,
+surtout, une nouvelle connexion TCP + TLS vers l'API. Ce module conserve un
+client configuré par backend (et par clé) pour toute la durée du processus,
+avec un pool de connexions HTTP keep-alive partagé entre les appels.
+
+Clients gérés :
+===============
+1. Groq           → get_groq_client(api_key)
+2. Hugging Face   → get_hf_client(model, token)
+
+Configuration (.env) :
+======================
+KG_LLM_MAX_CONNECTIONS     Connexions simultanées par client (défaut : 20)
+KG_LLM_KEEPALIVE           Connexions keep-alive conservées (défaut : 10)
+KG_LLM_KEEPALIVE_EXPIRY    Durée de vie d'une connexion inactive en s (défaut : 60)
+KG_LLM_TIMEOUT             Timeout d'une requête en secondes (défaut : 30)
+
+Les SDK (groq, huggingface_hub, httpx : environ 0,5 s d'import) sont importés
+à la création du premier client : une exécution servie par le backend
+local, le cache LLM ou les règles ne les charge jamais.
+"""
+
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    from groq import Groq
+    from huggingface_hub import InferenceClient
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_TIMEOUT = 30.0
+
+
+def _http_limits() -> "httpx.Limits":
+    """Limites du pool de connexions, lues depuis l'environnement."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.getenv("KG_LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv("KG_LLM_KEEPALIVE", DEFAULT_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(os.getenv("KG_LLM_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+
+
+def _http_timeout() -> float:
+    return float(os.getenv("KG_LLM_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+# ============================================================================
+# REGISTRE
+# ============================================================================
+
+_lock = threading.Lock()
+_groq_clients: Dict[Optional[str], "Groq"] = {}
+_hf_clients: Dict[Tuple[Optional[str], Optional[str]], "InferenceClient"] = {}
+
+
+def get_groq_client(api_key: Optional[str] = None) -> "Groq":
+    """
+    Retourne le client Groq partagé associé à cette clé API.
+
+    Le client est créé au premier appel avec un httpx.Client dont le pool
+    garde les connexions ouvertes ; les appels suivants réutilisent la même
+    connexion TLS. Le client est thread-safe et peut être partagé.
+
+    Args:
+        api_key (str): Clé API Groq (défaut : GROQ_API_KEY)
+
+    Returns:
+        Groq: Client configuré
+    """
+    if api_key is None:
+        api_key = os.getenv("GROQ_API_KEY")
+
+    with _lock:
+        client = _groq_clients.get(api_key)
+        if client is None:
+            import httpx
+            from groq import Groq
+
+            http_client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+            # Pas de retry interne au SDK : llm_resilience.py décide des nouvelles tentatives
+            client = Groq(api_key=api_key, http_client=http_client, timeout=_http_timeout(),
+                          max_retries=0)
+            _groq_clients[api_key] = client
+        return client
+
+
+def get_hf_client(model: Optional[str] = None, token: Optional[str] = None) -> "InferenceClient":
+    """
+    Retourne le client Hugging Face partagé pour ce couple (modèle, token).
+
+    huggingface_hub s'appuie déjà sur une session HTTP commune ; conserver
+    l'InferenceClient évite de reconstruire en-têtes et configuration.
+
+    Args:
+        model (str): Modèle par défaut du client (None = fourni à chaque appel)
+        token (str): Token Hugging Face (défaut : HF_TOKEN)
+
+    Returns:
+        InferenceClient: Client configuré
+    """
+    if token is None:
+        token = os.getenv("HF_TOKEN")
+
+    key = (model, token)
+    with _lock:
+        client = _hf_clients.get(key)
+        if client is None:
+            from huggingface_hub import InferenceClient
+
+            client = InferenceClient(model=model, token=token, timeout=_http_timeout())
+            _hf_clients[key] = client
+        return client
+
+
+def close_all_clients():
+    """Ferme les pools de connexions et vide le registre (fin de processus, tests)."""
+    with _lock:
+        for client in _groq_clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _groq_clients.clear()
+        _hf_clients.clear()
+
+
+def reset_after_fork():
+    """
+    Vide le registre dans un processus fils (pool de workers), sans fermer.
+
+    Les pools de connexions hérités appartiennent au parent : les fermer ici
+    couperait ses connexions TLS. Le fils recrée ses propres clients.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _groq_clients.clear()
+    _hf_clients.clear()
+
+
+def registry_stats() -> Dict[str, int]:
+    """Nombre de clients actuellement enregistrés par backend."""
+    with _lock:
+        return {"groq": len(_groq_clients), "huggingface": len(_hf_clients)}
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LIMITEUR DE DÉBIT DES APPELS LLM (TOKEN BUCKET)
+
+Dès que les appels LLM partent en parallèle, le quota du fournisseur devient
+la vraie limite : au-delà, l'API répond 429 et le pipeline retombe sur les
+heuristiques de fallback. Ce module régule le débit des requêtes réseau avec
+un seau à jetons partagé par tout le processus.
+
+Principe :
+==========
+- Le seau contient au plus `capacity` jetons (rafale autorisée)
+- Il se remplit de `rate` jetons par seconde (quota moyen)
+- Chaque requête consomme un jeton ; s'il n'y en a pas, l'appelant attend
+
+Le limiteur est thread-safe (acquire) : les prédictions concurrentes de
+concurrent_relations.py s'exécutent dans des threads (run_in_executor) et
+appellent acquire() via le backend LLM.
+
+Configuration (.env) :
+======================
+KG_LLM_RPM     Requêtes par minute autorisées (défaut : 30, quota Groq gratuit ;
+               "0" pour désactiver la limitation)
+KG_LLM_BURST   Taille de rafale (défaut : 5)
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from kg_tracing import record_span
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_BURST = 5
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : TokenBucket
+# ============================================================================
+
+class TokenBucket:
+    """
+    Seau à jetons : débit moyen `rate` req/s, rafale maximale `capacity`.
+
+    Utilisation :
+    -------------
+    >>> bucket = TokenBucket(rate=0.5, capacity=5)   # 30 req/min
+    >>> bucket.acquire()              # attend un jeton si nécessaire
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock=time.monotonic):
+        """
+        Args:
+            rate: Jetons ajoutés par seconde (> 0)
+            capacity: Nombre maximal de jetons accumulés
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        if rate <= 0:
+            raise ValueError("rate doit être strictement positif")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """
+        Réserve un jeton et retourne le temps d'attente nécessaire (0 si disponible).
+
+        Le jeton est décompté immédiatement (solde éventuellement négatif) : les
+        appelants concurrents sont ainsi servis dans leur ordre d'arrivée.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            self.acquired += 1
+            self.total_wait += wait
+            return wait
+
+    def split(self, parts: int) -> "TokenBucket":
+        """
+        Part du seau pour un processus parmi `parts` (pool de workers).
+
+        Débit et rafale sont divisés sans plancher, et chaque part démarre
+        avec sa fraction de jetons : la rafale cumulée des parts ne dépasse
+        jamais celle du seau d'origine (une part de moins d'un jeton fait
+        attendre la fraction manquante).
+        """
+        share = TokenBucket(self.rate / parts, clock=self._clock)
+        share.capacity = share._tokens = self.capacity / parts
+        return share
+
+    def acquire(self):
+        """Attend (bloquant) qu'un jeton soit disponible puis le consomme."""
+        wait = self._reserve()
+        if wait > 0:
+            start = time.perf_counter()
+            time.sleep(wait)
+            record_span("llm.rate_limit_wait", start, wait_s=round(wait, 6))
+
+    def stats(self):
+        """Jetons consommés et attente cumulée imposée par le quota."""
+        return {"acquired": self.acquired, "total_wait": round(self.total_wait, 3)}
+
+
+# ============================================================================
+# INSTANCE PARTAGÉE
+# ============================================================================
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+_UNSET = object()
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """
+    Retourne le limiteur partagé par les appels LLM du processus.
+
+    Construit à la première utilisation depuis KG_LLM_RPM / KG_LLM_BURST ;
+    retourne None si la limitation est désactivée (KG_LLM_RPM=0).
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            rpm = float(os.getenv("KG_LLM_RPM", DEFAULT_REQUESTS_PER_MINUTE))
+            if rpm <= 0:
+                _shared_limiter = _UNSET
+            else:
+                burst = float(os.getenv("KG_LLM_BURST", DEFAULT_BURST))
+                _shared_limiter = TokenBucket(rate=rpm / 60.0, capacity=burst)
+        return None if _shared_limiter is _UNSET else _shared_limiter
+
+
+def set_rate_limiter(limiter: Optional[TokenBucket]):
+    """Remplace le limiteur partagé (None = aucune limitation)."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        _shared_limiter = _UNSET if limiter is None else limiter
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COUCHE DE RÉSILIENCE DES APPELS LLM
+
+Sans protection, la moindre erreur du fournisseur (429, 503, coupure réseau)
+fait basculer une paire sur l'heuristique de repli, une réponse lente bloque
+toute la file, et un service dégradé est martelé de requêtes vouées à
+l'échec. ResilientBackend enveloppe n'importe quel LLMBackend :
+
+Mécanismes :
+============
+1. Retry avec backoff exponentiel « full jitter » : attente tirée dans
+   [0, min(max, base × 2^tentative)], uniquement pour les erreurs transitoires
+   (réseau, 408, 409, 429, 5xx) ; une erreur 4xx définitive n'est pas répétée
+2. Disjoncteur (circuit breaker) : après N échecs consécutifs, les appels
+   sont refusés immédiatement pendant `reset_timeout` secondes ; le pipeline
+   passe alors en mode « règles seules ». Un unique appel sonde (half-open)
+   referme le circuit s'il réussit
+3. Requêtes couvertes (hedging, optionnel) : si la réponse n'est pas arrivée
+   après le p95 des latences récentes, une requête dupliquée est lancée et la
+   première réponse gagne (coût : une requête de plus sur la traîne)
+
+Chaque mécanisme est comptabilisé (stats()) : tentatives, retries, temps de
+backoff, ouvertures du disjoncteur, appels refusés, requêtes couvertes et
+gagnées, latences p50/p95. Les compteurs sont aussi exportés dans le registre
+kg_metrics (kg_llm_resilience_events_total, kg_llm_backoff_seconds_total,
+kg_llm_breaker_opened_total).
+
+Le client Groq du registre est créé sans retry interne (max_retries=0) :
+les nouvelles tentatives sont décidées ici, une seule fois.
+
+Configuration (.env) :
+======================
+KG_LLM_RESILIENCE         1 = backend actif enveloppé (défaut), 0 = appels bruts
+KG_LLM_MAX_RETRIES        Nouvelles tentatives après un échec transitoire (défaut : 2)
+KG_LLM_BACKOFF_BASE       Attente de base du backoff en secondes (défaut : 0.5)
+KG_LLM_BACKOFF_MAX        Attente maximale d'un backoff en secondes (défaut : 8)
+KG_LLM_BREAKER_THRESHOLD  Échecs consécutifs qui ouvrent le disjoncteur (défaut : 5)
+KG_LLM_BREAKER_RESET      Durée d'ouverture avant l'appel sonde, en secondes (défaut : 30)
+KG_LLM_HEDGE              1 = requêtes couvertes au-delà du p95 (défaut : 0)
+KG_LLM_HEDGE_MIN_SAMPLES  Latences observées avant d'activer la couverture (défaut : 20)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+from kg_metrics import get_metrics
+from llm_backends import LLMBackend, LLMBackendError
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Codes HTTP qui justifient une nouvelle tentative
+RETRYABLE_STATUS_CODES = frozenset([408, 409, 429, 500, 502, 503, 504])
+
+# Fils d'exécution disponibles pour les requêtes couvertes
+HEDGE_WORKERS = 16
+
+
+class CircuitOpenError(LLMBackendError):
+    """Appel refusé : le disjoncteur est ouvert (fournisseur jugé dégradé)."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Erreur transitoire ?
+
+    Les erreurs HTTP des SDK exposent `status_code` : seuls les codes de
+    RETRYABLE_STATUS_CODES sont répétés. Une erreur sans code (réseau,
+    délai dépassé, erreur injectée par le backend local) est transitoire.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        response = getattr(exc, "response", None)
+        status_code = getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in RETRYABLE_STATUS_CODES
+    return True
+
+
+# ============================================================================
+# BACKOFF EXPONENTIEL
+# ============================================================================
+
+class RetryPolicy:
+    """
+    Nombre de tentatives et attente entre deux tentatives (full jitter).
+
+    Utilisation :
+    -------------
+    >>> policy = RetryPolicy(max_retries=2, base_delay=0.5, max_delay=8)
+    >>> policy.backoff(0)   # ∈ [0, 0.5]
+    >>> policy.backoff(3)   # ∈ [0, 4.0]
+    """
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5,
+                 max_delay: float = 8.0, rng: Optional[random.Random] = None):
+        """
+        Args:
+            max_retries: Nouvelles tentatives après le premier échec
+            base_delay: Attente de base (secondes)
+            max_delay: Plafond de l'attente (secondes)
+            rng: Générateur aléatoire (injectable pour les tests)
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Attente avant la tentative attempt+1 (attempt = 0 après le premier échec)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self._rng.uniform(0.0, ceiling)
+
+
+# ============================================================================
+# DISJONCTEUR
+# ============================================================================
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états : closed → open → half_open → closed.
+
+    - closed    : les appels passent ; `failure_threshold` échecs consécutifs l'ouvrent
+    - open      : tout appel est refusé pendant `reset_timeout` secondes
+    - half_open : un seul appel sonde ; succès → closed, échec → open
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock=time.monotonic):
+        """
+        Args:
+            failure_threshold: Échecs consécutifs avant ouverture
+            reset_timeout: Durée d'ouverture avant l'appel sonde (secondes)
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def is_open(self) -> bool:
+        """Vrai tant que les appels sont refusés (la sonde n'est pas encore autorisée)."""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Réserve le droit d'appeler ; faux si le circuit refuse l'appel."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (
+                    state == self.CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+                self.times_opened += 1
+                get_metrics().inc("kg_llm_breaker_opened_total")
+
+    def stats(self) -> Dict[str, object]:
+        return {"state": self.state, "times_opened": self.times_opened, "rejected": self.rejected}
+
+
+# ============================================================================
+# LATENCES RÉCENTES (SEUIL DE COUVERTURE)
+# ============================================================================
+
+class LatencyWindow:
+    """Dernières latences réussies et leurs quantiles."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantile q ∈ [0, 1] des latences récentes (None si aucune)."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : ResilientBackend
+# ============================================================================
+
+class ResilientBackend(LLMBackend):
+    """
+    Enveloppe un LLMBackend avec retry, disjoncteur et requêtes couvertes.
+
+    Le modèle (et donc la clé du cache LLM) est celui du backend enveloppé.
+
+    Utilisation :
+    -------------
+    >>> backend = ResilientBackend(GroqBackend(), hedge=True)
+    >>> set_llm_backend(backend)
+    >>> backend.stats()
+    {'calls': 12, 'attempts': 14, 'retries': 2, ...}
+    """
+
+    def __init__(self, backend: LLMBackend,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge: bool = False, hedge_min_samples: int = 20,
+                 sleep=time.sleep):
+        """
+        Args:
+            backend: Backend enveloppé (Groq, Hugging Face, local)
+            retry_policy: Politique de retry (défaut : RetryPolicy())
+            breaker: Disjoncteur (défaut : CircuitBreaker())
+            hedge: Lancer une requête dupliquée au-delà du p95 des latences
+            hedge_min_samples: Latences observées avant d'activer la couverture
+            sleep: Fonction d'attente du backoff (injectable pour les tests)
+        """
+        super().__init__(backend.model)
+        self.backend = backend
+        self.name = backend.name
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyWindow()
+        self._sleep = sleep
+        self._executor = None
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._backoff_total = 0.0
+
+    @classmethod
+    def from_env(cls, backend: LLMBackend) -> "ResilientBackend":
+        return cls(
+            backend,
+            retry_policy=RetryPolicy(
+                max_retries=int(os.getenv("KG_LLM_MAX_RETRIES", "2")),
+                base_delay=float(os.getenv("KG_LLM_BACKOFF_BASE", "0.5")),
+                max_delay=float(os.getenv("KG_LLM_BACKOFF_MAX", "8")),
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("KG_LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("KG_LLM_BREAKER_RESET", "30")),
+            ),
+            hedge=os.getenv("KG_LLM_HEDGE", "0") == "1",
+            hedge_min_samples=int(os.getenv("KG_LLM_HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    # ── Interface LLMBackend ────────────────────────────────────────────────
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def unavailable_reason(self) -> str:
+        return self.backend.unavailable_reason()
+
+    def is_degraded(self) -> bool:
+        return self.breaker.is_open()
+
+    def complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Appel avec retry/backoff ; lève CircuitOpenError si le circuit est ouvert."""
+        self._count("calls")
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                self._count("short_circuited")
+                raise CircuitOpenError("disjoncteur LLM ouvert : appel refusé")
+
+            self._count("attempts")
+            try:
+                response = self._call(system_prompt, user_prompt)
+            except Exception as exc:
+                self._count("failures")
+                self.breaker.record_failure()
+                if not is_retryable(exc):
+                    self._count("non_retryable")
+                    raise
+                if attempt >= self.retry_policy.max_retries:
+                    self._count("retries_exhausted")
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                attempt += 1
+                self._count("retries")
+                with self._lock:
+                    self._backoff_total += delay
+                get_metrics().inc("kg_llm_backoff_seconds_total", delay, backend=self.name)
+                self._sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self._count("successes")
+            return response
+
+    # ── Appel (éventuellement couvert) ──────────────────────────────────────
+
+    def hedge_delay(self) -> Optional[float]:
+        """Délai avant la requête dupliquée (p95 récent), None si couverture inactive."""
+        if not self.hedge or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.quantile(0.95)
+
+    def _timed_call(self, system_prompt: str, user_prompt: str) -> str:
+        start = time.perf_counter()
+        response = self.backend.complete(system_prompt, user_prompt)
+        self.latencies.record(time.perf_counter() - start)
+        return response
+
+    def _call(self, system_prompt: str, user_prompt: str) -> str:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed_call(system_prompt, user_prompt)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed_call, system_prompt, user_prompt)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        # Réponse plus lente que le p95 : une seconde requête part en parallèle
+        self._count("hedges_launched")
+        hedge = executor.submit(self._timed_call, system_prompt, user_prompt)
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedges_won")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS,
+                                                    thread_name_prefix="kg-llm-hedge")
+            return self._executor
+
+    # ── Métriques ───────────────────────────────────────────────────────────
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counters[key] += 1
+        get_metrics().inc("kg_llm_resilience_events_total", backend=self.name, event=key)
+
+    def stats(self) -> Dict[str, object]:
+        """Compteurs de résilience, état du disjoncteur et latences (ms)."""
+        with self._lock:
+            stats = {key: self._counters[key] for key in (
+                "calls", "attempts", "successes", "failures", "retries",
+                "retries_exhausted", "non_retryable", "short_circuited",
+                "hedges_launched", "hedges_won")}
+            stats["backoff_total"] = round(self._backoff_total, 3)
+        breaker = self.breaker.stats()
+        stats["breaker_state"] = breaker["state"]
+        stats["breaker_opened"] = breaker["times_opened"]
+        for name, q in (("latency_p50_ms", 0.5), ("latency_p95_ms", 0.95)):
+            value = self.latencies.quantile(q)
+            stats[name] = None if value is None else round(value * 1000, 1)
+        return stats
+
+    def __repr__(self):
+        return f"ResilientBackend({self.backend!r})"
+
+
+def make_resilient(backend: LLMBackend) -> LLMBackend:
+    """Enveloppe `backend` selon la configuration (KG_LLM_RESILIENCE=0 : inchangé)."""
+    if os.getenv("KG_LLM_RESILIENCE", "1") == "0" or isinstance(backend, ResilientBackend):
+        return backend
+    return ResilientBackend.from_env(backend)
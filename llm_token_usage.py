@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMPTABILITÉ DES TOKENS DES APPELS LLM
+
+Le coût (quota, facturation) et la latence d'un appel LLM croissent avec le
+nombre de tokens envoyés : un prompt qui répète les mêmes règles à chaque
+paire paie ces règles à chaque appel. Ce module enregistre, pour chaque
+appel réseau, les tokens d'entrée et de sortie et la latence observée.
+
+Sources des comptes :
+=====================
+- Exacts lorsque le fournisseur les renvoie (champ `usage` de l'API Groq /
+  OpenAI, y compris le serveur local compatible)
+- Estimés sinon (Hugging Face text_generation, remplaçant local en
+  processus) : mots découpés par tranches de 4 caractères + 1 token par
+  signe de ponctuation, approximation proche des tokenizers BPE
+
+Les réponses servies par le cache LLM ne sont pas comptées (aucun coût).
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, List, Optional
+
+from kg_metrics import get_metrics
+from kg_tracing import record_span
+
+_TOKEN_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Appels conservés en détail (as_dicts) ; les totaux couvrent tous les appels
+RECENT_RECORDS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation du nombre de tokens BPE d'un texte."""
+    count = 0
+    for piece in _TOKEN_PIECE_RE.findall(text or ""):
+        count += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+    return count
+
+
+@dataclass
+class TokenUsage:
+    """Tokens et latence d'un appel réseau"""
+    backend: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float            # secondes
+    estimated: bool           # True = compte estimé, False = renvoyé par le fournisseur
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TokenUsageStats:
+    """
+    Appels LLM enregistrés par le processus (thread-safe).
+
+    Totaux cumulés, plus les RECENT_RECORDS derniers appels pour le détail :
+    l'objet vit tout le processus (service, corpus, workers) sans grossir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, usage: TokenUsage):
+        with self._lock:
+            self.records.append(usage)
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+            self.latency += usage.latency
+            self.estimated_calls += usage.estimated
+
+    def reset(self):
+        with self._lock:
+            self.records: Deque[TokenUsage] = deque(maxlen=RECENT_RECORDS)
+            self.calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.latency = 0.0
+            self.estimated_calls = 0
+
+    def summary(self) -> Dict[str, object]:
+        """Totaux et moyennes par appel."""
+        with self._lock:
+            calls, latency = self.calls, self.latency
+            prompt_tokens, completion_tokens = self.prompt_tokens, self.completion_tokens
+            estimated_calls = self.estimated_calls
+        return {
+            "calls": calls,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_per_call": round(prompt_tokens / calls, 1) if calls else 0.0,
+            "latency_total": round(latency, 3),
+            "latency_per_call_ms": round(latency / calls * 1000, 1) if calls else 0.0,
+            "estimated_calls": estimated_calls,
+        }
+
+    def as_dicts(self) -> List[Dict[str, object]]:
+        """Derniers appels enregistrés (au plus RECENT_RECORDS), du plus ancien au plus récent."""
+        with self._lock:
+            return [asdict(r) for r in self.records]
+
+
+_shared_stats = TokenUsageStats()
+
+
+def get_token_usage_stats() -> TokenUsageStats:
+    """Compteurs partagés par tous les backends du processus."""
+    return _shared_stats
+
+
+def record_usage(backend: str, model: str, system_prompt: str, user_prompt: str,
+                 response: str, latency: float, prompt_tokens: Optional[int] = None,
+                 completion_tokens: Optional[int] = None) -> TokenUsage:
+    """
+    Enregistre un appel ; les comptes absents (ou nuls) sont estimés.
+
+    Returns:
+        TokenUsage: L'enregistrement ajouté
+    """
+    estimated = not prompt_tokens
+    if estimated:
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        completion_tokens = estimate_tokens(response)
+    usage = TokenUsage(backend, model, int(prompt_tokens), int(completion_tokens or 0),
+                       latency, estimated)
+    _shared_stats.record(usage)
+
+    metrics = get_metrics()
+    metrics.inc("kg_llm_calls_total", backend=backend)
+    metrics.inc("kg_llm_tokens_total", usage.prompt_tokens, backend=backend, kind="prompt")
+    metrics.inc("kg_llm_tokens_total", usage.completion_tokens, backend=backend, kind="completion")
+    metrics.observe("kg_llm_latency_seconds", latency, backend=backend)
+
+    # Span rétroactif : l'appel vient de se terminer après `latency` secondes
+    end = time.perf_counter()
+    record_span("llm.call", end - latency, end, backend=backend, model=model,
+                prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+    return usage
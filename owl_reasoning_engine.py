@@ -21,6 +21,9 @@ Révision : Ajout raisonnement OWL réel (conformité audit)
 from rdflib import Graph, URIRef, Literal, Namespace, RDF, RDFS, OWL
 from typing import Tuple, List, Set, Optional, Dict
 
+from kg_metrics import get_metrics
+from kg_tracing import span
+
 # Import conditionnel de owlrl
 try:
     import owlrl
@@ -153,6 +156,7 @@ class OWLReasoningEngine:
             print(f"  • Triplets avant raisonnement : {triplets_before}")
         
         # Application de la fermeture déductive avec sémantique OWL-RL
+        metrics = get_metrics()
         try:
             # DeductiveClosure applique les règles OWL-RL sur le graphe
             # Cela inclut :
@@ -161,10 +165,14 @@ class OWLReasoningEngine:
             # - Inférence de propriétés transitives (owl:TransitiveProperty)
             # - Inférence de propriétés symétriques (owl:SymmetricProperty)
             # - Inférence via owl:sameAs, owl:equivalentClass, etc.
-            DeductiveClosure(OWLRL_Semantics).expand(self.graph)
+            with span("owl.deductive_closure", triples=triplets_before) as current, \
+                    metrics.timer("kg_owl_reasoning_seconds"):
+                DeductiveClosure(OWLRL_Semantics).expand(self.graph)
             
-            triplets_after = len(self.graph)
-            inferred_count = triplets_after - triplets_before
+                triplets_after = len(self.graph)
+                inferred_count = triplets_after - triplets_before
+                current.set(inferred=inferred_count)
+            metrics.inc("kg_owl_inferred_triples_total", inferred_count)
             
             if self.verbose:
                 print(f"  • Triplets après raisonnement : {triplets_after}")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ÉCRITURE EN FLUX DU GRAPHE : N-TRIPLES / N-QUADS, DOCUMENT PAR DOCUMENT
+
+main() construit tout le graphe en mémoire puis le sérialise en chaînes
+Turtle et RDF/XML. Sur un corpus, garder le graphe fusionné et le
+re-sérialiser en entier coûte plus que l'extraction elle-même.
+
+Ce module écrit les triplets de chaque document dès qu'il est terminé :
+
+Fonctionnement :
+================
+1. Une ligne par triplet : N-Triples (.nt) ou N-Quads (.nq), formats
+   ligne à ligne, concaténables, sans en-tête ni préfixes
+2. N-Quads : chaque document dans son graphe nommé (document_graph_uri),
+   la T-Box dans le graphe par défaut
+3. Compression gzip optionnelle (extension .gz ou gzip_output=True)
+4. Vidage du tampon après chaque document : le fichier reste exploitable si
+   le traitement s'interrompt
+5. Turtle / RDF/XML deviennent une étape de conversion hors ligne (convert)
+
+Le raisonnement OWL s'applique au graphe complet : en mode flux, il est fait
+hors ligne, à la conversion (--reason).
+
+Usage :
+    python kg_batch.py corpus/ --stream corpus.nq.gz
+    python rdf_stream_sink.py convert corpus.nq.gz knowledge_graph.ttl [--reason]
+"""
+
+import gzip
+import os
+import sys
+from typing import Optional
+from urllib.parse import quote
+
+from rdflib import Dataset, Graph, URIRef
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Espace des graphes nommés (un par document)
+GRAPH_NAMESPACE = "http://example.org/master2/graph/"
+
+# Extension → format rdflib (conversion hors ligne)
+CONVERSION_FORMATS = {
+    ".ttl": "turtle",
+    ".xml": "xml",
+    ".rdf": "xml",
+    ".trig": "trig",
+    ".nt": "nt",
+    ".nq": "nquads",
+}
+
+
+def document_graph_uri(doc_id: str) -> URIRef:
+    """IRI du graphe nommé d'un document (identifiant encodé pour l'IRI)."""
+    return URIRef(GRAPH_NAMESPACE + quote(str(doc_id), safe=""))
+
+
+def abox_ntriples(graph: Graph, tbox: Optional[Graph] = None) -> str:
+    """Triplets d'un graphe de document hors T-Box, en N-Triples."""
+    if tbox is None:
+        return graph.serialize(format="nt")
+    abox = Graph()
+    for triple in graph:
+        if triple not in tbox:
+            abox.add(triple)
+    return abox.serialize(format="nt")
+
+
+def _open_text(path: str, mode: str, compress: Optional[bool] = None):
+    """Ouvre un fichier texte UTF-8, compressé si gzip demandé ou extension .gz."""
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _stream_format(path: str) -> str:
+    """Format d'un fichier de flux d'après son extension (hors .gz)."""
+    base = path[:-3] if path.endswith(".gz") else path
+    return "nquads" if base.endswith(".nq") else "nt"
+
+
+# ============================================================================
+# CLASSE PRINCIPALE : StreamingTripleSink
+# ============================================================================
+
+class StreamingTripleSink:
+    """
+    Écrit les triplets document par document en N-Triples ou N-Quads.
+
+    Utilisation :
+    -------------
+    >>> with StreamingTripleSink("corpus.nq.gz", tbox=pipeline.tbox) as sink:
+    ...     for doc_id, text in documents:
+    ...         sink.write_graph(pipeline.process(text), doc_id)
+    >>> sink.stats()
+    {'documents': 2, 'triples': 57, 'path': 'corpus.nq.gz', 'format': 'nquads'}
+    """
+
+    def __init__(self, path: str, tbox: Optional[Graph] = None, append: bool = False,
+                 gzip_output: Optional[bool] = None):
+        """
+        Ouvre le fichier de sortie.
+
+        Args:
+            path: Fichier de sortie (.nt, .nq, éventuellement suivi de .gz)
+            tbox: T-Box écrite une fois à l'ouverture (graphe par défaut) et
+                  retirée ensuite des graphes de documents
+            append: Ajoute à un fichier existant (la T-Box n'est pas réécrite)
+            gzip_output: Force (True) ou interdit (False) la compression gzip ;
+                         défaut : d'après l'extension .gz
+        """
+        self.path = path
+        self.format = _stream_format(path)
+        self.tbox = tbox
+        self.documents = 0
+        self.triples = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exists = append and os.path.exists(path)
+        self._handle = _open_text(path, "a" if append else "w", gzip_output)
+
+        if tbox is not None and not exists:
+            self._write_lines(tbox.serialize(format="nt"))
+            self._handle.flush()
+
+    # ── Écriture ────────────────────────────────────────────────────────────
+
+    def _write_lines(self, ntriples: str, doc_id: Optional[str] = None) -> int:
+        """Écrit des lignes N-Triples ; en N-Quads, avec le graphe nommé du document."""
+        lines = [line for line in ntriples.splitlines() if line.strip()]
+        if self.format == "nquads" and doc_id is not None:
+            suffix = f" {document_graph_uri(doc_id).n3()} .\n"
+            # Une ligne N-Triples se termine par " ." : le graphe s'insère avant
+            self._handle.write("".join(line[:-1].rstrip() + suffix for line in lines))
+        else:
+            self._handle.write("".join(line + "\n" for line in lines))
+        self.triples += len(lines)
+        return len(lines)
+
+    def write_ntriples(self, ntriples: str, doc_id: Optional[str] = None) -> int:
+        """
+        Écrit un document déjà sérialisé en N-Triples (ex : renvoyé par un worker)
+        puis vide le tampon. Les triplets ne sont pas filtrés contre la T-Box.
+
+        Returns:
+            int: Nombre de triplets écrits
+        """
+        written = self._write_lines(ntriples, doc_id)
+        self.documents += 1
+        self._handle.flush()
+        return written
+
+    def write_graph(self, graph: Graph, doc_id: Optional[str] = None) -> int:
+        """
+        Écrit les triplets d'un document (hors T-Box) puis vide le tampon.
+
+        Args:
+            graph: Graphe du document (KnowledgeGraphPipeline.process())
+            doc_id: Identifiant du document (graphe nommé en N-Quads)
+
+        Returns:
+            int: Nombre de triplets écrits
+        """
+        return self.write_ntriples(abox_ntriples(graph, self.tbox), doc_id)
+
+    # ── Cycle de vie ────────────────────────────────────────────────────────
+
+    def stats(self):
+        """Documents et triplets écrits depuis l'ouverture."""
+        return {"documents": self.documents, "triples": self.triples,
+                "path": self.path, "format": self.format}
+
+    def close(self):
+        if not self._handle.closed:
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ============================================================================
+# CONVERSION HORS LIGNE
+# ============================================================================
+
+def load_stream(path: str):
+    """
+    Charge un fichier de flux (.nt, .nq, éventuellement .gz).
+
+    Returns:
+        rdflib.Graph (N-Triples) ou rdflib.Dataset (N-Quads)
+    """
+    stream_format = _stream_format(path)
+    graph = Dataset() if stream_format == "nquads" else Graph()
+    with _open_text(path, "r") as handle:
+        graph.parse(data=handle.read(), format=stream_format)
+    return graph
+
+
+def convert(input_path: str, output_path: str, output_format: Optional[str] = None,
+            reasoning: bool = False) -> int:
+    """
+    Convertit un fichier de flux en Turtle, RDF/XML, TriG...
+
+    Les formats sans graphes nommés (Turtle, RDF/XML, N-Triples) reçoivent
+    l'union de tous les graphes.
+
+    Args:
+        input_path: Fichier .nt / .nq (éventuellement .gz)
+        output_path: Fichier de sortie
+        output_format: Format rdflib (défaut : d'après l'extension de sortie)
+        reasoning: Raisonnement OWL sur l'union des graphes avant écriture
+
+    Returns:
+        int: Nombre de triplets (ou quads) écrits
+
+    Raises:
+        ValueError: Format de sortie non reconnu
+    """
+    if output_format is None:
+        output_format = CONVERSION_FORMATS.get(os.path.splitext(output_path)[1].lower())
+        if output_format is None:
+            raise ValueError(f"Format de sortie non reconnu : {output_path} "
+                             f"({', '.join(CONVERSION_FORMATS)})")
+
+    loaded = load_stream(input_path)
+    if isinstance(loaded, Dataset) and (reasoning or output_format not in ("trig", "nquads")):
+        union = Graph()
+        for s, p, o, _ in loaded.quads((None, None, None, None)):
+            union.add((s, p, o))
+        loaded = union
+
+    if reasoning:
+        from owl_reasoning_engine import OWLReasoningEngine
+        OWLReasoningEngine(loaded, verbose=False).apply_reasoning()
+
+    for prefix, namespace in [("ex", "http://example.org/master2/ontology#"),
+                              ("data", "http://example.org/master2/data#"),
+                              ("schema", "http://schema.org/")]:
+        loaded.bind(prefix, namespace)
+    loaded.serialize(destination=output_path, format=output_format)
+    if isinstance(loaded, Dataset):
+        return sum(1 for _ in loaded.quads((None, None, None, None)))
+    return len(loaded)
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    reasoning = "--reason" in argv
+    if reasoning:
+        argv.remove("--reason")
+    if len(argv) != 3 or argv[0] != "convert":
+        print("Usage : python rdf_stream_sink.py convert <entrée.nt|.nq[.gz]> "
+              "<sortie.ttl|.xml|.trig> [--reason]")
+        return 1
+
+    try:
+        count = convert(argv[1], argv[2], reasoning=reasoning)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✓ {count} triplet(s) convertis : {argv[1]} → {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRÉ-CLASSIFIEUR DE RELATIONS PAR RÈGLES (RULE-FIRST)
+
+La cascade de priorités appliquée au contexte local (Priorité 0a → 5 et
+post-override « ville seule ») écrase la réponse du LLM dès qu'elle se
+déclenche : dans ce cas, la relation finale ne dépend que du contexte et des
+types NER, et l'appel réseau est payé pour rien.
+
+Ce module exécute la cascade AVANT tout appel :
+================================================
+1. classify_relation_by_rules() → RuleDecision
+   - relation fixée par une règle  → décision finale, pas d'appel LLM
+   - relation None (cas ambigu)    → le LLM est interrogé
+2. finalize_relation() applique ensuite à l'étiquette du LLM la même
+   décision et le mapping de sécurité qu'auparavant
+3. Chaque décision est étiquetée par sa source (rule:priority_3, llm,
+   fallback, ...) et comptabilisée (appels LLM évités)
+
+Configuration (.env) :
+======================
+KG_RULE_FIRST   1 = règles d'abord, LLM pour les cas ambigus (défaut)
+                0 = LLM systématique, règles en correction a posteriori
+"""
+
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from document_index import DocumentIndex, PassageSentences
+from keyword_index import KeywordIndex
+from kg_logging import get_logger
+
+
+# Relations acceptées en sortie de la prédiction (tout le reste → relatedTo)
+VALID_RELATIONS = ["teachesSubject", "author", "worksAt", "locatedIn",
+                   "collaboratesWith", "studiesAt", "manages", "relatedTo"]
+
+# Règles d'abord (KG_RULE_FIRST=0 pour toujours interroger le LLM)
+RULE_FIRST_ENABLED = os.getenv("KG_RULE_FIRST", "1") == "1"
+
+logger = get_logger(__name__)
+
+
+# ============================================================================
+# MOTS-CLÉS (compilés une fois, voir keyword_index.py)
+# ============================================================================
+
+# Classification des lieux (villes vs bâtiments/institutions)
+# IMPORTANT : Ne pas mettre de villes qui apparaissent souvent dans des noms d'institutions
+VRAIES_VILLES = KeywordIndex([
+    "paris", "france", "versailles", "lyon", "marseille", "toulouse",
+    "bordeaux", "lille", "états-unis", "usa", "new york", "londres",
+    "californie", "redmond", "cambridge", "oxford",
+    "berkeley", "boston", "seattle", "tokyo", "berlin"])
+
+BATIMENTS_INSTITUTIONS = KeywordIndex([
+    "palais", "élysée", "mit", "stanford", "harvard", "université",
+    "university", "institut", "école", "college"])
+
+# Repli par mots-clés quand le type NER de entity2 est inconnu
+TOPIC_KEYWORDS = KeywordIndex([
+    "physique", "mathématiques", "maths", "informatique", "biologie",
+    "chimie", "histoire", "géographie", "philosophie", "littérature",
+    "physics", "mathematics", "computer science", "biology", "chemistry",
+    "rdfs", "rdf", "owl", "sparql", "sémantique", "web sémantique",
+    "semantic web", "ontologie", "ontology", "json-ld", "turtle",
+    "bases de données", "base de données", "database", "réseaux", "networks",
+    "algorithmes", "algorithms", "intelligence artificielle", "ia", "ai",
+    "machine learning", "deep learning", "apprentissage"])
+
+ORG_KEYWORDS = KeywordIndex([
+    "université", "university", "institute", "institut", "laboratoire",
+    "lab", "department", "département", "centre", "center", "school",
+    "college", "école", "inria", "cnrs"])
+
+# Indices du contexte local, par priorité
+TEACH_VERBS = KeywordIndex(["enseigne", "enseigné", "enseignant", "teach", "taught", "teaching"])
+TEACH_CONTEXT = KeywordIndex(["enseigne", "enseigné", "enseignant", "professeur",
+                              "teach", "professor", "taught", "teaching"])
+MANAGE_CONTEXT = KeywordIndex(["dirige", "gère", "manage", "manages", "ceo", "dirigeant"])
+WORK_CONTEXT = KeywordIndex(["travaille", "works", "employé", "employee"])
+AUTHOR_CONTEXT = KeywordIndex(["auteur", "rédigé", "écrit", "author", "wrote", "written",
+                               "écrivain", "a écrit"])
+LOCATION_CONTEXT = KeywordIndex(["situé", "située", "basé", "basée", "located", "based"])
+
+
+@dataclass
+class RuleDecision:
+    """Résultat de la cascade de priorités pour une paire"""
+    relation: Optional[str]   # None = ambigu, le LLM doit trancher
+    source: Optional[str]     # ex : "rule:priority_3", "rule:city_override"
+    local_context: str
+    is_org: bool
+
+    @property
+    def is_decisive(self) -> bool:
+        return self.relation is not None
+
+
+# ============================================================================
+# CASCADE DE PRIORITÉS
+# ============================================================================
+
+def classify_relation_by_rules(entity1: str, entity2: str, sentence: str,
+                               entity1_type: str = "UNK", entity2_type: str = "UNK",
+                               doc_index: Optional[DocumentIndex] = None) -> RuleDecision:
+    """
+    Applique la cascade de priorités au contexte local de la paire.
+
+    Args:
+        entity1 (str): Sujet
+        entity2 (str): Objet
+        sentence (str): Texte (passage ou document) contenant la paire
+        entity1_type (str): Type NER du sujet
+        entity2_type (str): Type NER de l'objet
+        doc_index (DocumentIndex): Index du document ; le découpage du passage
+                                   en phrases est alors mémorisé entre les paires
+
+    Returns:
+        RuleDecision: relation fixée par une règle (et sa source), ou None si ambigu
+    """
+    # --- LOGIQUE DE CORRECTION SÉMANTIQUE AVEC PRIORITÉS ET CONTEXTE LOCAL ---
+    passage = doc_index.passage(sentence) if doc_index is not None else PassageSentences(sentence)
+    sentence_lower = passage.text_lower
+    entity1_lower = entity1.lower()
+    entity2_lower = entity2.lower()
+
+    # Extraction du contexte local AMÉLIORÉE : Utiliser la phrase qui contient les deux entités
+    # Si les entités sont dans des phrases différentes, utiliser la phrase de entity2 (objet)
+    try:
+        # Trouver la phrase qui contient les deux entités
+        local_context = passage.first_containing(entity1_lower, entity2_lower)
+
+        # Si pas de phrase commune, prendre la phrase de entity2 (objet)
+        # Raison: La relation est généralement exprimée près de l'objet
+        # Ex: "Elle travaille au CNRS" → "travaille" est dans la phrase du CNRS
+        if not local_context:
+            local_context = passage.first_containing(entity2_lower)
+
+        # Fallback sur la phrase de entity1
+        if not local_context:
+            local_context = passage.first_containing(entity1_lower)
+
+        # Fallback final sur contexte autour des entités (ancien système)
+        if not local_context:
+            pos1 = sentence_lower.find(entity1_lower)
+            pos2 = sentence_lower.find(entity2_lower)
+
+            if pos1 >= 0 and pos2 >= 0:
+                start = min(pos1, pos2)
+                end = max(pos1 + len(entity1_lower), pos2 + len(entity2_lower))
+
+                # Extraire 50 caractères avant et après pour le contexte
+                context_start = max(0, start - 50)
+                context_end = min(len(sentence_lower), end + 50)
+                local_context = sentence_lower[context_start:context_end]
+            else:
+                local_context = sentence_lower  # Fallback sur phrase complète
+    except:
+        local_context = sentence_lower
+
+    logger.debug("    🔍 Contexte local : ...%s...", local_context)
+
+    # Vérifier si entity2 est UNIQUEMENT une ville (pas dans un nom d'institution)
+    is_batiment = BATIMENTS_INSTITUTIONS.contains_any(entity2_lower)
+    is_vraie_ville = VRAIES_VILLES.contains_any(entity2_lower) and not is_batiment
+
+    # === PRIORITÉS BASÉES SUR LE CONTEXTE LOCAL (pas toute la phrase) ===
+
+    # PRIORITÉ 0 : Enseignement — dispatch selon le type de entity2
+    # Primary source: NER-produced entity types passed as parameters.
+    # Keyword lists are used ONLY as fallback when type is UNK.
+    # Type-first resolution (NER parameter > keyword heuristic)
+    if entity2_type == "TOPIC":
+        is_topic, is_org = True, False
+    elif entity2_type in ("ORG",):
+        is_topic, is_org = False, True
+    elif entity2_type in ("LOC",):
+        # LOC alone: keyword fallback distinguishes pure city from institution
+        is_topic = False
+        is_org   = ORG_KEYWORDS.contains_any(entity2_lower)
+    else:
+        # UNK — fall back to keyword heuristics
+        is_topic = TOPIC_KEYWORDS.contains_any(entity2_lower)
+        is_org   = ORG_KEYWORDS.contains_any(entity2_lower)
+
+    _teach_in_ctx = TEACH_VERBS.contains_any(local_context)
+
+    relation, source = None, None
+
+    if _teach_in_ctx and is_topic:
+        relation, source = "teachesSubject", "rule:priority_0a"
+        logger.debug("  🎓 Priorité 0a : 'enseigne' + matière '%s' → teachesSubject", entity2)
+
+    elif _teach_in_ctx and is_org:
+        relation, source = "worksAt", "rule:priority_0b"
+        logger.debug("  🏫 Priorité 0b : 'enseigne' + organisation '%s' → worksAt", entity2)
+
+    # PRIORITÉ 1 : Enseignement générique (type de entity2 inconnu)
+    elif TEACH_CONTEXT.contains_any(local_context):
+        relation, source = "teachesSubject", "rule:priority_1"
+        logger.debug("  🎓 Priorité 1 : 'enseigne/professeur' → teachesSubject (défaut)")
+
+    # PRIORITÉ 2 : Direction/Management (mots-clés de management)
+    # IMPORTANT : Seulement si entity1 est une personne ET entity2 est une organisation
+    elif MANAGE_CONTEXT.contains_any(local_context) and \
+         not is_vraie_ville:  # Exclure les villes (on ne dirige pas une ville)
+        relation, source = "manages", "rule:priority_2"
+        logger.debug("  💼 Priorité 2 : Détection 'dirige/gère' dans contexte local → Force manages")
+
+    # PRIORITÉ 3 : Travail/Emploi (personne → organisation/bâtiment)
+    # IMPORTANT : "travaille à X" devrait être worksAt même si X est une ville
+    # car dans contexte professionnel, c'est souvent une organisation (ex: Université de Versailles)
+    elif WORK_CONTEXT.contains_any(local_context):
+        # Dans contexte de travail, privilégier worksAt (organisation implicite)
+        relation, source = "worksAt", "rule:priority_3"
+        logger.debug("  💼 Priorité 3 : Détection 'travaille' → Force worksAt (contexte professionnel)")
+
+    # PRIORITÉ 4 : Rédaction/Auteur (mots-clés de création)
+    elif AUTHOR_CONTEXT.contains_any(local_context):
+        relation, source = "author", "rule:priority_4"
+        logger.debug("  ✍️ Priorité 4 : Détection 'auteur/écrit' dans contexte local → Force author")
+
+    # PRIORITÉ 4.5 : Localisation explicite avec "situé" (prend le dessus sur manages)
+    elif LOCATION_CONTEXT.contains_any(local_context):
+        if is_vraie_ville or is_batiment:
+            relation, source = "locatedIn", "rule:priority_4_5"
+            logger.debug("  📍 Priorité 4.5 : Détection 'situé/basé' dans contexte local → Force locatedIn")
+
+    # PRIORITÉ 5 : Localisation (si entity2 est une VRAIE ville — pas une institution)
+    # This fires even after Priority 0/1 because a bare city is never a
+    # teaching object: "Zoubida enseigne Versailles" makes no semantic sense.
+    elif is_vraie_ville:
+        ville_detectee = VRAIES_VILLES.first_in_order(entity2_lower) or entity2
+        logger.debug("  📍 Priorité 5 : Détection ville '%s' → Force locatedIn", ville_detectee)
+        relation, source = "locatedIn", "rule:priority_5"
+
+    # POST-OVERRIDE: bare city must always yield locatedIn regardless of verb
+    if is_vraie_ville and relation != "locatedIn":
+        relation, source = "locatedIn", "rule:city_override"
+        logger.debug("  📍 Post-override : ville seule → locatedIn (annule verbe d'enseignement)")
+
+
+    return RuleDecision(relation, source, local_context, is_org)
+
+
+def finalize_relation(relation: str, decision: RuleDecision) -> str:
+    """
+    Relation finale à partir de l'étiquette du LLM et de la décision des règles.
+
+    Une décision des règles l'emporte sur le LLM ; sinon l'étiquette passe par
+    le mapping de sécurité. Le résultat appartient toujours à VALID_RELATIONS.
+    """
+    if decision.is_decisive:
+        relation = decision.relation
+    is_org = decision.is_org
+
+    # Mapping de sécurité pour les autres cas (détection dans la réponse LLM)
+    # IMPORTANT : Ne pas écraser teachesSubject ou worksAt fixés par les priorités 0a/0b
+    if relation not in ("teachesSubject", "worksAt"):  # Protection contre écrasement
+        if "teachsubject" in relation.lower().replace(" ", "").replace("_", ""):
+            relation = "teachesSubject"
+        elif "teach" in relation:
+            # Dispatcher selon le type de entity2
+            if is_org:
+                relation = "worksAt"
+            else:
+                relation = "teachesSubject"
+        elif "author" in relation or "wrote" in relation:
+            relation = "author"
+        elif "work" in relation:
+            relation = "worksAt"
+        elif "located" in relation or "situé" in relation or "basé" in relation:
+            relation = "locatedIn"
+        elif "collabore" in relation or "collaborate" in relation:
+            relation = "collaboratesWith"
+        elif "étudie" in relation or "studies" in relation:
+            relation = "studiesAt"
+        elif "gère" in relation or "manage" in relation:
+            relation = "manages"
+
+    if relation not in VALID_RELATIONS:
+        relation = "relatedTo"
+
+    return relation
+
+
+# ============================================================================
+# TRAÇABILITÉ DES DÉCISIONS
+# ============================================================================
+
+class RelationDecisionStats:
+    """
+    Compteurs des décisions de relation par source (thread-safe).
+
+    Sources : rule:* (cascade, sans appel LLM), llm (étiquette du LLM),
+    llm:rejected (NO_VALID_RELATIONS), fallback (erreur LLM), no_backend.
+
+    llm_calls compte les paires soumises au LLM (une requête batch en couvre
+    plusieurs) ; llm_calls_avoided celles tranchées par les règles seules.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.by_source = Counter()
+            self.llm_calls = 0
+            self.llm_calls_avoided = 0
+            self.total = 0
+
+    def record(self, entity1: str, entity2: str, relation: Optional[str], source: str,
+               llm_called: bool):
+        """
+        Enregistre une décision et l'usage du LLM.
+
+        Seuls des compteurs sont conservés (aucune liste par paire) : l'objet
+        vit tout le processus (corpus, kg_service.py) sans grossir.
+        """
+        with self._lock:
+            self.by_source[source] += 1
+            self.total += 1
+            if llm_called:
+                self.llm_calls += 1
+            elif source.startswith("rule:"):
+                self.llm_calls_avoided += 1
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "decisions": self.total,
+                "llm_calls": self.llm_calls,
+                "llm_calls_avoided": self.llm_calls_avoided,
+                "by_source": dict(sorted(self.by_source.items())),
+            }
+
+
+_decision_stats = RelationDecisionStats()
+
+
+def get_relation_decision_stats() -> RelationDecisionStats:
+    """Compteurs partagés par toutes les prédictions du processus."""
+    return _decision_stats
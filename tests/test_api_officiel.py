@@ -4,8 +4,12 @@
 Test API Hugging Face avec bibliothèque officielle
 """
 
-from huggingface_hub import InferenceClient
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client_registry import get_hf_client
 
 # Configuration
 HF_TOKEN = os.getenv("HF_TOKEN", "your_huggingface_token_here")
@@ -19,7 +23,7 @@ print(f"🔑 Token: {HF_TOKEN[:10]}...{HF_TOKEN[-5:]}\n")
 
 # Créer le client
 try:
-    client = InferenceClient(model=MODEL, token=HF_TOKEN)
+    client = get_hf_client(model=MODEL, token=HF_TOKEN)
     print("✅ Client créé avec succès\n")
 except Exception as e:
     print(f"❌ Erreur création client: {e}\n")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du générateur de paires candidates par fenêtre de phrases
+"""
+
+import os
+import sys
+
+import spacy
+from spacy.tokens import Doc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candidate_pairs import SentenceWindowPairGenerator
+
+TEXT = ("Marie Curie travaille à la Sorbonne. Elle enseigne la Physique. "
+        "Le CNRS est situé à Paris. Pierre Dupont habite à Lyon.")
+ENTITIES = ["Marie Curie", "Sorbonne", "Physique", "CNRS", "Paris", "Pierre Dupont", "Lyon"]
+
+
+def _doc(text):
+    nlp = spacy.blank("fr")
+    nlp.add_pipe("sentencizer")
+    return nlp(text)
+
+
+def test_window_zero_keeps_same_sentence_pairs_only():
+    generator = SentenceWindowPairGenerator(window=0, max_dep_hops=0)
+    pairs = generator.generate(_doc(TEXT), ENTITIES)
+    kept = {(ENTITIES[p.index1], ENTITIES[p.index2]) for p in pairs}
+    assert kept == {("Marie Curie", "Sorbonne"), ("CNRS", "Paris"), ("Pierre Dupont", "Lyon")}
+    assert generator.stats["pairs_total"] == 21
+    assert generator.stats["pairs_pruned"] == 18
+
+
+def test_adjacent_window_and_local_context():
+    generator = SentenceWindowPairGenerator(window=1, max_dep_hops=0)
+    pairs = generator.generate(_doc(TEXT), ENTITIES)
+    by_names = {(ENTITIES[p.index1], ENTITIES[p.index2]): p for p in pairs}
+    assert ("Marie Curie", "Physique") in by_names
+    assert ("Marie Curie", "Lyon") not in by_names
+    # Le contexte couvre les deux phrases concernées, pas le document entier
+    assert by_names[("Marie Curie", "Physique")].context == \
+        "Marie Curie travaille à la Sorbonne. Elle enseigne la Physique."
+
+
+def test_unplaced_and_reformatted_entities():
+    """Casse et blancs ignorés ; une entité introuvable n'est jamais élaguée"""
+    generator = SentenceWindowPairGenerator(window=0, max_dep_hops=0)
+    entities = ["marie  curie", "SORBONNE", "Inconnue"]
+    pairs = generator.generate(_doc(TEXT), entities)
+    reasons = {(p.index1, p.index2): p.reason for p in pairs}
+    assert reasons == {(0, 1): "window", (0, 2): "unplaced", (1, 2): "unplaced"}
+
+
+def test_negative_window_keeps_all_pairs():
+    generator = SentenceWindowPairGenerator(window=-1)
+    pairs = generator.generate(_doc(TEXT), ENTITIES)
+    assert len(pairs) == 21
+    assert generator.stats["pairs_pruned"] == 0
+
+
+def test_dependency_distance():
+    nlp = spacy.blank("fr")
+    #            0        1        2       3
+    words = ["Marie", "dirige", "le", "laboratoire"]
+    doc = Doc(nlp.vocab, words=words, heads=[1, 1, 3, 1],
+              deps=["nsubj", "ROOT", "det", "obj"])
+    assert SentenceWindowPairGenerator._dependency_distance(doc[0], doc[3]) == 2
+    assert SentenceWindowPairGenerator._dependency_distance(doc[2], doc[0]) == 3
+    assert SentenceWindowPairGenerator._dependency_distance(doc[1], doc[3]) == 1
+
+
+def test_dependency_path_rescues_pairs_across_sentence_trees():
+    """Hors fenêtre, deux sujets de phrases proches restent liés par la chaîne des racines"""
+    nlp = spacy.blank("fr")
+    words = ["Marie", "dirige", "le", "CNRS", ".",
+             "Il", "pleut", ".",
+             "Paris", "accueille", "le", "congrès", "."]
+    heads = [1, 1, 3, 1, 1,
+             6, 6, 6,
+             9, 9, 11, 9, 9]
+    deps = ["nsubj", "ROOT", "det", "obj", "punct",
+            "nsubj", "ROOT", "punct",
+            "nsubj", "ROOT", "det", "obj", "punct"]
+    doc = Doc(nlp.vocab, words=words, heads=heads, deps=deps)
+    entities = ["Marie", "CNRS", "Paris"]
+
+    # Marie → dirige → (racine suivante) pleut → accueille ← Paris : 4 arcs
+    generator = SentenceWindowPairGenerator(window=0, max_dep_hops=4)
+    reasons = {(entities[p.index1], entities[p.index2]): p.reason for p in generator.generate(doc, entities)}
+    assert reasons == {("Marie", "CNRS"): "window", ("Marie", "Paris"): "dependency",
+                       ("CNRS", "Paris"): "dependency"}
+    assert generator.stats["kept_dependency"] == 2
+
+    generator = SentenceWindowPairGenerator(window=0, max_dep_hops=3)
+    assert len(generator.generate(doc, entities)) == 1 and generator.stats["pairs_pruned"] == 2
@@ -4,8 +4,12 @@
 Test API Hugging Face - Chat Completion (Mistral)
 """
 
-from huggingface_hub import InferenceClient
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client_registry import get_hf_client
 
 # Configuration
 HF_TOKEN = os.getenv("HF_TOKEN", "your_huggingface_token_here")
@@ -18,7 +22,7 @@ print(f"\n🤖 Modèle: {MODEL}")
 print(f"🔑 Token: {HF_TOKEN[:10]}...{HF_TOKEN[-5:]}\n")
 
 # Créer le client
-client = InferenceClient(token=HF_TOKEN)
+client = get_hf_client(token=HF_TOKEN)
 
 # TEST 1: Simple question
 print("📌 TEST 1: Question simple")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la prédiction concurrente des relations et du seau à jetons
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent_relations import run_predictions
+from llm_rate_limiter import TokenBucket
+
+
+def test_results_keep_job_order():
+    """Les réponses arrivent dans le désordre mais sont rendues dans l'ordre des paires"""
+    delays = [0.05, 0.01, 0.04, 0.0, 0.03]
+
+    def predict(idx, delay):
+        time.sleep(delay)
+        return f"rel-{idx}"
+
+    results = run_predictions(list(enumerate(delays)), predict, concurrency=5)
+    assert results == [f"rel-{i}" for i in range(len(delays))]
+
+
+def test_concurrency_limit_is_respected():
+    """Jamais plus de `concurrency` appels en vol"""
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def predict(idx):
+        with lock:
+            in_flight.append(idx)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.remove(idx)
+        return idx
+
+    run_predictions([(i,) for i in range(12)], predict, concurrency=3)
+    assert max(peak) == 3
+
+
+def test_token_bucket_burst_then_rate():
+    """Rafale servie immédiatement, puis un jeton toutes les 1/rate secondes"""
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=lambda: now[0])
+
+    waits = [bucket._reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == 0.5
+    assert waits[4] == 1.0
+
+    now[0] = 10.0  # le seau s'est rempli entre-temps
+    assert bucket._reserve() == 0.0
+
+
+def test_token_bucket_split_never_exceeds_parent_burst():
+    """8 workers pour une rafale de 5 : la rafale cumulée reste 5"""
+    now = [0.0]
+    shares = [TokenBucket(rate=0.5, capacity=5, clock=lambda: now[0]).split(8) for _ in range(8)]
+    assert sum(share.capacity for share in shares) == 5
+    assert [share._reserve() for share in shares] == [0.375 / (0.5 / 8)] * 8
+
+    now[0] = 1000.0  # même après un long repos, aucune part n'accumule un jeton entier
+    assert all(share._reserve() > 0 for share in shares)
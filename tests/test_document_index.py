@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'index de positions par document (DocumentIndex / PassageSentences)
+"""
+
+import os
+import re
+import sys
+
+import spacy
+from spacy.tokens import Doc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_index import DocumentIndex, PassageSentences
+
+WORDS = ["Marie", "Curie", "enseigne", "la", "Physique", ".",
+         "Elle", "travaille", "au", "CNRS", "à", "Paris", "."]
+ENTS = ["B-PER", "I-PER", "O", "O", "B-MISC", "O",
+        "O", "O", "O", "B-ORG", "O", "B-LOC", "O"]
+SENT_STARTS = [True] + [False] * 5 + [True] + [False] * 6
+
+
+def _doc():
+    return Doc(spacy.blank("fr").vocab, words=WORDS, ents=ENTS, sent_starts=SENT_STARTS)
+
+
+def test_entity_at_matches_doc_ents_scan():
+    doc = _doc()
+    doc_index = DocumentIndex(doc)
+    for token in doc:
+        expected = next((ent for ent in doc.ents if ent.start <= token.i < ent.end), None)
+        assert doc_index.entity_at(token.i) == expected
+    assert doc_index.entity_at(1).text == "Marie Curie"
+
+
+def test_last_position_matches_token_scan():
+    doc = _doc()
+    doc_index = DocumentIndex(doc)
+    for verb_pos in range(len(doc)):
+        for ent_text in ("Marie Curie", "Paris", "Elle CNRS", "Absent"):
+            expected = any(t.i > verb_pos for t in doc if t.text in ent_text.split())
+            assert any(doc_index.last_position(w) > verb_pos for w in ent_text.split()) == expected
+
+
+def test_entity_sentences_and_offsets():
+    doc_index = DocumentIndex(_doc())
+    assert doc_index.sentence_ids("marie curie") == [0]
+    assert doc_index.sentence_ids("CNRS") == [1]
+    assert doc_index.sentence_ids("Lyon") == []
+    start, end = doc_index.char_offsets("Paris")[0]
+    assert doc_index.text[start:end] == "Paris"
+
+
+def test_passage_is_memoized_and_matches_regex_split():
+    text = "Marie enseigne la physique. Elle travaille au CNRS! Paris?"
+    doc_index = DocumentIndex(_doc())
+    passage = doc_index.passage(text)
+    assert doc_index.passage(text) is passage
+    assert passage.sentences_lower == [s.lower() for s in re.split(r'[.!?]\s+', text)]
+    assert passage.first_containing("marie", "physique") == "marie enseigne la physique"
+    assert passage.first_containing("marie", "cnrs") is None
+    assert passage.first_containing("cnrs") == "elle travaille au cnrs"
+
+
+def test_passage_without_index():
+    passage = PassageSentences("A b. C d")
+    assert passage.text_lower == "a b. c d"
+    assert passage.containing("c") == frozenset({1})
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du mémo persistant des types d'entités
+"""
+
+import json
+import os
+import sys
+
+from rdflib import RDF, RDFS, Graph, Literal, Namespace
+from rdflib.namespace import FOAF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_extraction_semantic_web as kg
+import llm_backends
+from entity_type_memo import EntityTypeMemo, set_entity_type_memo
+from llm_cache import NullLLMCache, get_llm_cache, set_llm_cache
+
+DATA = Namespace("http://example.org/master2/data#")
+SCHEMA = Namespace("http://schema.org/")
+EX = Namespace("http://example.org/master2/ontology#")
+
+
+def test_lookup_counts_hits(tmp_path):
+    memo = EntityTypeMemo(str(tmp_path / "memo.sqlite3"))
+    assert memo.lookup("web_semantique") is None
+    memo.store("web_semantique", "TOPIC")
+    assert memo.lookup("web_semantique") == "TOPIC"
+    assert memo.lookup("web_semantique") == "TOPIC"
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["stored_hits"]) == (2, 1, 2)
+
+
+def test_divergent_types_mark_entry_ambiguous(tmp_path):
+    memo = EntityTypeMemo(str(tmp_path / "memo.sqlite3"))
+    memo.store("versailles", "LOC")
+    memo.store("versailles", "LOC")
+    assert memo.lookup("versailles") == "LOC"
+    memo.store("versailles", "ORG")
+    assert memo.lookup("versailles") is None
+    assert memo.stats()["ambiguous"] == 1
+
+
+def test_context_signature_falls_back_to_plain_entry(tmp_path):
+    memo = EntityTypeMemo(str(tmp_path / "memo.sqlite3"), context_mode="ner")
+    memo.store("rdfs", "TOPIC")
+    memo.store("rdfs", "ORG", context=memo.context_for("ORG"))
+    assert memo.lookup("rdfs", memo.context_for("ORG")) == "ORG"
+    assert memo.lookup("rdfs", memo.context_for("MISC")) == "TOPIC"
+    assert EntityTypeMemo(":memory:").context_for("ORG") == ""
+
+
+def test_persistence_across_instances(tmp_path):
+    path = str(tmp_path / "memo.sqlite3")
+    EntityTypeMemo(path).store("cnrs", "ORG")
+    assert EntityTypeMemo(path).lookup("cnrs") == "ORG"
+
+
+def test_warm_up_from_graph(tmp_path):
+    graph = Graph()
+    for fragment, label, classes in [
+        ("universite_de_versailles", "Université de Versailles", [SCHEMA.Organization]),
+        ("rdfs", "RDFS", [EX.Document]),
+        ("versailles", "Versailles", [SCHEMA.Place, FOAF.Person]),
+        ("inconnu", "Inconnu", []),
+    ]:
+        graph.add((DATA[fragment], RDFS.label, Literal(label, lang="fr")))
+        for cls in classes:
+            graph.add((DATA[fragment], RDF.type, cls))
+    path = tmp_path / "kg.ttl"
+    graph.serialize(str(path), format="turtle")
+
+    memo = EntityTypeMemo(":memory:")
+    assert memo.warm_up_from_graph(str(path)) == {"loaded": 1, "ambiguous": 1, "skipped": 2}
+    assert memo.lookup(kg.normalize_uri_fragment("Université de Versailles")) == "ORG"
+    # ex:Document regroupe TOPIC, DOC et MISC : pas de type mémorisé
+    assert memo.lookup("rdfs") is None
+    assert memo.lookup("versailles") is None
+
+
+class ClassifierBackend(llm_backends.LLMBackend):
+    """Classe tout en TOPIC et enregistre les entités demandées."""
+
+    name = "classifier"
+
+    def __init__(self):
+        super().__init__("classifier-model")
+        self.requests = []
+
+    def complete(self, system_prompt, user_prompt):
+        entities = json.loads("[" + user_prompt.split("Entities detected: [")[1].split("]")[0] + "]")
+        self.requests.append(entities)
+        return json.dumps({entity: "TOPIC" for entity in entities})
+
+
+def test_refine_entity_types_calls_llm_only_for_unseen_entities():
+    backend = ClassifierBackend()
+    memo = EntityTypeMemo(":memory:")
+    previous_cache = get_llm_cache()
+    set_llm_cache(NullLLMCache())
+    llm_backends.set_llm_backend(backend)
+    set_entity_type_memo(memo)
+    try:
+        first = kg.refine_entity_types([("Web Sémantique", "MISC"), ("Marie", "PER")], "t1")
+        assert first == [("Web Sémantique", "TOPIC"), ("Marie", "PER")]
+
+        second = kg.refine_entity_types([("web sémantique", "MISC"), ("Ontologie", "MISC")], "t2")
+        assert second == [("web sémantique", "TOPIC"), ("Ontologie", "TOPIC")]
+        assert backend.requests == [["Web Sémantique", "Marie"], ["Ontologie"]]
+
+        kg.refine_entity_types([("Ontologie", "MISC"), ("Marie", "PER")], "t3")
+        assert len(backend.requests) == 2
+    finally:
+        llm_backends.set_llm_backend(None)
+        set_entity_type_memo(None)
+        set_llm_cache(previous_cache)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du mode fusionné : types raffinés + relations en un seul appel LLM
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_extraction_semantic_web as kg
+import llm_backends
+from entity_type_memo import NullEntityTypeMemo, set_entity_type_memo
+from llm_cache import NullLLMCache, get_llm_cache, set_llm_cache
+
+TEXT = "Zoubida Kedad enseigne à l'Université de Versailles. Elle travaille sur RDFS."
+ENTITIES = [("Zoubida Kedad", "PER"), ("Université de Versailles", "LOC"), ("RDFS", "MISC")]
+
+
+class ScriptedBackend(llm_backends.LLMBackend):
+    """Renvoie une réponse fixée et compte les appels."""
+
+    name = "scripted"
+
+    def __init__(self, response):
+        super().__init__("scripted-model")
+        self.response = response
+        self.calls = 0
+
+    def complete(self, system_prompt, user_prompt):
+        self.calls += 1
+        return self.response
+
+
+def _run_with(backend, func, *args, **kwargs):
+    previous_cache = get_llm_cache()
+    set_llm_cache(NullLLMCache())
+    set_entity_type_memo(NullEntityTypeMemo())
+    llm_backends.set_llm_backend(backend)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        llm_backends.set_llm_backend(None)
+        set_entity_type_memo(None)
+        set_llm_cache(previous_cache)
+
+
+def test_one_call_returns_types_and_relations():
+    backend = ScriptedBackend("```json\n" + json.dumps({
+        "types": {"1": "ORGANIZATION", "2": "ORGANIZATION", "3": "TOPIC", "9": "TOPIC"},
+        "relations": [[1, 2, "worksAt"], [1, 3, "teachesSubject"], [2, 2, "relatedTo"], [1, 7, "x"]],
+    }) + "\n```")
+    entities, relations = _run_with(backend, kg.extract_types_and_relations_fused, ENTITIES, TEXT)
+
+    assert backend.calls == 1
+    # La garde PER s'applique comme dans refine_entity_types()
+    assert entities == [("Zoubida Kedad", "PER"), ("Université de Versailles", "ORG"), ("RDFS", "TOPIC")]
+    assert relations == {("Zoubida Kedad", "Université de Versailles"): "worksAt",
+                         ("Zoubida Kedad", "RDFS"): "teachesSubject"}
+
+
+def test_invalid_response_falls_back_to_standard_mode():
+    backend = ScriptedBackend("pas de JSON")
+    entities, relations = _run_with(backend, kg.extract_types_and_relations_fused, ENTITIES, TEXT)
+    assert relations is None
+    assert entities == ENTITIES
+
+
+def test_fused_labels_replace_the_batch_request(monkeypatch):
+    monkeypatch.setattr(kg, "RULE_FIRST_ENABLED", False)
+    backend = ScriptedBackend("[]")
+    pairs = [("Zoubida Kedad", "Université de Versailles", "PER", "ORG", ["worksAt", "relatedTo"]),
+             ("Zoubida Kedad", "RDFS", "PER", "TOPIC", ["teachesSubject", "relatedTo"])]
+    labels = {("Zoubida Kedad", "Université de Versailles"): "worksAt"}
+    results = _run_with(backend, kg.predict_relations_batch_real_api, pairs, TEXT,
+                        fused_labels=labels)
+    assert backend.calls == 0
+    assert len(results) == 2 and results[0] == "worksAt"
+    assert results[1] is None
+    assert kg._normalize_llm_relation("NO_VALID_RELATIONS") is None
+
+
+def test_fused_label_for_reversed_pair_is_not_applied(monkeypatch):
+    monkeypatch.setattr(kg, "RULE_FIRST_ENABLED", False)
+    pairs = [("Université de Versailles", "Zoubida Kedad", "ORG", "PER", ["worksAt", "relatedTo"])]
+    labels = {("Zoubida Kedad", "Université de Versailles"): "worksAt"}
+    results = _run_with(ScriptedBackend("[]"), kg.predict_relations_batch_real_api, pairs, TEXT,
+                        fused_labels=labels)
+    assert results == [None]
+
+
+def test_local_backend_answers_fused_prompt():
+    backend = llm_backends.LocalStandInBackend()
+    answer = json.loads(backend.answer(*kg.build_fused_prompt(ENTITIES, TEXT)))
+    assert answer["types"] == {"1": "PERSON", "2": "ORGANIZATION", "3": "TOPIC"}
+    assert [1, 2, "worksAt"] in answer["relations"]
+
+
+def test_batch_mode_uses_each_pair_context(monkeypatch):
+    """Règles et prompt du mode batch voient le passage de chaque paire, pas le document"""
+    seen = []
+    classify = kg.classify_relation_by_rules
+
+    def spy(entity1, entity2, sentence, *args, **kwargs):
+        seen.append(sentence)
+        return classify(entity1, entity2, sentence, *args, **kwargs)
+
+    class PromptBackend(ScriptedBackend):
+        def complete(self, system_prompt, user_prompt):
+            self.prompt = user_prompt
+            return super().complete(system_prompt, user_prompt)
+
+    monkeypatch.setattr(kg, "classify_relation_by_rules", spy)
+    monkeypatch.setattr(kg, "RULE_FIRST_ENABLED", False)
+    document = TEXT + " Jean Dupont habite à Paris."
+    contexts = ["Zoubida Kedad enseigne à l'Université de Versailles.", "Jean Dupont habite à Paris."]
+    pairs = [("Zoubida Kedad", "Université de Versailles", "PER", "ORG", ["worksAt", "relatedTo"]),
+             ("Jean Dupont", "Paris", "PER", "LOC", ["livesIn", "relatedTo"])]
+    backend = PromptBackend('["relatedTo", "relatedTo"]')
+    _run_with(backend, kg.predict_relations_batch_real_api, pairs, document, contexts=contexts)
+
+    assert seen == contexts
+    assert f'Text: "{contexts[0]} {contexts[1]}"' in backend.prompt
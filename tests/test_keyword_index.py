@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'index de mots-clés compilé (équivalence avec any(kw in texte))
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_index import KeywordIndex
+
+
+def test_contains_any_matches_substring_semantics():
+    index = KeywordIndex(["université", "cnrs", "lab"])
+    assert index.contains_any("université de versailles")
+    assert index.contains_any("collaboration")          # "lab" sous-chaîne
+    assert not index.contains_any("paris")
+    assert not index.contains_any("")
+
+
+def test_find_all_reports_overlapping_keywords():
+    index = KeywordIndex(["rdf", "rdfs", "owl", "web sémantique", "sémantique"])
+    assert index.find_all("le cours rdfs et web sémantique") == {
+        "rdf", "rdfs", "web sémantique", "sémantique"}
+    assert index.find_all("sparql") == set()
+
+
+def test_first_in_order_follows_list_order_not_text_order():
+    index = KeywordIndex(["paris", "versailles"])
+    assert index.first_in_order("versailles près de paris") == "paris"
+    assert index.first_in_order("lyon") is None
+
+
+def test_empty_and_duplicate_keywords():
+    assert not KeywordIndex([]).contains_any("texte")
+    assert KeywordIndex([""]).contains_any("texte")
+    assert KeywordIndex(["ai", "ai"]).keywords == ("ai",)
+
+
+def test_equivalent_to_naive_scans_on_random_inputs():
+    rng = random.Random(7)
+    for _ in range(500):
+        keywords = ["".join(rng.choice("abé") for _ in range(rng.randint(1, 4)))
+                    for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice("abé ") for _ in range(rng.randint(0, 20)))
+        index = KeywordIndex(keywords)
+        assert index.contains_any(text) == any(kw in text for kw in keywords)
+        assert index.find_all(text) == {kw for kw in keywords if kw in text}
+        assert index.first_in_order(text) == next((kw for kw in keywords if kw in text), None)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du mode corpus (kg_batch.py) : lecture, nlp.pipe, graphe fusionné
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from rdflib import RDF
+from rdflib.compare import isomorphic
+from rdflib.namespace import FOAF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_batch
+import kg_extraction_semantic_web as kg
+import llm_backends
+from entity_type_memo import NullEntityTypeMemo, set_entity_type_memo
+from kg_logging import set_log_level
+from llm_cache import NullLLMCache, get_llm_cache, set_llm_cache
+from test_knowledge_graph_pipeline import _nlp
+
+CORPUS = [
+    ("a", "Zoubida Kedad travaille au CNRS. Elle vit à Paris."),
+    ("b", "Trop court"),
+    ("c", "Jean   Dupont travaille au CNRS depuis longtemps."),
+]
+
+
+@pytest.fixture
+def pipeline():
+    previous_cache = get_llm_cache()
+    set_llm_cache(NullLLMCache())
+    set_entity_type_memo(NullEntityTypeMemo())
+    yield kg.KnowledgeGraphPipeline(nlp=_nlp(), llm_backend=llm_backends.LocalStandInBackend(),
+                                    reasoning=False)
+    llm_backends.set_llm_backend(None)
+    set_entity_type_memo(None)
+    set_llm_cache(previous_cache)
+
+
+def test_read_documents_formats(tmp_path):
+    corpus_dir = tmp_path / "corpus"
+    corpus_dir.mkdir()
+    (corpus_dir / "b.txt").write_text("Deuxième texte.\n", encoding="utf-8")
+    (corpus_dir / "a.txt").write_text("Premier texte.", encoding="utf-8")
+    (corpus_dir / "notes.md").write_text("ignoré", encoding="utf-8")
+    (corpus_dir / "vide.txt").write_text("  \n", encoding="utf-8")
+    assert list(kg_batch.read_documents(str(corpus_dir))) == [
+        ("a.txt", "Premier texte."), ("b.txt", "Deuxième texte.")]
+
+    jsonl = tmp_path / "corpus.jsonl"
+    jsonl.write_text(json.dumps({"id": "d1", "text": "Un texte."}) + "\n\n"
+                     + json.dumps({"text": "Sans identifiant."}) + "\n", encoding="utf-8")
+    assert list(kg_batch.read_documents(str(jsonl))) == [
+        ("d1", "Un texte."), ("3", "Sans identifiant.")]
+
+    tsv = tmp_path / "corpus.tsv"
+    tsv.write_text("x1\tUn texte\tavec tabulation.\nTexte seul.\n", encoding="utf-8")
+    assert list(kg_batch.read_documents(str(tsv))) == [
+        ("x1", "Un texte\tavec tabulation."), ("2", "Texte seul.")]
+
+    with pytest.raises(ValueError):
+        list(kg_batch.read_documents(str(tmp_path / "corpus.csv")))
+
+
+def test_corpus_graph_matches_per_document_graphs(pipeline, monkeypatch):
+    expected = pipeline.new_graph()
+    for doc_id, text in CORPUS:
+        try:
+            expected += pipeline.process(text, source_file=doc_id)
+        except kg.PipelineInputError:
+            pass
+
+    # Une seule analyse spaCy par forme de texte, toutes via nlp.pipe
+    calls = []
+    original_call = type(pipeline.nlp).__call__
+    monkeypatch.setattr(type(pipeline.nlp), "__call__",
+                        lambda self, *a, **k: calls.append(a) or original_call(self, *a, **k))
+
+    graph, report = kg_batch.process_corpus(pipeline, CORPUS, batch_size=2)
+
+    assert calls == []
+    assert (report["documents"], report["processed"], report["rejected"], report["failed"]) == (3, 2, 1, 0)
+    assert report["triples"] == len(graph)
+    assert (kg.DATA["zoubida_kedad"], RDF.type, FOAF.Person) in graph
+    assert (kg.DATA["jean_dupont"], kg.EX.worksAt, kg.DATA["cnrs"]) in graph
+    assert isomorphic(graph, expected)
+
+
+def test_corpus_with_several_spacy_processes(pipeline):
+    single, _ = kg_batch.process_corpus(pipeline, CORPUS, batch_size=1, n_process=1)
+    multi, report = kg_batch.process_corpus(pipeline, CORPUS, batch_size=1, n_process=2)
+    assert report["processed"] == 2
+    assert isomorphic(single, multi)
+
+
+def test_rejection_warnings_follow_log_level(pipeline, capsys):
+    previous = set_log_level("ERROR")
+    try:
+        kg_batch.process_corpus(pipeline, CORPUS[1:2])
+    finally:
+        set_log_level(previous)
+    assert "[b] ignoré" not in capsys.readouterr().out
+
+    kg_batch.process_corpus(pipeline, CORPUS[1:2])
+    assert "⚠️ [b] ignoré" in capsys.readouterr().out
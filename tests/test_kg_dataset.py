@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du mode dataset (kg_dataset.py) : un graphe nommé par document
+"""
+
+import os
+import sys
+
+import pytest
+from rdflib import RDF
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_batch
+import kg_extraction_semantic_web as kg
+from kg_dataset import KnowledgeGraphDataset
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+def test_upsert_replaces_document_graph(pipeline):
+    kg_dataset = KnowledgeGraphDataset(pipeline)
+    kg_dataset.upsert_document("a", CORPUS[0][1])
+    kg_dataset.upsert_document("c", CORPUS[2][1])
+    assert kg_dataset.documents() == ["a", "c"]
+
+    before = set(kg_dataset.graph_for("c"))
+    kg_dataset.upsert_document("a", "Marie Curie travaille à Sorbonne Université depuis 1900.")
+    assert set(kg_dataset.graph_for("c")) == before
+    sources = set(kg_dataset.graph_for("a").objects(None, kg.DC.source))
+    assert {str(source) for source in sources} == {"a"}
+
+    # Texte rejeté : l'ancien graphe du document est conservé
+    previous = len(kg_dataset.graph_for("a"))
+    with pytest.raises(kg.PipelineInputError):
+        kg_dataset.upsert_document("a", "Trop court")
+    assert len(kg_dataset.graph_for("a")) == previous
+
+
+def test_delete_keeps_entities_of_other_documents(pipeline):
+    kg_dataset = KnowledgeGraphDataset(pipeline)
+    kg_dataset.upsert_document("c", CORPUS[2][1])
+    kg_dataset.upsert_document("d", "Marie   Curie travaille au CNRS depuis 1900.")
+    cnrs = kg.DATA.cnrs
+    assert (cnrs, None, None) in kg_dataset.graph_for("c")
+
+    assert kg_dataset.delete_document("c") > 0
+    assert kg_dataset.delete_document("c") == 0
+    assert "c" not in kg_dataset and kg_dataset.documents() == ["d"]
+    assert (cnrs, RDF.type, kg.SCHEMA.Organization) in kg_dataset.union_graph()
+    assert len(kg_dataset.tbox) == len(pipeline.tbox)
+
+
+@pytest.mark.parametrize("extension", [".trig", ".nq"])
+def test_corpus_sink_save_and_load(pipeline, tmp_path, extension):
+    merged, _ = kg_batch.process_corpus(pipeline, CORPUS)
+
+    kg_dataset = KnowledgeGraphDataset(pipeline)
+    graph, report = kg_batch.process_corpus(pipeline, CORPUS, sink=kg_dataset)
+    assert graph is None and report["triples"] == kg_dataset.triples
+    assert isomorphic(kg_dataset.union_graph(), merged)
+
+    path = str(tmp_path / f"corpus{extension}")
+    kg_dataset.save(path)
+    loaded = KnowledgeGraphDataset.load(path, pipeline)
+    assert loaded.documents() == ["a", "c"]
+    assert isomorphic(loaded.union_graph(), merged)
+
+    # Ré-extraction après rechargement : même graphe, T-Box toujours filtrée
+    size = len(loaded.graph_for("a"))
+    loaded.upsert_document("a", CORPUS[0][1])
+    assert len(loaded.graph_for("a")) == size
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la journalisation à niveaux du pipeline (kg_logging.py)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg_extraction_semantic_web import PipelineInputError
+from kg_logging import debug_enabled, get_logger, set_log_level
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+class _Formatted:
+    """Argument de message qui compte ses conversions en chaîne."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "formaté"
+
+
+@pytest.fixture
+def level():
+    previous = set_log_level("DEBUG")
+    yield set_log_level
+    set_log_level(previous)
+
+
+def test_threshold_skips_formatting(level, capsys):
+    logger = get_logger("test")
+    argument = _Formatted()
+
+    level("WARNING")
+    logger.debug("  ✓ %s", argument)
+    logger.info("[ÉTAPE] %s", argument)
+    assert argument.calls == 0 and not debug_enabled()
+    logger.warning("⚠️ %s", argument)
+
+    level("DEBUG")
+    logger.debug("100%% %s", argument)
+    assert capsys.readouterr().out == "⚠️ formaté\n100% formaté\n"
+    assert argument.calls == 2 and debug_enabled()
+
+    with pytest.raises(ValueError):
+        level("BAVARD")
+
+
+def test_production_mode_silences_document_processing(level, pipeline, capsys):
+    level("DEBUG")
+    pipeline.process(CORPUS[0][1], reasoning=False)
+    verbose = capsys.readouterr().out
+    assert "✓ Instance créée" in verbose and "[RÉIFICATION]" in verbose
+
+    level("INFO")
+    pipeline.process(CORPUS[0][1], reasoning=False)
+    summary = capsys.readouterr().out
+    assert "[RÉIFICATION]" in summary and "✓ Instance créée" not in summary
+
+    level("WARNING")
+    graph = pipeline.process(CORPUS[0][1], reasoning=False)
+    with pytest.raises(PipelineInputError):
+        pipeline.process(CORPUS[1][1])
+    assert capsys.readouterr().out == ""
+    assert len(graph) > len(pipeline.tbox)
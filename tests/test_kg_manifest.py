@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du traitement incrémental (kg_manifest.py) : reprise des documents inchangés
+"""
+
+import os
+import sys
+
+import pytest
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_batch
+import kg_extraction_semantic_web as kg
+import kg_worker_pool
+from kg_extraction_semantic_web import PipelineInputError
+from kg_manifest import RunManifest, ontology_version, pipeline_version, process_incremental
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+def _forbid_process(monkeypatch, pipeline):
+    def _process(*args, **kwargs):
+        raise AssertionError("document inchangé ré-extrait")
+    monkeypatch.setattr(pipeline, "process", _process)
+
+
+def test_unchanged_corpus_is_not_reprocessed(pipeline, tmp_path, monkeypatch):
+    directory = str(tmp_path / "manifest")
+    first, report = kg_batch.process_corpus(pipeline, CORPUS,
+                                            manifest=RunManifest.for_pipeline(pipeline, directory))
+    assert (report["processed"], report["rejected"], report["skipped"]) == (2, 1, 0)
+
+    manifest = RunManifest.for_pipeline(pipeline, directory)
+    entry = manifest.entry("a")
+    assert entry["status"] == "ok" and entry["triples"] > 0
+    assert {"validation", "entities", "types", "relations", "reification"} <= set(entry["timings"])
+    assert manifest.entry("b")["status"] == "rejected"
+
+    _forbid_process(monkeypatch, pipeline)
+    second, report = kg_batch.process_corpus(pipeline, CORPUS, manifest=manifest)
+    assert (report["documents"], report["processed"], report["skipped"]) == (3, 0, 3)
+    assert isomorphic(first, second)
+
+
+def test_changed_text_or_version_is_reprocessed(pipeline, tmp_path):
+    directory = str(tmp_path / "manifest")
+    kg_batch.process_corpus(pipeline, CORPUS, manifest=RunManifest.for_pipeline(pipeline, directory))
+
+    changed = [CORPUS[0], CORPUS[1], ("c", "Marie   Curie travaille au CNRS depuis 1900.")]
+    manifest = RunManifest.for_pipeline(pipeline, directory)
+    graph, report = kg_batch.process_corpus(pipeline, changed, manifest=manifest)
+    assert (report["processed"], report["skipped"]) == (1, 2)
+    assert manifest.stats()["updated"] == 1
+    assert any("marie_curie" in str(s) for s in graph.subjects())
+
+    stale = RunManifest(directory, pipeline_version="0-autre",
+                        ontology_version=ontology_version(pipeline.tbox))
+    assert stale.invalidated and not stale.is_current("a", CORPUS[0][1])
+    assert pipeline_version(pipeline) != "0-autre"
+
+
+@pytest.mark.parametrize("setting", ["KG_RELATION_WINDOW", "KG_RELATION_DEP_HOPS", "RULE_FIRST_ENABLED",
+                                     "COMPACT_PROMPT_MODE", "batch_mode"])
+def test_relation_settings_invalidate_the_manifest(pipeline, tmp_path, monkeypatch, setting):
+    directory = str(tmp_path / "manifest")
+    kg_batch.process_corpus(pipeline, CORPUS[:1], manifest=RunManifest.for_pipeline(pipeline, directory))
+    assert RunManifest.for_pipeline(pipeline, directory).is_current("a", CORPUS[0][1])
+
+    if setting.startswith("KG_"):
+        monkeypatch.setenv(setting, "7")
+    elif setting == "batch_mode":
+        monkeypatch.setattr(pipeline, "batch_mode", not kg.BATCH_RELATION_MODE)
+    else:
+        monkeypatch.setattr(kg, setting, not getattr(kg, setting))
+    manifest = RunManifest.for_pipeline(pipeline, directory)
+    assert manifest.invalidated and not manifest.is_current("a", CORPUS[0][1])
+
+
+def test_process_incremental_remembers_rejections(pipeline, tmp_path, monkeypatch):
+    manifest = RunManifest.for_pipeline(pipeline, str(tmp_path))
+    graph = process_incremental(pipeline, manifest, CORPUS[0][1], "a")
+    with pytest.raises(PipelineInputError):
+        process_incremental(pipeline, manifest, "Trop court", "b")
+
+    _forbid_process(monkeypatch, pipeline)
+    assert isomorphic(process_incremental(pipeline, manifest, CORPUS[0][1], "a"), graph)
+    with pytest.raises(PipelineInputError):
+        process_incremental(pipeline, manifest, "Trop court", "b")
+    assert manifest.stats()["skipped"] == 2
+
+
+def test_worker_pool_reuses_manifest(pipeline, tmp_path):
+    if not kg_worker_pool.fork_available():
+        pytest.skip("fork() indisponible")
+    directory = str(tmp_path / "manifest")
+    merged, _ = kg_batch.process_corpus(pipeline, CORPUS)
+
+    graph, report = kg_worker_pool.process_corpus_parallel(
+        pipeline, CORPUS, workers=2, manifest=RunManifest.for_pipeline(pipeline, directory))
+    assert report["processed"] == 2 and isomorphic(graph, merged)
+    assert RunManifest.for_pipeline(pipeline, directory).entry("c")["timings"]
+
+    graph, report = kg_worker_pool.process_corpus_parallel(
+        pipeline, CORPUS, workers=2, manifest=RunManifest.for_pipeline(pipeline, directory))
+    assert (report["processed"], report["skipped"]) == (0, 3) and isomorphic(graph, merged)
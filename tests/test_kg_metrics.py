@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du registre de métriques (kg_metrics.py) et de son alimentation par le pipeline
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg_extraction_semantic_web import PipelineInputError
+from kg_metrics import MetricsRegistry, NullMetricsRegistry, export_metrics, get_metrics, set_metrics
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def metrics():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    set_metrics(registry)
+    yield registry
+    set_metrics(None)
+
+
+def test_counters_gauges_histograms_and_exports(metrics, tmp_path):
+    metrics.inc("kg_documents_total", status="ok")
+    metrics.inc("kg_documents_total", 2, status="ok")
+    metrics.set_gauge("kg_graph_triples", 42)
+    metrics.observe("kg_stage_seconds", 0.05, stage="relations")
+    metrics.observe("kg_stage_seconds", 0.5, stage="relations")
+    metrics.observe("kg_stage_seconds", 3.0, stage="relations")
+    metrics.inc("kg_llm_calls_total", backend='gr"oq\n')
+
+    assert metrics.value("kg_documents_total", status="ok") == 3
+    assert metrics.value("kg_graph_triples") == 42
+    assert metrics.histogram("kg_stage_seconds", stage="relations") == {"count": 3, "sum": 3.55}
+
+    text = metrics.to_prometheus()
+    assert "# TYPE kg_stage_seconds histogram" in text
+    assert 'kg_documents_total{status="ok"} 3' in text.splitlines()
+    assert 'kg_stage_seconds_bucket{stage="relations",le="1.0"} 2' in text
+    assert 'kg_stage_seconds_bucket{stage="relations",le="+Inf"} 3' in text
+    assert 'kg_stage_seconds_count{stage="relations"} 3' in text
+    assert 'kg_llm_calls_total{backend="gr\\"oq\\n"} 1' in text
+
+    written = export_metrics(str(tmp_path / "run.json"), str(tmp_path / "run.prom"))
+    assert len(written) == 2
+    report = json.loads((tmp_path / "run.json").read_text(encoding="utf-8"))
+    (histogram,) = report["histograms"]
+    assert histogram["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+    assert (tmp_path / "run.prom").read_text(encoding="utf-8") == text
+
+
+def test_pipeline_stages_feed_the_registry(metrics, pipeline):
+    pipeline.process(CORPUS[0][1], reasoning=False)
+    with pytest.raises(PipelineInputError):
+        pipeline.process(CORPUS[1][1])
+
+    for stage in ("validation", "entities", "types", "abox", "relations", "reification",
+                  "verb_dispatch"):
+        assert metrics.histogram("kg_stage_seconds", stage=stage)["count"] == 1, stage
+    assert metrics.histogram("kg_ner_layer_seconds", layer="1_spacy_ner")["count"] == 1
+    assert metrics.value("kg_ner_entities_total", layer="6_confidence") >= 2
+    assert metrics.value("kg_documents_total", status="ok") == 1
+    assert metrics.value("kg_documents_total", status="rejected") == 1
+    assert metrics.value("kg_triples_added_total") > 0
+
+
+def test_null_registry_when_disabled(monkeypatch):
+    set_metrics(None)
+    monkeypatch.setenv("KG_METRICS", "0")
+    try:
+        registry = get_metrics()
+        assert isinstance(registry, NullMetricsRegistry)
+        with registry.timer("kg_stage_seconds", stage="x"):
+            registry.inc("kg_documents_total")
+        assert registry.to_prometheus() == "" and export_metrics() == []
+    finally:
+        set_metrics(None)
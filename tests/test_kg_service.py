@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du service HTTP/JSON d'extraction (kg_service.py)
+"""
+
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rdflib import Graph, RDF
+from rdflib.namespace import DC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg_service import PipelinePool, create_server
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def service(pipeline):
+    server = create_server(PipelinePool([pipeline]), "127.0.0.1", 0, timeout=0.2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _request(url, payload=None, raw=None):
+    """(code HTTP, corps JSON) d'un GET, ou d'un POST si un corps est donné."""
+    data = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else None)
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_extract_formats(service):
+    _, url = service
+    status, turtle = _request(f"{url}/extract", {"text": CORPUS[0][1], "doc_id": "cv.txt"})
+    assert status == 200 and turtle["format"] == "turtle"
+    graph = Graph().parse(data=turtle["graph"], format="turtle")
+    assert len(graph) == turtle["stats"]["triples"]
+    assert "cv.txt" in {str(source) for source in graph.objects(None, DC.source)}
+    assert turtle["stats"]["instances"] >= 2 and turtle["stats"]["relations"] >= 1
+    assert turtle["stats"]["reified"] == len(set(graph.subjects(RDF.type, RDF.Statement)))
+    assert {"validation", "entities", "relations"} <= set(turtle["timings_ms"])
+
+    status, jsonld = _request(f"{url}/extract", {"text": CORPUS[0][1], "format": "json-ld"})
+    assert status == 200 and jsonld["doc_id"].startswith("requete_")
+    assert len(Graph().parse(data=json.dumps(jsonld["graph"]), format="json-ld")) == len(graph)
+
+    status, stats = _request(f"{url}/extract", {"text": CORPUS[0][1], "format": "stats"})
+    assert status == 200 and "graph" not in stats and stats["stats"] == turtle["stats"]
+
+
+def test_errors_are_reported_with_http_codes(service):
+    _, url = service
+    assert _request(f"{url}/extract", {"text": CORPUS[1][1]})[0] == 422
+    assert _request(f"{url}/extract", raw=b"{pas du json")[0] == 400
+    assert _request(f"{url}/extract", {"texte": "oubli"})[0] == 400
+    assert _request(f"{url}/extract", {"text": CORPUS[0][1], "format": "xml"})[0] == 400
+    assert _request(f"{url}/inconnu", {})[0] == 404
+
+    status, health = _request(f"{url}/health")
+    assert status == 200 and (health["pipelines"], health["busy"]) == (1, 0)
+
+
+def test_concurrent_requests_share_the_pool(service):
+    server, url = service
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = list(executor.map(
+            lambda i: _request(f"{url}/extract", {"text": CORPUS[2][1], "doc_id": f"d{i}"})[0],
+            range(4)))
+    assert statuses == [200] * 4
+
+    # Pipeline occupé au-delà du délai d'attente : 503
+    with server.pool.acquire():
+        status, busy = _request(f"{url}/extract", {"text": CORPUS[0][1]})
+    assert status == 503 and "Aucun pipeline libre" in busy["error"]
+    assert _request(f"{url}/extract", {"text": CORPUS[0][1]})[0] == 200
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du traçage par spans (kg_tracing.py) et de l'export Chrome trace-event
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_tracing
+import kg_worker_pool
+from kg_tracing import export_trace, record_span, span, start_tracing, stop_tracing, traced
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def tracer():
+    yield start_tracing()
+    stop_tracing()
+
+
+def test_nested_spans_and_chrome_export(tracer, tmp_path):
+    @traced("export.dummy")
+    def dummy():
+        return 42
+
+    with span("document", doc_id="cours.txt") as document:
+        with span("relations.predict", pairs=3) as current:
+            current.set(mode="batch")
+        assert dummy() == 42
+        document.set(triples=7)
+    with pytest.raises(ValueError):
+        with span("stage.types"):
+            raise ValueError("boom")
+    record_span("llm.call", 1.0, 1.5, backend="groq")
+
+    written = export_trace(str(tmp_path / "trace.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    assert written == str(tmp_path / "trace.json")
+
+    events = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+    assert set(events) == {"document", "relations.predict", "export.dummy", "stage.types", "llm.call"}
+    parent, child = events["document"], events["relations.predict"]
+    assert parent["ts"] <= child["ts"] and child["ts"] + child["dur"] <= parent["ts"] + parent["dur"]
+    assert parent["args"] == {"doc_id": "cours.txt", "triples": 7}
+    assert child["args"] == {"pairs": 3, "mode": "batch"} and child["cat"] == "relations"
+    assert events["stage.types"]["args"] == {"error": "ValueError"}
+    assert (events["llm.call"]["ts"], events["llm.call"]["dur"]) == (1e6, 5e5)
+    (metadata,) = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+    assert metadata["args"]["name"] == "kg_pipeline"
+
+
+def test_pipeline_process_emits_document_stage_and_ner_spans(tracer, pipeline):
+    pipeline.process(CORPUS[0][1], source_file="a.txt", reasoning=False)
+
+    names = [event["name"] for event in tracer.events()]
+    for name in ("stage.validation", "stage.entities", "stage.relations", "ner.1_spacy_ner",
+                 "relations.verb_dispatch"):
+        assert name in names, name
+    (document,) = [event for event in tracer.events() if event["name"] == "document"]
+    assert document["args"]["doc_id"] == "a.txt"
+    assert document["args"]["entities"] >= 2 and document["args"]["triples"] > 0
+
+
+@pytest.mark.skipif(not kg_worker_pool.fork_available(), reason="fork() indisponible")
+def test_worker_spans_reach_the_parent_trace(tracer, pipeline):
+    kg_worker_pool.process_corpus_parallel(pipeline, CORPUS, workers=2)
+
+    documents = [event for event in tracer.events() if event["name"] == "document"]
+    assert sorted(event["args"]["doc_id"] for event in documents) == ["a", "b", "c"]
+    assert all(event["pid"] != os.getpid() for event in documents)
+
+
+def test_disabled_tracing_is_a_shared_no_op(tmp_path):
+    stop_tracing()
+    assert kg_tracing.get_tracer() is None
+    assert span("document", doc_id="x") is span("stage.types")
+    with span("document") as current:
+        current.set(triples=1)
+    record_span("llm.call", 0.0)
+    assert export_trace(str(tmp_path / "trace.json")) is None
+    assert not (tmp_path / "trace.json").exists()
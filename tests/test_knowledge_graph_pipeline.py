@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du pipeline réutilisable KnowledgeGraphPipeline
+"""
+
+import os
+import sys
+
+import pytest
+import spacy
+from spacy.language import Language
+from rdflib import RDF
+from rdflib.namespace import FOAF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_extraction_semantic_web as kg
+import llm_backends
+from entity_type_memo import NullEntityTypeMemo, set_entity_type_memo
+from llm_cache import NullLLMCache, get_llm_cache, set_llm_cache
+
+
+@Language.component("test_flat_parser")
+def _flat_parser(doc):
+    """Analyse factice : un arbre plat par phrase, enraciné sur son premier token."""
+    for sent in list(doc.sents):
+        for token in sent:
+            token.dep_ = "ROOT" if token.i == sent.start else "dep"
+            token.head = sent[0]
+    for token in doc:
+        token.pos_ = ("PROPN" if token.text[:1].isupper()
+                      else "VERB" if token.text.endswith(("e", "é")) else "NOUN")
+        token.lemma_ = token.text.lower()
+    return doc
+
+
+def _nlp():
+    """Modèle français minimal : phrases, analyse plate et NER par motifs."""
+    nlp = spacy.blank("fr")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("test_flat_parser")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([
+        {"label": "PER", "pattern": "Zoubida Kedad"},
+        {"label": "PER", "pattern": "Jean Dupont"},
+        {"label": "ORG", "pattern": "CNRS"},
+        {"label": "LOC", "pattern": "Paris"},
+    ])
+    return nlp
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    previous_cache = get_llm_cache()
+    set_llm_cache(NullLLMCache())
+    set_entity_type_memo(NullEntityTypeMemo())
+    backend = llm_backends.LocalStandInBackend()
+    yield kg.KnowledgeGraphPipeline(nlp=_nlp(), llm_backend=backend, reasoning=False)
+    llm_backends.set_llm_backend(None)
+    set_entity_type_memo(None)
+    set_llm_cache(previous_cache)
+
+
+def test_process_builds_independent_graphs_without_loading_models(pipeline, monkeypatch):
+    def forbidden_load(*args, **kwargs):
+        raise AssertionError("spacy.load appelé pendant process()")
+
+    monkeypatch.setattr(kg.spacy, "load", forbidden_load)
+    tbox_size = len(pipeline.tbox)
+
+    first = pipeline.process("Zoubida Kedad travaille au CNRS. Elle vit à Paris.")
+    second = pipeline.process("Jean Dupont travaille au CNRS depuis longtemps.")
+
+    assert (kg.DATA["zoubida_kedad"], RDF.type, FOAF.Person) in first
+    assert (kg.DATA["jean_dupont"], kg.EX.worksAt, kg.DATA["cnrs"]) in second
+    assert (kg.DATA["zoubida_kedad"], RDF.type, FOAF.Person) not in second
+    assert len(pipeline.tbox) == tbox_size
+    assert all(triple in first for triple in pipeline.tbox)
+
+
+def test_entity_ruler_is_installed_once(pipeline):
+    pipeline.process("Zoubida Kedad travaille au CNRS à Paris.")
+    pipeline.process("Jean Dupont travaille au CNRS à Paris.")
+    assert pipeline.nlp.pipe_names.count("entity_ruler") == 1
+
+
+def test_entry_gate_rejections(pipeline):
+    with pytest.raises(kg.PipelineInputError):
+        pipeline.process("Trop court")
+    with pytest.raises(kg.PipelineInputError, match="entités"):
+        pipeline.process("Zoubida Kedad aime beaucoup la musique classique.")
+
+
+def test_progress_reports_each_stage_in_order(pipeline):
+    events, timings = [], {}
+    pipeline.process("Zoubida Kedad travaille au CNRS. Elle vit à Paris.",
+                     timings=timings, progress=lambda stage, seconds: events.append((stage, seconds)))
+
+    assert [stage for stage, _ in events] == [s for s in pipeline.STAGES if s != "reasoning"]
+    assert dict(events) == timings
+
+    events.clear()
+    with pytest.raises(kg.PipelineInputError):
+        pipeline.process("Trop court", progress=lambda stage, seconds: events.append(stage))
+    assert events == []
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des imports paresseux et de l'option --no-viz (démarrage à froid)
+"""
+
+import io
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import kg_extraction_semantic_web as kg
+from test_knowledge_graph_pipeline import _nlp, pipeline  # noqa: F401 (fixture)
+
+LAZY_MODULES = ("matplotlib", "networkx", "groq", "huggingface_hub", "httpx")
+
+
+def test_import_does_not_load_visualization_or_llm_sdks():
+    code = ("import sys, kg_extraction_semantic_web; "
+            f"print('chargés:', [m for m in {LAZY_MODULES!r} if m in sys.modules])")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, KG_LLM_BACKEND="local"), check=True)
+    assert result.stdout.strip().splitlines()[-1] == "chargés: []"
+
+
+def test_main_no_viz_skips_visualization(pipeline, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(kg.spacy, "load", lambda *args, **kwargs: _nlp())
+    monkeypatch.setattr(sys, "stdin", io.StringIO(""))
+    monkeypatch.setattr(sys, "argv", ["kg_extraction_semantic_web.py", "--no-viz", "--text",
+                                      "Jean Dupont travaille au CNRS depuis longtemps."])
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("visualisation appelée malgré --no-viz")
+
+    monkeypatch.setattr(kg, "visualize_knowledge_graph", forbidden)
+    kg.main()
+
+    assert (tmp_path / "knowledge_graph.ttl").exists() and (tmp_path / "knowledge_graph.xml").exists()
+    assert not (tmp_path / "graphe_connaissance.png").exists()
+    assert "[INFO] Texte chargé depuis argument --text" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du cache persistant des réponses LLM (llm_cache.py)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMResponseCache
+
+
+def test_hit_after_miss(tmp_path):
+    """Une requête déjà vue est servie sans rappeler le LLM"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "worksAt"
+
+    assert cache.get_or_compute("m", "sys", "prompt", compute) == "worksAt"
+    assert cache.get_or_compute("m", "sys", "prompt", compute) == "worksAt"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_model_and_prompts(tmp_path):
+    """Modèle, prompt système et prompt utilisateur font partie de la clé"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("m", "sys", "prompt", "author")
+
+    assert cache.get("m", "sys", "prompt") == "author"
+    assert cache.get("other-model", "sys", "prompt") is None
+    assert cache.get("m", "other-sys", "prompt") is None
+    assert cache.get("m", "sys", "other-prompt") is None
+
+
+def test_persistence_across_instances(tmp_path):
+    """Le cache survit à la fin du processus (fichier SQLite)"""
+    path = str(tmp_path / "cache.sqlite3")
+    first = LLMResponseCache(path)
+    first.put("m", "sys", "prompt", "locatedIn")
+    first.close()
+
+    second = LLMResponseCache(path)
+    assert second.get("m", "sys", "prompt") == "locatedIn"
+
+
+def test_lru_eviction(tmp_path):
+    """Au-delà de max_entries, l'entrée la moins récemment utilisée est évincée"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("m", "sys", "a", "1")
+    time.sleep(0.01)
+    cache.put("m", "sys", "b", "2")
+    time.sleep(0.01)
+    assert cache.get("m", "sys", "a") == "1"  # "a" devient la plus récente
+    time.sleep(0.01)
+    cache.put("m", "sys", "c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("m", "sys", "b") is None
+    assert cache.get("m", "sys", "a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(tmp_path):
+    """Une entrée plus vieille que le TTL est considérée absente"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    cache.put("m", "sys", "prompt", "author")
+    time.sleep(0.1)
+    assert cache.get("m", "sys", "prompt") is None
+
+
+def test_ontology_version_invalidation(tmp_path):
+    """Changer de version d'ontologie invalide les réponses précédentes"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ontology_version="v1")
+    cache.put("m", "sys", "prompt", "teachesSubject")
+
+    removed = cache.set_ontology_version("v2")
+    assert removed == 1
+    assert cache.get("m", "sys", "prompt") is None
+
+
+def test_errors_are_not_cached(tmp_path):
+    """Une exception du LLM se propage et n'est pas mémorisée"""
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+
+    def failing():
+        raise RuntimeError("API indisponible")
+
+    try:
+        cache.get_or_compute("m", "sys", "prompt", failing)
+    except RuntimeError:
+        pass
+    assert len(cache) == 0
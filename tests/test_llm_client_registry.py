@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du registre des clients LLM (llm_client_registry.py)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_client_registry
+from llm_client_registry import get_groq_client, get_hf_client
+
+
+def test_groq_client_is_reused():
+    """Une même clé API renvoie toujours le même client (et donc le même pool)"""
+    llm_client_registry.close_all_clients()
+    first = get_groq_client("key-a")
+    assert get_groq_client("key-a") is first
+    assert get_groq_client("key-b") is not first
+    assert llm_client_registry.registry_stats()["groq"] == 2
+    llm_client_registry.close_all_clients()
+
+
+def test_hf_client_keyed_by_model_and_token():
+    """Un client Hugging Face par couple (modèle, token)"""
+    llm_client_registry.close_all_clients()
+    client = get_hf_client(model="m1", token="t")
+    assert get_hf_client(model="m1", token="t") is client
+    assert get_hf_client(model="m2", token="t") is not client
+    llm_client_registry.close_all_clients()
+    assert llm_client_registry.registry_stats() == {"groq": 0, "huggingface": 0}
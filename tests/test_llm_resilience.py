@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la couche de résilience LLM : retry, disjoncteur, requêtes couvertes
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg_metrics import MetricsRegistry, set_metrics
+from llm_backends import LLMBackend, LLMBackendError, LocalStandInBackend
+from llm_resilience import (CircuitBreaker, CircuitOpenError, ResilientBackend,
+                            RetryPolicy, is_retryable, make_resilient)
+
+
+class FlakyBackend(LLMBackend):
+    """Échoue `failures` fois puis répond ; latence configurable par appel."""
+
+    name = "flaky"
+
+    def __init__(self, failures=0, error=None, latencies=None):
+        super().__init__("flaky-model")
+        self.failures = failures
+        self.error = error or LLMBackendError("503")
+        self.latencies = list(latencies or [])
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, system_prompt, user_prompt):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.latencies:
+            time.sleep(self.latencies[min(call, len(self.latencies)) - 1])
+        if call <= self.failures:
+            raise self.error
+        return f"réponse {call}"
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_backoff_is_bounded_and_exponential():
+    policy = RetryPolicy(max_retries=5, base_delay=0.5, max_delay=3.0)
+    for attempt, ceiling in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0.0 <= d <= ceiling for d in delays)
+        assert max(delays) > ceiling / 2
+
+
+def test_transient_errors_are_retried():
+    waits = []
+    backend = ResilientBackend(FlakyBackend(failures=2),
+                               retry_policy=RetryPolicy(max_retries=2, base_delay=0.1),
+                               sleep=waits.append)
+    assert backend.complete("s", "u") == "réponse 3"
+    stats = backend.stats()
+    assert (stats["attempts"], stats["retries"], stats["failures"], stats["successes"]) == (3, 2, 2, 1)
+    assert len(waits) == 2 and stats["backoff_total"] == round(sum(waits), 3)
+
+
+def test_retries_exhausted_and_non_retryable_errors():
+    backend = ResilientBackend(FlakyBackend(failures=5), retry_policy=RetryPolicy(max_retries=1),
+                               sleep=lambda _: None)
+    with pytest.raises(LLMBackendError):
+        backend.complete("s", "u")
+    assert backend.stats()["retries_exhausted"] == 1
+
+    assert not is_retryable(HTTPError(401))
+    assert is_retryable(HTTPError(429)) and is_retryable(TimeoutError())
+    inner = FlakyBackend(failures=5, error=HTTPError(400))
+    backend = ResilientBackend(inner, sleep=lambda _: None)
+    with pytest.raises(HTTPError):
+        backend.complete("s", "u")
+    assert inner.calls == 1 and backend.stats()["non_retryable"] == 1
+
+
+def test_circuit_breaker_opens_then_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    inner = FlakyBackend(failures=3)
+    backend = ResilientBackend(inner, retry_policy=RetryPolicy(max_retries=0),
+                               breaker=breaker, sleep=lambda _: None)
+
+    for _ in range(3):
+        with pytest.raises(LLMBackendError):
+            backend.complete("s", "u")
+    assert backend.is_degraded() and breaker.state == "open"
+
+    # Circuit ouvert : refus immédiat, aucun appel réseau
+    with pytest.raises(CircuitOpenError):
+        backend.complete("s", "u")
+    assert inner.calls == 3 and backend.stats()["short_circuited"] == 1
+
+    # Après reset_timeout : une sonde, qui réussit et referme le circuit
+    clock.now = 10
+    assert not backend.is_degraded()
+    assert backend.complete("s", "u") == "réponse 4"
+    assert breaker.state == "closed" and breaker.times_opened == 1
+
+
+def test_half_open_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    assert breaker.allow_request()
+    assert not breaker.allow_request()     # une seule sonde à la fois
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+
+def test_hedged_request_wins_when_primary_is_slow():
+    # 20 appels rapides pour établir le p95, puis un appel primaire très lent
+    inner = FlakyBackend(latencies=[0.01] * 20 + [1.0, 0.01])
+    backend = ResilientBackend(inner, hedge=True, hedge_min_samples=20)
+    for _ in range(20):
+        backend.complete("s", "u")
+
+    start = time.perf_counter()
+    assert backend.complete("s", "u") == "réponse 22"
+    assert time.perf_counter() - start < 0.5
+    stats = backend.stats()
+    assert stats["hedges_launched"] == 1 and stats["hedges_won"] == 1
+
+
+def test_make_resilient_respects_configuration(monkeypatch):
+    local = LocalStandInBackend()
+    wrapped = make_resilient(local)
+    assert isinstance(wrapped, ResilientBackend) and wrapped.model == local.model
+    assert make_resilient(wrapped) is wrapped
+    monkeypatch.setenv("KG_LLM_RESILIENCE", "0")
+    assert make_resilient(local) is local
+
+
+def test_counters_are_exported_to_metrics():
+    registry = MetricsRegistry()
+    set_metrics(registry)
+    try:
+        backend = ResilientBackend(FlakyBackend(failures=2),
+                                   retry_policy=RetryPolicy(max_retries=1, base_delay=0.1),
+                                   breaker=CircuitBreaker(failure_threshold=2), sleep=lambda _: None)
+        with pytest.raises(LLMBackendError):
+            backend.complete("s", "u")
+        with pytest.raises(CircuitOpenError):
+            backend.complete("s", "u")
+    finally:
+        set_metrics(None)
+
+    stats = backend.stats()
+    for event in ("calls", "attempts", "retries", "failures", "retries_exhausted", "short_circuited"):
+        assert registry.value("kg_llm_resilience_events_total", backend="flaky", event=event) == stats[event]
+    assert registry.value("kg_llm_backoff_seconds_total", backend="flaky") == pytest.approx(
+        stats["backoff_total"], abs=1e-3)
+    assert registry.value("kg_llm_breaker_opened_total") == stats["breaker_opened"] == 1
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la comptabilité des tokens et du prompt de relation compact
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_extraction_semantic_web as kg
+from llm_backends import LocalStandInBackend
+import llm_token_usage
+from llm_token_usage import estimate_tokens, get_token_usage_stats, record_usage
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Marie") == 2                 # 5 caractères → 2 tranches
+    assert estimate_tokens("un, deux.") == 4             # 2 mots + 2 ponctuations
+    assert estimate_tokens("a " * 100) == 100
+
+
+def test_record_usage_exact_and_estimated():
+    stats = get_token_usage_stats()
+    stats.reset()
+    record_usage("groq", "m", "system", "user", "worksAt", 0.2,
+                 prompt_tokens=120, completion_tokens=3)
+    estimated = record_usage("hf", "m", "system", "user prompt", "worksAt", 0.1)
+    assert estimated.estimated and estimated.prompt_tokens == estimate_tokens("system user prompt")
+
+    summary = stats.summary()
+    assert summary["calls"] == 2 and summary["estimated_calls"] == 1
+    assert summary["prompt_tokens"] == 120 + estimated.prompt_tokens
+    assert summary["latency_per_call_ms"] == 150.0
+    stats.reset()
+    assert stats.summary()["calls"] == 0
+
+
+def test_local_backend_records_each_call():
+    stats = get_token_usage_stats()
+    stats.reset()
+    backend = LocalStandInBackend()
+    backend.complete("relation extraction", 'Text: "x"')
+    backend.respond("relation extraction", 'Text: "x"')      # sans comptabilité
+    assert stats.summary()["calls"] == 1
+    assert stats.as_dicts()[0]["backend"] == backend.name
+    stats.reset()
+
+
+def test_compact_prompt_is_shorter_and_same_answer():
+    backend = LocalStandInBackend()
+    args = ("Marie Curie", "CNRS", "Marie Curie travaille au CNRS.", "PER", "ORG")
+    verbose = kg.build_relation_prompt(*args, compact=False)
+    compact = kg.build_relation_prompt(*args, compact=True)
+
+    assert sum(map(estimate_tokens, compact)) < sum(map(estimate_tokens, verbose)) / 2
+    assert "Admissible: worksAt, manages, studiesAt, collaboratesWith, relatedTo, NO_VALID_RELATIONS" in compact[1]
+    assert backend.answer(*compact) == backend.answer(*verbose) == "worksAt"
+
+    # Relation hors de la liste admissible → refus
+    restricted = kg.build_relation_prompt(*args, allowed_relations=["manages"], compact=True)
+    assert backend.answer(*restricted) == "NO_VALID_RELATIONS"
+
+
+def test_usage_stats_keep_totals_but_bounded_detail():
+    stats = get_token_usage_stats()
+    stats.reset()
+    for _ in range(llm_token_usage.RECENT_RECORDS + 10):
+        record_usage("groq", "m", "s", "u", "r", 0.001, prompt_tokens=2, completion_tokens=1)
+    assert stats.summary()["calls"] == llm_token_usage.RECENT_RECORDS + 10
+    assert stats.summary()["prompt_tokens"] == 2 * (llm_token_usage.RECENT_RECORDS + 10)
+    assert len(stats.as_dicts()) == llm_token_usage.RECENT_RECORDS
+    stats.reset()
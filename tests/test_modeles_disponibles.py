@@ -4,8 +4,12 @@
 Test avec modèle gratuit accessible - Meta Llama ou alternatives
 """
 
-from huggingface_hub import InferenceClient
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client_registry import get_hf_client
 
 HF_TOKEN = os.getenv("HF_TOKEN", "your_huggingface_token_here")
 
@@ -22,7 +26,7 @@ models = [
     "microsoft/phi-2"
 ]
 
-client = InferenceClient(token=HF_TOKEN)
+client = get_hf_client(token=HF_TOKEN)
 
 for model_name in models:
     print(f"\n🤖 Test: {model_name}")
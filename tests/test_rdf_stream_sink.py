@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'écriture en flux N-Triples / N-Quads (rdf_stream_sink.py)
+"""
+
+import gzip
+import os
+import sys
+
+from rdflib import Dataset, Graph, Literal, Namespace
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_batch
+import kg_worker_pool
+from rdf_stream_sink import StreamingTripleSink, convert, document_graph_uri, load_stream
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+EX = Namespace("http://example.org/master2/ontology#")
+DATA = Namespace("http://example.org/master2/data#")
+
+
+def _tbox():
+    tbox = Graph()
+    tbox.add((EX.Cours, EX.label, Literal("Cours")))
+    return tbox
+
+
+def _document(tbox, name, text):
+    graph = Graph()
+    graph += tbox
+    graph.add((DATA[name], EX.intitule, Literal(text, lang="fr")))
+    return graph
+
+
+def test_nquads_gzip_one_named_graph_per_document(tmp_path):
+    path = str(tmp_path / "corpus.nq.gz")
+    tbox = _tbox()
+    with StreamingTripleSink(path, tbox=tbox) as sink:
+        sink.write_graph(_document(tbox, "a", 'Cours "RDF"\nsur deux lignes'), "doc a.txt")
+        sink.write_graph(_document(tbox, "b", "Cours OWL"), "b")
+        assert sink.stats()["documents"] == 2 and sink.triples == 3
+
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert len(lines) == 3 and lines[-1].endswith(f"{document_graph_uri('b').n3()} .")
+
+    dataset = load_stream(path)
+    assert isinstance(dataset, Dataset)
+    named = dataset.graph(document_graph_uri("doc a.txt"))
+    assert (DATA.a, EX.intitule, Literal('Cours "RDF"\nsur deux lignes', lang="fr")) in named
+    assert len(dataset.graph(document_graph_uri("b"))) == 1
+
+
+def test_append_does_not_rewrite_tbox(tmp_path):
+    path = str(tmp_path / "corpus.nt")
+    tbox = _tbox()
+    with StreamingTripleSink(path, tbox=tbox) as sink:
+        sink.write_graph(_document(tbox, "a", "A"))
+    with StreamingTripleSink(path, tbox=tbox, append=True) as sink:
+        sink.write_graph(_document(tbox, "b", "B"))
+    with open(path, encoding="utf-8") as handle:
+        assert len(handle.read().splitlines()) == 3
+
+
+def test_convert_to_turtle_and_trig(tmp_path):
+    path = str(tmp_path / "corpus.nq")
+    tbox = _tbox()
+    with StreamingTripleSink(path, tbox=tbox) as sink:
+        sink.write_graph(_document(tbox, "a", "A"), "a")
+        sink.write_graph(_document(tbox, "b", "B"), "b")
+
+    assert convert(path, str(tmp_path / "kg.ttl")) == 3
+    union = Graph().parse(str(tmp_path / "kg.ttl"), format="turtle")
+    assert (DATA.b, EX.intitule, Literal("B", lang="fr")) in union
+    assert convert(path, str(tmp_path / "kg.trig")) == 3
+
+
+def test_streamed_corpus_matches_merged_graph(pipeline, tmp_path):
+    merged, _ = kg_batch.process_corpus(pipeline, CORPUS)
+
+    path = str(tmp_path / "corpus.nq.gz")
+    with StreamingTripleSink(path, tbox=pipeline.tbox) as sink:
+        graph, report = kg_batch.process_corpus(pipeline, CORPUS, sink=sink)
+    assert graph is None and report["processed"] == 2 and report["triples"] == sink.triples
+
+    convert(path, str(tmp_path / "corpus.nt"))
+    assert isomorphic(Graph().parse(str(tmp_path / "corpus.nt"), format="nt"), merged)
+
+    if kg_worker_pool.fork_available():
+        path = str(tmp_path / "pool.nt")
+        with StreamingTripleSink(path, tbox=pipeline.tbox) as sink:
+            kg_worker_pool.process_corpus_parallel(pipeline, CORPUS, workers=2, sink=sink)
+        assert isomorphic(Graph().parse(path, format="nt"), merged)
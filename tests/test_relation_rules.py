@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du pré-classifieur de relations par règles (relation_rules.py)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relation_rules import (RelationDecisionStats, classify_relation_by_rules,
+                            finalize_relation)
+
+
+def test_teaching_topic_is_decided_by_rules():
+    decision = classify_relation_by_rules(
+        "Marie Curie", "Physique", "Marie Curie enseigne la Physique.", "PER", "TOPIC")
+    assert decision.is_decisive
+    assert (decision.relation, decision.source) == ("teachesSubject", "rule:priority_0a")
+
+
+def test_teaching_organisation_is_works_at():
+    decision = classify_relation_by_rules(
+        "Marie Curie", "Sorbonne", "Marie Curie enseigne à la Sorbonne.", "PER", "ORG")
+    assert (decision.relation, decision.source) == ("worksAt", "rule:priority_0b")
+
+
+def test_bare_city_always_located_in():
+    decision = classify_relation_by_rules(
+        "Jean Dupont", "Paris", "Jean Dupont enseigne la chimie à Paris.", "PER", "LOC")
+    assert decision.relation == "locatedIn"
+    assert decision.source == "rule:city_override"
+
+
+def test_no_cue_is_ambiguous_and_llm_label_is_kept():
+    decision = classify_relation_by_rules(
+        "Alice Martin", "Bob Durand", "Alice Martin et Bob Durand publient ensemble.", "PER", "PER")
+    assert not decision.is_decisive
+    assert finalize_relation("collaboratesWith", decision) == "collaboratesWith"
+    assert finalize_relation("works_for", decision) == "worksAt"
+    assert finalize_relation("likes", decision) == "relatedTo"
+
+
+def test_rule_decision_overrides_llm_label():
+    decision = classify_relation_by_rules(
+        "Marie Curie", "CNRS", "Marie Curie dirige le CNRS.", "PER", "ORG")
+    assert decision.source == "rule:priority_2"
+    assert finalize_relation("relatedTo", decision) == "manages"
+
+
+def test_stats_count_avoided_calls():
+    stats = RelationDecisionStats()
+    stats.record("A", "B", "worksAt", "rule:priority_3", llm_called=False)
+    stats.record("A", "C", "relatedTo", "llm", llm_called=True)
+    stats.record("A", "D", None, "llm:rejected", llm_called=True)
+    summary = stats.summary()
+    assert summary["llm_calls_avoided"] == 1
+    assert summary["llm_calls"] == 2
+    assert summary["by_source"] == {"llm": 1, "llm:rejected": 1, "rule:priority_3": 1}
+    assert summary["decisions"] == 3 and not hasattr(stats, "decisions")
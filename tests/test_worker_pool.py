@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du pool de workers forkés (kg_worker_pool.py)
+"""
+
+import os
+import sys
+
+import pytest
+from rdflib.compare import isomorphic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kg_batch
+import kg_worker_pool
+from entity_type_memo import EntityTypeMemo
+from llm_cache import LLMResponseCache
+from test_kg_batch import CORPUS, pipeline  # noqa: F401 (fixture)
+
+pytestmark = pytest.mark.skipif(not kg_worker_pool.fork_available(), reason="fork() indisponible")
+
+
+def test_pool_graph_matches_single_process(pipeline):
+    expected, _ = kg_batch.process_corpus(pipeline, CORPUS)
+    graph, report = kg_worker_pool.process_corpus_parallel(pipeline, CORPUS * 3, workers=2)
+
+    assert isomorphic(graph, expected)
+    assert (report["documents"], report["processed"], report["rejected"], report["failed"]) == (9, 6, 3, 0)
+    assert report["workers"] == 2
+    assert sum(stats["documents"] for stats in report["per_worker"].values()) == 9
+
+
+def test_workers_never_exceed_documents(pipeline):
+    _, report = kg_worker_pool.process_corpus_parallel(pipeline, CORPUS[:1], workers=8)
+    assert report["workers"] == 1 and report["processed"] == 1
+
+
+def test_sqlite_stores_reopen_after_fork(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("m", "s", "u", "worksAt")
+    inherited = cache._conn
+    cache.reopen_after_fork()
+    assert cache._conn is not inherited
+    assert cache.get("m", "s", "u") == "worksAt"
+
+    memo = EntityTypeMemo(":memory:")
+    memo.store("cnrs", "ORG")
+    memo.reopen_after_fork()
+    assert memo.lookup("cnrs") is None       # mémo en mémoire : repart vide
+    memo.store("cnrs", "ORG")
+    assert memo.lookup("cnrs") == "ORG"
@@ -29,9 +29,10 @@ from typing import Set, List, Tuple, Dict
 import logging
 from collections import defaultdict
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from kg_logging import get_logger
+
+# Journalisation (KG_LOG_LEVEL, voir kg_logging.py) : le détail par chaîne est en DEBUG
+logger = get_logger(__name__)
 
 
 class TransitiveInferenceEngine:
@@ -108,9 +109,10 @@ class TransitiveInferenceEngine:
         
         # AMÉLIORATION PROBLÈME 5: Afficher les triplets de base pour debug
         if existing_triples:
-            logger.info(f"    📊 {len(existing_triples)} triplet(s) de base détecté(s)")
-            for s, o in list(existing_triples)[:3]:  # Afficher 3 exemples
-                logger.info(f"       → {self._format_uri(s)} → {self._format_uri(o)}")
+            logger.info("    📊 %s triplet(s) de base détecté(s)", len(existing_triples))
+            if logger.isEnabledFor(logging.DEBUG):
+                for s, o in list(existing_triples)[:3]:  # Afficher 3 exemples
+                    logger.debug("       → %s → %s", self._format_uri(s), self._format_uri(o))
         
         # Construction d'un graphe de relations
         # relations[A] = [B, C, ...] signifie A → B, A → C, ...
@@ -151,7 +153,11 @@ class TransitiveInferenceEngine:
                                     new_relations = True
                                     
                                     # AMÉLIORATION: Afficher la chaîne transitive trouvée
-                                    logger.info(f"    🔗 Chaîne transitive: {self._format_uri(source)} → {self._format_uri(intermediate)} → {self._format_uri(target)}")
+                                    if logger.isEnabledFor(logging.DEBUG):
+                                        logger.debug("    🔗 Chaîne transitive: %s → %s → %s",
+                                                     self._format_uri(source),
+                                                     self._format_uri(intermediate),
+                                                     self._format_uri(target))
             
             # Si aucune nouvelle relation, la fermeture est complète
             if not new_relations:
@@ -214,19 +220,20 @@ class TransitiveInferenceEngine:
         # Traitement de chaque propriété transitive
         for prop in self.transitive_properties:
             prop_name = self._format_uri(prop)
-            logger.info(f"  Traitement de la propriété: {prop_name}")
+            logger.info("  Traitement de la propriété: %s", prop_name)
             
             # Calcul de la fermeture transitive
             inferred = self._build_transitive_closure(prop)
             
             if inferred:
-                logger.info(f"    ✓ {len(inferred)} triplet(s) inféré(s)")
+                logger.info("    ✓ %s triplet(s) inféré(s)", len(inferred))
                 
                 # AMÉLIORATION: Afficher les chaînes d'inférence
-                for subject, predicate, obj in inferred[:3]:  # Afficher max 3 exemples
-                    subj_name = self._format_uri(subject)
-                    obj_name = self._format_uri(obj)
-                    logger.info(f"      → {subj_name} --[{prop_name}]--> {obj_name}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    for subject, predicate, obj in inferred[:3]:  # Afficher max 3 exemples
+                        subj_name = self._format_uri(subject)
+                        obj_name = self._format_uri(obj)
+                        logger.debug("      → %s --[%s]--> %s", subj_name, prop_name, obj_name)
                 
                 # Ajout au graphe si demandé
                 if add_to_graph:
@@ -245,7 +252,7 @@ class TransitiveInferenceEngine:
                 logger.info(f"    → Aucun triplet à inférer")
                 results_by_property[prop_name] = 0
         
-        logger.info(f"[INFÉRENCE] Total: {total_inferred} triplet(s) ajouté(s)")
+        logger.info("[INFÉRENCE] Total: %s triplet(s) ajouté(s)", total_inferred)
         
         return {
             "total_inferred": total_inferred,